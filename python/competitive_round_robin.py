@@ -21,10 +21,16 @@ CONSTRAINTS:
 """
 
 from typing import List, Dict, Tuple, Optional, Set
-from itertools import combinations
-from dataclasses import dataclass
+from itertools import combinations, chain
+from collections import Counter
+from dataclasses import dataclass, replace
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 import random
 import math
+import os
+import sys
+import time
 import uuid
 import json
 
@@ -56,6 +62,45 @@ class ScheduleValidationResult:
     is_valid: bool
     violations: List[ScheduleConstraintViolation]
     games_per_player: Dict[str, int]  # player_id -> number of games scheduled
+
+
+@dataclass
+class RoundCheckpoint:
+    """Constraint state of a rounds-based schedule after one of its rounds"""
+    round_key: Tuple  # The round's teams and waiters, to tell whether a schedule still has this round
+    games_per_player: Dict[str, int]
+    wait_count: Dict[str, int]
+    partnerships: frozenset  # Sorted (player, player) pairs that have partnered
+    opponent_count: Dict[Tuple[str, str], int]  # Sorted pair -> times faced
+    
+    def same_state(self, other: 'RoundCheckpoint') -> bool:
+        """Whether both describe the same constraint state (whatever the round was)"""
+        return (self.games_per_player == other.games_per_player
+                and self.wait_count == other.wait_count
+                and self.partnerships == other.partnerships
+                and self.opponent_count == other.opponent_count)
+
+
+@dataclass
+class RoundCheckpoints:
+    """Checkpoints for every round of the schedule last generated for a config"""
+    player_ids: Tuple[str, ...]
+    num_courts: int
+    rounds: List[RoundCheckpoint]
+
+
+@dataclass
+class ScheduleQuality:
+    """How good a whole rounds-based schedule is, for picking between candidate schedules"""
+    violations: int  # Constraint violations found by validate_schedule
+    games_spread: int  # Most games any player has minus fewest
+    wait_spread: int  # Most rounds any player waits minus fewest
+    repeated_pairs: int  # Times a pair of players shares a court beyond the first
+    mean_imbalance: float  # Average team rating difference per match
+    
+    def sort_key(self) -> Tuple[int, int, int, float]:
+        """Lower is better: constraints first, then fairness, then variety, then balance"""
+        return (self.violations, self.games_spread + self.wait_spread, self.repeated_pairs, self.mean_imbalance)
     
     
 def get_player_skill_rating(session: Session, player_id: str) -> float:
@@ -159,6 +204,104 @@ def calculate_team_balance_score(session: Session, team1: List[str], team2: List
     return balance_score
 
 
+class ScheduleValidator:
+    """
+    Keeps the result of validate_schedule up to date as matches change one at a time.
+    
+    Remembers what each match contributed when it was last counted, so
+    match_changed() reverts that and counts the match as it is now, in time
+    proportional to one match rather than the whole schedule. Matches are told
+    apart by identity, not by id. Call reset() after bulk changes or a change of
+    the config limits.
+    """
+    
+    def __init__(
+        self,
+        session: Session,
+        config: CompetitiveRoundRobinConfig,
+        scheduled_matches: Optional[List[ScheduledMatch]] = None
+    ):
+        self.session = session
+        self.config = config
+        self.reset(scheduled_matches or [])
+    
+    def reset(self, scheduled_matches: List[ScheduledMatch]) -> None:
+        """Recount the whole schedule from scratch"""
+        self.games_per_player: Dict[str, int] = {player.id: 0 for player in self.session.config.players}
+        self._partnership_count: Dict[Tuple[str, str], int] = {}  # sorted pair -> times partnered
+        self._opponent_count: Dict[Tuple[str, str], int] = {}  # sorted pair -> times opposed
+        self._partner_violations: Dict[Tuple[str, str], int] = {}  # Pairs over the limit only
+        self._opponent_violations: Dict[Tuple[str, str], int] = {}
+        self._counted: Dict[int, Tuple[ScheduledMatch, List[str], List[str]]] = {}  # id(match) -> teams counted
+        for match in scheduled_matches:
+            self.match_changed(match)
+    
+    def match_changed(self, match: ScheduledMatch) -> None:
+        """Recount one match after its status or teams changed"""
+        self.match_removed(match)
+        if match.status == 'approved':
+            team1, team2 = list(match.team1), list(match.team2)
+            self._counted[id(match)] = (match, team1, team2)
+            self._apply(team1, team2, 1)
+    
+    def match_removed(self, match: ScheduledMatch) -> None:
+        """Stop counting a match, e.g. before it is replaced in the schedule"""
+        counted = self._counted.pop(id(match), None)
+        if counted is not None:
+            _, team1, team2 = counted
+            self._apply(team1, team2, -1)
+    
+    def _apply(self, team1: List[str], team2: List[str], delta: int) -> None:
+        """Add (delta=1) or take away (delta=-1) one approved match"""
+        for pid in team1 + team2:
+            self.games_per_player[pid] = self.games_per_player.get(pid, 0) + delta
+        
+        partner_limit = self.config.max_partner_repeats + 1  # +1 because first is allowed
+        for team in (team1, team2):
+            if len(team) == 2:
+                self._count_pair(self._partnership_count, self._partner_violations,
+                                 team[0], team[1], delta, partner_limit)
+        
+        for a in team1:
+            for b in team2:
+                self._count_pair(self._opponent_count, self._opponent_violations,
+                                 a, b, delta, self.config.max_individual_opponent_repeats)
+    
+    @staticmethod
+    def _count_pair(counts: Dict[Tuple[str, str], int], over_limit: Dict[Tuple[str, str], int],
+                    p1: str, p2: str, delta: int, limit: int) -> None:
+        """Update one pair's count and whether it is over the limit"""
+        key = (p1, p2) if p1 < p2 else (p2, p1)
+        count = counts.get(key, 0) + delta
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+        if count > limit:
+            over_limit[key] = count
+        else:
+            over_limit.pop(key, None)
+    
+    def result(self) -> ScheduleValidationResult:
+        """The current validation result (same as validate_schedule on the schedule)"""
+        partner_limit = self.config.max_partner_repeats + 1
+        violations = [
+            ScheduleConstraintViolation(violation_type='partner_repeat', players_involved=list(pair),
+                                        count=count, limit=partner_limit)
+            for pair, count in self._partner_violations.items()
+        ]
+        violations.extend(
+            ScheduleConstraintViolation(violation_type='individual_opponent_exceed', players_involved=list(pair),
+                                        count=count, limit=self.config.max_individual_opponent_repeats)
+            for pair, count in self._opponent_violations.items()
+        )
+        return ScheduleValidationResult(
+            is_valid=len(violations) == 0,
+            violations=violations,
+            games_per_player=dict(self.games_per_player)
+        )
+
+
 def validate_schedule(
     session: Session,
     scheduled_matches: List[ScheduledMatch],
@@ -168,89 +311,7 @@ def validate_schedule(
     Validate a schedule against all constraints.
     Returns validation result with any violations found.
     """
-    violations = []
-    games_per_player: Dict[str, int] = {}
-    partnership_count: Dict[str, Dict[str, int]] = {}  # player -> partner -> count
-    opponent_pair_count: Dict[str, int] = {}  # "p1,p2" sorted -> count faced
-    individual_opponent_count: Dict[str, Dict[str, int]] = {}  # player -> opponent -> count
-    
-    # Initialize tracking for all players
-    for player in session.config.players:
-        pid = player.id
-        games_per_player[pid] = 0
-        partnership_count[pid] = {}
-        individual_opponent_count[pid] = {}
-    
-    # Process each approved match
-    approved_matches = [m for m in scheduled_matches if m.status == 'approved']
-    
-    for match in approved_matches:
-        all_players = match.get_all_players()
-        
-        # Count games per player
-        for pid in all_players:
-            games_per_player[pid] = games_per_player.get(pid, 0) + 1
-        
-        # Track partnerships (within teams)
-        for team in [match.team1, match.team2]:
-            if len(team) == 2:
-                p1, p2 = team
-                partnership_count.setdefault(p1, {})
-                partnership_count.setdefault(p2, {})
-                partnership_count[p1][p2] = partnership_count[p1].get(p2, 0) + 1
-                partnership_count[p2][p1] = partnership_count[p2].get(p1, 0) + 1
-        
-        # Track opponent pairs
-        opp_pair_key = ','.join(sorted(match.team2))  # team2 as opponent pair
-        opponent_pair_count[opp_pair_key] = opponent_pair_count.get(opp_pair_key, 0) + 1
-        
-        opp_pair_key2 = ','.join(sorted(match.team1))  # team1 as opponent pair  
-        opponent_pair_count[opp_pair_key2] = opponent_pair_count.get(opp_pair_key2, 0) + 1
-        
-        # Track individual opponents
-        for p1 in match.team1:
-            for p2 in match.team2:
-                individual_opponent_count.setdefault(p1, {})
-                individual_opponent_count.setdefault(p2, {})
-                individual_opponent_count[p1][p2] = individual_opponent_count[p1].get(p2, 0) + 1
-                individual_opponent_count[p2][p1] = individual_opponent_count[p2].get(p1, 0) + 1
-    
-    # Check partnership violations
-    for p1, partners in partnership_count.items():
-        for p2, count in partners.items():
-            if count > config.max_partner_repeats + 1:  # +1 because first is allowed
-                violations.append(ScheduleConstraintViolation(
-                    violation_type='partner_repeat',
-                    players_involved=[p1, p2],
-                    count=count,
-                    limit=config.max_partner_repeats + 1
-                ))
-    
-    # Check individual opponent violations
-    for p1, opponents in individual_opponent_count.items():
-        for p2, count in opponents.items():
-            if count > config.max_individual_opponent_repeats:
-                violations.append(ScheduleConstraintViolation(
-                    violation_type='individual_opponent_exceed',
-                    players_involved=[p1, p2],
-                    count=count,
-                    limit=config.max_individual_opponent_repeats
-                ))
-    
-    # Deduplicate violations (each pair reports twice)
-    seen_violations = set()
-    unique_violations = []
-    for v in violations:
-        key = (v.violation_type, tuple(sorted(v.players_involved)), v.count)
-        if key not in seen_violations:
-            seen_violations.add(key)
-            unique_violations.append(v)
-    
-    return ScheduleValidationResult(
-        is_valid=len(unique_violations) == 0,
-        violations=unique_violations,
-        games_per_player=games_per_player
-    )
+    return ScheduleValidator(session, config, scheduled_matches).result()
 
 
 def generate_initial_schedule(
@@ -1339,16 +1400,19 @@ def get_available_swaps(
 def get_schedule_summary(
     session: Session,
     scheduled_matches: List[ScheduledMatch],
-    config: CompetitiveRoundRobinConfig
+    config: CompetitiveRoundRobinConfig,
+    validation: Optional[ScheduleValidationResult] = None
 ) -> Dict:
     """
     Get summary statistics about the current schedule.
+    Pass validation if it is already known (e.g. from a ScheduleValidator).
     """
     approved = [m for m in scheduled_matches if m.status == 'approved']
     pending = [m for m in scheduled_matches if m.status == 'pending']
     rejected = [m for m in scheduled_matches if m.status == 'rejected']
     
-    validation = validate_schedule(session, scheduled_matches, config)
+    if validation is None:
+        validation = validate_schedule(session, scheduled_matches, config)
     
     # Calculate average balance score
     avg_balance = 0.0
@@ -1977,9 +2041,23 @@ def compute_scheduled_waiters(
     return scheduled_waiters
 
 
+def _player_bits(player_ids: List[str]) -> Dict[str, int]:
+    """Give each player a bit, so groups of players can be held as int bitmasks"""
+    return {pid: 1 << i for i, pid in enumerate(player_ids)}
+
+
+def _players_mask(player_ids: List[str], player_bits: Dict[str, int]) -> int:
+    """Bitmask of the given players"""
+    mask = 0
+    for pid in player_ids:
+        mask |= player_bits[pid]
+    return mask
+
+
 def generate_rounds_based_schedule(
     session: Session,
-    config: Optional[CompetitiveRoundRobinConfig] = None
+    config: Optional[CompetitiveRoundRobinConfig] = None,
+    seed: Optional[int] = None
 ) -> Tuple[List[ScheduledMatch], List[List[str]]]:
     """
     Generate a rounds-based schedule with fair waitlist assignment and player variety.
@@ -1991,12 +2069,35 @@ def generate_rounds_based_schedule(
     4. Track player co-occurrence to ensure variety (no player appears with same person too often)
     5. Fair waitlist rotation: nobody waits twice before everyone waits once
     
+    With a seed, ties between equally scored matches and equally deserving waiters
+    are broken by a generator seeded with it, giving a different (reproducible) schedule.
+    
     Returns:
         (scheduled_matches, scheduled_waiters)
     """
     if config is None:
         config = CompetitiveRoundRobinConfig()
     
+    scheduled_matches, scheduled_waiters = _build_rounds_based_schedule(session, config, seed)
+    _store_round_checkpoints(session, config, scheduled_matches, scheduled_waiters)
+    _log_schedule_generated(scheduled_matches)
+    return scheduled_matches, scheduled_waiters
+
+
+def _log_schedule_generated(scheduled_matches: List[ScheduledMatch]) -> None:
+    """Log schedule generation"""
+    from python.session_logger import get_session_logger
+    logger = get_session_logger()
+    if logger:
+        logger.log_schedule_generated(len(scheduled_matches))
+
+
+def _build_rounds_based_schedule(
+    session: Session,
+    config: CompetitiveRoundRobinConfig,
+    seed: Optional[int]
+) -> Tuple[List[ScheduledMatch], List[List[str]]]:
+    """Body of generate_rounds_based_schedule, without logging (also run in search worker processes)"""
     players = session.config.players
     num_players = len(players)
     num_courts = session.config.courts
@@ -2015,6 +2116,7 @@ def generate_rounds_based_schedule(
         player_ratings[player.id] = get_player_skill_rating(session, player.id)
     
     all_player_ids = [p.id for p in players]
+    player_bits = _player_bits(all_player_ids)
     
     # Calculate number of rounds needed
     target_games = config.games_per_player
@@ -2025,18 +2127,45 @@ def generate_rounds_based_schedule(
     
     first_bye_player_ids = set(session.config.first_bye_players or [])
     
+    # Seeded runs enumerate groups in a shuffled player order and draw waiter tie-breaks from rng
+    rng = random.Random(seed) if seed is not None else None
+    combo_order = all_player_ids
+    if rng is not None:
+        combo_order = all_player_ids[:]
+        rng.shuffle(combo_order)
+    
     # =========================================================================
     # STEP 1: PRE-GENERATE ALL POSSIBLE MATCHES
     # =========================================================================
-    @dataclass
     class PotentialMatch:
-        team1: List[str]
-        team2: List[str]
-        competitive_score: float  # Score for competitive rounds (similar skill)
-        mixed_score: float        # Score for mixed rounds (varied skill)
-        player_set: frozenset     # All 4 players for quick lookup
-        rating_spread: float      # Max-min rating (for round type selection)
-    
+        """One team split of 4 players. Scores are computed the first time a round asks
+        for them, so splits that are pruned or never considered are never scored."""
+        __slots__ = ('team1', 'team2', 'player_set', 'player_mask', 'rating_spread', '_competitive_score', '_mixed_score')
+
+        def __init__(self, team1: List[str], team2: List[str], player_set: frozenset, player_mask: int,
+                     rating_spread: float):
+            self.team1 = team1
+            self.team2 = team2
+            self.player_set = player_set        # All 4 players (shared by the 3 splits)
+            self.player_mask = player_mask      # Same players as a bitmask, for subset/overlap tests
+            self.rating_spread = rating_spread  # Max-min rating (for round type selection)
+            self._competitive_score: Optional[float] = None
+            self._mixed_score: Optional[float] = None
+
+        @property
+        def competitive_score(self) -> float:
+            """Score for competitive rounds (similar skill)"""
+            if self._competitive_score is None:
+                self._competitive_score = calculate_competitive_score(self.team1, self.team2)
+            return self._competitive_score
+
+        @property
+        def mixed_score(self) -> float:
+            """Score for mixed rounds (varied skill)"""
+            if self._mixed_score is None:
+                self._mixed_score = calculate_mixed_score(self.team1, self.team2)
+            return self._mixed_score
+
     def calculate_competitive_score(team1: List[str], team2: List[str]) -> float:
         """Score for COMPETITIVE rounds - prefers similar skill levels.
         
@@ -2135,7 +2264,7 @@ def generate_rounds_based_schedule(
     # Generate ALL possible matches
     all_potential_matches: List[PotentialMatch] = []
     
-    for combo in combinations(all_player_ids, 4):
+    for combo in combinations(combo_order, 4):
         combo_list = list(combo)
         
         # Try all 3 team configurations
@@ -2145,18 +2274,13 @@ def generate_rounds_based_schedule(
             ([combo_list[0], combo_list[3]], [combo_list[1], combo_list[2]]),
         ]
         
+        ratings = [player_ratings[p] for p in combo_list]
+        rating_spread = max(ratings) - min(ratings)
+        player_set = frozenset(combo_list)
+        player_mask = _players_mask(combo_list, player_bits)
+
         for team1, team2 in team_configs:
-            ratings = [player_ratings[p] for p in combo_list]
-            rating_spread = max(ratings) - min(ratings)
-            
-            all_potential_matches.append(PotentialMatch(
-                team1=team1,
-                team2=team2,
-                competitive_score=calculate_competitive_score(team1, team2),
-                mixed_score=calculate_mixed_score(team1, team2),
-                player_set=frozenset(combo_list),
-                rating_spread=rating_spread
-            ))
+            all_potential_matches.append(PotentialMatch(team1, team2, player_set, player_mask, rating_spread))
     
     # Sort by score (we'll use this for selection)
     # For competitive rounds: sort by competitive_score
@@ -2171,8 +2295,8 @@ def generate_rounds_based_schedule(
     wait_count: Dict[str, int] = {pid: 0 for pid in all_player_ids}
     partnership_used: Dict[str, Set[str]] = {pid: set() for pid in all_player_ids}
     individual_opponent_count: Dict[str, Dict[str, int]] = {pid: {} for pid in all_player_ids}
-    groups_played: Set[frozenset] = set()
-    team_configs_used: Set[Tuple[frozenset, frozenset]] = set()  # Track specific team configurations
+    groups_played: Set[int] = set()  # Player bitmasks
+    team_configs_used: Set[Tuple[int, int]] = set()  # Track specific team configurations (team bitmasks)
     
     # Track player co-occurrence for variety (how many times each pair has played together)
     player_cooccurrence: Dict[str, Dict[str, int]] = {pid: {} for pid in all_player_ids}
@@ -2181,6 +2305,12 @@ def generate_rounds_based_schedule(
     scheduled_waiters: List[List[str]] = []
     match_number = 0
     
+    def team_config_used(team1: List[str], team2: List[str]) -> bool:
+        """Whether these two teams have already played each other (either side)"""
+        t1_mask = player_bits[team1[0]] | player_bits[team1[1]]
+        t2_mask = player_bits[team2[0]] | player_bits[team2[1]]
+        return (t1_mask, t2_mask) in team_configs_used or (t2_mask, t1_mask) in team_configs_used
+    
     def can_use_match(match: PotentialMatch, is_ultra_competitive: bool = False) -> bool:
         """Check if a match can be used given current constraints.
         
@@ -2210,11 +2340,9 @@ def generate_rounds_based_schedule(
         # Group already played - same 4 players with different team configs allowed
         # (This constraint is relaxed - same 4 can play if partners are different)
         # Only block if exact same team configuration was used
-        if match.player_set in groups_played:
+        if match.player_mask in groups_played:
             # Check if this SPECIFIC team configuration was used before
-            team_config = (frozenset(t1), frozenset(t2))
-            team_config_alt = (frozenset(t2), frozenset(t1))
-            if team_config in team_configs_used or team_config_alt in team_configs_used:
+            if team_config_used(t1, t2):
                 return False
         
         # Co-occurrence limit: No pair should play together more than 2 times
@@ -2278,10 +2406,10 @@ def generate_rounds_based_schedule(
                 individual_opponent_count[b][a] = individual_opponent_count[b].get(a, 0) + 1
         
         # Group
-        groups_played.add(frozenset(all_four))
+        groups_played.add(_players_mask(all_four, player_bits))
         
         # Team configuration (for tracking specific team pairings)
-        team_config = (frozenset(team1), frozenset(team2))
+        team_config = (_players_mask(team1, player_bits), _players_mask(team2, player_bits))
         team_configs_used.add(team_config)
         
         # Co-occurrence (all pairs in the match)
@@ -2320,10 +2448,14 @@ def generate_rounds_based_schedule(
         bottom_40_players = set(sorted_by_rating[:bottom_40_cutoff])
         top_40_players = set(sorted_by_rating[top_40_cutoff:])
         
+        # Base rotation factor for fairness within same preference tier
+        if rng is None:
+            rotation_factor = {p: hash((p, round_idx)) % 100 for p in available_players}
+        else:
+            rotation_factor = {p: rng.randrange(100) for p in available_players}
+        
         def waiter_sort_key(p):
-            # Base rotation factor for fairness within same preference tier
-            rotation_factor = hash((p, round_idx)) % 100
-            base_score = games_per_player[p] * 1000 + rotation_factor
+            base_score = games_per_player[p] * 1000 + rotation_factor[p]
             
             # Apply skill-based preference (higher score = more likely to wait)
             if round_type in ('ultra-competitive', 'competitive'):
@@ -2377,6 +2509,81 @@ def generate_rounds_based_schedule(
         
         return penalty
     
+    def find_disjoint_matches(candidates: List[PotentialMatch], num_needed: int) -> Optional[List[PotentialMatch]]:
+        """Find num_needed non-overlapping matches, trying candidates in order (greedy with backtracking).
+
+        Candidates must already pass the constraint check for this round. Returns what a
+        plain depth-first search over the candidates would, but only steps into a candidate
+        once the rest of the round is known to be completable after it.
+        """
+        # Whether the round can be completed depends only on which groups of 4 are still
+        # available, so the splits of a group count once, from the latest position it has
+        last_position: Dict[int, int] = {}
+        for i, m in enumerate(candidates):
+            last_position[m.player_mask] = i
+
+        # Completable from some position means completable from any earlier one, and the
+        # other way around, so one position per (used players, matches needed) is kept
+        completable_from: Dict[Tuple[int, int], int] = {}
+        stuck_from: Dict[Tuple[int, int], int] = {}
+
+        def can_complete(groups: List[int], start: int, num_needed: int, used: int) -> bool:
+            """Whether num_needed more non-overlapping matches exist in candidates[start:].
+            groups must include every group of those that doesn't overlap used."""
+            if num_needed == 0:
+                return True
+            key = (used, num_needed)
+            if start <= completable_from.get(key, -1):
+                return True
+            if start >= stuck_from.get(key, len(candidates)):
+                return False
+
+            live = [g for g in groups if not g & used and last_position[g] >= start]
+            playable = 0
+            for g in live:
+                playable |= g
+            num_playable = bin(playable).count('1')
+
+            if num_playable < 4 * num_needed:
+                found = False
+            else:
+                if num_playable == 4 * num_needed:
+                    # Everyone who can still play has to, so it's enough to try the groups
+                    # of the player with the fewest
+                    groups_per_player = Counter(chain.from_iterable(group_bits[g] for g in live))
+                    bit = min(groups_per_player, key=groups_per_player.__getitem__)
+                    branches = [g for g in live if g & bit]
+                else:
+                    branches = live
+                found = any(can_complete(live, start, num_needed - 1, used | g) for g in branches)
+
+            if found:
+                completable_from[key] = start
+            else:
+                stuck_from[key] = start
+            return found
+
+        group_bits = {g: [player_bits[pid] for pid in candidates[i].player_set] for g, i in last_position.items()}
+        groups = list(last_position)
+        if not can_complete(groups, 0, num_needed, 0):
+            return None
+
+        selected: List[PotentialMatch] = []
+        used = 0
+        start = 0
+        while len(selected) < num_needed:
+            groups = [g for g in groups if not g & used and last_position[g] >= start]
+            for i in range(start, len(candidates)):
+                match = candidates[i]
+                if match.player_mask & used:
+                    continue  # Players already used
+                if can_complete(groups, i + 1, num_needed - len(selected) - 1, used | match.player_mask):
+                    selected.append(match)
+                    used |= match.player_mask
+                    start = i + 1
+                    break
+        return selected
+    
     # Generate rounds
     for round_idx in range(num_rounds):
         # Determine round type:
@@ -2408,19 +2615,35 @@ def generate_rounds_based_schedule(
         scheduled_waiters.append(waiters)
         
         playing = [p for p in available if p not in waiters]
-        playing_set = set(playing)
+        not_playing_mask = _players_mask([p for p in all_player_ids if p not in playing], player_bits)
         
+        # A split that repeats a partnership fails every check below, at every relaxation
+        # level, and partnerships are never freed - drop those splits for good
+        all_potential_matches = [
+            m for m in all_potential_matches
+            if m.team1[1] not in partnership_used[m.team1[0]] and m.team2[1] not in partnership_used[m.team2[0]]
+        ]
+
         # Filter potential matches to only those using players who are playing this round
         round_candidates = [
-            m for m in all_potential_matches 
-            if m.player_set.issubset(playing_set) and can_use_match(m, is_ultra_competitive)
+            m for m in all_potential_matches
+            if not m.player_mask & not_playing_mask and can_use_match(m, is_ultra_competitive)
         ]
-        
-        # Score and sort candidates for this round type
-        def match_score_for_round(m: PotentialMatch) -> float:
-            base_score = m.competitive_score if is_competitive_round else m.mixed_score
+
+        # Constraints only change once the round's matches are recorded, so each
+        # candidate is scored once per round, and the penalties that depend only on
+        # its 4 players (not on the split) once per player set
+        round_scores: Dict[PotentialMatch, float] = {}
+        round_group_penalties: Dict[int, Tuple[float, float]] = {}
+
+        def group_penalties(m: PotentialMatch) -> Tuple[float, float]:
+            """(variety penalty, balance penalty) for the 4 players of m this round"""
+            penalties = round_group_penalties.get(m.player_mask)
+            if penalties is not None:
+                return penalties
+
             variety_penalty = get_cooccurrence_penalty(m)
-            score = base_score - variety_penalty
+            balance_penalty = 0
             
             # For competitive rounds, apply HEAVY penalty for poor achievable balance
             # This is crucial: even if 4 players are homogeneous, if partnership constraints
@@ -2431,15 +2654,28 @@ def generate_rounds_based_schedule(
                 
                 if best_balance_diff == float('inf'):
                     # No valid configuration exists - heavily penalize
-                    score -= 2000
+                    balance_penalty = 2000
                 elif best_balance_diff > 100:  # More than 100 rating points difference (0.25 skill level)
                     # Poor achievable balance - apply penalty proportional to imbalance
                     # 100 diff → -200 penalty, 200 diff → -400 penalty, etc.
-                    score -= best_balance_diff * 2
+                    balance_penalty = best_balance_diff * 2
                 elif best_balance_diff > 50:
                     # Moderate imbalance - small penalty
-                    score -= best_balance_diff
+                    balance_penalty = best_balance_diff
             
+            penalties = round_group_penalties[m.player_mask] = (variety_penalty, balance_penalty)
+            return penalties
+
+        # Score and sort candidates for this round type
+        def match_score_for_round(m: PotentialMatch) -> float:
+            score = round_scores.get(m)
+            if score is None:
+                variety_penalty, balance_penalty = group_penalties(m)
+                base_score = m.competitive_score if is_competitive_round else m.mixed_score
+                score = base_score - variety_penalty
+                if balance_penalty:
+                    score -= balance_penalty
+                round_scores[m] = score
             return score
         
         # For ULTRA-COMPETITIVE round: group similarly-rated players together
@@ -2451,33 +2687,34 @@ def generate_rounds_based_schedule(
             used_players = set()
             
             if max_matches_per_round >= 2 and len(playing) >= 8:
-                # For multiple courts, evaluate all valid 2-match combinations
-                # to find the one with best total homogeneity
-                available = set(playing)
+                # For multiple courts, find the 2 non-overlapping matches with best total
+                # homogeneity (lowest combined skill spread); ties go to the earliest pair
                 best_combination = None
-                best_total_score = float('-inf')
-                
-                valid_matches_for_round = [m for m in round_candidates if m.player_set.issubset(available)]
-                
-                # Try all pairs of non-overlapping matches
-                for i, m1 in enumerate(valid_matches_for_round):
-                    for m2 in valid_matches_for_round[i+1:]:
-                        if m1.player_set.isdisjoint(m2.player_set):
-                            # Calculate homogeneity score for this combination
-                            m1_ratings = [player_ratings.get(p, 1500) for p in m1.player_set]
-                            m2_ratings = [player_ratings.get(p, 1500) for p in m2.player_set]
-                            
-                            # Skill spread within each match (lower is better for ultra-competitive)
-                            m1_spread = max(m1_ratings) - min(m1_ratings)
-                            m2_spread = max(m2_ratings) - min(m2_ratings)
-                            
-                            # Combined score: negative spread (lower spread = higher score)
-                            total_score = -(m1_spread + m2_spread)
-                            
-                            if total_score > best_total_score:
-                                best_total_score = total_score
-                                best_combination = [m1, m2]
-                
+                best_total_spread = float('inf')
+
+                # Spread depends only on the 4 players, so only the first usable split of
+                # each player set can be picked
+                first_split_per_group: Dict[int, PotentialMatch] = {}
+                for m in round_candidates:
+                    first_split_per_group.setdefault(m.player_mask, m)
+                group_matches = list(first_split_per_group.values())
+                by_spread = sorted(range(len(group_matches)), key=lambda k: (group_matches[k].rating_spread, k))
+
+                # For each first match, the best second match is the lowest-spread disjoint
+                # group after it; stop scanning once no later pair can beat the best so far
+                lowest_spread = group_matches[by_spread[0]].rating_spread if group_matches else 0.0
+                for i, m1 in enumerate(group_matches):
+                    if m1.rating_spread + lowest_spread >= best_total_spread:
+                        continue
+                    for k in by_spread:
+                        m2 = group_matches[k]
+                        if m1.rating_spread + m2.rating_spread >= best_total_spread:
+                            break
+                        if k > i and not m1.player_mask & m2.player_mask:
+                            best_total_spread = m1.rating_spread + m2.rating_spread
+                            best_combination = [m1, m2]
+                            break
+
                 if best_combination:
                     selected_matches = best_combination
                     for m in best_combination:
@@ -2493,12 +2730,11 @@ def generate_rounds_based_schedule(
                     # Find the best match with smallest skill spread
                     best_match = None
                     best_homogeneity_score = float('-inf')
+                    used_mask = _players_mask(used_players, player_bits)
                     
                     for m in round_candidates:
-                        if m.player_set.issubset(set(available)):
-                            match_ratings = [player_ratings.get(p, 1500) for p in m.player_set]
-                            skill_spread = max(match_ratings) - min(match_ratings)
-                            homogeneity_score = -skill_spread + match_score_for_round(m) * 0.001
+                        if not m.player_mask & used_mask:
+                            homogeneity_score = -m.rating_spread + match_score_for_round(m) * 0.001
                             
                             if homogeneity_score > best_homogeneity_score:
                                 best_homogeneity_score = homogeneity_score
@@ -2551,10 +2787,10 @@ def generate_rounds_based_schedule(
             players_by_priority = sorted(playing, key=selection_priority)
             
             selected_matches_competitive: List[PotentialMatch] = []
-            used_in_round: Set[str] = set()
+            used_in_round = 0  # Player bitmask
             
             for player in players_by_priority:
-                if player in used_in_round:
+                if player_bits[player] & used_in_round:
                     continue  # Already assigned to a match
                 
                 # Find best available match for this player
@@ -2567,7 +2803,7 @@ def generate_rounds_based_schedule(
                 best_score = float('-inf')
                 
                 for m in player_matches[player]:
-                    if m.player_set & used_in_round:
+                    if m.player_mask & used_in_round:
                         continue  # Someone already assigned
                     if not can_use_match(m, is_ultra_competitive):
                         continue  # Constraint violation
@@ -2596,7 +2832,7 @@ def generate_rounds_based_schedule(
                 
                 if best_match:
                     selected_matches_competitive.append(best_match)
-                    used_in_round |= best_match.player_set
+                    used_in_round |= best_match.player_mask
                     
                     if len(selected_matches_competitive) >= max_matches_per_round:
                         break
@@ -2613,31 +2849,8 @@ def generate_rounds_based_schedule(
         if selected_matches is None or len(selected_matches) < max_matches_per_round:
             round_candidates.sort(key=match_score_for_round, reverse=True)
             
-            # Select matches for this round (greedy with backtracking)
-            def find_matches_for_round(candidates: List[PotentialMatch], num_needed: int, used: Set[str]) -> Optional[List[PotentialMatch]]:
-                """Find num_needed non-overlapping matches from candidates."""
-                if num_needed == 0:
-                    return []
-                
-                for i, match in enumerate(candidates):
-                    if match.player_set & used:
-                        continue  # Players already used
-                    
-                    if not can_use_match(match, is_ultra_competitive):
-                        continue  # Constraints violated
-                    
-                    # Try this match
-                    new_used = used | match.player_set
-                    remaining = candidates[i+1:]
-                    
-                    result = find_matches_for_round(remaining, num_needed - 1, new_used)
-                    if result is not None:
-                        return [match] + result
-                
-                return None
-            
             # FIXED: Use max_matches_per_round instead of num_courts
-            selected_matches = find_matches_for_round(round_candidates, max_matches_per_round, set())
+            selected_matches = find_disjoint_matches(round_candidates, max_matches_per_round)
             
             # If backtracking failed, try with relaxed variety constraints
             if selected_matches is None:
@@ -2646,7 +2859,7 @@ def generate_rounds_based_schedule(
                     key=lambda m: m.competitive_score if is_competitive_round else m.mixed_score,
                     reverse=True
                 )
-                selected_matches = find_matches_for_round(round_candidates, max_matches_per_round, set())
+                selected_matches = find_disjoint_matches(round_candidates, max_matches_per_round)
             
             # PROGRESSIVE CONSTRAINT RELAXATION
             # If still no matches, we need to progressively relax constraints
@@ -2668,9 +2881,7 @@ def generate_rounds_based_schedule(
                                 return False
                     
                     # Team configuration check - same 4 can play if team config is different
-                    team_config = (frozenset(t1), frozenset(t2))
-                    team_config_alt = (frozenset(t2), frozenset(t1))
-                    if team_config in team_configs_used or team_config_alt in team_configs_used:
+                    if team_config_used(t1, t2):
                         return False
                     
                     # RELAXED: Allow pairs to play together up to 3 times instead of 2
@@ -2682,24 +2893,10 @@ def generate_rounds_based_schedule(
                     return True
                 
                 relaxed_candidates = [m for m in all_potential_matches 
-                                     if m.player_set.issubset(playing_set) and can_use_match_relaxed_cooccurrence(m)]
+                                     if not m.player_mask & not_playing_mask and can_use_match_relaxed_cooccurrence(m)]
                 relaxed_candidates.sort(key=lambda m: m.competitive_score if is_competitive_round else m.mixed_score, reverse=True)
                 
-                def find_matches_relaxed(candidates, num_needed, used):
-                    if num_needed == 0:
-                        return []
-                    for i, match in enumerate(candidates):
-                        if match.player_set & used:
-                            continue
-                        if not can_use_match_relaxed_cooccurrence(match):
-                            continue
-                        new_used = used | match.player_set
-                        result = find_matches_relaxed(candidates[i+1:], num_needed - 1, new_used)
-                        if result is not None:
-                            return [match] + result
-                    return None
-                
-                selected_matches = find_matches_relaxed(relaxed_candidates, max_matches_per_round, set())
+                selected_matches = find_disjoint_matches(relaxed_candidates, max_matches_per_round)
             
             # Level 2: Relax opponent limit (allow facing same person more times)
             if selected_matches is None:
@@ -2718,32 +2915,16 @@ def generate_rounds_based_schedule(
                                 return False
                     
                     # Team configuration check - same 4 can play if team config is different
-                    team_config = (frozenset(t1), frozenset(t2))
-                    team_config_alt = (frozenset(t2), frozenset(t1))
-                    if team_config in team_configs_used or team_config_alt in team_configs_used:
+                    if team_config_used(t1, t2):
                         return False
                     
                     return True
                 
                 very_relaxed_candidates = [m for m in all_potential_matches 
-                                          if m.player_set.issubset(playing_set) and can_use_match_very_relaxed(m)]
+                                          if not m.player_mask & not_playing_mask and can_use_match_very_relaxed(m)]
                 very_relaxed_candidates.sort(key=lambda m: m.competitive_score if is_competitive_round else m.mixed_score, reverse=True)
                 
-                def find_matches_very_relaxed(candidates, num_needed, used):
-                    if num_needed == 0:
-                        return []
-                    for i, match in enumerate(candidates):
-                        if match.player_set & used:
-                            continue
-                        if not can_use_match_very_relaxed(match):
-                            continue
-                        new_used = used | match.player_set
-                        result = find_matches_very_relaxed(candidates[i+1:], num_needed - 1, new_used)
-                        if result is not None:
-                            return [match] + result
-                    return None
-                
-                selected_matches = find_matches_very_relaxed(very_relaxed_candidates, max_matches_per_round, set())
+                selected_matches = find_disjoint_matches(very_relaxed_candidates, max_matches_per_round)
             
             # Level 3: Only enforce no-repeat-partners and no-same-group constraints
             if selected_matches is None:
@@ -2756,32 +2937,16 @@ def generate_rounds_based_schedule(
                         return False
                     
                     # Team configuration check - same 4 can play if team config is different
-                    team_config = (frozenset(t1), frozenset(t2))
-                    team_config_alt = (frozenset(t2), frozenset(t1))
-                    if team_config in team_configs_used or team_config_alt in team_configs_used:
+                    if team_config_used(t1, t2):
                         return False
                     
                     return True
                 
                 minimal_candidates = [m for m in all_potential_matches 
-                                     if m.player_set.issubset(playing_set) and can_use_match_minimal(m)]
+                                     if not m.player_mask & not_playing_mask and can_use_match_minimal(m)]
                 minimal_candidates.sort(key=lambda m: m.competitive_score if is_competitive_round else m.mixed_score, reverse=True)
                 
-                def find_matches_minimal(candidates, num_needed, used):
-                    if num_needed == 0:
-                        return []
-                    for i, match in enumerate(candidates):
-                        if match.player_set & used:
-                            continue
-                        if not can_use_match_minimal(match):
-                            continue
-                        new_used = used | match.player_set
-                        result = find_matches_minimal(candidates[i+1:], num_needed - 1, new_used)
-                        if result is not None:
-                            return [match] + result
-                    return None
-                
-                selected_matches = find_matches_minimal(minimal_candidates, max_matches_per_round, set())
+                selected_matches = find_disjoint_matches(minimal_candidates, max_matches_per_round)
             
             # Level 4: LAST RESORT - Only enforce no-repeat-partners (allow repeated groups)
             if selected_matches is None:
@@ -2796,24 +2961,10 @@ def generate_rounds_based_schedule(
                     return True
                 
                 partnership_only_candidates = [m for m in all_potential_matches 
-                                              if m.player_set.issubset(playing_set) and can_use_match_partnership_only(m)]
+                                              if not m.player_mask & not_playing_mask and can_use_match_partnership_only(m)]
                 partnership_only_candidates.sort(key=lambda m: m.competitive_score if is_competitive_round else m.mixed_score, reverse=True)
                 
-                def find_matches_partnership_only(candidates, num_needed, used):
-                    if num_needed == 0:
-                        return []
-                    for i, match in enumerate(candidates):
-                        if match.player_set & used:
-                            continue
-                        if not can_use_match_partnership_only(match):
-                            continue
-                        new_used = used | match.player_set
-                        result = find_matches_partnership_only(candidates[i+1:], num_needed - 1, new_used)
-                        if result is not None:
-                            return [match] + result
-                    return None
-                
-                selected_matches = find_matches_partnership_only(partnership_only_candidates, max_matches_per_round, set())
+                selected_matches = find_disjoint_matches(partnership_only_candidates, max_matches_per_round)
             
             # If all fallbacks failed but competitive selection got at least 1 match, use that
             if selected_matches is None and competitive_partial:
@@ -2886,12 +3037,144 @@ def generate_rounds_based_schedule(
         
         scheduled_matches.extend(round_matches)
     
-    # Log schedule generation
-    from python.session_logger import get_session_logger
-    logger = get_session_logger()
-    if logger:
-        logger.log_schedule_generated(len(scheduled_matches))
+    return scheduled_matches, scheduled_waiters
+
+
+def evaluate_schedule_quality(
+    session: Session,
+    scheduled_matches: List[ScheduledMatch],
+    scheduled_waiters: List[List[str]],
+    config: CompetitiveRoundRobinConfig
+) -> ScheduleQuality:
+    """
+    Score a whole rounds-based schedule, as if every match in it were approved.
+    """
+    validation = validate_schedule(
+        session, [replace(m, status='approved') for m in scheduled_matches], config
+    )
+    player_ratings = {p.id: get_player_skill_rating(session, p.id) for p in session.config.players}
+    
+    wait_count: Dict[str, int] = {pid: 0 for pid in player_ratings}
+    for waiters in scheduled_waiters:
+        for pid in waiters:
+            wait_count[pid] = wait_count.get(pid, 0) + 1
+    
+    pair_count: Dict[Tuple[str, str], int] = {}
+    total_imbalance = 0.0
+    for match in scheduled_matches:
+        for pair in combinations(sorted(match.get_all_players()), 2):
+            pair_count[pair] = pair_count.get(pair, 0) + 1
+        total_imbalance += abs(
+            sum(player_ratings.get(pid, 1500) for pid in match.team1)
+            - sum(player_ratings.get(pid, 1500) for pid in match.team2)
+        )
+    
+    games = list(validation.games_per_player.values()) or [0]
+    waits = list(wait_count.values()) or [0]
+    return ScheduleQuality(
+        violations=len(validation.violations),
+        games_spread=max(games) - min(games),
+        wait_spread=max(waits) - min(waits),
+        repeated_pairs=sum(count - 1 for count in pair_count.values()),
+        mean_imbalance=total_imbalance / len(scheduled_matches) if scheduled_matches else 0.0
+    )
+
+
+def _generate_scored_schedule(
+    session: Session,
+    config: CompetitiveRoundRobinConfig,
+    seed: Optional[int]
+) -> Tuple[Tuple[int, int, int, float], List[ScheduledMatch], List[List[str]]]:
+    """One start of search_rounds_based_schedule (runs in a worker process)"""
+    scheduled_matches, scheduled_waiters = _build_rounds_based_schedule(session, config, seed)
+    quality = evaluate_schedule_quality(session, scheduled_matches, scheduled_waiters, config)
+    return quality.sort_key(), scheduled_matches, scheduled_waiters
+
+
+def default_schedule_search_starts() -> int:
+    """Schedule search starts to use by default: one per CPU (capped at 8), at least 1"""
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def _stop_schedule_workers(executor: ProcessPoolExecutor) -> None:
+    """Terminate the executor's worker processes, ending starts that are still running"""
+    processes = getattr(executor, '_processes', None) or {}
+    for process in list(processes.values()):
+        try:
+            process.terminate()
+        except (OSError, ValueError, AttributeError):
+            pass  # Already exited
+
+
+def search_rounds_based_schedule(
+    session: Session,
+    config: Optional[CompetitiveRoundRobinConfig] = None,
+    num_starts: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    max_workers: Optional[int] = None
+) -> Tuple[List[ScheduledMatch], List[List[str]]]:
+    """
+    Generate several differently seeded rounds-based schedules in parallel and
+    return the best one by ScheduleQuality.
+    
+    The unseeded start (the schedule generate_rounds_based_schedule gives) runs in
+    this process while worker processes run the seeded ones, so the result is never
+    worse than a single pass. Seeded starts that haven't finished when the time
+    budget runs out are dropped and their worker processes stopped. If worker
+    processes can't be started, only the unseeded start is used.
+    
+    This blocks for up to time_budget seconds, so the GUI runs it off the UI thread.
+    
+    num_starts and time_budget default to the config's schedule_search_starts and
+    schedule_search_time_budget; max_workers defaults to one less than the CPU count.
+    
+    Returns:
+        (scheduled_matches, scheduled_waiters)
+    """
+    if config is None:
+        config = CompetitiveRoundRobinConfig()
+    if num_starts is None:
+        num_starts = config.schedule_search_starts
+    if time_budget is None:
+        time_budget = config.schedule_search_time_budget
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 2) - 1)
+    
+    if num_starts <= 1:
+        return generate_rounds_based_schedule(session, config)
+    
+    deadline = time.perf_counter() + time_budget
+    executor = None
+    futures = []
+    try:
+        try:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+            futures = [executor.submit(_generate_scored_schedule, session, config, seed)
+                       for seed in range(1, num_starts)]
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass  # No usable worker processes (e.g. restricted environment)
+        
+        results = [_generate_scored_schedule(session, config, None)]
+        wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                results.append(future.result())
+    finally:
+        for future in futures:
+            future.cancel()  # Starts that never began (what cancel_futures does on 3.9+)
+        if executor is not None:
+            if not all(future.done() for future in futures):
+                # Past the deadline: stop the starts still running instead of letting them burn cores
+                _stop_schedule_workers(executor)
+            if sys.version_info >= (3, 9):
+                executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                executor.shutdown(wait=False)
     
+    # Ties keep the earliest result, which is the unseeded one
+    _, scheduled_matches, scheduled_waiters = min(results, key=lambda result: result[0])
+    _store_round_checkpoints(session, config, scheduled_matches, scheduled_waiters)
+    _log_schedule_generated(scheduled_matches)
     return scheduled_matches, scheduled_waiters
 
 
@@ -3376,6 +3659,107 @@ def swap_player_between_matches_or_waitlist(
     return False, "Could not find both players in round"
 
 
+def _round_key(round_matches: List[ScheduledMatch], round_waiters: List[str]) -> Tuple:
+    """Hashable summary of one round's teams and waiters"""
+    return (tuple((tuple(m.team1), tuple(m.team2)) for m in round_matches), tuple(round_waiters))
+
+
+def _split_rounds(
+    scheduled_matches: List[ScheduledMatch],
+    scheduled_waiters: List[List[str]],
+    num_courts: int
+) -> Optional[List[List[ScheduledMatch]]]:
+    """Matches of each round, or None unless every round fills every court in order"""
+    if num_courts <= 0 or len(scheduled_matches) != len(scheduled_waiters) * num_courts:
+        return None
+    rounds = [scheduled_matches[r * num_courts:(r + 1) * num_courts] for r in range(len(scheduled_waiters))]
+    if any(m.round_number != r for r, round_matches in enumerate(rounds) for m in round_matches):
+        return None
+    return rounds
+
+
+def _regenerated_round_type(round_idx: int) -> str:
+    """Round type regenerate_subsequent_rounds gives a round"""
+    # Round 0 = ultra-competitive, then alternate competitive/variety
+    if round_idx == 0:
+        return ROUND_TYPE_ULTRA_COMPETITIVE
+    is_competitive = ((round_idx - 1) % 2 == 0)  # rounds 1,3,5 = competitive
+    return ROUND_TYPE_COMPETITIVE if is_competitive else ROUND_TYPE_VARIETY
+
+
+class _RoundState:
+    """Running constraint counts of a rounds-based schedule, as regenerate_subsequent_rounds uses them"""
+    
+    def __init__(self, player_ids: List[str], checkpoint: Optional[RoundCheckpoint] = None):
+        self.games_per_player: Dict[str, int] = {pid: 0 for pid in player_ids}
+        self.wait_count: Dict[str, int] = {pid: 0 for pid in player_ids}
+        self.partnership_used: Dict[str, Set[str]] = {pid: set() for pid in player_ids}
+        self.individual_opponent_count: Dict[str, Dict[str, int]] = {pid: {} for pid in player_ids}
+        if checkpoint is not None:
+            self.games_per_player.update(checkpoint.games_per_player)
+            self.wait_count.update(checkpoint.wait_count)
+            for a, b in checkpoint.partnerships:
+                self.partnership_used[a].add(b)
+                self.partnership_used[b].add(a)
+            for (a, b), count in checkpoint.opponent_count.items():
+                self.individual_opponent_count[a][b] = count
+                self.individual_opponent_count[b][a] = count
+    
+    def add_match(self, team1: List[str], team2: List[str]) -> None:
+        for pid in team1 + team2:
+            self.games_per_player[pid] = self.games_per_player.get(pid, 0) + 1
+        
+        # Partnerships
+        for team in (team1, team2):
+            if len(team) == 2:
+                self.partnership_used[team[0]].add(team[1])
+                self.partnership_used[team[1]].add(team[0])
+        
+        # Opponents
+        for a in team1:
+            for b in team2:
+                self.individual_opponent_count[a][b] = self.individual_opponent_count[a].get(b, 0) + 1
+                self.individual_opponent_count[b][a] = self.individual_opponent_count[b].get(a, 0) + 1
+    
+    def add_waiters(self, waiters: List[str]) -> None:
+        for pid in waiters:
+            self.wait_count[pid] = self.wait_count.get(pid, 0) + 1
+    
+    def checkpoint(self, round_key: Tuple) -> RoundCheckpoint:
+        return RoundCheckpoint(
+            round_key=round_key,
+            games_per_player=dict(self.games_per_player),
+            wait_count=dict(self.wait_count),
+            partnerships=frozenset((a, b) for a, partners in self.partnership_used.items() for b in partners if a < b),
+            opponent_count={(a, b): count for a, opponents in self.individual_opponent_count.items()
+                            for b, count in opponents.items() if a < b}
+        )
+
+
+def _store_round_checkpoints(
+    session: Session,
+    config: CompetitiveRoundRobinConfig,
+    scheduled_matches: List[ScheduledMatch],
+    scheduled_waiters: List[List[str]]
+) -> None:
+    """Remember the constraint state after each round of a newly generated schedule"""
+    num_courts = session.config.courts
+    rounds = _split_rounds(scheduled_matches, scheduled_waiters, num_courts)
+    if rounds is None:
+        config.round_checkpoints = None
+        return
+    
+    player_ids = [p.id for p in session.config.players]
+    state = _RoundState(player_ids)
+    checkpoints = []
+    for round_matches, round_waiters in zip(rounds, scheduled_waiters):
+        for match in round_matches:
+            state.add_match(match.team1, match.team2)
+        state.add_waiters(round_waiters)
+        checkpoints.append(state.checkpoint(_round_key(round_matches, round_waiters)))
+    config.round_checkpoints = RoundCheckpoints(tuple(player_ids), num_courts, checkpoints)
+
+
 def regenerate_subsequent_rounds(
     session: Session,
     scheduled_matches: List[ScheduledMatch],
@@ -3389,6 +3773,13 @@ def regenerate_subsequent_rounds(
     This is called after a player swap or round type change to ensure
     subsequent rounds are valid and properly configured.
     
+    Uses the per-round checkpoints kept in config.round_checkpoints (rounds whose
+    teams or waiters no longer match their checkpoint are not trusted): constraint
+    state is restored from the last unchanged round before from_round_index rather
+    than replayed from the start, and as soon as the state after a round is the
+    same as the old schedule's at that round, the old remaining rounds (and their
+    approvals) are kept instead of being regenerated.
+    
     Args:
         session: Current session
         scheduled_matches: All scheduled matches
@@ -3411,54 +3802,57 @@ def regenerate_subsequent_rounds(
     
     # Get all player IDs
     all_player_ids = [p.id for p in session.config.players]
+    player_bits = _player_bits(all_player_ids)
+    
+    # Checkpoints of the schedule as generated; the caller has usually edited
+    # from_round_index since, and any round that was edited no longer matches its key
+    rounds = _split_rounds(scheduled_matches, scheduled_waiters, num_courts)
+    old_checkpoints: Optional[List[RoundCheckpoint]] = None
+    saved = config.round_checkpoints
+    if (rounds is not None and saved is not None and saved.player_ids == tuple(all_player_ids)
+            and saved.num_courts == num_courts and len(saved.rounds) == num_rounds):
+        old_checkpoints = saved.rounds
+        unchanged = [cp.round_key == _round_key(round_matches, round_waiters)
+                     for cp, round_matches, round_waiters in zip(old_checkpoints, rounds, scheduled_waiters)]
+        # Old later rounds are only kept if they have the type regeneration would give them
+        reusable = [same and all(m.round_type == _regenerated_round_type(r) for m in rounds[r])
+                    for r, same in enumerate(unchanged)]
+    
+    # Build constraint tracking from kept matches, starting from the last checkpoint
+    # whose round and every round before it are unchanged
+    resume_round = -1
+    if old_checkpoints is not None:
+        while resume_round + 1 < min(from_round_index, num_rounds) and unchanged[resume_round + 1]:
+            resume_round += 1
+    if resume_round >= 0:
+        state = _RoundState(all_player_ids, old_checkpoints[resume_round])
+        new_checkpoints: Optional[List[RoundCheckpoint]] = old_checkpoints[:resume_round + 1]
+    else:
+        state = _RoundState(all_player_ids)
+        new_checkpoints = [] if rounds is not None else None
+    
+    if rounds is not None:
+        for r in range(resume_round + 1, min(from_round_index + 1, num_rounds)):
+            for match in rounds[r]:
+                state.add_match(match.team1, match.team2)
+            state.add_waiters(scheduled_waiters[r])
+            new_checkpoints.append(state.checkpoint(_round_key(rounds[r], scheduled_waiters[r])))
+    else:
+        for match in kept_matches:
+            state.add_match(match.team1, match.team2)
+        for waiters in kept_waiters:
+            state.add_waiters(waiters)
     
-    # Build constraint tracking from kept matches
-    games_per_player: Dict[str, int] = {pid: 0 for pid in all_player_ids}
-    wait_count: Dict[str, int] = {pid: 0 for pid in all_player_ids}
-    partnership_used: Dict[str, Set[str]] = {pid: set() for pid in all_player_ids}
-    individual_opponent_count: Dict[str, Dict[str, int]] = {pid: {} for pid in all_player_ids}
-    groups_played: Set[frozenset] = set()
-    player_cooccurrence: Dict[str, Dict[str, int]] = {pid: {} for pid in all_player_ids}
+    games_per_player = state.games_per_player
+    wait_count = state.wait_count
+    partnership_used = state.partnership_used
+    individual_opponent_count = state.individual_opponent_count
     
     # Get player ratings
     player_ratings: Dict[str, float] = {}
     for player in session.config.players:
         player_ratings[player.id] = get_player_skill_rating(session, player.id)
     
-    # Process kept matches to build constraint state
-    for match in kept_matches:
-        all_four = match.get_all_players()
-        for pid in all_four:
-            games_per_player[pid] += 1
-        
-        # Partnerships
-        if len(match.team1) == 2:
-            partnership_used[match.team1[0]].add(match.team1[1])
-            partnership_used[match.team1[1]].add(match.team1[0])
-        if len(match.team2) == 2:
-            partnership_used[match.team2[0]].add(match.team2[1])
-            partnership_used[match.team2[1]].add(match.team2[0])
-        
-        # Opponents
-        for a in match.team1:
-            for b in match.team2:
-                individual_opponent_count[a][b] = individual_opponent_count[a].get(b, 0) + 1
-                individual_opponent_count[b][a] = individual_opponent_count[b].get(a, 0) + 1
-        
-        # Groups
-        groups_played.add(frozenset(all_four))
-        
-        # Co-occurrence
-        for i, p1 in enumerate(all_four):
-            for p2 in all_four[i+1:]:
-                player_cooccurrence[p1][p2] = player_cooccurrence[p1].get(p2, 0) + 1
-                player_cooccurrence[p2][p1] = player_cooccurrence[p2].get(p1, 0) + 1
-    
-    # Process kept waiters
-    for waiters in kept_waiters:
-        for w in waiters:
-            wait_count[w] = wait_count.get(w, 0) + 1
-    
     target_games = config.games_per_player
     max_games = target_games + 2
     players_per_round = num_courts * 4
@@ -3484,28 +3878,6 @@ def regenerate_subsequent_rounds(
         
         return True
     
-    def record_match_check(team1: List[str], team2: List[str]) -> None:
-        all_four = team1 + team2
-        for pid in all_four:
-            games_per_player[pid] = games_per_player.get(pid, 0) + 1
-        
-        partnership_used[team1[0]].add(team1[1])
-        partnership_used[team1[1]].add(team1[0])
-        partnership_used[team2[0]].add(team2[1])
-        partnership_used[team2[1]].add(team2[0])
-        
-        for a in team1:
-            for b in team2:
-                individual_opponent_count[a][b] = individual_opponent_count[a].get(b, 0) + 1
-                individual_opponent_count[b][a] = individual_opponent_count[b].get(a, 0) + 1
-        
-        groups_played.add(frozenset(all_four))
-        
-        for i, p1 in enumerate(all_four):
-            for p2 in all_four[i+1:]:
-                player_cooccurrence[p1][p2] = player_cooccurrence[p1].get(p2, 0) + 1
-                player_cooccurrence[p2][p1] = player_cooccurrence[p2].get(p1, 0) + 1
-    
     def select_waiters(available: List[str], num_to_wait: int, round_idx: int, round_type: str) -> List[str]:
         """Select waiters with STRICT fair rotation for regenerated rounds.
         
@@ -3561,13 +3933,16 @@ def regenerate_subsequent_rounds(
     match_number = len(kept_matches)
     
     for round_idx in range(from_round_index + 1, num_rounds):
-        # Determine round type: match the pattern from initial generation
-        # Round 0 = ultra-competitive, then alternate competitive/variety
-        if round_idx == 0:
-            round_type = ROUND_TYPE_ULTRA_COMPETITIVE
-        else:
-            is_competitive = ((round_idx - 1) % 2 == 0)  # rounds 1,3,5 = competitive
-            round_type = ROUND_TYPE_COMPETITIVE if is_competitive else ROUND_TYPE_VARIETY
+        # Converged: the constraint state is what the old schedule had before this round,
+        # so its remaining rounds still follow on correctly
+        if (old_checkpoints is not None and new_checkpoints and all(reusable[round_idx:])
+                and new_checkpoints[-1].same_state(old_checkpoints[round_idx - 1])):
+            kept_matches.extend(scheduled_matches[round_idx * num_courts:])
+            kept_waiters.extend(scheduled_waiters[round_idx:])
+            new_checkpoints.extend(old_checkpoints[round_idx:])
+            break
+        
+        round_type = _regenerated_round_type(round_idx)
         
         # Select who plays this round
         available = all_player_ids[:]
@@ -3584,11 +3959,12 @@ def regenerate_subsequent_rounds(
             playing.sort(key=lambda p: player_ratings.get(p, 1500), reverse=True)
         
         # Generate matches for this round - try harder to fill all courts
-        used_in_round: Set[str] = set()
+        round_start = len(kept_matches)
+        used_in_round = 0  # Player bitmask
         round_matches_added = 0
         
         for court_idx in range(num_courts):
-            remaining = [p for p in playing if p not in used_in_round]
+            remaining = [p for p in playing if not player_bits[p] & used_in_round]
             if len(remaining) < 4:
                 break
             
@@ -3656,11 +4032,10 @@ def regenerate_subsequent_rounds(
             
             if best_teams:
                 team1, team2 = best_teams
-                record_match_check(team1, team2)
+                state.add_match(team1, team2)
                 match_number += 1
                 
-                for p in team1 + team2:
-                    used_in_round.add(p)
+                used_in_round |= _players_mask(team1 + team2, player_bits)
                 
                 kept_matches.append(ScheduledMatch(
                     id=f"scheduled_{uuid.uuid4().hex[:8]}",
@@ -3673,5 +4048,13 @@ def regenerate_subsequent_rounds(
                     round_type=round_type
                 ))
                 round_matches_added += 1
+        
+        if new_checkpoints is not None:
+            new_checkpoints.append(state.checkpoint(_round_key(kept_matches[round_start:], waiters)))
+    
+    if new_checkpoints is not None and _split_rounds(kept_matches, kept_waiters, num_courts) is not None:
+        config.round_checkpoints = RoundCheckpoints(tuple(all_player_ids), num_courts, new_checkpoints)
+    else:
+        config.round_checkpoints = None
     
     return kept_matches, kept_waiters
@@ -7,12 +7,15 @@ Wait Priority System: Simple 2-court-wait rule - a player MUST be placed in the
 after 2 courts have completed while they were waiting.
 """
 
-from typing import List, Dict, Tuple, Set, Optional
+from typing import List, Dict, Tuple, Set, Optional, Iterator
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from .pickleball_types import Player, QueuedMatch, Session, Match, PlayerStats
 from .time_manager import now
+from .relationship_index import RelationshipIndex, get_relationship_index
 import math
-from itertools import combinations
+from bisect import bisect_left, bisect_right
+from itertools import chain, combinations, islice
 
 # Constants for ELO system
 BASE_RATING = 1500
@@ -27,6 +30,14 @@ OPPONENT_REPETITION_GAMES_REQUIRED = 2  # Must wait 2 games before playing again
 # Wait priority: player must play after this many courts complete
 COURTS_WAIT_THRESHOLD = 2
 
+# Candidates (in wait priority order) searched when forming a court's match, and how far
+# the fallback search widens when none of those can form a valid match
+MATCH_SEARCH_LIMIT = 12
+EXTENDED_MATCH_SEARCH_LIMIT = 20
+
+# Candidate quadruples scored per score_match_splits call
+SCORE_BATCH_SIZE = 64
+
 # Roaming Range for Matchmaking
 ROAMING_RANK_PERCENTAGE = 0.5  # Players can play with others within +/- 50% of total players range
 
@@ -121,7 +132,7 @@ def get_adaptive_constraints(session: Session) -> Dict[str, float]:
         }
     
     # Count completed matches as progress metric
-    completed_matches = len([m for m in session.matches if m.status == 'completed'])
+    completed_matches = get_relationship_index(session).completed_count
     
     # Calculate dynamic thresholds based on player count
     thresholds = calculate_session_thresholds(session)
@@ -377,7 +388,8 @@ def calculate_elo_rating(player_stats, pre_seeded_rating: Optional[float] = None
     return max(MIN_RATING, min(MAX_RATING, rating))
 
 
-def create_skill_based_matches_for_pre_seeded(session: Session, available_players: List[str], courts_needed: int) -> List[QueuedMatch]:
+def create_skill_based_matches_for_pre_seeded(session: Session, available_players: List[str], courts_needed: int,
+                                              context: Optional['MatchmakingContext'] = None) -> List[QueuedMatch]:
     """
     Create skill-balanced matches for pre-seeded sessions.
     
@@ -389,9 +401,12 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
     if not session.config.pre_seeded_ratings or len(available_players) < 4:
         return []
     
-    # Get current adaptive constraints
-    constraints = get_adaptive_constraints(session)
-    balance_weight = constraints['balance_weight']
+    if context is None:
+        context = build_matchmaking_context(session)
+    
+    # Score with at least mid-session balance weighting, whatever the current adaptive phase
+    balance_weight = context.adaptive_balance_weight
+    scoring_context = replace(context, scoring_balance_weight=max(3.0, balance_weight))
     
     # CRITICAL: Get must-play players first - they MUST be included
     must_play = get_must_play_players(session, available_players)
@@ -399,12 +414,13 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
     # Sort all players by their ELO rating (highest to lowest)
     player_ratings = []
     for player_id in available_players:
-        rating = calculate_player_elo_rating(session, player_id)
+        rating = context.rating(player_id)
         player_ratings.append((player_id, rating))
     
     # Sort by rating (highest first)
     player_ratings.sort(key=lambda x: x[1], reverse=True)
     sorted_players = [p[0] for p in player_ratings]
+    score_table = build_match_score_table(session, sorted_players, scoring_context)
     
     matches = []
     players_used = set()
@@ -446,11 +462,12 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
                     if len(fill_candidates) < fill_needed:
                         continue
                     
-                    for fill_combo in combinations(fill_candidates, fill_needed):
-                        four_players = list(mp_combo) + list(fill_combo)
+                    window = (mp_combo + fill_combo for fill_combo in combinations(fill_candidates, fill_needed))
+                    for four_players, totals, _ in iter_scored_quadruples(score_table, score_table.index, window):
+                        four_players = list(four_players)
                         
                         # Check if these 4 players can form a valid match
-                        if not _can_form_valid_teams(session, four_players, allow_cross_bracket=False):
+                        if not _can_form_valid_teams(session, four_players, allow_cross_bracket=False, context=context):
                             continue
                         
                         # Try all three possible team configurations
@@ -460,23 +477,15 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
                             ([four_players[0], four_players[3]], [four_players[1], four_players[2]])
                         ]
                         
-                        for team1, team2 in team_configs:
-                            if not _is_team_configuration_valid(session, team1, team2):
+                        for split_idx, (team1, team2) in enumerate(team_configs):
+                            if not _is_team_configuration_valid(session, team1, team2, context):
                                 continue
                             
-                            original_weight = getattr(session, '_effective_adaptive_balance_weight', None)
-                            try:
-                                session._effective_adaptive_balance_weight = max(3.0, balance_weight)
-                                score = score_potential_match(session, team1, team2)
-                                
-                                if score > best_score:
-                                    best_score = score
-                                    best_match = QueuedMatch(team1=list(team1), team2=list(team2))
-                            finally:
-                                if original_weight is not None:
-                                    session._effective_adaptive_balance_weight = original_weight
-                                elif hasattr(session, '_effective_adaptive_balance_weight'):
-                                    delattr(session, '_effective_adaptive_balance_weight')
+                            score = totals[split_idx]
+                            
+                            if score > best_score:
+                                best_score = score
+                                best_match = QueuedMatch(team1=list(team1), team2=list(team2))
                     
                     # If we found a match with this many must-play players, use it
                     if best_match:
@@ -488,10 +497,11 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
         if not best_match:
             max_combinations_to_try = min(35, len(available_sorted) // 2)
             
-            for four_players in combinations(available_sorted, 4):
+            window = combinations(available_sorted, 4)
+            for four_players, totals, _ in iter_scored_quadruples(score_table, score_table.index, window):
                 players_list = list(four_players)
                 
-                if not _can_form_valid_teams(session, players_list, allow_cross_bracket=False):
+                if not _can_form_valid_teams(session, players_list, allow_cross_bracket=False, context=context):
                     continue
                 
                 team_configs = [
@@ -500,23 +510,15 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
                     ([players_list[0], players_list[3]], [players_list[1], players_list[2]])
                 ]
                 
-                for team1, team2 in team_configs:
-                    if not _is_team_configuration_valid(session, team1, team2):
+                for split_idx, (team1, team2) in enumerate(team_configs):
+                    if not _is_team_configuration_valid(session, team1, team2, context):
                         continue
                     
-                    original_weight = getattr(session, '_effective_adaptive_balance_weight', None)
-                    try:
-                        session._effective_adaptive_balance_weight = max(3.0, balance_weight)
-                        score = score_potential_match(session, team1, team2)
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_match = QueuedMatch(team1=list(team1), team2=list(team2))
-                    finally:
-                        if original_weight is not None:
-                            session._effective_adaptive_balance_weight = original_weight
-                        elif hasattr(session, '_effective_adaptive_balance_weight'):
-                            delattr(session, '_effective_adaptive_balance_weight')
+                    score = totals[split_idx]
+                    
+                    if score > best_score:
+                        best_score = score
+                        best_match = QueuedMatch(team1=list(team1), team2=list(team2))
                 
                 max_combinations_to_try -= 1
                 if max_combinations_to_try <= 0:
@@ -531,27 +533,77 @@ def create_skill_based_matches_for_pre_seeded(session: Session, available_player
     return matches
 
 
-def get_player_ranking(session: Session, player_id: str) -> Tuple[int, float]:
+@dataclass
+class PlayerRankingIndex:
     """
-    Get a player's rank and rating.
-    Returns (rank, rating) where rank is 1-based (1 = best).
-    Ranks all active players by rating.
+    Session-scoped rank/rating lookup for all active players.
+
+    Built once from the current stats and reused until something that affects
+    ratings changes (match completion, score edit, player add/remove), so rank
+    lookups are O(1) instead of a full re-rate and sort per call.
     """
+    ranks: Dict[str, int]  # player_id -> 1-based rank (1 = best)
+    ratings: Dict[str, float]  # player_id -> ELO rating
+    # Identity guards: a replaced active set or stats dict makes the index stale
+    active_players_ref: Set[str]
+    active_count: int
+    player_stats_ref: Dict[str, PlayerStats]
+
+
+def build_ranking_index(session: Session) -> PlayerRankingIndex:
+    """Rate and rank every active player of the session."""
     # Calculate ratings for all active players (sorted for determinism)
     ratings = []
     for pid in sorted(session.active_players):
         rating = calculate_player_elo_rating(session, pid)
         ratings.append((pid, rating))
-    
-    # Sort by rating descending (best first)
+
+    # Sort by rating descending (best first) - stable, so ties keep player_id order
     ratings.sort(key=lambda x: x[1], reverse=True)
-    
-    # Find this player's rank
-    for rank, (pid, rating) in enumerate(ratings, 1):
-        if pid == player_id:
-            return rank, rating
-    
-    return len(ratings) + 1, BASE_RATING
+
+    return PlayerRankingIndex(
+        ranks={pid: rank for rank, (pid, _) in enumerate(ratings, 1)},
+        ratings=dict(ratings),
+        active_players_ref=session.active_players,
+        active_count=len(session.active_players),
+        player_stats_ref=session.player_stats
+    )
+
+
+def get_ranking_index(session: Session) -> PlayerRankingIndex:
+    """Return the session's ranking index, rebuilding it if it is missing or stale."""
+    index = session.ranking_index
+    if (index is None
+            or index.active_players_ref is not session.active_players
+            or index.active_count != len(session.active_players)
+            or index.player_stats_ref is not session.player_stats):
+        index = build_ranking_index(session)
+        session.ranking_index = index
+    return index
+
+
+def invalidate_ranking_index(session: Session) -> None:
+    """
+    Drop the cached ranking so the next lookup re-rates all players.
+    Call after any change to player stats, pre-seeded ratings or the active player set
+    (mark_session_changed does this too).
+    """
+    session.ranking_index = None
+
+
+def get_player_ranking(session: Session, player_id: str) -> Tuple[int, float]:
+    """
+    Get a player's rank and rating.
+    Returns (rank, rating) where rank is 1-based (1 = best).
+    Ranks all active players by rating.
+    """
+    index = get_ranking_index(session)
+
+    rank = index.ranks.get(player_id)
+    if rank is None:
+        return index.active_count + 1, BASE_RATING
+
+    return rank, index.ratings[player_id]
 
 
 def is_provisional(session: Session, player_id: str) -> bool:
@@ -561,7 +613,72 @@ def is_provisional(session: Session, player_id: str) -> bool:
     return session.player_stats[player_id].games_played < PROVISIONAL_GAMES
 
 
-def get_roaming_rank_range(session: Session, player_id: str) -> Tuple[int, int]:
+@dataclass(frozen=True)
+class MatchmakingContext:
+    """
+    Everything the constraint and scoring helpers read from the session, frozen for
+    one matchmaking pass.
+
+    Nothing here changes while courts are being filled, so
+    populate_empty_courts_competitive_variety builds one context up front and passes
+    it down instead of every pair check re-deriving ratings, ranks, adaptive weights
+    and thresholds. Helpers called without a context build their own.
+    """
+    session: Session = field(repr=False)
+    ranking: PlayerRankingIndex = field(repr=False)
+    history: RelationshipIndex = field(repr=False)
+    provisional: Dict[str, bool]  # Active players only; others are looked up on demand
+    active_count: int
+    roaming_limit: int  # Max rank difference allowed by the roaming range
+    partner_repetition_limit: int
+    opponent_repetition_limit: int
+    adaptive_balance_weight: float  # Automatic weight from get_adaptive_constraints (drives thresholds/patterns)
+    scoring_balance_weight: float  # Effective weight used by score_potential_match (honours manual override)
+    balance_threshold: float
+    # Ratings are filled on first use; they cannot change during the pass
+    ratings: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    def rating(self, player_id: str) -> float:
+        rating = self.ratings.get(player_id)
+        if rating is None:
+            rating = calculate_player_elo_rating(self.session, player_id)
+            self.ratings[player_id] = rating
+        return rating
+
+    def rank(self, player_id: str) -> int:
+        return self.ranking.ranks.get(player_id, self.ranking.active_count + 1)
+
+    def is_provisional(self, player_id: str) -> bool:
+        provisional = self.provisional.get(player_id)
+        if provisional is None:
+            return is_provisional(self.session, player_id)
+        return provisional
+
+
+def build_matchmaking_context(session: Session) -> MatchmakingContext:
+    """Freeze ratings, ranks, thresholds and adaptive weights for one matchmaking pass."""
+    adaptive_balance_weight = get_adaptive_constraints(session)['balance_weight']
+    roaming_percent = getattr(session, 'competitive_variety_roaming_range_percent', ROAMING_RANK_PERCENTAGE)
+    
+    return MatchmakingContext(
+        session=session,
+        ranking=get_ranking_index(session),
+        history=get_relationship_index(session),
+        provisional={pid: is_provisional(session, pid) for pid in session.active_players},
+        active_count=len(session.active_players),
+        roaming_limit=int(len(session.active_players) * roaming_percent),
+        partner_repetition_limit=session.competitive_variety_partner_repetition_limit,
+        opponent_repetition_limit=session.competitive_variety_opponent_repetition_limit,
+        adaptive_balance_weight=adaptive_balance_weight,
+        # For pre-seeded sessions, use the temporary pre-seed weight if set
+        scoring_balance_weight=getattr(session, '_pre_seed_balance_weight',
+                                       getattr(session, '_effective_adaptive_balance_weight', 1.0)),
+        balance_threshold=_balance_threshold_for_weight(adaptive_balance_weight)
+    )
+
+
+def get_roaming_rank_range(session: Session, player_id: str,
+                           context: Optional[MatchmakingContext] = None) -> Tuple[int, int]:
     """
     Get the roaming range of ranks a player can be matched with (symmetric window rule).
     
@@ -577,13 +694,14 @@ def get_roaming_rank_range(session: Session, player_id: str) -> Tuple[int, int]:
     Returns (min_rank, max_rank) inclusive.
     Only applies when 12+ players.
     """
-    total_players = len(session.active_players)
+    if context is None:
+        context = build_matchmaking_context(session)
+    total_players = context.active_count
     
-    player_rank, _ = get_player_ranking(session, player_id)
-    roaming_percent = session.competitive_variety_roaming_range_percent
+    player_rank = context.rank(player_id)
     
     # Calculate how many players can be above and below (symmetric)
-    roaming_distance = max(0, int(total_players * roaming_percent))
+    roaming_distance = max(0, context.roaming_limit)
     
     # Roaming window extends equally in both directions from player_rank
     min_rank = max(1, player_rank - roaming_distance)
@@ -625,7 +743,8 @@ def get_allowed_matchmaking_bracket(session: Session, player_id: str) -> Tuple[i
     return 1, total_players
 
 
-def can_all_players_play_together(session: Session, player_ids: List[str]) -> bool:
+def can_all_players_play_together(session: Session, player_ids: List[str],
+                                  context: Optional[MatchmakingContext] = None) -> bool:
     """
     Check if all players in a potential match can play together under roaming range rules.
     
@@ -638,20 +757,23 @@ def can_all_players_play_together(session: Session, player_ids: List[str]) -> bo
     if session.config.mode != 'competitive-variety':
         return True
     
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     # Check that all players are within roaming range of each other
     for player_id in player_ids:
         # Check if this player is provisional - they have no roaming restrictions
-        if is_provisional(session, player_id):
+        if context.is_provisional(player_id):
             continue
         
-        min_rank, max_rank = get_roaming_rank_range(session, player_id)
+        min_rank, max_rank = get_roaming_rank_range(session, player_id, context)
         
         # Check all other players are in this player's roaming range
         for other_player_id in player_ids:
             if other_player_id == player_id:
                 continue
             
-            other_rank, _ = get_player_ranking(session, other_player_id)
+            other_rank = context.rank(other_player_id)
             
             # Other player must be within this player's roaming range
             if other_rank < min_rank or other_rank > max_rank:
@@ -660,6 +782,86 @@ def can_all_players_play_together(session: Session, player_ids: List[str]) -> bo
     return True
 
 
+def roaming_compatibility_masks(session: Session, player_ids: List[str],
+                                context: Optional[MatchmakingContext] = None) -> List[int]:
+    """
+    For each position in player_ids, a bitmask of the positions it may share a court with
+    under the roaming range rule (the pairwise form of can_all_players_play_together).
+    
+    Each non-provisional player's roaming window is a contiguous run of the rank-sorted
+    players, found by bisection, so the cost is the total window size rather than n^2.
+    """
+    if context is None:
+        context = build_matchmaking_context(session)
+    
+    size = len(player_ids)
+    everyone = (1 << size) - 1
+    if session.config.mode != 'competitive-variety':
+        return [everyone & ~(1 << i) for i in range(size)]
+    
+    by_rank = sorted(range(size), key=lambda i: context.rank(player_ids[i]))
+    sorted_ranks = [context.rank(player_ids[i]) for i in by_rank]
+    prefix = [0]
+    for i in by_rank:
+        prefix.append(prefix[-1] | (1 << i))
+    
+    provisional = [context.is_provisional(pid) for pid in player_ids]
+    provisional_mask = 0
+    for i in range(size):
+        if provisional[i]:
+            provisional_mask |= 1 << i
+    
+    # in_window[i]: players inside i's window; accepted_by[i]: players whose window allows i
+    in_window = [everyone] * size
+    accepted_by = [provisional_mask] * size
+    for i, pid in enumerate(player_ids):
+        if provisional[i]:
+            continue
+        min_rank, max_rank = get_roaming_rank_range(session, pid, context)
+        window = prefix[bisect_right(sorted_ranks, max_rank)] & ~prefix[bisect_left(sorted_ranks, min_rank)]
+        in_window[i] = window
+        members = window
+        while members:
+            j = (members & -members).bit_length() - 1
+            members &= members - 1
+            accepted_by[j] |= 1 << i
+    
+    return [in_window[i] & accepted_by[i] & ~(1 << i) for i in range(size)]
+
+
+def generate_roaming_quadruples(session: Session, player_ids: List[str],
+                                context: Optional[MatchmakingContext] = None,
+                                pair_masks: Optional[List[int]] = None) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Yield position quadruples (i < j < k < l) of player_ids whose players can all play
+    together under the roaming range rule.
+    
+    Quadruples come out in the same order as combinations(range(len(player_ids)), 4),
+    minus those can_all_players_play_together would reject, so callers that stop at the
+    first good combination pick the same one. Rank-distant players are never combined,
+    which prunes most of the C(n, 4) space in large sessions. pair_masks, if given,
+    further restricts which positions may share a court.
+    """
+    compatible = roaming_compatibility_masks(session, player_ids, context)
+    if pair_masks is not None:
+        compatible = [c & m for c, m in zip(compatible, pair_masks)]
+    
+    for i in range(len(player_ids)):
+        after_i = compatible[i] & ~((2 << i) - 1)
+        while after_i:
+            j = (after_i & -after_i).bit_length() - 1
+            after_i &= after_i - 1
+            after_j = after_i & compatible[j]
+            while after_j:
+                k = (after_j & -after_j).bit_length() - 1
+                after_j &= after_j - 1
+                after_k = after_j & compatible[k]
+                while after_k:
+                    l = (after_k & -after_k).bit_length() - 1
+                    after_k &= after_k - 1
+                    yield (i, j, k, l)
+
+
 
 def _get_last_played_info(session: Session, player_id: str) -> Tuple[Optional[Match], int]:
     """
@@ -667,16 +869,15 @@ def _get_last_played_info(session: Session, player_id: str) -> Tuple[Optional[Ma
     Returns (match, game_number). game_number is 1-based index of completed matches.
     Returns (None, -1) if player hasn't played.
     """
-    completed_matches = [m for m in session.matches if m.status == 'completed']
-    # Iterate backwards to find last match
-    for i in range(len(completed_matches) - 1, -1, -1):
-        match = completed_matches[i]
-        if player_id in match.team1 or player_id in match.team2:
-            return match, i + 1
-    return None, -1
+    history = get_relationship_index(session)
+    last_idx = history.last_game_index(player_id)
+    if last_idx < 0:
+        return None, -1
+    return history.completed[last_idx], last_idx + 1
 
 
-def check_partner_opponent_partner_pattern(session: Session, player1: str, player2: str) -> bool:
+def check_partner_opponent_partner_pattern(session: Session, player1: str, player2: str,
+                                           context: Optional[MatchmakingContext] = None) -> bool:
     """
     Check for the problematic immediate Partner → Opponent → Partner pattern.
     
@@ -691,78 +892,35 @@ def check_partner_opponent_partner_pattern(session: Session, player1: str, playe
     
     Returns True if trying to make immediate partners after being opponents without proper gap.
     """
-    # Only apply this constraint when adaptive balance system is active
-    constraints = get_adaptive_constraints(session)
-    balance_weight = constraints['balance_weight']
+    if context is None:
+        context = build_matchmaking_context(session)
     
-    if balance_weight < 3.0:  # Early session - allow pattern exploration
+    # Only apply this constraint when adaptive balance system is active
+    if context.adaptive_balance_weight < 3.0:  # Early session - allow pattern exploration
         return False
     
-    # Get completed matches
-    completed_matches = [m for m in session.matches if m.status == 'completed']
+    history = context.history
     
-    if len(completed_matches) < 2:
+    if history.completed_count < 2:
         return False
     
     # Find the most recent match where player1 and player2 played together
-    last_game_together = None
-    last_game_index = -1
+    last_game_index, were_opponents_last = history.last_together_index(player1, player2)
     
-    for i, match in enumerate(completed_matches):
-        p1_in_match = player1 in match.team1 or player1 in match.team2
-        p2_in_match = player2 in match.team1 or player2 in match.team2
-        
-        if p1_in_match and p2_in_match:
-            last_game_together = match
-            last_game_index = i
-    
-    if not last_game_together:
+    if last_game_index < 0:
         return False  # They never played together
     
-    # Check their relationship in the last game together
-    p1_team1 = player1 in last_game_together.team1
-    p1_team2 = player1 in last_game_together.team2  
-    p2_team1 = player2 in last_game_together.team1
-    p2_team2 = player2 in last_game_together.team2
-    
-    # Were they opponents in their last game together?
-    were_opponents_last = (p1_team1 and p2_team2) or (p1_team2 and p2_team1)
-    
     if were_opponents_last:
         # They were opponents in their last interaction
         # Check if BOTH players have played at least one game since then
-        
-        games_since = completed_matches[last_game_index + 1:]  # Games after their opponent match
-        
-        p1_played_since = False
-        p2_played_since = False
-        
-        for game in games_since:
-            if player1 in game.team1 or player1 in game.team2:
-                p1_played_since = True
-            if player2 in game.team1 or player2 in game.team2:
-                p2_played_since = True
+        p1_played_since = history.last_game_index(player1) > last_game_index
+        p2_played_since = history.last_game_index(player2) > last_game_index
         
         # Block partnership if BOTH players haven't had a gap game
         if not (p1_played_since and p2_played_since):
             # Check if they had a partnership before the opponents match
-            had_prior_partnership = False
-            
-            for i in range(last_game_index):
-                prior_match = completed_matches[i]
-                p1_in_prior = player1 in prior_match.team1 or player1 in prior_match.team2
-                p2_in_prior = player2 in prior_match.team1 or player2 in prior_match.team2
-                
-                if p1_in_prior and p2_in_prior:
-                    # Check if they were partners
-                    p1_t1 = player1 in prior_match.team1
-                    p1_t2 = player1 in prior_match.team2
-                    p2_t1 = player2 in prior_match.team1
-                    p2_t2 = player2 in prior_match.team2
-                    
-                    if (p1_t1 and p2_t1) or (p1_t2 and p2_t2):
-                        had_prior_partnership = True
-                        break
+            first_partnership = history.first_partner_index(player1, player2)
+            had_prior_partnership = 0 <= first_partnership < last_game_index
             
             # Block if: Partners → Opponents → (trying Partners without both having gap)
             if had_prior_partnership:
@@ -771,7 +929,8 @@ def check_partner_opponent_partner_pattern(session: Session, player1: str, playe
     return False
 
 
-def can_play_with_player(session: Session, player1: str, player2: str, role: str, allow_cross_bracket: bool = False) -> bool:
+def can_play_with_player(session: Session, player1: str, player2: str, role: str, allow_cross_bracket: bool = False,
+                         context: Optional[MatchmakingContext] = None) -> bool:
     """
     Check if two players can play together in the given role.
     role = 'partner' or 'opponent'
@@ -785,9 +944,12 @@ def can_play_with_player(session: Session, player1: str, player2: str, role: str
     - Partner-Opponent-Partner pattern prevention (mid-late session only)
     - Only applies when 12+ players (otherwise fewer constraints)
     """
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     # -1. Check Partner-Opponent-Partner Pattern (when adaptive balance system is active)
     if role == 'partner':
-        if check_partner_opponent_partner_pattern(session, player1, player2):
+        if check_partner_opponent_partner_pattern(session, player1, player2, context):
             return False
     
     # 0. Check Locked Teams & Banned Pairs
@@ -837,126 +999,54 @@ def can_play_with_player(session: Session, player1: str, player2: str, role: str
     # Check bracket compatibility (Roaming Range Rule)
     # Relaxed if allow_cross_bracket is True
     # NOTE: Provisional players are exempt from roaming range restrictions
-    if not allow_cross_bracket and not (is_provisional(session, player1) or is_provisional(session, player2)):
-        # Calculate rank difference limit using session's roaming range setting
-        roaming_percent = getattr(session, 'competitive_variety_roaming_range_percent', ROAMING_RANK_PERCENTAGE)
-        limit = int(len(session.active_players) * roaming_percent)
-        
-        # Get ranks
-        rank1, _ = get_player_ranking(session, player1)
-        rank2, _ = get_player_ranking(session, player2)
-        
+    if not allow_cross_bracket and not (context.is_provisional(player1) or context.is_provisional(player2)):
+        # Rank difference limit comes from the session's roaming range setting
         # Check roaming range (applies in both directions)
-        if abs(rank1 - rank2) > limit:
+        if abs(context.rank(player1) - context.rank(player2)) > context.roaming_limit:
             return False
     
     # ---------------------------------------------------------
     # Repetition Constraints (Robust Two-Phase Check)
     # ---------------------------------------------------------
     
-    completed_matches = [m for m in session.matches if m.status == 'completed']
-    current_matches_count = len(completed_matches)
+    history = context.history
+    completed_count = history.completed_count
+    if role == 'partner':
+        repetition_limit = context.partner_repetition_limit
+    elif role == 'opponent':
+        repetition_limit = context.opponent_repetition_limit
+    else:
+        return True
+    last_global, last_personal = history.last_role_index(player1, player2, role)
+    
+    if last_global < 0:
+        return True  # Never played together in this role
     
     # Check 1: Global Recency (The "Wait N Games" Rule)
     # If they played together/against in the last X matches globally, forbid it.
     
-    if len(session.active_players) >= 8:
-        # Check Partner Repetition (Last N Global Games - using session setting)
-        if role == 'partner':
-            partner_limit = session.competitive_variety_partner_repetition_limit
-            matches_to_check = completed_matches[-partner_limit:] if partner_limit > 0 else []
-            for m in matches_to_check:
-                p1_t1 = player1 in m.team1
-                p1_t2 = player1 in m.team2
-                p2_t1 = player2 in m.team1
-                p2_t2 = player2 in m.team2
-                
-                if (p1_t1 and p2_t1) or (p1_t2 and p2_t2):
-                    return False
-
-        # Check Opponent Repetition (Last N Global Games - using session setting)
-        elif role == 'opponent':
-            opponent_limit = session.competitive_variety_opponent_repetition_limit
-            matches_to_check = completed_matches[-opponent_limit:] if opponent_limit > 0 else []
-            for m in matches_to_check:
-                p1_t1 = player1 in m.team1
-                p1_t2 = player1 in m.team2
-                p2_t1 = player2 in m.team1
-                p2_t2 = player2 in m.team2
-                
-                if (p1_t1 and p2_t2) or (p1_t2 and p2_t1):
-                    return False
+    if context.active_count >= 8:
+        # Last N global games - using session setting
+        if repetition_limit > 0 and last_global >= completed_count - repetition_limit:
+            return False
     else:
         # For < 8 players, enforce at least 1 game gap globally (Immediate Back-to-Back Global)
-        if completed_matches:
-            last_match = completed_matches[-1]
-            if role == 'partner':
-                if (player1 in last_match.team1 and player2 in last_match.team1) or \
-                   (player1 in last_match.team2 and player2 in last_match.team2):
-                    return False
-            elif role == 'opponent':
-                if (player1 in last_match.team1 and player2 in last_match.team2) or \
-                   (player1 in last_match.team2 and player2 in last_match.team1):
-                    return False
-
-    # Check 2: Player-Specific History Scan (The "Personal Gap" Rule)
-    # We must scan back through the *player's own history* to find when they last played with this partner.
-    # The number of *intervening games this player played* must be >= REQUIRED.
-    
-    player_matches = []
-    # Collect all matches this player participated in, in order
-    for m in completed_matches:
-        if player1 in m.team1 or player1 in m.team2:
-            player_matches.append(m)
-            
-    if player_matches:
-        # Scan backwards through player's personal history
-        last_played_together_idx = -1
-        last_played_against_idx = -1
-        
-        for i in range(len(player_matches) - 1, -1, -1):
-            m = player_matches[i]
-            
-            # Check Partnership
-            if role == 'partner':
-                if (player2 in m.team1 and player1 in m.team1) or \
-                   (player2 in m.team2 and player1 in m.team2):
-                    last_played_together_idx = i
-                    break # Found the last time
-            
-            # Check Opponent
-            elif role == 'opponent':
-                if (player1 in m.team1 and player2 in m.team2) or \
-                   (player1 in m.team2 and player2 in m.team1):
-                    last_played_against_idx = i
-                    break # Found the last time
-        
-        current_personal_game_count = len(player_matches)
-        
-        if role == 'partner' and last_played_together_idx != -1:
-            # Games played SINCE that match
-            # If I played in match index 0, and now count is 1. Gap is 1-0-1 = 0.
-            # If I played in match index 0, then match index 1. Now count is 2.
-            # Gap = 2 - 0 - 1 = 1 intervening game.
-            intervening_games = current_personal_game_count - last_played_together_idx - 1
-            
-            # Apply constraint
-            if len(session.active_players) >= 8:
-                 partner_limit = session.competitive_variety_partner_repetition_limit
-                 if intervening_games < partner_limit:
-                     return False
-            elif intervening_games < 1: # Basic back-to-back check for small groups
-                 return False
-
-        elif role == 'opponent' and last_played_against_idx != -1:
-            intervening_games = current_personal_game_count - last_played_against_idx - 1
-            
-            if len(session.active_players) >= 8:
-                 opponent_limit = session.competitive_variety_opponent_repetition_limit
-                 if intervening_games < opponent_limit:
-                     return False
-            elif intervening_games < 1:
-                 return False
+        if last_global == completed_count - 1:
+            return False
+
+    # Check 2: Player-Specific History (The "Personal Gap" Rule)
+    # The number of *intervening games this player played* since they last played
+    # with this partner/opponent must be >= REQUIRED.
+    # If I played in personal game 0, and now count is 1. Gap is 1-0-1 = 0.
+    # If I played in personal game 0, then game 1. Now count is 2.
+    # Gap = 2 - 0 - 1 = 1 intervening game.
+    intervening_games = history.personal_game_count(player1) - last_personal - 1
+    
+    if context.active_count >= 8:
+        if intervening_games < repetition_limit:
+            return False
+    elif intervening_games < 1: # Basic back-to-back check for small groups
+        return False
     
     return True
 
@@ -969,8 +1059,11 @@ def get_balance_threshold(session: Session) -> float:
     Returns maximum acceptable rating difference between teams.
     """
     constraints = get_adaptive_constraints(session)
-    balance_weight = constraints['balance_weight']
-    
+    return _balance_threshold_for_weight(constraints['balance_weight'])
+
+
+def _balance_threshold_for_weight(balance_weight: float) -> float:
+    """Map the adaptive balance weight to the maximum acceptable team rating difference."""
     # Balance constraints only activate when adaptive system kicks in
     if balance_weight <= 1.0:  # Early session - no balance constraints
         return float('inf')  # No balance threshold in early session
@@ -982,23 +1075,27 @@ def get_balance_threshold(session: Session) -> float:
         return 400  # Lenient balance threshold
 
 
-def meets_balance_constraints(session: Session, team1: List[str], team2: List[str]) -> bool:
+def meets_balance_constraints(session: Session, team1: List[str], team2: List[str],
+                              context: Optional[MatchmakingContext] = None) -> bool:
     """
     Check if a potential match meets hard balance constraints.
     As sessions progress and variety constraints relax, balance constraints get stricter.
     """
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     # Calculate team ratings using pre-seeded ratings if available
-    team1_rating = sum(calculate_player_elo_rating(session, p) for p in team1)
-    team2_rating = sum(calculate_player_elo_rating(session, p) for p in team2)
+    team1_rating = sum(context.rating(p) for p in team1)
+    team2_rating = sum(context.rating(p) for p in team2)
     
     # Check if imbalance exceeds threshold
     rating_diff = abs(team1_rating - team2_rating)
-    threshold = get_balance_threshold(session)
     
-    return rating_diff <= threshold
+    return rating_diff <= context.balance_threshold
 
 
-def score_potential_match(session: Session, team1: List[str], team2: List[str]) -> float:
+def score_potential_match(session: Session, team1: List[str], team2: List[str],
+                          context: Optional[MatchmakingContext] = None) -> float:
     """
     Score a potential match based on skill balance and variety.
     Higher score = better match.
@@ -1012,110 +1109,220 @@ def score_potential_match(session: Session, team1: List[str], team2: List[str])
     
     Uses adaptive balance weighting and hard balance thresholds.
     Prefers Elite vs Elite, Strong vs Strong, etc. over mixed skill partnerships.
-    """
-    # First check: must meet hard balance constraints
-    if not meets_balance_constraints(session, team1, team2):
-        return -10000  # Severely penalize matches that violate balance constraints
-    
-    score = 0.0
     
-    # Get effective adaptive balance weight (increases as session progresses)
-    # For pre-seeded sessions, use the temporary pre-seed weight if set
-    balance_weight = getattr(session, '_pre_seed_balance_weight', 
-                           getattr(session, '_effective_adaptive_balance_weight', 1.0))
-    
-    # Calculate team ratings (total, not average, for better balance) using pre-seeded ratings
-    team1_rating = sum(calculate_player_elo_rating(session, p) for p in team1)
-    team2_rating = sum(calculate_player_elo_rating(session, p) for p in team2)
-    
-    # Calculate individual player ratings for partnership analysis
-    team1_ratings = [calculate_player_elo_rating(session, p) for p in team1]
-    team2_ratings = [calculate_player_elo_rating(session, p) for p in team2]
-    
-    # Penalize unbalanced teams (large skill difference)
-    rating_diff = abs(team1_rating - team2_rating)
-    balance_penalty = rating_diff * 2 * balance_weight
-    score -= balance_penalty
-    
-    # Homogeneous Partnership Bonus (only activates when adaptive system kicks in)
-    # Reward teams where partners have similar skill levels
-    # Elite vs Elite, Strong vs Strong, etc. creates better pickleball experiences
-    if balance_weight >= 3.0:  # Mid to late session - adaptive system active
-        homogeneous_bonus = 0
-        
-        # Check each team for similar skill composition
-        for team_ratings in [team1_ratings, team2_ratings]:
-            skill_difference = max(team_ratings) - min(team_ratings)
-            if skill_difference <= 150:  # Partners within 150 rating points (very similar)
-                homogeneous_bonus += 75 * balance_weight
-            elif skill_difference <= 250:  # Partners within 250 rating points (reasonably similar)
-                homogeneous_bonus += 40 * balance_weight
-        
-        score += homogeneous_bonus
-    
-    # Penalty for mismatched partnerships (only when adaptive system active)
-    # This discourages the "carry" dynamic that creates poor experiences
-    if balance_weight >= 3.0:  # Mid to late session - adaptive system active
-        mismatch_penalty = 0
-        for team_ratings in [team1_ratings, team2_ratings]:
-            skill_difference = max(team_ratings) - min(team_ratings)
-            if skill_difference >= 400:  # Very large skill gap within team
-                mismatch_penalty += 100 * balance_weight  # Heavy penalty
-            elif skill_difference >= 300:  # Large skill gap within team  
-                mismatch_penalty += 50 * balance_weight   # Moderate penalty
-        
-        score -= mismatch_penalty
+    Scored by score_match_splits, so a single match and a batched candidate
+    always get the same score.
+    """
+    if context is None:
+        context = build_matchmaking_context(session)
+    
+    table = build_match_score_table(session, list(team1) + list(team2), context)
+    return score_match_splits(table, [(0, 1, 2, 3)]).total[0]
+
+
+# The three ways to split 4 players into two teams, in the order every search tries them
+MATCH_SPLITS = (
+    ((0, 1), (2, 3)),
+    ((0, 2), (1, 3)),
+    ((0, 3), (1, 2)),
+)
+
+
+@dataclass
+class MatchScoreTable:
+    """
+    Flat rating array and partner/opponent history matrices for one matchmaking pass.
+
+    Players are addressed by their position in `players`, so score_match_splits can
+    score many candidate quadruples without per-player dict and stats lookups.
+    """
+    players: List[str]
+    index: Dict[str, int]  # player_id -> position in players
+    ratings: List[float]
+    # partnered[i][j] / opposed[i][j]: j already appears in i's partners / opponents played
+    partnered: List[List[bool]]
+    opposed: List[List[bool]]
+    balance_weight: float  # Scoring weight (score_potential_match)
+    balance_threshold: float  # Hard balance limit (meets_balance_constraints)
+
+
+@dataclass
+class MatchScoreBatch:
+    """
+    Score components for every split of a batch of quadruples.
+    Row q * 3 + s holds split s (see MATCH_SPLITS) of quadruple q.
+    """
+    feasible: List[bool]  # meets_balance_constraints
+    balance: List[float]  # Imbalance penalty plus close-match bonus
+    homogeneity: List[float]
+    mismatch: List[float]
+    variety: List[float]
+    tier: List[float]
+    total: List[float]  # Equal to score_potential_match for the same split
+
+
+def build_match_score_table(session: Session, players: List[str],
+                            context: Optional[MatchmakingContext] = None) -> MatchScoreTable:
+    """Gather ratings and partner/opponent history for the given players into flat arrays."""
+    if context is None:
+        context = build_matchmaking_context(session)
+    
+    stats = [session.player_stats.get(p) for p in players]
+    matrix = session.pair_matrix
+    if matrix is not None:
+        slots = [matrix.slot(p) for p in players]
+    partnered = []
+    opposed = []
+    for i, player_stats in enumerate(stats):
+        if player_stats is None:
+            partnered.append([False] * len(players))
+            opposed.append([False] * len(players))
+        elif matrix is not None:
+            # Counts only ever grow from zero, so a count > 0 is an entry in the player's table
+            partner_row = matrix.partner_count[slots[i]]
+            opponent_row = matrix.opponent_count[slots[i]]
+            partnered.append([other is not None and partner_row[slot] > 0 for slot, other in zip(slots, stats)])
+            opposed.append([other is not None and opponent_row[slot] > 0 for slot, other in zip(slots, stats)])
+        else:
+            partnered.append([other is not None and p in player_stats.partners_played
+                              for p, other in zip(players, stats)])
+            opposed.append([other is not None and p in player_stats.opponents_played
+                            for p, other in zip(players, stats)])
+    
+    return MatchScoreTable(
+        players=list(players),
+        index={p: i for i, p in enumerate(players)},
+        ratings=[context.rating(p) for p in players],
+        partnered=partnered,
+        opposed=opposed,
+        balance_weight=context.scoring_balance_weight,
+        balance_threshold=context.balance_threshold
+    )
+
+
+def score_match_splits(table: MatchScoreTable, quadruples: List[Tuple[int, int, int, int]]) -> MatchScoreBatch:
+    """
+    Score all three team splits of each candidate quadruple (player positions in table).
     
-    # Bonus for variety (reduced weight as session progresses to prioritize balance)
-    variety_weight = max(1.0, 3.0 - (balance_weight - 1.0))  # Decreases from 3.0 to 1.0
-    variety_bonus = 0
+    Terms are summed in a fixed order, so a split's total does not depend on which
+    batch it was scored in and equals score_potential_match for the same teams.
+    """
+    ratings = table.ratings
+    partnered = table.partnered
+    opposed = table.opposed
+    balance_weight = table.balance_weight
+    threshold = table.balance_threshold
+    adaptive = balance_weight >= 3.0
+    variety_weight = max(1.0, 3.0 - (balance_weight - 1.0))
+    partner_bonus = 5 * variety_weight
+    opponent_bonus = 3 * variety_weight
     
-    # Partner variety bonus
-    for team in [team1, team2]:
-        p1, p2 = team
-        if (p1 not in session.player_stats or p2 not in session.player_stats or 
-            p2 not in session.player_stats[p1].partners_played):
-            variety_bonus += 5 * variety_weight
+    batch = MatchScoreBatch([], [], [], [], [], [], [])
+    for quad in quadruples:
+        for (a, b), (c, d) in MATCH_SPLITS:
+            p1, p2, p3, p4 = quad[a], quad[b], quad[c], quad[d]
+            r1, r2, r3, r4 = ratings[p1], ratings[p2], ratings[p3], ratings[p4]
+            team1_rating = r1 + r2
+            team2_rating = r3 + r4
+            rating_diff = abs(team1_rating - team2_rating)
+            
+            feasible = rating_diff <= threshold
+            balance_penalty = rating_diff * 2 * balance_weight
+            
+            homogeneity = 0
+            mismatch = 0
+            tier = 0
+            if adaptive:
+                for skill_difference in (abs(r1 - r2), abs(r3 - r4)):
+                    if skill_difference <= 150:
+                        homogeneity += 75 * balance_weight
+                    elif skill_difference <= 250:
+                        homogeneity += 40 * balance_weight
+                    if skill_difference >= 400:
+                        mismatch += 100 * balance_weight
+                    elif skill_difference >= 300:
+                        mismatch += 50 * balance_weight
+                
+                team_avg_diff = abs(team1_rating / 2 - team2_rating / 2)
+                if team_avg_diff <= 100:
+                    tier = 75 * balance_weight
+                elif team_avg_diff <= 200:
+                    tier = 40 * balance_weight
+            
+            variety = 0
+            if not partnered[p1][p2]:
+                variety += partner_bonus
+            if not partnered[p3][p4]:
+                variety += partner_bonus
+            for x in (p1, p2):
+                row = opposed[x]
+                for y in (p3, p4):
+                    if not row[y]:
+                        variety += opponent_bonus
+            
+            close_bonus = 0
+            if rating_diff <= 100:
+                close_bonus = 100 * balance_weight
+            elif rating_diff <= 200:
+                close_bonus = 50 * balance_weight
+            
+            if feasible:
+                total = 0.0
+                total -= balance_penalty
+                if adaptive:
+                    total += homogeneity
+                    total -= mismatch
+                total += variety
+                total += close_bonus
+                total += tier
+            else:
+                total = -10000
+            
+            batch.feasible.append(feasible)
+            batch.balance.append(close_bonus - balance_penalty)
+            batch.homogeneity.append(homogeneity)
+            batch.mismatch.append(mismatch)
+            batch.variety.append(variety)
+            batch.tier.append(tier)
+            batch.total.append(total)
     
-    # Opponent variety bonus  
-    for p1 in team1:
-        for p2 in team2:
-            if (p1 not in session.player_stats or p2 not in session.player_stats or
-                p2 not in session.player_stats[p1].opponents_played):
-                variety_bonus += 3 * variety_weight
-    
-    score += variety_bonus
-    
-    # Perfect balance bonus (extra reward for very close team ratings)
-    if rating_diff <= 100:  # Very close teams
-        score += 100 * balance_weight
-    elif rating_diff <= 200:  # Close teams
-        score += 50 * balance_weight
-    
-    # Skill tier matching bonus (only when adaptive system active)
-    # Encourage matches between similar skill levels across teams
-    if balance_weight >= 3.0:  # Mid to late session - adaptive system active
-        avg_team1_rating = sum(team1_ratings) / 2
-        avg_team2_rating = sum(team2_ratings) / 2
-        team_avg_diff = abs(avg_team1_rating - avg_team2_rating)
-        
-        if team_avg_diff <= 100:  # Similar average team skill
-            score += 75 * balance_weight
-        elif team_avg_diff <= 200:  # Reasonably similar average team skill
-            score += 40 * balance_weight
+    return batch
+
+
+def iter_scored_quadruples(table: MatchScoreTable, positions, quadruples,
+                           batch_size: int = SCORE_BATCH_SIZE) -> Iterator[Tuple[tuple, List[float], List[bool]]]:
+    """
+    Score a stream of candidate quadruples through score_match_splits, batch_size at a time.
     
-    return score
+    Each quadruple holds keys into positions (a list of table positions, or table.index
+    itself for player ids). Yields (quadruple, totals, feasible) in input order, with the
+    three splits in MATCH_SPLITS order. Quadruples are pulled lazily, so a search that
+    stops at its first good match scores at most one batch past it.
+    """
+    quadruples = iter(quadruples)
+    while True:
+        window = list(islice(quadruples, batch_size))
+        if not window:
+            return
+        batch = score_match_splits(table, [tuple(positions[key] for key in quad) for quad in window])
+        for q, quad in enumerate(window):
+            row = q * 3
+            yield quad, batch.total[row:row + 3], batch.feasible[row:row + 3]
 
 
-def _can_form_valid_teams(session: Session, players: List[str], allow_cross_bracket: bool = False) -> bool:
+def _can_form_valid_teams(session: Session, players: List[str], allow_cross_bracket: bool = False,
+                          context: Optional[MatchmakingContext] = None) -> bool:
     """
     Check if 4 players can form valid teams respecting all competitive variety constraints.
     """
     if len(players) != 4:
         return False
     
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     # First check: all players must be within roaming range of each other
-    if not can_all_players_play_together(session, players):
+    if not can_all_players_play_together(session, players, context):
         return False
     
     # Try different team configurations
@@ -1129,17 +1336,17 @@ def _can_form_valid_teams(session: Session, players: List[str], allow_cross_brac
         valid = True
         
         # Check within-team partnerships
-        if not can_play_with_player(session, team1[0], team1[1], 'partner', allow_cross_bracket):
+        if not can_play_with_player(session, team1[0], team1[1], 'partner', allow_cross_bracket, context):
             valid = False
         
-        if valid and not can_play_with_player(session, team2[0], team2[1], 'partner', allow_cross_bracket):
+        if valid and not can_play_with_player(session, team2[0], team2[1], 'partner', allow_cross_bracket, context):
             valid = False
         
         # Check cross-team opponents
         if valid:
             for p1 in team1:
                 for p2 in team2:
-                    if not can_play_with_player(session, p1, p2, 'opponent', allow_cross_bracket):
+                    if not can_play_with_player(session, p1, p2, 'opponent', allow_cross_bracket, context):
                         valid = False
                         break
                 if not valid:
@@ -1151,21 +1358,25 @@ def _can_form_valid_teams(session: Session, players: List[str], allow_cross_brac
     return False
 
 
-def _is_team_configuration_valid(session: Session, team1: List[str], team2: List[str]) -> bool:
+def _is_team_configuration_valid(session: Session, team1: List[str], team2: List[str],
+                                 context: Optional[MatchmakingContext] = None) -> bool:
     """
     Check if a specific team configuration is valid according to variety constraints.
     """
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     # Check within-team partnerships
-    if not can_play_with_player(session, team1[0], team1[1], 'partner'):
+    if not can_play_with_player(session, team1[0], team1[1], 'partner', context=context):
         return False
     
-    if not can_play_with_player(session, team2[0], team2[1], 'partner'):
+    if not can_play_with_player(session, team2[0], team2[1], 'partner', context=context):
         return False
     
     # Check cross-team opponents
     for p1 in team1:
         for p2 in team2:
-            if not can_play_with_player(session, p1, p2, 'opponent'):
+            if not can_play_with_player(session, p1, p2, 'opponent', context=context):
                 return False
     
     return True
@@ -1189,7 +1400,8 @@ def get_must_play_players(session: Session, available_players: List[str]) -> Lis
 MUST_PLAY_BALANCE_THRESHOLD = 300
 
 
-def _can_play_relaxed(session: Session, player1: str, player2: str, role: str) -> bool:
+def _can_play_relaxed(session: Session, player1: str, player2: str, role: str,
+                      context: Optional[MatchmakingContext] = None) -> bool:
     """
     Relaxed constraint check for must-play balance override.
     Only enforces: locked teams, banned pairs, and back-to-back prevention (1-game gap).
@@ -1234,16 +1446,14 @@ def _can_play_relaxed(session: Session, player1: str, player2: str, role: str) -
                 return False
 
     # Back-to-back prevention only (1-game gap)
-    completed_matches = [m for m in session.matches if m.status == 'completed']
-    if completed_matches:
-        last_match = completed_matches[-1]
+    history = context.history if context is not None else get_relationship_index(session)
+    last_game = history.completed_count - 1
+    if last_game >= 0:
         if role == 'partner':
-            if (player1 in last_match.team1 and player2 in last_match.team1) or \
-               (player1 in last_match.team2 and player2 in last_match.team2):
+            if history.last_role_index(player1, player2, 'partner')[0] == last_game:
                 return False
         elif role == 'opponent':
-            if (player1 in last_match.team1 and player2 in last_match.team2) or \
-               (player1 in last_match.team2 and player2 in last_match.team1):
+            if history.last_role_index(player1, player2, 'opponent')[0] == last_game:
                 return False
 
     return True
@@ -1253,13 +1463,17 @@ def _find_relaxed_must_play_match(
     session: Session,
     candidates: List[str],
     must_play: List[str],
-    search_limit: int
+    search_limit: int,
+    context: Optional[MatchmakingContext] = None
 ) -> Optional[Tuple[List[str], List[str]]]:
     """
     Search for a well-balanced match with must-play players using relaxed constraints.
     Only enforces locked teams, banned pairs, and back-to-back prevention.
     Returns the most balanced (team1, team2) or None.
     """
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     best_diff = float('inf')
     best_config = None
 
@@ -1274,14 +1488,14 @@ def _find_relaxed_must_play_match(
         ]
 
         for team1, team2 in configs:
-            if not (_can_play_relaxed(session, team1[0], team1[1], 'partner') and
-                    _can_play_relaxed(session, team2[0], team2[1], 'partner')):
+            if not (_can_play_relaxed(session, team1[0], team1[1], 'partner', context) and
+                    _can_play_relaxed(session, team2[0], team2[1], 'partner', context)):
                 continue
 
             valid = True
             for p1 in team1:
                 for p2 in team2:
-                    if not _can_play_relaxed(session, p1, p2, 'opponent'):
+                    if not _can_play_relaxed(session, p1, p2, 'opponent', context):
                         valid = False
                         break
                 if not valid:
@@ -1290,8 +1504,8 @@ def _find_relaxed_must_play_match(
             if not valid:
                 continue
 
-            t1_rating = sum(calculate_player_elo_rating(session, p) for p in team1)
-            t2_rating = sum(calculate_player_elo_rating(session, p) for p in team2)
+            t1_rating = sum(context.rating(p) for p in team1)
+            t2_rating = sum(context.rating(p) for p in team2)
             diff = abs(t1_rating - t2_rating)
 
             if diff < best_diff:
@@ -1326,7 +1540,8 @@ def get_simple_wait_priority_candidates(session: Session, available_players: Lis
 def create_ultra_competitive_first_round_matches(
     session: Session, 
     available_players: List[str], 
-    courts_needed: int
+    courts_needed: int,
+    context: Optional[MatchmakingContext] = None
 ) -> List[QueuedMatch]:
     """
     Create ultra-competitive first round matches using the top 4/bottom 4 alternating pattern.
@@ -1343,8 +1558,11 @@ def create_ultra_competitive_first_round_matches(
     if len(available_players) < 4:
         return []
     
+    if context is None:
+        context = build_matchmaking_context(session)
+    
     # Sort players by ELO rating (highest first)
-    player_ratings = [(p, calculate_player_elo_rating(session, p)) for p in available_players]
+    player_ratings = [(p, context.rating(p)) for p in available_players]
     player_ratings.sort(key=lambda x: x[1], reverse=True)
     sorted_players = [p[0] for p in player_ratings]
     
@@ -1384,7 +1602,7 @@ def create_ultra_competitive_first_round_matches(
         best_score = float('-inf')
         
         # Get ratings for balance calculation
-        court_ratings = {p: calculate_player_elo_rating(session, p) for p in court_players}
+        court_ratings = {p: context.rating(p) for p in court_players}
         
         # Try all 3 possible team configurations
         configs = [
@@ -1395,7 +1613,7 @@ def create_ultra_competitive_first_round_matches(
         
         for team1, team2 in configs:
             # Check if valid configuration (may not matter in first round, but be safe)
-            if not _is_team_configuration_valid(session, team1, team2):
+            if not _is_team_configuration_valid(session, team1, team2, context):
                 continue
             
             # Score by balance
@@ -1435,6 +1653,11 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
     # Apply adaptive balance weighting (constraints stay the same)
     apply_adaptive_constraints(session)
     
+    # Ratings, ranks and thresholds are fixed for the whole pass
+    context = build_matchmaking_context(session)
+    # Built on first use over the players still available; later courts only draw from a subset
+    score_table = None
+    
     from .utils import generate_id
     from .pickleball_types import Match, PlayerStats, QueuedMatch
     
@@ -1486,6 +1709,29 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
         if match.status in ['in-progress', 'waiting']:
             players_in_matches.update(match.team1 + match.team2)
     
+    # Several courts free at once: optionally pick all their matches in one joint search
+    # (queued matches, locked teams, pre-seeded and first rounds keep their own handling)
+    if (session.competitive_variety_joint_court_solver and len(empty_courts) >= 2
+            and not session.match_queue and not session.config.locked_teams
+            and not session.config.pre_seeded_ratings and context.history.completed_count > 0):
+        from .joint_court_solver import solve_joint_court_assignment
+        available_players = [p for p in sorted(session.active_players) if p not in players_in_matches and p not in first_bye_players_set]
+        assignment = solve_joint_court_assignment(session, available_players, len(empty_courts), context)
+        if assignment is not None:
+            for court_num, (team1, team2) in zip(empty_courts, assignment):
+                session.matches.append(Match(
+                    id=generate_id(),
+                    court_number=court_num,
+                    team1=team1,
+                    team2=team2,
+                    status='waiting',
+                    start_time=now()
+                ))
+                for player_id in (team1 + team2):
+                    if player_id not in session.player_stats:
+                        session.player_stats[player_id] = PlayerStats(player_id=player_id)
+            return
+    
     # First, try to assign matches from the queue (respects waitlist)
     matches_to_remove = []
     for court_idx, court_num in enumerate(empty_courts):
@@ -1499,13 +1745,13 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
             if not (match_players & players_in_matches):
                 # First check: all players must be within roaming range of each other
                 all_players = list(match_players)
-                valid = can_all_players_play_together(session, all_players)
+                valid = can_all_players_play_together(session, all_players, context)
                 
                 # Check competitive variety constraints
                 if valid:
                     for p1 in queued_match.team1:
                         for p2 in queued_match.team1:
-                            if p1 != p2 and not can_play_with_player(session, p1, p2, 'partner'):
+                            if p1 != p2 and not can_play_with_player(session, p1, p2, 'partner', context=context):
                                 valid = False
                                 break
                         if not valid:
@@ -1514,7 +1760,7 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                 if valid:
                     for p1 in queued_match.team1:
                         for p2 in queued_match.team2:
-                            if not can_play_with_player(session, p1, p2, 'opponent'):
+                            if not can_play_with_player(session, p1, p2, 'opponent', context=context):
                                 valid = False
                                 break
                         if not valid:
@@ -1555,13 +1801,13 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                     # Court 1: Top 4 players, Court 2: Bottom 4 players, etc.
                     remaining_courts = len(empty_courts) - court_idx
                     skill_matches = create_ultra_competitive_first_round_matches(
-                        session, available_players, remaining_courts
+                        session, available_players, remaining_courts, context
                     )
                 else:
                     # LATER ROUNDS: Skill-based matching with must-play priority
                     remaining_courts = len(empty_courts) - court_idx
                     skill_matches = create_skill_based_matches_for_pre_seeded(
-                        session, available_players, remaining_courts
+                        session, available_players, remaining_courts, context
                     )
                 
                 # Assign matches to remaining courts
@@ -1617,14 +1863,14 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                                  
                                  # Check roaming range
                                  all_players = pair1 + pair2
-                                 if not can_all_players_play_together(session, all_players):
+                                 if not can_all_players_play_together(session, all_players, context):
                                      continue
                                  
                                  # Check validity of pair1 vs pair2
                                  valid_match = True
                                  for p1 in pair1:
                                      for p2 in pair2:
-                                         if not can_play_with_player(session, p1, p2, 'opponent'):
+                                         if not can_play_with_player(session, p1, p2, 'opponent', context=context):
                                              valid_match = False
                                              break
                                      if not valid_match:
@@ -1643,7 +1889,7 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                         remaining = [p for p in available_players if p not in pair1]
                         
                         # Sort remaining by rating using pre-seeded ratings if available
-                        player_ratings = [(p, calculate_player_elo_rating(session, p)) for p in remaining]
+                        player_ratings = [(p, context.rating(p)) for p in remaining]
                         player_ratings.sort(key=lambda x: x[1], reverse=True)
 
                         # Try to find a partner pair for opponents
@@ -1657,15 +1903,15 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                              
                              # Check roaming range
                              all_players = pair1 + pair2
-                             if not can_all_players_play_together(session, all_players):
+                             if not can_all_players_play_together(session, all_players, context):
                                  continue
                              
-                             if can_play_with_player(session, pair2[0], pair2[1], 'partner'):
+                             if can_play_with_player(session, pair2[0], pair2[1], 'partner', context=context):
                                  # Check opponent validity
                                  valid_match = True
                                  for p1 in pair1:
                                      for p2 in pair2:
-                                         if not can_play_with_player(session, p1, p2, 'opponent'):
+                                         if not can_play_with_player(session, p1, p2, 'opponent', context=context):
                                              valid_match = False
                                              break
                                      if not valid_match:
@@ -1697,7 +1943,7 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                         # This creates skill-homogeneous courts for competitive play
                         remaining_courts = len(empty_courts) - court_idx
                         ultra_comp_matches = create_ultra_competitive_first_round_matches(
-                            session, available_players, remaining_courts
+                            session, available_players, remaining_courts, context
                         )
                         
                         if ultra_comp_matches:
@@ -1733,7 +1979,7 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                         must_play = get_must_play_players(session, available_players)
                         
                         # Search limit for combinations
-                        search_limit = min(12, len(candidates_for_matching))
+                        search_limit = min(MATCH_SEARCH_LIMIT, len(candidates_for_matching))
                     
                         # Maintain skill bracket quality - no cross-bracket matching
                         allow_cross = False
@@ -1744,7 +1990,15 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                         if must_play:
                             # Prioritize combinations that include must-play players
                             # Try combinations starting from those with most must-play players
-                            for combo in combinations(candidates_for_matching[:search_limit], 4):
+                            search_pool = candidates_for_matching[:search_limit]
+                            if score_table is None:
+                                score_table = build_match_score_table(session, available_players, context)
+                            pool_positions = [score_table.index[p] for p in search_pool]
+                            window = generate_roaming_quadruples(session, search_pool, context)
+                            for quad, totals, feasible in iter_scored_quadruples(score_table, pool_positions, window):
+                                if not any(feasible):
+                                    continue  # No split meets the balance constraints
+                                combo = tuple(search_pool[i] for i in quad)
                                 # Count how many must-play players are in this combo
                                 must_play_count = sum(1 for p in combo if p in must_play)
                                 
@@ -1752,7 +2006,7 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                                 if must_play and must_play_count == 0:
                                     continue
                                 
-                                if _can_form_valid_teams(session, list(combo), allow_cross_bracket=allow_cross):
+                                if _can_form_valid_teams(session, list(combo), allow_cross_bracket=allow_cross, context=context):
                                     configs = [
                                         ([combo[0], combo[1]], [combo[2], combo[3]]),
                                         ([combo[0], combo[2]], [combo[1], combo[3]]),
@@ -1762,20 +2016,20 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                                     best_score = float('-inf')
                                     best_config = None
                                     
-                                    for team1, team2 in configs:
-                                        if (can_play_with_player(session, team1[0], team1[1], 'partner', allow_cross) and
-                                            can_play_with_player(session, team2[0], team2[1], 'partner', allow_cross)):
+                                    for split_idx, (team1, team2) in enumerate(configs):
+                                        if (can_play_with_player(session, team1[0], team1[1], 'partner', allow_cross, context) and
+                                            can_play_with_player(session, team2[0], team2[1], 'partner', allow_cross, context)):
                                             valid = True
                                             for p1 in team1:
                                                 for p2 in team2:
-                                                    if not can_play_with_player(session, p1, p2, 'opponent', allow_cross):
+                                                    if not can_play_with_player(session, p1, p2, 'opponent', allow_cross, context):
                                                         valid = False
                                                         break
                                                 if not valid:
                                                     break
                                             
-                                            if valid and meets_balance_constraints(session, team1, team2):
-                                                score = score_potential_match(session, team1, team2)
+                                            if valid and feasible[split_idx]:
+                                                score = totals[split_idx]
                                                 if score > best_score:
                                                     best_score = score
                                                     best_config = (list(team1), list(team2))
@@ -1790,18 +2044,18 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                         if must_play:
                             normal_diff = float('inf')
                             if found_match and best_team1 and best_team2:
-                                t1_r = sum(calculate_player_elo_rating(session, p) for p in best_team1)
-                                t2_r = sum(calculate_player_elo_rating(session, p) for p in best_team2)
+                                t1_r = sum(context.rating(p) for p in best_team1)
+                                t2_r = sum(context.rating(p) for p in best_team2)
                                 normal_diff = abs(t1_r - t2_r)
                             
                             if not found_match or normal_diff > MUST_PLAY_BALANCE_THRESHOLD:
                                 relaxed_result = _find_relaxed_must_play_match(
-                                    session, candidates_for_matching, must_play, search_limit
+                                    session, candidates_for_matching, must_play, search_limit, context
                                 )
                                 if relaxed_result:
                                     rt1, rt2 = relaxed_result
-                                    relaxed_t1_r = sum(calculate_player_elo_rating(session, p) for p in rt1)
-                                    relaxed_t2_r = sum(calculate_player_elo_rating(session, p) for p in rt2)
+                                    relaxed_t1_r = sum(context.rating(p) for p in rt1)
+                                    relaxed_t2_r = sum(context.rating(p) for p in rt2)
                                     relaxed_diff = abs(relaxed_t1_r - relaxed_t2_r)
                                     
                                     # Use relaxed match if it's significantly better or normal found nothing
@@ -1810,9 +2064,22 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                                         found_match = True
 
                         if not found_match:
-                            # Fallback: try any valid combination
-                            for combo in combinations(candidates_for_matching[:search_limit], 4):
-                                if _can_form_valid_teams(session, list(combo), allow_cross_bracket=allow_cross):
+                            # Fallback: try any valid combination, widening past search_limit
+                            # only once the top candidates are exhausted
+                            search_pool = candidates_for_matching[:EXTENDED_MATCH_SEARCH_LIMIT]
+                            if score_table is None:
+                                score_table = build_match_score_table(session, available_players, context)
+                            pool_positions = [score_table.index[p] for p in search_pool]
+                            window = chain(
+                                generate_roaming_quadruples(session, search_pool[:search_limit], context),
+                                (quad for quad in generate_roaming_quadruples(session, search_pool, context)
+                                 if quad[3] >= search_limit)
+                            )
+                            for quad, totals, feasible in iter_scored_quadruples(score_table, pool_positions, window):
+                                if not any(feasible):
+                                    continue  # No split meets the balance constraints
+                                combo = tuple(search_pool[i] for i in quad)
+                                if _can_form_valid_teams(session, list(combo), allow_cross_bracket=allow_cross, context=context):
                                     configs = [
                                         ([combo[0], combo[1]], [combo[2], combo[3]]),
                                         ([combo[0], combo[2]], [combo[1], combo[3]]),
@@ -1822,20 +2089,20 @@ def populate_empty_courts_competitive_variety(session: Session) -> None:
                                     best_score = float('-inf')
                                     best_config = None
                                     
-                                    for team1, team2 in configs:
-                                        if (can_play_with_player(session, team1[0], team1[1], 'partner', allow_cross) and
-                                            can_play_with_player(session, team2[0], team2[1], 'partner', allow_cross)):
+                                    for split_idx, (team1, team2) in enumerate(configs):
+                                        if (can_play_with_player(session, team1[0], team1[1], 'partner', allow_cross, context) and
+                                            can_play_with_player(session, team2[0], team2[1], 'partner', allow_cross, context)):
                                             valid = True
                                             for p1 in team1:
                                                 for p2 in team2:
-                                                    if not can_play_with_player(session, p1, p2, 'opponent', allow_cross):
+                                                    if not can_play_with_player(session, p1, p2, 'opponent', allow_cross, context):
                                                         valid = False
                                                         break
                                                 if not valid:
                                                     break
                                             
-                                            if valid and meets_balance_constraints(session, team1, team2):
-                                                score = score_potential_match(session, team1, team2)
+                                            if valid and feasible[split_idx]:
+                                                score = totals[split_idx]
                                                 if score > best_score:
                                                     best_score = score
                                                     best_config = (list(team1), list(team2))
@@ -1882,6 +2149,8 @@ def build_match_for_court_competitive_variety(
     if len(available_players) < 4:
         return None
     
+    context = build_matchmaking_context(session)
+    
     # Try to find 4 players that can play together
     from itertools import combinations
     
@@ -1899,18 +2168,18 @@ def build_match_for_court_competitive_variety(
             
             # Check within-team partnerships
             if len(team1) == 2:
-                if not can_play_with_player(session, team1[0], team1[1], 'partner'):
+                if not can_play_with_player(session, team1[0], team1[1], 'partner', context=context):
                     valid = False
             
             if len(team2) == 2:
-                if not can_play_with_player(session, team2[0], team2[1], 'partner'):
+                if not can_play_with_player(session, team2[0], team2[1], 'partner', context=context):
                     valid = False
             
             # Check cross-team opponents
             if valid:
                 for p1 in team1:
                     for p2 in team2:
-                        if not can_play_with_player(session, p1, p2, 'opponent'):
+                        if not can_play_with_player(session, p1, p2, 'opponent', context=context):
                             valid = False
                             break
                     if not valid:
@@ -1934,8 +2203,10 @@ def can_players_form_match_together(
     if session.config.mode != 'competitive-variety' or len(player_ids) != 4:
         return False
     
+    context = build_matchmaking_context(session)
+    
     # First check: all players must be within roaming range of each other
-    if not can_all_players_play_together(session, player_ids):
+    if not can_all_players_play_together(session, player_ids, context):
         return False
     
     # Try all possible team configurations
@@ -1948,18 +2219,18 @@ def can_players_form_match_together(
     for team1, team2 in configs:
         # Check within-team partnerships
         if len(team1) == 2:
-            if not can_play_with_player(session, team1[0], team1[1], 'partner'):
+            if not can_play_with_player(session, team1[0], team1[1], 'partner', context=context):
                 continue
         
         if len(team2) == 2:
-            if not can_play_with_player(session, team2[0], team2[1], 'partner'):
+            if not can_play_with_player(session, team2[0], team2[1], 'partner', context=context):
                 continue
         
         # Check cross-team opponents
         valid_opponents = True
         for p1 in team1:
             for p2 in team2:
-                if not can_play_with_player(session, p1, p2, 'opponent'):
+                if not can_play_with_player(session, p1, p2, 'opponent', context=context):
                     valid_opponents = False
                     break
             if not valid_opponents:
@@ -1984,6 +2255,9 @@ def update_variety_tracking_after_match(
     if session.config.mode != 'competitive-variety':
         return
     
+    # Ratings changed with this result
+    invalidate_ranking_index(session)
+    
     # Get current game number BEFORE incrementing (this is the game that just completed)
     # Count games by completed matches + 1 (since we just finished one)
     completed_count = len([m for m in session.matches if m.status == 'completed'])
@@ -161,24 +161,29 @@ def calculate_variety_penalty(session: Session, team1: List[str], team2: List[st
     This is a SOFT constraint - we don't block matches, just prefer variety.
     """
     penalty = 0.0
+    matrix = session.pair_matrix
     
     # Check partnerships
     for team in [team1, team2]:
         if len(team) == 2:
             p1, p2 = team
-            stats1 = session.player_stats.get(p1)
-            if stats1 and p2 in stats1.partners_played:
-                partner_count = stats1.partners_played[p2]
-                penalty += partner_count * 100  # 100 per repeat
+            if matrix is not None:
+                partner_count = matrix.partners(p1, p2)
+            else:
+                stats1 = session.player_stats.get(p1)
+                partner_count = stats1.partners_played.get(p2, 0) if stats1 else 0
+            penalty += partner_count * 100  # 100 per repeat
     
     # Check opponents
     for p1 in team1:
+        stats1 = None if matrix is not None else session.player_stats.get(p1)
         for p2 in team2:
-            stats1 = session.player_stats.get(p1)
-            if stats1 and p2 in stats1.opponents_played:
-                opp_count = stats1.opponents_played[p2]
-                if opp_count > MAX_INDIVIDUAL_OPPONENT_REPEATS:
-                    penalty += (opp_count - MAX_INDIVIDUAL_OPPONENT_REPEATS) * 50
+            if matrix is not None:
+                opp_count = matrix.opponents(p1, p2)
+            else:
+                opp_count = stats1.opponents_played.get(p2, 0) if stats1 else 0
+            if opp_count > MAX_INDIVIDUAL_OPPONENT_REPEATS:
+                penalty += (opp_count - MAX_INDIVIDUAL_OPPONENT_REPEATS) * 50
     
     return penalty
 
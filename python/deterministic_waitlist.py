@@ -20,12 +20,13 @@ from dataclasses import dataclass
 from .pickleball_types import Session, Match, Player
 from .competitive_variety import (
     calculate_elo_rating, get_player_ranking, get_roaming_rank_range,
-    can_play_with_player, is_provisional, populate_empty_courts_competitive_variety
+    can_play_with_player, is_provisional, populate_empty_courts_competitive_variety,
+    invalidate_ranking_index
 )
 from .wait_priority import sort_players_by_wait_priority, calculate_wait_priority_info
 from .queue_manager import get_waiting_players
 from .session import get_player_name
-import copy
+from .trial_session import create_trial_session, trial_match, trial_player_stats
 
 @dataclass
 class PredictedMatch:
@@ -59,15 +60,11 @@ def simulate_match_outcome(session: Session, match: Match, team1_wins: bool) ->
     Returns:
         New session with simulated outcome applied
     """
-    # Create deep copy to avoid modifying original
-    sim_session = copy.deepcopy(session)
+    # Trial copy: shares history with the original, copies what it changes
+    sim_session = create_trial_session(session)
     
     # Find the corresponding match in the copy
-    sim_match = None
-    for m in sim_session.matches:
-        if m.id == match.id:
-            sim_match = m
-            break
+    sim_match = trial_match(sim_session, match.id)
     
     if not sim_match:
         return sim_session
@@ -89,7 +86,7 @@ def simulate_match_outcome(session: Session, match: Match, team1_wins: bool) ->
     for player_id in sim_match.team1:
         if player_id not in sim_session.player_stats:
             continue
-        stats = sim_session.player_stats[player_id]
+        stats = trial_player_stats(sim_session, player_id)
         stats.games_played += 1
         stats.total_points_for += team1_score
         stats.total_points_against += team2_score
@@ -111,7 +108,7 @@ def simulate_match_outcome(session: Session, match: Match, team1_wins: bool) ->
     for player_id in sim_match.team2:
         if player_id not in sim_session.player_stats:
             continue
-        stats = sim_session.player_stats[player_id]
+        stats = trial_player_stats(sim_session, player_id)
         stats.games_played += 1
         stats.total_points_for += team2_score
         stats.total_points_against += team1_score
@@ -133,7 +130,10 @@ def simulate_match_outcome(session: Session, match: Match, team1_wins: bool) ->
     for player_id in sorted(sim_session.active_players):
         if player_id not in players_in_match:
             if player_id in sim_session.player_stats:
-                sim_session.player_stats[player_id].games_waited += 1
+                trial_player_stats(sim_session, player_id).games_waited += 1
+    
+    # Simulated result changes ratings
+    invalidate_ranking_index(sim_session)
     
     return sim_session
 
@@ -201,7 +201,7 @@ def check_player_gets_match(sim_session: Session, player_id: str, court_num: int
         List of PredictedMatch if player gets assigned to that court
     """
     # Create a temporary copy to test match assignment
-    test_session = copy.deepcopy(sim_session)
+    test_session = create_trial_session(sim_session)
     
     # Remove the completed match from the specified court
     test_session.matches = [m for m in test_session.matches 
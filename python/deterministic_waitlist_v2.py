@@ -10,12 +10,12 @@ that tracks assignments without persisting changes.
 """
 
 from typing import List, Dict, Set, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from .pickleball_types import Session, Match, Player
-from .competitive_variety import populate_empty_courts_competitive_variety
+from .competitive_variety import populate_empty_courts_competitive_variety, invalidate_ranking_index
 from .queue_manager import get_waiting_players
 from .session import get_player_name
-import copy
+from .trial_session import create_trial_session, trial_match, trial_player_stats
 
 @dataclass
 class MatchingResult:
@@ -44,6 +44,36 @@ class WaitlistPrediction:
     court_dependencies: Dict[int, List[str]]  # Court number -> list of outcomes
 
 
+@dataclass
+class ScenarioCache:
+    """
+    Court finish scenarios computed for one version of a session.
+    
+    Every waiting player's prediction looks at the same court/outcome scenarios,
+    and each one is a full matchmaking run, so they are computed once per session
+    version and shared by the whole prediction pass and the GUI.
+    """
+    version: int
+    # Guards for changes made without a version bump (replaced or appended matches)
+    matches_ref: List[Match]
+    match_count: int
+    # (court_number, finishing match id, outcome) -> matches created in that scenario
+    scenarios: Dict[Tuple[int, str, str], List[MatchingResult]] = field(default_factory=dict)
+
+
+def get_scenario_cache(session: Session) -> ScenarioCache:
+    """Return the session's scenario cache, starting a new one if the session changed."""
+    cache = session.scenario_cache
+    if (cache is None
+            or cache.version != session.version
+            or cache.matches_ref is not session.matches
+            or cache.match_count != len(session.matches)):
+        cache = ScenarioCache(version=session.version, matches_ref=session.matches,
+                              match_count=len(session.matches))
+        session.scenario_cache = cache
+    return cache
+
+
 def run_matching_in_trial_mode(session: Session, track_court: Optional[int] = None) -> List[MatchingResult]:
     """
     Run the competitive variety algorithm in "trial mode" to see what assignments would be made.
@@ -58,8 +88,8 @@ def run_matching_in_trial_mode(session: Session, track_court: Optional[int] = No
     Returns:
         List of MatchingResult showing what assignments would be made
     """
-    # Create deep copy for trial run
-    trial_session = copy.deepcopy(session)
+    # Trial copy: shares history with the real session, keeps its own new matches
+    trial_session = create_trial_session(session)
     
     # Track initial state
     initial_matches = {m.court_number: m.id for m in trial_session.matches 
@@ -122,21 +152,26 @@ def analyze_court_finish_scenarios(session: Session, court_number: int) -> Dict[
     if not target_match:
         return {}
     
+    # Keyed by the finishing match too, so a court slide can't return another match's scenario
+    cache = get_scenario_cache(session)
+    keys = {outcome: (court_number, target_match.id, outcome) for outcome in ("red_wins", "blue_wins")}
+    if all(key in cache.scenarios for key in keys.values()):
+        return {outcome: cache.scenarios[key] for outcome, key in keys.items()}
+    
     results = {}
     
     for outcome, team1_wins in [("red_wins", True), ("blue_wins", False)]:
         # Simulate match completion
-        sim_session = copy.deepcopy(session)
+        sim_session = create_trial_session(session)
         
         # Find and complete the match
-        for sim_match in sim_session.matches:
-            if sim_match.id == target_match.id:
-                sim_match.status = 'completed'
-                if team1_wins:
-                    sim_match.score = {'team1_score': 11, 'team2_score': 9}
-                else:
-                    sim_match.score = {'team1_score': 9, 'team2_score': 11}
-                break
+        sim_match = trial_match(sim_session, target_match.id)
+        if sim_match:
+            sim_match.status = 'completed'
+            if team1_wins:
+                sim_match.score = {'team1_score': 11, 'team2_score': 9}
+            else:
+                sim_match.score = {'team1_score': 9, 'team2_score': 11}
         
         # Update player stats for realistic ELO calculations
         _update_stats_for_completed_match(sim_session, target_match, team1_wins)
@@ -166,6 +201,7 @@ def analyze_court_finish_scenarios(session: Session, court_number: int) -> Dict[
                 ))
         
         results[outcome] = matching_results
+        cache.scenarios[keys[outcome]] = matching_results
     
     return results
 
@@ -177,7 +213,7 @@ def _update_stats_for_completed_match(session: Session, match: Match, team1_wins
     # Update team1 players
     for player_id in match.team1:
         if player_id in session.player_stats:
-            stats = session.player_stats[player_id]
+            stats = trial_player_stats(session, player_id)
             stats.games_played += 1
             stats.total_points_for += 11 if team1_wins else 9
             stats.total_points_against += 9 if team1_wins else 11
@@ -189,7 +225,7 @@ def _update_stats_for_completed_match(session: Session, match: Match, team1_wins
     # Update team2 players  
     for player_id in match.team2:
         if player_id in session.player_stats:
-            stats = session.player_stats[player_id]
+            stats = trial_player_stats(session, player_id)
             stats.games_played += 1
             stats.total_points_for += 9 if team1_wins else 11
             stats.total_points_against += 11 if team1_wins else 9
@@ -202,7 +238,10 @@ def _update_stats_for_completed_match(session: Session, match: Match, team1_wins
     for player_id in sorted(session.active_players):
         if player_id not in players_in_match:
             if player_id in session.player_stats:
-                session.player_stats[player_id].games_waited += 1
+                trial_player_stats(session, player_id).games_waited += 1
+    
+    # Simulated result changes ratings
+    invalidate_ranking_index(session)
 
 
 def calculate_player_dependencies(session: Session, player_id: str) -> Dict[int, List[str]]:
@@ -295,7 +334,7 @@ def calculate_waitlist_predictions_v2(session: Session) -> List[WaitlistPredicti
         assignments = []
         for court_num, outcomes in dependencies.items():
             for outcome in outcomes:
-                # Get the actual assignment details by re-running the analysis
+                # Get the actual assignment details (computed once per court for the whole pass)
                 court_outcomes = analyze_court_finish_scenarios(session, court_num)
                 if outcome in court_outcomes:
                     for result in court_outcomes[outcome]:
@@ -330,20 +369,30 @@ def get_court_outcome_dependencies_v2(session: Session, player_id: str) -> Dict[
     return calculate_player_dependencies(session, player_id)
 
 
-def format_prediction_display_v2(session: Session, prediction: WaitlistPrediction) -> str:
+def calculate_waitlist_dependencies(session: Session) -> Dict[str, Dict[int, List[str]]]:
     """
-    Format a waitlist prediction for display in the GUI.
+    Court outcome dependencies for every waiting player, in one pass.
     
-    Uses the new prediction structure.
+    Used by the GUI's background prediction worker on a frozen snapshot of the
+    session (see trial_session.freeze_session). Players without dependencies are
+    left out.
     """
-    player_name = get_player_name(session, prediction.player_id)
-    
-    if not prediction.court_dependencies:
-        return f"{player_name}"
+    if session.config.mode != 'competitive-variety':
+        return {}
     
+    dependencies = {}
+    for player_id in get_waiting_players(session):
+        player_dependencies = calculate_player_dependencies(session, player_id)
+        if player_dependencies:
+            dependencies[player_id] = player_dependencies
+    return dependencies
+
+
+def format_court_dependencies_v2(dependencies: Dict[int, List[str]]) -> str:
+    """Compact form of a player's court dependencies, e.g. "C1RB, C3R"."""
     court_strings = []
-    for court_num in sorted(prediction.court_dependencies.keys()):
-        outcomes = prediction.court_dependencies[court_num]
+    for court_num in sorted(dependencies.keys()):
+        outcomes = dependencies[court_num]
         
         # Convert outcome names to compact format
         outcome_chars = []
@@ -352,14 +401,23 @@ def format_prediction_display_v2(session: Session, prediction: WaitlistPredictio
         if "blue_wins" in outcomes:
             outcome_chars.append("B")
         
-        if len(outcome_chars) == 2:
-            outcome_str = "RB"
-        else:
-            outcome_str = "".join(outcome_chars)
-        
-        court_strings.append(f"C{court_num}{outcome_str}")
+        court_strings.append(f"C{court_num}{''.join(outcome_chars)}")
+    
+    return ", ".join(court_strings)
+
+
+def format_prediction_display_v2(session: Session, prediction: WaitlistPrediction) -> str:
+    """
+    Format a waitlist prediction for display in the GUI.
+    
+    Uses the new prediction structure.
+    """
+    player_name = get_player_name(session, prediction.player_id)
+    
+    if not prediction.court_dependencies:
+        return f"{player_name}"
     
-    dependencies_str = ", ".join(court_strings)
+    dependencies_str = format_court_dependencies_v2(prediction.court_dependencies)
     return f"{player_name} 🎯[{dependencies_str}]"
 
 
@@ -6,6 +6,7 @@ import sys
 import json
 import os
 import subprocess
+import time
 from typing import Optional, List, Dict
 from datetime import datetime
 from PyQt6.QtWidgets import (
@@ -15,8 +16,8 @@ from PyQt6.QtWidgets import (
     QMessageBox, QInputDialog, QSpinBox, QGroupBox, QCheckBox, QFrame, QScrollArea,
     QGridLayout, QSpacerItem, QSizePolicy, QSlider, QDialogButtonBox, QTextEdit
 )
-from PyQt6.QtCore import Qt, QTimer, QRect, QSize, QPropertyAnimation, QPoint, QEasingCurve, QParallelAnimationGroup, QMimeData, pyqtSignal, qInstallMessageHandler, QEvent
-from PyQt6.QtGui import QColor, QFont, QPainter, QBrush, QPen, QPixmap, QDrag
+from PyQt6.QtCore import Qt, QTimer, QRect, QSize, QPropertyAnimation, QPoint, QEasingCurve, QParallelAnimationGroup, QMimeData, pyqtSignal, qInstallMessageHandler, QEvent, QObject, QRunnable, QThreadPool
+from PyQt6.QtGui import QColor, QFont, QPainter, QBrush, QPen, QPixmap, QDrag, QKeySequence, QShortcut
 
 from python.pickleball_types import (
     Player, Session, SessionConfig, GameMode, SessionType, Match,
@@ -26,7 +27,7 @@ from python.session import (
     create_session, add_player_to_session, remove_player_from_session,
     complete_match, forfeit_match, get_player_name, get_matches_for_court,
     get_active_matches, get_completed_matches,
-    get_active_player_names
+    get_active_player_names, mark_session_changed
 )
 from python.session_manager import create_session_manager
 from python.time_manager import now, start_session as tm_start_session
@@ -493,8 +494,13 @@ class PlayerListWidget(QWidget):
         if self.pre_seed_mode:
             skill_text = self.skill_input.text().strip()
             if not skill_text:
-                QMessageBox.warning(self, "Error", "Please enter a skill rating (e.g., 3.0, 3.25, 4.0)")
-                return
+                # Fall back to the rating the player had in an earlier session
+                from python.session_persistence import load_player_ratings
+                known_rating = load_player_ratings([name]).get(name)
+                if known_rating is None:
+                    QMessageBox.warning(self, "Error", "Please enter a skill rating (e.g., 3.0, 3.25, 4.0)")
+                    return
+                skill_text = str(known_rating)
             
             try:
                 skill_rating = float(skill_text)
@@ -788,6 +794,32 @@ class ManageLocksDialog(QDialog):
             self.refresh_bans()
 
 
+class ScheduleSearchSignals(QObject):
+    """Signals for ScheduleSearchJob (QRunnable cannot emit signals itself)"""
+    
+    # (scheduled_matches, scheduled_waiters), or None if the search failed
+    finished = pyqtSignal(object)
+
+
+class ScheduleSearchJob(QRunnable):
+    """Runs search_rounds_based_schedule off the UI thread (it waits up to the time budget)"""
+    
+    def __init__(self, session: Session, config):
+        super().__init__()
+        self.session = session
+        self.config = config
+        self.signals = ScheduleSearchSignals()
+    
+    def run(self):
+        from python.competitive_round_robin import search_rounds_based_schedule
+        try:
+            result = search_rounds_based_schedule(self.session, self.config)
+        except Exception as e:
+            print(f"Error generating schedule: {e}")
+            result = None
+        self.signals.finished.emit(result)
+
+
 class ManageMatchesDialog(QDialog):
     """
     Dialog for managing pre-scheduled matches in Competitive Round Robin mode.
@@ -805,6 +837,10 @@ class ManageMatchesDialog(QDialog):
         self.session = session
         self.config = config
         self.scheduled_matches = []
+        from python.competitive_round_robin import ScheduleValidator
+        self.schedule_validator = ScheduleValidator(session, config)
+        self.schedule_search_job: Optional[ScheduleSearchJob] = None
+        self.schedule_search_done = None  # Called once the running search has been shown
         self.init_ui()
         self.generate_initial_schedule()
     
@@ -824,7 +860,7 @@ class ManageMatchesDialog(QDialog):
         header_layout.addStretch()
         
         # Action buttons in header
-        regenerate_btn = QPushButton("🔄 Regenerate Rejected")
+        regenerate_btn = self.regenerate_rejected_btn = QPushButton("🔄 Regenerate Rejected")
         regenerate_btn.clicked.connect(self.regenerate_rejected_matches)
         header_layout.addWidget(regenerate_btn)
         
@@ -857,7 +893,29 @@ class ManageMatchesDialog(QDialog):
         
         config_layout.addSpacing(20)
         
-        regenerate_all_btn = QPushButton("🔁 Regenerate All")
+        # Schedule search: generate several schedules in parallel and keep the best
+        from python.competitive_round_robin import default_schedule_search_starts
+        config_layout.addWidget(QLabel("Schedules to try:"))
+        self.search_starts_spin = QSpinBox()
+        self.search_starts_spin.setMinimum(1)
+        self.search_starts_spin.setMaximum(32)
+        self.search_starts_spin.setValue(max(self.config.schedule_search_starts, default_schedule_search_starts()))
+        self.search_starts_spin.setFixedWidth(60)
+        self.search_starts_spin.setToolTip("Differently seeded schedules to generate in parallel, keeping the best (1 = single pass)")
+        config_layout.addWidget(self.search_starts_spin)
+        
+        config_layout.addWidget(QLabel("Time limit (s):"))
+        self.search_budget_spin = QSpinBox()
+        self.search_budget_spin.setMinimum(1)
+        self.search_budget_spin.setMaximum(120)
+        self.search_budget_spin.setValue(int(self.config.schedule_search_time_budget))
+        self.search_budget_spin.setFixedWidth(60)
+        self.search_budget_spin.setToolTip("Seconds to wait for the extra schedules before keeping the best one so far")
+        config_layout.addWidget(self.search_budget_spin)
+        
+        config_layout.addSpacing(20)
+        
+        regenerate_all_btn = self.regenerate_all_btn = QPushButton("🔁 Regenerate All")
         regenerate_all_btn.setToolTip("Rebuild entire schedule with current settings")
         regenerate_all_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; font-weight: bold; padding: 5px 15px; }")
         regenerate_all_btn.clicked.connect(self.regenerate_all_matches)
@@ -959,15 +1017,52 @@ class ManageMatchesDialog(QDialog):
     
     def generate_initial_schedule(self):
         """Generate the initial schedule of matches"""
-        from python.competitive_round_robin import generate_rounds_based_schedule
+        self.start_schedule_search()
+    
+    def start_schedule_search(self, on_done=None):
+        """
+        Generate a rounds-based schedule with waiters in the background.
+        The dialog's controls stay disabled until the search finishes.
+        """
+        if self.schedule_search_job is not None:
+            return
+        self.config.schedule_search_starts = self.search_starts_spin.value()
+        self.config.schedule_search_time_budget = float(self.search_budget_spin.value())
+        
+        self._set_schedule_search_running(True)
+        job = ScheduleSearchJob(self.session, self.config)
+        job.signals.finished.connect(self._on_schedule_search_finished)
+        self.schedule_search_job = job
+        self.schedule_search_done = on_done
+        QThreadPool.globalInstance().start(job)
+    
+    def _set_schedule_search_running(self, running: bool):
+        """Disable everything that reads or edits the schedule while a search runs"""
+        for widget in (self.regenerate_rejected_btn, self.regenerate_all_btn, self.games_per_player_spin,
+                       self.search_starts_spin, self.search_budget_spin, self.matches_container):
+            widget.setEnabled(not running)
+        if running:
+            self.finalize_btn.setEnabled(False)
+            self.stats_label.setText("Generating schedule...")
+    
+    def _on_schedule_search_finished(self, result):
+        """Show the searched schedule (runs on the GUI thread)"""
+        self.schedule_search_job = None
+        on_done, self.schedule_search_done = self.schedule_search_done, None
+        self._set_schedule_search_running(False)
+        if result is None:
+            self.update_stats()
+            QMessageBox.warning(self, "Schedule Error", "Could not generate a schedule.")
+            return
         
-        # Generate rounds-based schedule with waiters
-        self.scheduled_matches, scheduled_waiters = generate_rounds_based_schedule(self.session, self.config)
+        self.scheduled_matches, scheduled_waiters = result
         self.config.scheduled_matches = self.scheduled_matches
         self.config.scheduled_waiters = scheduled_waiters
         
         self.refresh_match_display()
         self.update_stats()
+        if on_done is not None:
+            on_done()
     
     def refresh_match_display(self):
         """Refresh the match cards in the UI with round labels and waiters"""
@@ -1391,21 +1486,21 @@ class ManageMatchesDialog(QDialog):
         if 0 <= index < len(self.scheduled_matches):
             self.scheduled_matches[index].status = 'approved'
             self.refresh_match_display()
-            self.update_stats()
+            self.update_stats(self.scheduled_matches[index])
     
     def unapprove_match(self, index: int):
         """Unapprove an approved match (return to pending)"""
         if 0 <= index < len(self.scheduled_matches):
             self.scheduled_matches[index].status = 'pending'
             self.refresh_match_display()
-            self.update_stats()
+            self.update_stats(self.scheduled_matches[index])
     
     def reject_match(self, index: int):
         """Reject a scheduled match"""
         if 0 <= index < len(self.scheduled_matches):
             self.scheduled_matches[index].status = 'rejected'
             self.refresh_match_display()
-            self.update_stats()
+            self.update_stats(self.scheduled_matches[index])
     
     def approve_all_pending(self):
         """Approve all pending matches"""
@@ -1443,8 +1538,6 @@ class ManageMatchesDialog(QDialog):
     
     def regenerate_all_matches(self):
         """Regenerate entire schedule with current configuration"""
-        from python.competitive_round_robin import generate_rounds_based_schedule
-        
         # Update config with new games per player value
         new_games_per_player = self.games_per_player_spin.value()
         self.config.games_per_player = new_games_per_player
@@ -1463,20 +1556,12 @@ class ManageMatchesDialog(QDialog):
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        # Generate new schedule with waiters
-        self.scheduled_matches, scheduled_waiters = generate_rounds_based_schedule(self.session, self.config)
-        self.config.scheduled_matches = self.scheduled_matches
-        self.config.scheduled_waiters = scheduled_waiters
-        
-        # Refresh display
-        self.refresh_match_display()
-        self.update_stats()
-        
-        QMessageBox.information(
+        # Generate new schedule with waiters, then refresh and report
+        self.start_schedule_search(lambda: QMessageBox.information(
             self,
             "Schedule Regenerated",
             f"Generated {len(self.scheduled_matches)} matches with target of {new_games_per_player} games per player."
-        )
+        ))
     
     def swap_player_dialog(self, match_index: int):
         """Open dialog to swap a player in a match"""
@@ -1596,8 +1681,9 @@ class ManageMatchesDialog(QDialog):
             
             if success:
                 self.scheduled_matches[match_index] = new_match
+                self.schedule_validator.match_removed(match)
                 self.refresh_match_display()
-                self.update_stats()
+                self.update_stats(new_match)
                 dialog.accept()
             else:
                 result_label.setText(f"Cannot swap: {error}")
@@ -1666,11 +1752,20 @@ class ManageMatchesDialog(QDialog):
             except Exception as e:
                 QMessageBox.warning(self, "Import Failed", f"Failed to import: {str(e)}")
     
-    def update_stats(self):
-        """Update the statistics display"""
-        from python.competitive_round_robin import get_schedule_summary, validate_schedule
+    def update_stats(self, changed_match: Optional[ScheduledMatch] = None):
+        """Update the statistics display.
         
-        summary = get_schedule_summary(self.session, self.scheduled_matches, self.config)
+        Pass changed_match when only that match's status or teams changed, so the
+        constraint counts are updated for it alone instead of for the whole schedule.
+        """
+        from python.competitive_round_robin import get_schedule_summary
+        
+        if changed_match is not None:
+            self.schedule_validator.match_changed(changed_match)
+        else:
+            self.schedule_validator.reset(self.scheduled_matches)
+        validation = self.schedule_validator.result()
+        summary = get_schedule_summary(self.session, self.scheduled_matches, self.config, validation)
         
         self.stats_label.setText(
             f"Total: {summary['total_matches']} matches | "
@@ -1680,7 +1775,6 @@ class ManageMatchesDialog(QDialog):
         )
         
         # Constraint summary
-        validation = validate_schedule(self.session, self.scheduled_matches, self.config)
         self.current_violations = validation.violations  # Store for dialog
         if validation.violations:
             violation_text = f"⚠️ {len(validation.violations)} constraint violations found (click to view)"
@@ -3456,7 +3550,8 @@ class SetupDialog(QDialog):
                 game_mode=mode,
                 session_type=session_type.replace('-', ' '),  # Convert to readable format
                 pool_assignments=pool_name_assignments,
-                pool_court_assignments=pool_court_assign
+                pool_court_assignments=pool_court_assign,
+                session=self.session
             )
             
             self.accept()
@@ -3916,8 +4011,8 @@ class CourtDisplayWidget(QWidget):
                             parent.animate_court_sliding(slides)
                     
                     # Save session after completing a match
-                    from python.session_persistence import save_session
-                    save_session(self.session)
+                    from python.session_persistence import request_session_save
+                    request_session_save(self.session, "complete_match")
                     
                     # Refresh parent display to show new matches
                     parent = self.window()
@@ -3956,8 +4051,8 @@ class CourtDisplayWidget(QWidget):
             
             if success:
                 # Save session after forfeiting a match
-                from python.session_persistence import save_session
-                save_session(self.session)
+                from python.session_persistence import request_session_save
+                request_session_save(self.session, "forfeit_match")
                 
                 # Refresh parent display to show new matches
                 parent = self.window()
@@ -4043,6 +4138,51 @@ class CourtDisplayWidget(QWidget):
             QMessageBox.critical(self, "Error", f"Error editing court:\n{str(e)}")
 
 
+# Waitlist predictions depend on wait times as well as session changes, so they
+# are recomputed this often even when the session version has not moved.
+WAITLIST_PREDICTION_REFRESH_SECONDS = 5.0
+
+
+class WaitlistPredictionSignals(QObject):
+    """Signals for WaitlistPredictionJob (QRunnable cannot emit signals itself)"""
+    
+    # Session version the predictions were computed for, player_id -> court dependencies
+    finished = pyqtSignal(int, dict)
+
+
+class WaitlistPredictionJob(QRunnable):
+    """Computes court dependencies for the waitlist on a frozen copy of the session"""
+    
+    def __init__(self, session: Session):
+        super().__init__()
+        from python.trial_session import freeze_session
+        self.version = session.version
+        self.snapshot = freeze_session(session)  # Taken on the GUI thread
+        self.signals = WaitlistPredictionSignals()
+    
+    def run(self):
+        from python.deterministic_waitlist_v2 import calculate_waitlist_dependencies
+        try:
+            dependencies = calculate_waitlist_dependencies(self.snapshot)
+        except Exception as e:
+            print(f"Error computing waitlist predictions: {e}")
+            dependencies = {}
+        self.signals.finished.emit(self.version, dependencies)
+
+
+class AutosaveOwnerBridge(QObject):
+    """Runs callables from the autosave worker on the GUI thread (AutosaveService.call_on_owner)"""
+    
+    requested = pyqtSignal(object)
+    
+    def __init__(self):
+        super().__init__()
+        self.requested.connect(self._run)  # Queued: emitted from the worker, runs here
+    
+    def _run(self, callback):
+        callback()
+
+
 class SessionWindow(QMainWindow):
     """Main window for active session"""
     
@@ -4061,6 +4201,15 @@ class SessionWindow(QMainWindow):
             self.show_wait_times = False
             self.show_rank = False
             self.show_deterministic_waitlist = False
+            # Last background waitlist predictions, shown until newer ones arrive
+            self.waitlist_dependencies: Dict[str, Dict[int, List[str]]] = {}
+            self.waitlist_dependencies_version: Optional[int] = None
+            self.waitlist_dependencies_time = 0.0
+            self.waitlist_prediction_job: Optional[WaitlistPredictionJob] = None
+            # Background saves freeze the session here, on the thread that edits it
+            from python.session_persistence import get_autosave_service
+            self.autosave_bridge = AutosaveOwnerBridge()
+            get_autosave_service().call_on_owner = self.autosave_bridge.requested.emit
             self.last_known_matches: Dict[int, str] = {}
             self.announcement_queue: List[str] = []
             self.is_announcing = False
@@ -4115,6 +4264,42 @@ class SessionWindow(QMainWindow):
         if hasattr(self, 'session_manager'):
             self.session_manager.force_session_evaluation()
     
+    def _trigger_session_evaluation_if_changed(self):
+        """
+        Evaluate the session only if it changed since the last evaluation.
+        Called from the 1-second refresh so an idle session costs no matchmaking.
+        """
+        if hasattr(self, 'session_manager'):
+            self.session_manager.evaluate_if_changed()
+    
+    def _request_waitlist_predictions(self):
+        """
+        Start a background prediction pass if the shown predictions are out of date.
+        At most one pass runs at a time; refresh_display keeps showing the last result.
+        """
+        if not self.show_deterministic_waitlist or self.session.config.mode != 'competitive-variety':
+            return
+        if self.waitlist_prediction_job is not None:
+            return
+        
+        if (self.waitlist_dependencies_version == self.session.version
+                and time.monotonic() - self.waitlist_dependencies_time < WAITLIST_PREDICTION_REFRESH_SECONDS):
+            return
+        
+        job = WaitlistPredictionJob(self.session)
+        job.signals.finished.connect(self._on_waitlist_predictions_ready)
+        self.waitlist_prediction_job = job
+        QThreadPool.globalInstance().start(job)
+    
+    def _on_waitlist_predictions_ready(self, version: int, dependencies: dict):
+        """Store predictions from the background worker (runs on the GUI thread)"""
+        self.waitlist_prediction_job = None
+        self.waitlist_dependencies = dependencies
+        self.waitlist_dependencies_version = version
+        self.waitlist_dependencies_time = time.monotonic()
+        if version != self.session.version:
+            self._request_waitlist_predictions()
+    
     def closeEvent(self, event):
         """Handle window close"""
         self.update_timer.stop()
@@ -4133,10 +4318,20 @@ class SessionWindow(QMainWindow):
             slogger.log_session_ended()
             slogger.close()
         
-        # Save session state before closing
-        from python.session_persistence import save_session, save_player_history
-        save_session(self.session)
-        
+        # Save session state before closing (full checkpoint, so the next start replays no journal).
+        # Pending background saves are superseded by it, so they are dropped.
+        from python.session_persistence import save_session, save_player_history, get_autosave_service
+        get_autosave_service().discard()
+        get_autosave_service().call_on_owner = None
+        save_session(self.session, event="close", checkpoint=True)
+
+        # Keep a compressed archive of the session for browsing past sessions
+        from python.session_archive import write_session_archive
+        try:
+            write_session_archive(self.session)
+        except Exception as e:
+            print(f"Error archiving session: {e}")
+
         # Also save player history for "New Session with Previous Players"
         player_names = [player.name for player in self.session.config.players]
         
@@ -4156,7 +4351,8 @@ class SessionWindow(QMainWindow):
             players_with_ratings=self.session.config.players,
             pre_seeded=self.session.config.pre_seeded_ratings,
             game_mode=self.session.config.mode,
-            session_type=self.session.config.session_type
+            session_type=self.session.config.session_type,
+            session=self.session
         )
         
         if self.parent_window:
@@ -4401,6 +4597,19 @@ class SessionWindow(QMainWindow):
         # Control buttons
         button_layout = QHBoxLayout()
         
+        self.undo_btn = QPushButton("↶ Undo")
+        self.undo_btn.setStyleSheet("QPushButton { background-color: #455A64; color: white; font-weight: bold; padding: 8px 16px; border-radius: 3px; } QPushButton:disabled { background-color: #3a3a3a; color: #777777; }")
+        self.undo_btn.clicked.connect(self.undo_last_change)
+        button_layout.addWidget(self.undo_btn)
+        
+        self.redo_btn = QPushButton("↷ Redo")
+        self.redo_btn.setStyleSheet("QPushButton { background-color: #455A64; color: white; font-weight: bold; padding: 8px 16px; border-radius: 3px; } QPushButton:disabled { background-color: #3a3a3a; color: #777777; }")
+        self.redo_btn.clicked.connect(self.redo_last_change)
+        button_layout.addWidget(self.redo_btn)
+        
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo_last_change)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo_last_change)
+        
         make_court_btn = QPushButton("🏗️ Make Court")
         make_court_btn.setStyleSheet("QPushButton { background-color: #555555; color: white; font-weight: bold; padding: 8px 16px; border-radius: 3px; }")
         make_court_btn.clicked.connect(self.make_court)
@@ -5372,12 +5581,13 @@ class SessionWindow(QMainWindow):
                 
                 # For Competitive Variety, queue is usually dynamic/empty so clearing it allows
                 # the population logic to run fresh with new constraints.
+                mark_session_changed(self.session)
                 
                 self.refresh_display()
                 
                 # Save session
-                from python.session_persistence import save_session
-                save_session(self.session)
+                from python.session_persistence import request_session_save
+                request_session_save(self.session, "manage_locks")
                 
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Error updating queue: {str(e)}")
@@ -5535,8 +5745,13 @@ class SessionWindow(QMainWindow):
                 get_waiting_players, get_queued_matches_for_display
             )
             from python.utils import start_player_wait_timer, stop_player_wait_timer
+            from python.waitlist_view import build_waitlist_view_model
             
-            self._trigger_session_evaluation()
+            self._trigger_session_evaluation_if_changed()
+            
+            if hasattr(self, 'undo_btn'):
+                self.undo_btn.setEnabled(self.session_manager.undo_stack.can_undo(self.session))
+                self.redo_btn.setEnabled(self.session_manager.undo_stack.can_redo(self.session))
             
             # Update court displays and stop wait timers for players in matches
             players_in_matches = set()
@@ -5567,6 +5782,17 @@ class SessionWindow(QMainWindow):
             
             # Update waiting players list and start wait timers
             waiting_ids = get_waiting_players(self.session)
+            for player_id in waiting_ids:
+                if player_id in self.session.player_stats:
+                    start_player_wait_timer(self.session.player_stats[player_id])
+            self._request_waitlist_predictions()
+            
+            # Everything shown for the waitlist, computed once for all rows
+            waitlist_view = build_waitlist_view_model(
+                self.session, waiting_ids, self.waitlist_dependencies,
+                dependencies_stale=self.waitlist_dependencies_version != self.session.version
+            )
+            show_dependencies = self.show_deterministic_waitlist and self.session.config.mode == 'competitive-variety'
             
             # Map existing items by player_id
             existing_items = {}
@@ -5583,158 +5809,20 @@ class SessionWindow(QMainWindow):
                     del existing_items[pid]
             
             # Add or update items
-            for index, player_id in enumerate(waiting_ids):
-                player_name = get_player_name(self.session, player_id)
-                # Start wait timer for players on waitlist
-                if player_id in self.session.player_stats:
-                    start_player_wait_timer(self.session.player_stats[player_id])
-                    # Build the display text
-                    item_text = player_name
-                    
-                    # Add rank if toggle is on
-                    if self.show_rank:
-                        from python.competitive_variety import get_player_ranking
-                        rank, _ = get_player_ranking(self.session, player_id)
-                        item_text += f" [{rank}]"
-                    
-                    # Get current wait time and format it only if toggle is on
-                    if self.show_wait_times:
-                        from python.utils import get_current_wait_time, format_duration
-                        
-                        # Use relative wait priority system for display
-                        from python.wait_priority import calculate_relative_wait_priority_infos, format_wait_time_display
-                        
-                        # Get all waiting player IDs for relative calculation
-                        all_waiting_ids = [item.data(Qt.ItemDataRole.UserRole) for item in existing_items.values()]
-                        all_waiting_ids = [pid for pid in all_waiting_ids if pid] + [player_id]
-                        all_waiting_ids = list(set(all_waiting_ids))  # Remove duplicates
-                        
-                        # Calculate relative priorities for all waiting players
-                        relative_infos = calculate_relative_wait_priority_infos(self.session, all_waiting_ids)
-                        player_info = next((info for info in relative_infos if info.player_id == player_id), None)
-                        
-                        if player_info:
-                            current_wait_str = format_duration(player_info.current_wait_seconds)
-                            total_wait_str = format_wait_time_display(player_info.total_wait_seconds)
-                            
-                            # Show priority indicator based on relative tier
-                            priority_indicator = ""
-                            if player_info.priority_tier == 0:  # extreme
-                                priority_indicator = " ⚠️"  # Warning for extreme relative wait
-                            elif player_info.priority_tier == 1:  # significant
-                                priority_indicator = " ⏰"  # Clock for significant relative wait
-                            
-                            item_text += f"  [{current_wait_str} / {total_wait_str}]{priority_indicator}"
-                        else:
-                            # Fallback for edge cases
-                            stats = self.session.player_stats[player_id]
-                            current_wait = get_current_wait_time(stats)
-                            current_wait_str = format_duration(current_wait)
-                            total_wait_str = format_wait_time_display(stats.total_wait_time + current_wait)
-                            item_text += f"  [{current_wait_str} / {total_wait_str}]"
-                    
-                    # Add deterministic court dependencies if enabled
-                    if self.show_deterministic_waitlist and self.session.config.mode == 'competitive-variety':
-                        from python.deterministic_waitlist_v2 import get_court_outcome_dependencies_v2
-                        from python.queue_manager import get_waiting_players
-                        
-                        try:
-                            # Debug: Check if this player is actually waiting
-                            waiting_players = get_waiting_players(self.session)
-                            is_waiting = player_id in waiting_players
-                            
-                            dependencies = get_court_outcome_dependencies_v2(self.session, player_id)
-                            
-                            if dependencies and is_waiting:
-                                court_strings = []
-                                for court_num in sorted(dependencies.keys()):
-                                    outcomes = dependencies[court_num]
-                                    
-                                    # Convert outcome names to compact format
-                                    outcome_chars = []
-                                    if "red_wins" in outcomes:
-                                        outcome_chars.append("R")
-                                    if "blue_wins" in outcomes:
-                                        outcome_chars.append("B")
-                                    
-                                    if len(outcome_chars) == 2:
-                                        outcome_str = "RB"
-                                    else:
-                                        outcome_str = "".join(outcome_chars)
-                                    
-                                    court_strings.append(f"C{court_num}{outcome_str}")
-                                
-                                if court_strings:
-                                    deps_str = ", ".join(court_strings)
-                                    old_item_text = item_text
-                                    item_text += f"\n    🎯{deps_str}"
-                        except Exception as e:
-                            # Silent fallback if dependencies fail
-                            pass
-                    
-                    if player_id in existing_items:
-                        # Update existing item
-                        item = existing_items[player_id]
-                        if item.text() != item_text:
-                            item.setText(item_text)
-                    else:
-                        # Add new item
-                        item = QListWidgetItem(item_text)
-                        item.setData(Qt.ItemDataRole.UserRole, player_id)
-                        self.waiting_list.insertItem(index, item)
+            for index, waitlist_row in enumerate(waitlist_view.rows):
+                player_id = waitlist_row.player_id
+                item_text = waitlist_row.display_text(self.show_rank, self.show_wait_times, show_dependencies)
+                
+                if player_id in existing_items:
+                    # Update existing item
+                    item = existing_items[player_id]
+                    if item.text() != item_text:
+                        item.setText(item_text)
                 else:
-                    item_text = player_name
-                    if self.show_rank:
-                        from python.competitive_variety import get_player_ranking
-                        rank, _ = get_player_ranking(self.session, player_id)
-                        item_text += f" [{rank}]"
-                    
-                    # Add deterministic court dependencies if enabled (even when wait times not shown)
-                    if self.show_deterministic_waitlist and self.session.config.mode == 'competitive-variety':
-                        from python.deterministic_waitlist_v2 import get_court_outcome_dependencies_v2
-                        from python.queue_manager import get_waiting_players
-                        
-                        try:
-                            # Only show dependencies for players who are actually waiting
-                            waiting_players = get_waiting_players(self.session)
-                            is_waiting = player_id in waiting_players
-                            
-                            if is_waiting:
-                                dependencies = get_court_outcome_dependencies_v2(self.session, player_id)
-                                if dependencies:
-                                    court_strings = []
-                                    for court_num in sorted(dependencies.keys()):
-                                        outcomes = dependencies[court_num]
-                                        
-                                        # Convert outcome names to compact format
-                                        outcome_chars = []
-                                        if "red_wins" in outcomes:
-                                            outcome_chars.append("R")
-                                        if "blue_wins" in outcomes:
-                                            outcome_chars.append("B")
-                                        
-                                        if len(outcome_chars) == 2:
-                                            outcome_str = "RB"
-                                        else:
-                                            outcome_str = "".join(outcome_chars)
-                                        
-                                        court_strings.append(f"C{court_num}{outcome_str}")
-                                
-                                    if court_strings:
-                                        deps_str = ", ".join(court_strings)
-                                        item_text += f"\n    🎯{deps_str}"
-                        except Exception as e:
-                            # Silent fallback if dependencies fail
-                            pass
-                    
-                    if player_id in existing_items:
-                        item = existing_items[player_id]
-                        if item.text() != item_text:
-                            item.setText(item_text)
-                    else:
-                        item = QListWidgetItem(item_text)
-                        item.setData(Qt.ItemDataRole.UserRole, player_id)
-                        self.waiting_list.insertItem(index, item)
+                    # Add new item
+                    item = QListWidgetItem(item_text)
+                    item.setData(Qt.ItemDataRole.UserRole, player_id)
+                    self.waiting_list.insertItem(index, item)
             
             # Reorder items if needed (simple check: rebuild mapping and check order)
             # Since we iterate waiting_ids in order, insertItem/takeItem handles most cases.
@@ -6665,61 +6753,75 @@ class SessionWindow(QMainWindow):
             
             def save_changes():
                 try:
-                    # Remove players
-                    for player_id in players_to_remove:
-                        player = next((p for p in self.session.config.players if p.id == player_id), None)
-                        if not player:
-                            continue
+                    def apply_changes():
+                        # Remove players
+                        for player_id in players_to_remove:
+                            player = next((p for p in self.session.config.players if p.id == player_id), None)
+                            if not player:
+                                continue
                         
-                        # Forfeit any active matches
-                        for match in self.session.matches:
-                            if match.status in ['waiting', 'in-progress']:
-                                if player_id in match.team1 or player_id in match.team2:
-                                    forfeit_match(self.session, match.id)
+                            # Forfeit any active matches
+                            for match in self.session.matches:
+                                if match.status in ['waiting', 'in-progress']:
+                                    if player_id in match.team1 or player_id in match.team2:
+                                        forfeit_match(self.session, match.id)
                         
-                        # Remove from active players (keeps in config to preserve history)
-                        remove_player_from_session(self.session, player_id)
+                            # Remove from active players (keeps in config to preserve history)
+                            remove_player_from_session(self.session, player_id)
                     
-                    # Add players
-                    for player_name in players_to_add:
-                        new_player = Player(id=f"player_{now().timestamp()}", name=player_name)
-                        add_player_to_session(self.session, new_player)
+                        # Add players
+                        for player_name in players_to_add:
+                            new_player = Player(id=f"player_{now().timestamp()}", name=player_name)
+                            add_player_to_session(self.session, new_player)
                     
-                    # Regenerate match queue once at the end
-                    if players_to_add or players_to_remove:
-                        from python.roundrobin import generate_round_robin_queue
-                        # Session logic moved to session manager, get_waiting_players
+                        # Regenerate match queue once at the end
+                        if players_to_add or players_to_remove:
+                            from python.roundrobin import generate_round_robin_queue
+                            # Session logic moved to session manager, get_waiting_players
                         
-                        if self.session.config.mode == 'round-robin':
-                            self.session.match_queue = generate_round_robin_queue(
-                                [p for p in self.session.config.players if p.id in self.session.active_players],
-                                self.session.config.session_type,
-                                self.session.config.banned_pairs,
-                                player_stats=self.session.player_stats,
-                                active_matches=self.session.matches,
-                                first_bye_players=[]  # Empty for add player (mid-session)
-                            )
-                        else:
-                            # For competitive-variety, clear the queue to let dynamic allocator handle it
-                            self.session.match_queue = []
+                            if self.session.config.mode == 'round-robin':
+                                self.session.match_queue = generate_round_robin_queue(
+                                    [p for p in self.session.config.players if p.id in self.session.active_players],
+                                    self.session.config.session_type,
+                                    self.session.config.banned_pairs,
+                                    player_stats=self.session.player_stats,
+                                    active_matches=self.session.matches,
+                                    first_bye_players=[]  # Empty for add player (mid-session)
+                                )
+                            else:
+                                # For competitive-variety, clear the queue to let dynamic allocator handle it
+                                self.session.match_queue = []
                         
-                        # Prioritize matches with waiting players at the front of the queue
-                        if self.session.match_queue:
-                            waiting_ids = set(get_waiting_players(self.session))
-                            if waiting_ids:
-                                waiting_matches = []
-                                other_matches = []
-                                for queued_match in self.session.match_queue:
-                                    match_players = set(queued_match.team1 + queued_match.team2)
-                                    if match_players & waiting_ids:
-                                        waiting_matches.append(queued_match)
-                                    else:
-                                        other_matches.append(queued_match)
-                                self.session.match_queue = waiting_matches + other_matches
+                            # Prioritize matches with waiting players at the front of the queue
+                            if self.session.match_queue:
+                                waiting_ids = set(get_waiting_players(self.session))
+                                if waiting_ids:
+                                    waiting_matches = []
+                                    other_matches = []
+                                    for queued_match in self.session.match_queue:
+                                        match_players = set(queued_match.team1 + queued_match.team2)
+                                        if match_players & waiting_ids:
+                                            waiting_matches.append(queued_match)
+                                        else:
+                                            other_matches.append(queued_match)
+                                    self.session.match_queue = waiting_matches + other_matches
                         
-                        # Populate any empty courts with the newly regenerated queue
-                        self._trigger_session_evaluation()
+                            # Populate any empty courts with the newly regenerated queue
+                            self._trigger_session_evaluation()
+                    
+                    # One undoable change; players leaving take their unfinished matches' players with them
+                    involved = list(players_to_remove) + [
+                        pid for match in self.session.matches if match.status in ['waiting', 'in-progress']
+                        and set(players_to_remove) & set(match.team1 + match.team2)
+                        for pid in match.team1 + match.team2
+                    ]
+                    self.session_manager.record_change("Update players", apply_changes, players=involved)
+                    
+                    if players_to_add or players_to_remove:
                         self.refresh_display()
+                        
+                        from python.session_persistence import request_session_save
+                        request_session_save(self.session, "update_players")
                     
                     dialog.accept()
                 except Exception as e:
@@ -6833,11 +6935,8 @@ class SessionWindow(QMainWindow):
                     return
                 
                 old_score = match.score.copy() if match.score else {'team1_score': 0, 'team2_score': 0}
-                new_score = {'team1_score': t1_score, 'team2_score': t2_score}
                 
-                from python.session import recalculate_stats_after_edit
-                recalculate_stats_after_edit(self.session, match, old_score, new_score)
-                match.score = new_score
+                self.session_manager.handle_score_edit(match.id, t1_score, t2_score)
                 
                 # Log the score edit
                 from python.session_logger import get_session_logger
@@ -6849,6 +6948,9 @@ class SessionWindow(QMainWindow):
                         t1_score, t2_score
                     )
                 
+                from python.session_persistence import request_session_save
+                request_session_save(self.session, "edit_score")
+                
                 dialog.accept()
                 self.refresh_display()
             
@@ -6885,6 +6987,9 @@ class SessionWindow(QMainWindow):
                 success = load_session_from_snapshot(self.session, snapshot)
                 
                 if success:
+                    self.session_manager.undo_stack.clear()
+                    from python.session_persistence import request_session_save
+                    request_session_save(self.session, "load_snapshot")
                     dialog.accept()
                     self.refresh_display()
                     QMessageBox.information(self, "Success", "Session loaded to state before this match was completed")
@@ -7377,6 +7482,36 @@ class SessionWindow(QMainWindow):
                 return p.name
         return player_id
 
+    def undo_last_change(self):
+        """Undo the last score, forfeit, court or player change"""
+        self._apply_undo_redo(self.session_manager.handle_undo, "undo")
+    
+    def redo_last_change(self):
+        """Redo the last undone change"""
+        self._apply_undo_redo(self.session_manager.handle_redo, "redo")
+    
+    def _apply_undo_redo(self, handler, reason: str):
+        # Drop court slide animations of the change being reverted, as when loading a snapshot
+        if hasattr(self, 'animation_group') and self.animation_group:
+            self.animation_group.stop()
+        self.pending_slides = []
+        if hasattr(self, 'ghosts'):
+            for ghost in self.ghosts:
+                ghost.deleteLater()
+            self.ghosts = []
+        
+        description = handler()
+        if description is not None:
+            # Restored courts are not new matches to announce
+            from python.queue_manager import get_match_for_court
+            for court_num in range(1, self.session.config.courts + 1):
+                match = get_match_for_court(self.session, court_num)
+                self.last_known_matches[court_num] = match.id if match else None
+            from python.session_persistence import request_session_save
+            request_session_save(self.session, reason)
+            self.statusBar().showMessage(f"{reason.capitalize()}: {description}", 4000)
+        self.refresh_display()
+
     def make_court(self):
         """Open dialog to manually create a match on an empty court"""
         try:
@@ -7635,7 +7770,12 @@ class SessionWindow(QMainWindow):
                     return
                 
                 # Create match
-                if create_manual_match(self.session, court_num, team1_ids, team2_ids):
+                if self.session_manager.record_change(
+                        f"Make court {court_num}",
+                        lambda: create_manual_match(self.session, court_num, team1_ids, team2_ids),
+                        players=team1_ids + team2_ids):
+                    from python.session_persistence import request_session_save
+                    request_session_save(self.session, "create_manual_match")
                     self.refresh_display()
                     dialog.accept()
                 else:
@@ -7885,7 +8025,12 @@ class SessionWindow(QMainWindow):
                     return
                 
                 # Update match
-                if update_match_teams(self.session, match_id, team1_ids, team2_ids):
+                if self.session_manager.record_change(
+                        f"Change teams on court {court_number}",
+                        lambda: update_match_teams(self.session, match_id, team1_ids, team2_ids),
+                        players=team1_ids + team2_ids, matches=[match]):
+                    from python.session_persistence import request_session_save
+                    request_session_save(self.session, "update_match_teams")
                     self.refresh_display()
                     dialog.accept()
                 else:
@@ -8412,6 +8557,12 @@ class MainWindow(QMainWindow):
             previous_session_type = player_history_data["session_type"]
             previous_pool_assignments = player_history_data.get("pool_assignments")
             previous_pool_court_assignments = player_history_data.get("pool_court_assignments")
+            if was_pre_seeded:
+                # Players rated in an earlier session but not the last one keep their latest rating
+                from python.session_persistence import load_player_ratings
+                unrated = [name for name in player_names if name not in player_ratings]
+                if unrated:
+                    player_ratings = {**load_player_ratings(unrated), **player_ratings}
             
             if not player_names:
                 QMessageBox.warning(self, "Error", "No player history available")
@@ -0,0 +1,252 @@
+"""
+Joint Multi-Court Assignment for Competitive Variety
+
+When several courts are empty at once, the per-court greedy search in
+populate_empty_courts_competitive_variety fills them one at a time, so the first
+court can take players a later court needed. This module instead picks disjoint
+matches for all empty courts together with a branch-and-bound search.
+
+Assignments are compared, in order, by: courts filled, must-play players placed,
+players placed who have waited at least one court, and total match score.
+Hard constraints are exactly the greedy ones (roaming range, partner/opponent
+repetition, P-O-P pattern, balance threshold), and each match uses the best
+scoring valid team split, as the greedy search does.
+
+The search is bounded by a time budget. If the budget runs out before every
+candidate match has been built, or before any assignment filling all courts and
+placing every must-play player was found, it returns None and the caller falls
+back to greedy. Otherwise the best assignment found so far is returned.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Dict
+
+from .pickleball_types import Session
+from .competitive_variety import (
+    MatchmakingContext, MATCH_SPLITS, build_matchmaking_context, build_match_score_table,
+    score_match_splits, can_play_with_player, generate_roaming_quadruples,
+    get_must_play_players, get_simple_wait_priority_candidates
+)
+
+# Extra candidates beyond 4 per court (the greedy search looks at 12 players for one court)
+JOINT_SOLVER_EXTRA_CANDIDATES = 8
+# How many search nodes to expand between deadline checks
+_DEADLINE_CHECK_INTERVAL = 256
+
+
+class _SolverTimeout(Exception):
+    pass
+
+
+@dataclass
+class _CandidateMatch:
+    """Best valid team split for one group of four pool players"""
+    score: float
+    mask: int  # Bitmask of pool positions
+    team1: List[str]
+    team2: List[str]
+
+
+def _build_candidates(session: Session, pool: List[str], context: MatchmakingContext,
+                      deadline: float) -> List[_CandidateMatch]:
+    """Every group of four pool players that can play together, with its best scoring split"""
+    size = len(pool)
+    partner_ok = [[False] * size for _ in range(size)]
+    opponent_ok = [[False] * size for _ in range(size)]
+    for i, p1 in enumerate(pool):
+        for j, p2 in enumerate(pool):
+            if i != j:
+                partner_ok[i][j] = can_play_with_player(session, p1, p2, 'partner', False, context)
+                opponent_ok[i][j] = can_play_with_player(session, p1, p2, 'opponent', False, context)
+        if time.perf_counter() > deadline:
+            raise _SolverTimeout()
+
+    # role_ok[i]: pool positions that can share a court with i in some role
+    role_ok = [0] * size
+    for i in range(size):
+        for j in range(size):
+            if i != j and (partner_ok[i][j] or opponent_ok[i][j] or opponent_ok[j][i]):
+                role_ok[i] |= 1 << j
+
+    def valid_split(quad, split) -> bool:
+        (a, b), (c, d) = split
+        t1a, t1b, t2a, t2b = quad[a], quad[b], quad[c], quad[d]
+        return (partner_ok[t1a][t1b] and partner_ok[t2a][t2b] and
+                opponent_ok[t1a][t2a] and opponent_ok[t1a][t2b] and
+                opponent_ok[t1b][t2a] and opponent_ok[t1b][t2b])
+
+    table = build_match_score_table(session, pool, context)
+    candidates = []
+
+    def add_best_splits(quads, valid) -> None:
+        scored = score_match_splits(table, quads)
+        for q, quad in enumerate(quads):
+            best_score = float('-inf')
+            best_split = None
+            for s, split in enumerate(MATCH_SPLITS):
+                row = q * 3 + s
+                if valid[q][s] and scored.feasible[row] and scored.total[row] > best_score:
+                    best_score = scored.total[row]
+                    best_split = split
+            if best_split is None:
+                continue
+            (a, b), (c, d) = best_split
+            candidates.append(_CandidateMatch(
+                score=best_score,
+                mask=(1 << quad[0]) | (1 << quad[1]) | (1 << quad[2]) | (1 << quad[3]),
+                team1=[pool[quad[a]], pool[quad[b]]],
+                team2=[pool[quad[c]], pool[quad[d]]]
+            ))
+        if time.perf_counter() > deadline:
+            raise _SolverTimeout()
+
+    # Quadruples come out grouped by their first position; score a group once it is complete
+    anchor = None
+    quads: List[Tuple[int, int, int, int]] = []
+    valid: List[List[bool]] = []
+    for quad in generate_roaming_quadruples(session, pool, context, role_ok):
+        if quad[0] != anchor:
+            if quads:
+                add_best_splits(quads, valid)
+            anchor, quads, valid = quad[0], [], []
+        splits_ok = [valid_split(quad, split) for split in MATCH_SPLITS]
+        if any(splits_ok):
+            quads.append(quad)
+            valid.append(splits_ok)
+    if quads:
+        add_best_splits(quads, valid)
+    return candidates
+
+
+def solve_joint_court_assignment(
+    session: Session,
+    available_players: List[str],
+    courts_needed: int,
+    context: Optional[MatchmakingContext] = None,
+    time_budget: Optional[float] = None
+) -> Optional[List[Tuple[List[str], List[str]]]]:
+    """
+    Choose disjoint matches for several empty courts at once.
+
+    Returns a list of (team1, team2), best match first, or None when greedy should
+    fill the courts instead (out of time, fewer courts filled than there are players
+    for, or a must-play player left waiting).
+    """
+    if context is None:
+        context = build_matchmaking_context(session)
+    if time_budget is None:
+        time_budget = session.competitive_variety_joint_solver_time_budget
+    deadline = time.perf_counter() + time_budget
+
+    courts_needed = min(courts_needed, len(available_players) // 4)
+    if courts_needed <= 0:
+        return None
+
+    must_play = set(get_must_play_players(session, available_players))
+    must_play_target = min(len(must_play), 4 * courts_needed)
+    candidates_for_matching = get_simple_wait_priority_candidates(session, available_players)
+    pool = candidates_for_matching[:4 * courts_needed + JOINT_SOLVER_EXTRA_CANDIDATES]
+    size = len(pool)
+
+    try:
+        candidates = _build_candidates(session, pool, context, deadline)
+    except _SolverTimeout:
+        return None
+    if not candidates:
+        return None
+
+    must_mask = 0
+    waited_mask = 0
+    for i, p in enumerate(pool):
+        if p in must_play:
+            must_mask |= 1 << i
+        stats = session.player_stats.get(p)
+        if stats and stats.courts_completed_since_last_play > 0:
+            waited_mask |= 1 << i
+
+    # Candidates grouped by their first pool position (pool is in wait-priority order), best first
+    by_anchor: Dict[int, List[_CandidateMatch]] = {i: [] for i in range(size)}
+    best_for_player = [float('-inf')] * size
+    for cand in candidates:
+        by_anchor[(cand.mask & -cand.mask).bit_length() - 1].append(cand)
+        members = cand.mask
+        while members:
+            i = (members & -members).bit_length() - 1
+            members &= members - 1
+            if cand.score > best_for_player[i]:
+                best_for_player[i] = cand.score
+    for group in by_anchor.values():
+        group.sort(key=lambda c: c.score, reverse=True)
+    # Players that appear in some candidate, by their best match score (for the score bound)
+    bound_order = sorted((i for i in range(size) if best_for_player[i] > float('-inf')),
+                         key=lambda i: best_for_player[i], reverse=True)
+    playable_mask = 0
+    for i in bound_order:
+        playable_mask |= 1 << i
+
+    def popcount(mask: int) -> int:
+        return bin(mask).count('1')
+
+    def upper_bound(free_mask: int, value: Tuple[int, int, int, float]) -> Tuple[int, int, int, float]:
+        filled, placed_must, placed_waited, score = value
+        courts_possible = min(courts_needed - filled, popcount(free_mask) // 4)
+        seats = 4 * courts_possible
+        # A match scores at most the best match of each of its four players, so at most
+        # their average: further matches add at most a quarter of the best player values
+        player_bound = 0.0
+        for i in bound_order:
+            if seats == 0:
+                break
+            if free_mask >> i & 1:
+                player_bound += best_for_player[i]
+                seats -= 1
+        return (filled + courts_possible,
+                placed_must + min(popcount(free_mask & must_mask), 4 * courts_possible),
+                placed_waited + min(popcount(free_mask & waited_mask), 4 * courts_possible),
+                score + player_bound / 4)
+
+    best_value = (0, 0, 0, float('-inf'))
+    best_matches: List[_CandidateMatch] = []
+    chosen: List[_CandidateMatch] = []
+    nodes = 0
+
+    def search(free_mask: int, value: Tuple[int, int, int, float]) -> None:
+        nonlocal best_value, best_matches, nodes
+        nodes += 1
+        if nodes % _DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise _SolverTimeout()
+
+        if value > best_value:
+            best_value = value
+            best_matches = list(chosen)
+        if value[0] == courts_needed or not free_mask:
+            return
+        if upper_bound(free_mask, value) <= best_value:
+            return
+
+        anchor = (free_mask & -free_mask).bit_length() - 1
+        filled, placed_must, placed_waited, score = value
+        for cand in by_anchor[anchor]:
+            if cand.mask & ~free_mask:
+                continue
+            chosen.append(cand)
+            search(free_mask & ~cand.mask, (filled + 1,
+                                            placed_must + popcount(cand.mask & must_mask),
+                                            placed_waited + popcount(cand.mask & waited_mask),
+                                            score + cand.score))
+            chosen.pop()
+        # Anchor sits out
+        search(free_mask & ~(1 << anchor), value)
+
+    try:
+        search(playable_mask, (0, 0, 0, 0.0))
+    except _SolverTimeout:
+        pass  # Keep the best assignment found so far, if it is complete
+
+    filled, placed_must = best_value[0], best_value[1]
+    if filled < courts_needed or placed_must < must_play_target:
+        return None
+
+    best_matches.sort(key=lambda c: c.score, reverse=True)
+    return [(list(c.team1), list(c.team2)) for c in best_matches]
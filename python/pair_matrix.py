@@ -0,0 +1,115 @@
+"""
+Partner/Opponent Pair Matrix
+
+Dense N x N tables, indexed by player slot, holding the same partner and
+opponent counts as the PlayerStats tables (partners_played, opponents_played).
+Rows are plain lists, so a scorer can take one player's row and index it by
+slot instead of probing a dict per pair.
+
+Row p, column q is p's own table entry for q, so the matrix stays directed just
+like the stats it mirrors.
+
+complete_match and forfeit_match record each match into the matrix as they
+update the stats (the first one builds it from the stats), and adding a player
+grows it by a slot. Anything that replaces the stats tables wholesale (snapshot
+restore, undo) drops it, and trial sessions never share it, since they update
+their own copies of the stats. The competitive variety score table and the
+continuous wave flow variety penalty read the session's matrix; round robin
+queue generation builds its own from the stats it is given and counts the
+matches it queues into it.
+"""
+
+from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from .pickleball_types import Session, PlayerStats
+
+
+@dataclass
+class PairMatrix:
+    """Partner/opponent counts by player slot"""
+    slots: Dict[str, int] = field(default_factory=dict)  # player_id -> row/column
+    players: List[str] = field(default_factory=list)  # slot -> player_id
+    partner_count: List[List[int]] = field(default_factory=list)
+    opponent_count: List[List[int]] = field(default_factory=list)
+
+    def slot(self, player_id: str) -> int:
+        """Slot of the player, adding a row and column if they are new"""
+        slot = self.slots.get(player_id)
+        if slot is not None:
+            return slot
+        slot = len(self.players)
+        self.slots[player_id] = slot
+        self.players.append(player_id)
+        for table in (self.partner_count, self.opponent_count):
+            for row in table:
+                row.append(0)
+            table.append([0] * (slot + 1))
+        return slot
+
+    def partners(self, player_id: str, other_id: str) -> int:
+        """How often player_id has partnered other_id"""
+        slot, other = self.slots.get(player_id), self.slots.get(other_id)
+        return 0 if slot is None or other is None else self.partner_count[slot][other]
+
+    def opponents(self, player_id: str, other_id: str) -> int:
+        """How often player_id has played against other_id"""
+        slot, other = self.slots.get(player_id), self.slots.get(other_id)
+        return 0 if slot is None or other is None else self.opponent_count[slot][other]
+
+    def record_match(self, team1: List[str], team2: List[str]) -> None:
+        """Count one completed or forfeited match (as complete_match counts it in the stats)"""
+        for team, other_team in ((team1, team2), (team2, team1)):
+            for player_id in team:
+                slot = self.slot(player_id)
+                partner_row = self.partner_count[slot]
+                opponent_row = self.opponent_count[slot]
+                for other_id in other_team:
+                    opponent_row[self.slot(other_id)] += 1
+                for partner_id in team:
+                    if partner_id != player_id:
+                        partner_row[self.slot(partner_id)] += 1
+
+
+def build_pair_matrix_from_stats(player_ids: List[str],
+                                 player_stats: Optional[Dict[str, PlayerStats]]) -> PairMatrix:
+    """Matrix with a slot for each of player_ids (in order) and the counts of player_stats"""
+    matrix = PairMatrix()
+    for player_id in player_ids:
+        matrix.slot(player_id)
+    if not player_stats:
+        return matrix
+    for player_id in player_stats:
+        matrix.slot(player_id)
+
+    for player_id, stats in player_stats.items():
+        slot = matrix.slots[player_id]
+        for entries, table in ((stats.partners_played, matrix.partner_count),
+                               (stats.opponents_played, matrix.opponent_count)):
+            if not entries:
+                continue
+            row = table[slot]
+            if not isinstance(entries, dict):
+                entries = dict.fromkeys(entries, 1)  # Legacy sets
+            for other_id, count in entries.items():
+                row[matrix.slot(other_id)] = count
+    return matrix
+
+
+def build_pair_matrix(session: Session) -> PairMatrix:
+    """Matrix of the session's current PlayerStats tables"""
+    return build_pair_matrix_from_stats([player.id for player in session.config.players], session.player_stats)
+
+
+def get_pair_matrix(session: Session) -> PairMatrix:
+    """Return the session's pair matrix, building it from the stats if there is none"""
+    if session.pair_matrix is None:
+        session.pair_matrix = build_pair_matrix(session)
+    return session.pair_matrix
+
+
+def record_pair_match(session: Session, team1: List[str], team2: List[str]) -> None:
+    """Count a match whose stats were just updated (complete_match, forfeit_match)"""
+    if session.pair_matrix is None:
+        session.pair_matrix = build_pair_matrix(session)  # Already includes this match
+    else:
+        session.pair_matrix.record_match(team1, team2)
@@ -2,10 +2,15 @@
 Core data types for the Pickleball Session Manager
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Set, Dict, Optional, Literal, Any
+from typing import List, Set, Dict, Optional, Literal, Any, Union
 from datetime import datetime
 
+# Types created in large numbers (matches, per-player stats, queue entries) drop the
+# per-instance __dict__ where dataclasses support it (Python 3.10+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 GameMode = Literal['king-of-court', 'round-robin', 'competitive-variety', 'competitive-round-robin', 'competitive-continuous-round-robin', 'pooled-continuous-rr', 'strict-continuous-rr']
 SessionType = Literal['doubles', 'singles']
 MatchStatus = Literal['waiting', 'in-progress', 'completed', 'forfeited']
@@ -19,7 +24,7 @@ class Player:
     skill_rating: Optional[float] = None  # Pre-seeded skill rating (3.0, 3.25, 3.5, etc.)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PlayerStats:
     """Tracks statistics for a player"""
     player_id: str
@@ -45,7 +50,7 @@ class PlayerStats:
     courts_completed_since_last_play: int = 0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Match:
     """Represents a single match/game"""
     id: str
@@ -157,6 +162,10 @@ class CompetitiveRoundRobinConfig:
     scheduled_waiters: List[List[str]] = field(default_factory=list)  # Players waiting each round (List[round_index] -> List[player_ids])
     schedule_finalized: bool = False  # True when user has approved enough matches
     current_round: int = 0  # Current round number during play (0-indexed)
+    schedule_search_starts: int = 1  # Differently seeded schedules to generate in parallel, keeping the best (1 = single pass; the Manage Matches dialog sets it, defaulting to one per CPU)
+    schedule_search_time_budget: float = 10.0  # Seconds to wait for the extra schedule starts
+    # Constraint state after each round of the last generated schedule (RoundCheckpoints), never persisted
+    round_checkpoints: Optional[Any] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -261,7 +270,7 @@ class SessionConfig:
     pooled_continuous_rr_config: Optional['PooledContinuousRRConfig'] = None  # Pooled Continuous RR settings
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class QueuedMatch:
     """A match queued to be played"""
     team1: List[str]  # Player IDs
@@ -284,14 +293,16 @@ class Session:
     player_last_court: Dict[str, int] = field(default_factory=dict)  # player_id -> court_number
     court_players: Dict[int, List[str]] = field(default_factory=dict)  # court_number -> [player_ids]
     courts_mixed_history: Set[tuple] = field(default_factory=set)  # Set of (court_a, court_b) tuples that have mixed
-    # Match history snapshots for loading previous states
-    match_history_snapshots: List['MatchSnapshot'] = field(default_factory=list)
+    # Match history snapshots for loading previous states (full keyframes with deltas in between)
+    match_history_snapshots: List[Union['MatchSnapshot', 'MatchSnapshotDelta']] = field(default_factory=list)
     # Competitive Variety Settings
     competitive_variety_roaming_range_percent: float = 0.5  # Roaming range as percentage (0.35-1.0)
     competitive_variety_partner_repetition_limit: int = 3  # Games to wait before playing with same partner
     competitive_variety_opponent_repetition_limit: int = 2  # Games to wait before playing against same opponent
     adaptive_balance_weight: Optional[float] = None  # Manual override for adaptive balance weight (None = auto)
     adaptive_constraints_disabled: bool = False  # When True, adaptive constraints are completely disabled
+    competitive_variety_joint_court_solver: bool = False  # Fill several empty courts with one joint search instead of court by court
+    competitive_variety_joint_solver_time_budget: float = 0.25  # Seconds before the joint search gives up and greedy fills the courts
     # First bye players (to sit out the first match)
     first_bye_used: bool = False  # Flag indicating if first bye players have been applied
     # Session timing
@@ -303,6 +314,20 @@ class Session:
     king_of_court_waitlist_history: List[str] = field(default_factory=list)  # ordered list of players who have waited (first = longest ago)
     king_of_court_waitlist_rotation_index: int = 0  # current position in waitlist history for fair rotation
     session_exported: bool = False  # True if session was manually exported during this session
+    # Cached competitive variety ranking (PlayerRankingIndex); rebuilt when stats change, never persisted
+    ranking_index: Optional[Any] = field(default=None, repr=False, compare=False)
+    # Cached RelationshipIndex over completed matches (partner/opponent recency lookups), never persisted
+    relationship_index: Optional[Any] = field(default=None, repr=False, compare=False)
+    # PairMatrix mirroring the player stats' partner/opponent tables by player slot, never persisted
+    pair_matrix: Optional[Any] = field(default=None, repr=False, compare=False)
+    # Bumped by session.mark_session_changed on every state change, never persisted
+    version: int = field(default=0, compare=False)
+    # Cached deterministic waitlist court finish scenarios (ScenarioCache) for the current version, never persisted
+    scenario_cache: Optional[Any] = field(default=None, repr=False, compare=False)
+    # (last match_history_snapshots entry, its full MatchSnapshot) used to encode the next delta, never persisted
+    snapshot_head: Optional[Any] = field(default=None, repr=False, compare=False)
+    # Ids of finished matches edited since the last journal record (None: history rewritten), never persisted
+    journal_edits: Optional[Set[str]] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -321,6 +346,17 @@ class MatchSnapshot:
     courts_mixed_history: List[tuple]
 
 
+@dataclass
+class MatchSnapshotDelta:
+    """
+    A match snapshot stored as the changes since the previous entry in
+    match_history_snapshots. Use session.resolve_match_snapshot to get the full state.
+    """
+    match_id: str
+    timestamp: datetime
+    changes: Dict  # MatchSnapshot field name -> change, only for fields that changed
+
+
 @dataclass
 class PlayerRanking:
     """Player ranking information"""
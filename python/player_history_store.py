@@ -0,0 +1,240 @@
+"""
+Player History Store - SQLite database of players, sessions and matches across sessions
+
+Replaces player_history.json, which held only the last session's setup and was
+rewritten whole on every save. Each session's setup (players in order, first
+byes, mode, pools) is a row in sessions, with its roster and pre-seeded ratings
+in session_players; completed matches are kept in step with the session as it
+is saved. The setup dialog reads the latest setup, and pre-seeding looks up a
+player's most recent rating from any session.
+
+Saves compare against what is stored and write only what changed, so closing a
+session whose setup did not change writes nothing but its new matches. Queries
+go through indexes (player name, session date, save order), so the setup dialog
+stays fast with thousands of players and years of sessions.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT UNIQUE,
+    started_at TEXT,
+    save_order INTEGER NOT NULL,
+    game_mode TEXT,
+    session_type TEXT,
+    pre_seeded INTEGER NOT NULL DEFAULT 0,
+    first_bye_players TEXT NOT NULL DEFAULT '[]',
+    pool_assignments TEXT,
+    pool_court_assignments TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_started_at ON sessions (started_at);
+CREATE INDEX IF NOT EXISTS sessions_save_order ON sessions (save_order);
+CREATE TABLE IF NOT EXISTS session_players (
+    session INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    player INTEGER NOT NULL REFERENCES players (id),
+    position INTEGER NOT NULL,
+    rating REAL,
+    PRIMARY KEY (session, player)
+);
+CREATE INDEX IF NOT EXISTS session_players_player ON session_players (player);
+CREATE TABLE IF NOT EXISTS matches (
+    session INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    match_id TEXT NOT NULL,
+    court_number INTEGER,
+    team1 TEXT NOT NULL,
+    team2 TEXT NOT NULL,
+    team1_score INTEGER,
+    team2_score INTEGER,
+    end_time TEXT,
+    PRIMARY KEY (session, match_id)
+);
+"""
+
+# Setup fields stored as JSON text in the sessions table
+_JSON_FIELDS = ("first_bye_players", "pool_assignments", "pool_court_assignments")
+
+
+def empty_player_history() -> Dict:
+    """Player history of a first run, in the shape load_setup returns"""
+    return {
+        "players": [],
+        "first_bye_players": [],
+        "pre_seeded": False,
+        "player_ratings": {},
+        "game_mode": None,
+        "session_type": None,
+        "pool_assignments": None,
+        "pool_court_assignments": None
+    }
+
+
+class PlayerHistoryStore:
+    """Player history database file; each operation opens its own connection"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connect(self):
+        """Connection committed when the block succeeds and closed afterwards, so the file is not held open"""
+        db = sqlite3.connect(str(self.path))
+        try:
+            db.execute("PRAGMA foreign_keys = ON")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def is_empty(self) -> bool:
+        with self._connect() as db:
+            return db.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+    def _latest_session(self, db) -> Optional[int]:
+        row = db.execute("SELECT id FROM sessions ORDER BY save_order DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def _next_save_order(self, db) -> int:
+        return db.execute("SELECT COALESCE(MAX(save_order), 0) + 1 FROM sessions").fetchone()[0]
+
+    def _player_ids(self, db, names: List[str]) -> Dict[str, int]:
+        """Database ids for player names, adding players seen for the first time"""
+        cursor = db.cursor()
+        cursor.executemany("INSERT OR IGNORE INTO players (name) VALUES (?)", [(name,) for name in names])
+        ids = {}
+        for start in range(0, len(names), 500):  # Stay under SQLite's bound parameter limit
+            chunk = names[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            ids.update(cursor.execute(
+                f"SELECT name, id FROM players WHERE name IN ({placeholders})", chunk).fetchall())
+        return ids
+
+    def _read_setup(self, db, session_row: int) -> Dict:
+        row = db.execute(
+            "SELECT game_mode, session_type, pre_seeded, first_bye_players, pool_assignments, "
+            "pool_court_assignments FROM sessions WHERE id = ?", (session_row,)).fetchone()
+        roster = db.execute(
+            "SELECT p.name, sp.rating FROM session_players sp JOIN players p ON p.id = sp.player "
+            "WHERE sp.session = ? ORDER BY sp.position", (session_row,)).fetchall()
+        game_mode, session_type, pre_seeded, first_byes, pools, pool_courts = row
+        return {
+            "players": [name for name, _ in roster],
+            "first_bye_players": json.loads(first_byes),
+            "pre_seeded": bool(pre_seeded),
+            "player_ratings": {name: rating for name, rating in roster if rating is not None},
+            "game_mode": game_mode,
+            "session_type": session_type,
+            "pool_assignments": json.loads(pools) if pools is not None else None,
+            "pool_court_assignments": json.loads(pool_courts) if pool_courts is not None else None
+        }
+
+    def latest_ratings(self, names: List[str]) -> Dict[str, float]:
+        """Most recently stored pre-seeded rating of each named player, from any session"""
+        ratings = {}
+        with self._connect() as db:
+            for start in range(0, len(names), 500):  # Stay under SQLite's bound parameter limit
+                chunk = names[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                ratings.update(db.execute(
+                    "SELECT p.name, sp.rating FROM players p "
+                    "JOIN session_players sp ON sp.player = p.id JOIN sessions s ON s.id = sp.session "
+                    f"WHERE p.name IN ({placeholders}) AND sp.rating IS NOT NULL "
+                    "ORDER BY s.save_order", chunk).fetchall())  # Later sessions overwrite earlier ones
+        return ratings
+
+    def load_setup(self) -> Optional[Dict]:
+        """Setup of the most recently saved session, or None if nothing is stored"""
+        with self._connect() as db:
+            session_row = self._latest_session(db)
+            return self._read_setup(db, session_row) if session_row is not None else None
+
+    def save_setup(self, setup: Dict, session_id: Optional[str] = None, started_at: Optional[str] = None,
+                   matches: Optional[List[Dict]] = None) -> None:
+        """
+        Store a session setup (shaped like load_setup's result) and its completed matches.
+        A setup with a session_id updates that session's row; pools left as None keep the
+        stored ones. Without a session_id a new row is added unless it repeats the latest.
+        """
+        with self._connect() as db:
+            latest = self._latest_session(db)
+            if session_id is not None:
+                found = db.execute(
+                    "SELECT id FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+                session_row = found[0] if found else None
+            else:
+                session_row = None
+                if latest is not None and self._read_setup(db, latest) == setup:
+                    return
+
+            if session_row is None:
+                session_row = db.execute(
+                    "INSERT INTO sessions (session_id, started_at, save_order) VALUES (?, ?, ?)",
+                    (session_id, started_at, self._next_save_order(db))).lastrowid
+                self._write_setup(db, session_row, setup)
+            else:
+                stored = self._read_setup(db, session_row)
+                for key in ("pool_assignments", "pool_court_assignments"):
+                    if setup[key] is None:
+                        setup = dict(setup, **{key: stored[key]})
+                if setup != stored:
+                    self._write_setup(db, session_row, setup)
+                if session_row != latest:
+                    db.execute("UPDATE sessions SET save_order = ? WHERE id = ?",
+                               (self._next_save_order(db), session_row))
+
+            if matches is not None:
+                self._write_matches(db, session_row, matches)
+
+    def _write_setup(self, db, session_row: int, setup: Dict) -> None:
+        db.execute(
+            "UPDATE sessions SET game_mode = ?, session_type = ?, pre_seeded = ?, first_bye_players = ?, "
+            "pool_assignments = ?, pool_court_assignments = ? WHERE id = ?",
+            (setup["game_mode"], setup["session_type"], int(setup["pre_seeded"]),
+             *(json.dumps(setup[key]) if setup[key] is not None else None for key in _JSON_FIELDS),
+             session_row))
+
+        player_ids = self._player_ids(db, setup["players"])
+        ratings = setup["player_ratings"]
+        db.execute("DELETE FROM session_players WHERE session = ?", (session_row,))
+        db.executemany(
+            "INSERT INTO session_players (session, player, position, rating) VALUES (?, ?, ?, ?)",
+            [(session_row, player_ids[name], position, ratings.get(name))
+             for position, name in enumerate(setup["players"])])
+
+    def _write_matches(self, db, session_row: int, matches: List[Dict]) -> None:
+        """
+        Make the session's stored matches equal matches: insert new ones, update changed
+        ones (score edits) and delete ones no longer completed (undo, snapshot restore)
+        """
+        stored = {
+            row[0]: row[1:] for row in db.execute(
+                "SELECT match_id, court_number, team1, team2, team1_score, team2_score, end_time "
+                "FROM matches WHERE session = ?", (session_row,))
+        }
+        rows = []
+        for match in matches:
+            values = (match["court_number"], json.dumps(match["team1"]), json.dumps(match["team2"]),
+                      match["team1_score"], match["team2_score"], match["end_time"])
+            if stored.get(match["id"]) != values:
+                rows.append((session_row, match["id"]) + values)
+        db.executemany(
+            "INSERT OR REPLACE INTO matches (session, match_id, court_number, team1, team2, "
+            "team1_score, team2_score, end_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        current = {match["id"] for match in matches}
+        db.executemany("DELETE FROM matches WHERE session = ? AND match_id = ?",
+                       [(session_row, match_id) for match_id in stored if match_id not in current])
@@ -0,0 +1,197 @@
+"""
+Relationship History Index
+
+Per-player and per-pair lookups over the session's completed matches, so the
+competitive variety repetition rules (global recency, personal gap and the
+Partner -> Opponent -> Partner pattern) are answered by dict lookups and a
+bisect instead of by scanning the whole match history on every pairing check.
+
+Completed matches are indexed in the same order the constraint checks have
+always used: the order of session.matches (creation order), filtered to
+status 'completed'. complete_match and forfeit_match sync the index in
+whatever order courts finish; any other change to session.matches (direct
+appends, status flips, snapshot restore) is detected and folded in on the
+next lookup.
+"""
+
+from bisect import bisect_left, insort
+from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass, field
+from .pickleball_types import Session, Match
+
+
+@dataclass
+class RelationshipIndex:
+    """
+    Lookup tables built from the completed matches of a session.
+
+    Games are recorded by their position in session.matches, which does not
+    depend on the order matches complete in. The dense global index the
+    repetition rules use (0 = first completed match in session.matches order)
+    is derived from a position by bisecting the sorted completed positions, so
+    a court finishing after a later-created match is folded in without
+    renumbering anything.
+    """
+    completed: List[Match] = field(default_factory=list)  # Completed matches in session.matches order
+    completed_positions: List[int] = field(default_factory=list)  # Their positions in session.matches, sorted
+    # player_id -> sorted positions of that player's completed games
+    player_games: Dict[str, List[int]] = field(default_factory=dict)
+    # (player, other) -> position of the first / last game as partners, last game as opponents
+    first_partner_pos: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    last_partner_pos: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    last_opponent_pos: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    # Sync state against session.matches
+    matches_ref: Optional[List[Match]] = None
+    matches_seen: int = 0  # How many entries of session.matches have been examined
+    pending: List[int] = field(default_factory=list)  # Positions of matches still waiting/in-progress
+
+    @property
+    def completed_count(self) -> int:
+        return len(self.completed)
+
+    def global_index(self, pos: int) -> int:
+        """Global index (among completed matches) of the completed match at pos"""
+        return bisect_left(self.completed_positions, pos)
+
+    def personal_index(self, player_id: str, pos: int) -> int:
+        """Player's personal game index of the completed match at pos"""
+        return bisect_left(self.player_games.get(player_id, ()), pos)
+
+    def personal_game_count(self, player_id: str) -> int:
+        """Number of completed games the player has played"""
+        games = self.player_games.get(player_id)
+        return len(games) if games else 0
+
+    def last_game_index(self, player_id: str) -> int:
+        """Global index of the player's most recent completed game, or -1"""
+        games = self.player_games.get(player_id)
+        return self.global_index(games[-1]) if games else -1
+
+    def first_partner_index(self, player1: str, player2: str) -> int:
+        """Global index of the first completed game as partners, or -1"""
+        pos = self.first_partner_pos.get((player1, player2))
+        return -1 if pos is None else self.global_index(pos)
+
+    def last_role_index(self, player1: str, player2: str, role: str) -> Tuple[int, int]:
+        """
+        Global index of the last completed game with player2 as partner or opponent
+        (role), and player1's personal index of that game. Returns (-1, -1) if never.
+        """
+        table = self.last_partner_pos if role == 'partner' else self.last_opponent_pos
+        pos = table.get((player1, player2))
+        if pos is None:
+            return -1, -1
+        return self.global_index(pos), self.personal_index(player1, pos)
+
+    def last_together_index(self, player1: str, player2: str) -> Tuple[int, bool]:
+        """
+        Global index of the last completed game containing both players, and whether
+        they were opponents in it. Returns (-1, False) if they never shared a court.
+        """
+        partner_pos = self.last_partner_pos.get((player1, player2), -1)
+        opponent_pos = self.last_opponent_pos.get((player1, player2), -1)
+        if opponent_pos > partner_pos:
+            return self.global_index(opponent_pos), True
+        if partner_pos < 0:
+            return -1, False
+        return self.global_index(partner_pos), False
+
+    def _add_completed(self, pos: int, match: Match) -> None:
+        """Record the completed match at position pos, in any order"""
+        slot = bisect_left(self.completed_positions, pos)
+        self.completed_positions.insert(slot, pos)
+        self.completed.insert(slot, match)
+
+        for player_id in match.team1 + match.team2:
+            insort(self.player_games.setdefault(player_id, []), pos)
+
+        for team, other_team in ((match.team1, match.team2), (match.team2, match.team1)):
+            for p1 in team:
+                for p2 in team:
+                    if p1 != p2:
+                        pair = (p1, p2)
+                        if self.last_partner_pos.get(pair, -1) < pos:
+                            self.last_partner_pos[pair] = pos
+                        if self.first_partner_pos.get(pair, pos) >= pos:
+                            self.first_partner_pos[pair] = pos
+                for p2 in other_team:
+                    pair = (p1, p2)
+                    if self.last_opponent_pos.get(pair, -1) < pos:
+                        self.last_opponent_pos[pair] = pos
+
+
+def _is_settled(match: Match) -> bool:
+    """Completed and forfeited matches never change status again"""
+    return match.status in ('completed', 'forfeited')
+
+
+def build_relationship_index(session: Session) -> RelationshipIndex:
+    """Index every completed match of the session from scratch"""
+    index = RelationshipIndex(matches_ref=session.matches)
+    for pos, match in enumerate(session.matches):
+        if match.status == 'completed':
+            index._add_completed(pos, match)
+        elif not _is_settled(match):
+            index.pending.append(pos)
+    index.matches_seen = len(session.matches)
+    return index
+
+
+def _sync(index: RelationshipIndex, session: Session) -> bool:
+    """
+    Fold matches completed or appended since the last sync into the index.
+    Matches may complete in any order. Returns False when the history changed
+    in a way that needs a full rebuild (a different or shorter matches list).
+    """
+    matches = session.matches
+    if index.matches_ref is not matches or len(matches) < index.matches_seen:
+        return False
+
+    # Pending matches are looked up by position, so a match object swapped in at the
+    # same position (e.g. a trial session's private copy) is seen
+    newly_completed = [(pos, matches[pos]) for pos in index.pending if matches[pos].status == 'completed']
+    for pos in range(index.matches_seen, len(matches)):
+        if matches[pos].status == 'completed':
+            newly_completed.append((pos, matches[pos]))
+
+    if newly_completed or index.matches_seen != len(matches):
+        index.pending = [pos for pos in index.pending if not _is_settled(matches[pos])]
+        for pos, match in newly_completed:
+            index._add_completed(pos, match)
+        for pos in range(index.matches_seen, len(matches)):
+            if not _is_settled(matches[pos]):
+                index.pending.append(pos)
+        index.matches_seen = len(matches)
+    return True
+
+
+def fork_relationship_index(index: RelationshipIndex, matches: List[Match]) -> RelationshipIndex:
+    """
+    Copy of an index for a session whose matches list is a copy of the indexed one
+    (see trial_session). Only the tables are copied; the matches are shared.
+    """
+    return RelationshipIndex(
+        completed=list(index.completed),
+        completed_positions=list(index.completed_positions),
+        player_games={pid: list(games) for pid, games in index.player_games.items()},
+        first_partner_pos=dict(index.first_partner_pos),
+        last_partner_pos=dict(index.last_partner_pos),
+        last_opponent_pos=dict(index.last_opponent_pos),
+        matches_ref=matches,
+        matches_seen=index.matches_seen,
+        pending=list(index.pending)
+    )
+
+
+def get_relationship_index(session: Session) -> RelationshipIndex:
+    """Return the session's relationship index, brought up to date with session.matches"""
+    index = session.relationship_index
+    if index is None or not _sync(index, session):
+        index = build_relationship_index(session)
+        session.relationship_index = index
+    return index
+
+
+def sync_relationship_index(session: Session) -> None:
+    """Bring the index up to date after a match changes status (complete/forfeit)"""
+    get_relationship_index(session)
@@ -6,6 +6,7 @@ from typing import List, Dict, Tuple, Optional, Set
 from itertools import combinations
 from .pickleball_types import Player, PlayerStats, Match, QueuedMatch, SessionType
 from .utils import is_pair_banned, generate_combinations
+from .pair_matrix import build_pair_matrix_from_stats
 
 
 def generate_round_robin_queue(
@@ -51,8 +52,6 @@ def generate_round_robin_queue(
     player_ids = [p.id for p in players]
     
     # Track statistics for scoring
-    partnership_count: Dict[str, Dict[str, int]] = {}
-    opponent_count: Dict[str, Dict[str, int]] = {}
     four_player_group_count: Dict[str, int] = {}
     games_played: Dict[str, int] = {}
     used_matchups: Set[str] = set()
@@ -81,34 +80,13 @@ def generate_round_robin_queue(
                 matchup_key = '|'.join(sorted([t1_sorted, t2_sorted]))
                 used_matchups.add(matchup_key)
     
+    # Partner/opponent counts, pre-populated from session history if provided
+    history_stats = {pid: player_stats[pid] for pid in player_ids if pid in player_stats} if player_stats else None
+    pairs = build_pair_matrix_from_stats(player_ids, history_stats)
+    slots = pairs.slots
+    
     for pid in player_ids:
-        partnership_count[pid] = {}
-        opponent_count[pid] = {}
-        
-        # Initialize from player_stats if provided
-        if player_stats and pid in player_stats:
-            stats = player_stats[pid]
-            games_played[pid] = stats.games_played
-            
-            # Pre-populate partnerships from session history
-            if isinstance(stats.partners_played, dict):
-                for partner_id, count in stats.partners_played.items():
-                    partnership_count[pid][partner_id] = partnership_count[pid].get(partner_id, 0) + count
-            else:
-                # Fallback for legacy sets
-                for partner_id in stats.partners_played:
-                    partnership_count[pid][partner_id] = partnership_count[pid].get(partner_id, 0) + 1
-            
-            # Pre-populate opponents from session history
-            if isinstance(stats.opponents_played, dict):
-                for opponent_id, count in stats.opponents_played.items():
-                    opponent_count[pid][opponent_id] = opponent_count[pid].get(opponent_id, 0) + count
-            else:
-                # Fallback for legacy sets
-                for opponent_id in stats.opponents_played:
-                    opponent_count[pid][opponent_id] = opponent_count[pid].get(opponent_id, 0) + 1
-        else:
-            games_played[pid] = 0
+        games_played[pid] = history_stats[pid].games_played if history_stats and pid in history_stats else 0
     
     def get_matchup_key(team1: List[str], team2: List[str]) -> str:
         """Create a canonical key for a matchup"""
@@ -232,48 +210,27 @@ def generate_round_robin_queue(
         
         score = 1000.0
         
-        # Boost: new partnerships (players who haven't played together)
-        for player_id in team1:
-            for teammate_id in team1:
-                if player_id != teammate_id:
-                    if teammate_id not in partnership_count.get(player_id, {}):
-                        score += 100
-        
-        for player_id in team2:
-            for teammate_id in team2:
-                if player_id != teammate_id:
-                    if teammate_id not in partnership_count.get(player_id, {}):
-                        score += 100
-        
-        # Penalty: repeated partnerships (apply dynamic threshold)
-        for player_id in team1:
-            for teammate_id in team1:
-                if player_id != teammate_id:
-                    count = partnership_count.get(player_id, {}).get(teammate_id, 0)
-                    if count > allowed_reps:
-                        score -= 2000  # Hard lock: force negative score
-                    elif count > 0:
-                        score -= 100  # Soft penalty for repetition within threshold
-        
-        for player_id in team2:
-            for teammate_id in team2:
-                if player_id != teammate_id:
-                    count = partnership_count.get(player_id, {}).get(teammate_id, 0)
-                    if count > allowed_reps:
-                        score -= 2000  # Hard lock: force negative score
-                    elif count > 0:
-                        score -= 100  # Soft penalty for repetition within threshold
-        
-        # Boost: new opponents
-        for p1 in team1:
-            for p2 in team2:
-                if p2 not in opponent_count.get(p1, {}):
-                    score += 20
+        for team in (team1, team2):
+            for player_id in team:
+                partner_row = pairs.partner_count[slots[player_id]]
+                for teammate_id in team:
+                    if player_id != teammate_id:
+                        count = partner_row[slots[teammate_id]]
+                        if count == 0:
+                            score += 100  # Boost: new partnership
+                        # Penalty: repeated partnerships (apply dynamic threshold)
+                        if count > allowed_reps:
+                            score -= 2000  # Hard lock: force negative score
+                        elif count > 0:
+                            score -= 100  # Soft penalty for repetition within threshold
         
-        # Penalty: repeated opponents (apply dynamic threshold)
         for p1 in team1:
+            opponent_row = pairs.opponent_count[slots[p1]]
             for p2 in team2:
-                count = opponent_count.get(p1, {}).get(p2, 0)
+                count = opponent_row[slots[p2]]
+                if count == 0:
+                    score += 20  # Boost: new opponent
+                # Penalty: repeated opponents (apply dynamic threshold)
                 if count > allowed_reps:
                     score -= 2000  # Hard lock on opponent repetition too
                 elif count > 0:
@@ -363,21 +320,9 @@ def generate_round_robin_queue(
             used_players_this_round.update(best_team2)
             
             # Update tracking
-            for player_id in best_team1:
-                for teammate_id in best_team1:
-                    if player_id != teammate_id:
-                        partnership_count[player_id][teammate_id] = partnership_count[player_id].get(teammate_id, 0) + 1
-                games_played[player_id] += 1
-                for opponent_id in best_team2:
-                    opponent_count[player_id][opponent_id] = opponent_count[player_id].get(opponent_id, 0) + 1
-            
-            for player_id in best_team2:
-                for teammate_id in best_team2:
-                    if player_id != teammate_id:
-                        partnership_count[player_id][teammate_id] = partnership_count[player_id].get(teammate_id, 0) + 1
+            pairs.record_match(best_team1, best_team2)
+            for player_id in best_team1 + best_team2:
                 games_played[player_id] += 1
-                for opponent_id in best_team1:
-                    opponent_count[player_id][opponent_id] = opponent_count[player_id].get(opponent_id, 0) + 1
             
             four_key = get_four_player_key(best_team1, best_team2)
             four_player_group_count[four_key] = four_player_group_count.get(four_key, 0) + 1
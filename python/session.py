@@ -6,12 +6,25 @@ from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 from .pickleball_types import (
     Session, SessionConfig, Player, Match, MatchStatus, PlayerStats, 
-    QueuedMatch, AdvancedConfig, MatchSnapshot
+    QueuedMatch, AdvancedConfig, MatchSnapshot, MatchSnapshotDelta
 )
 from .utils import generate_id, create_player_stats, shuffle_list, get_default_advanced_config
 from .roundrobin import generate_round_robin_queue
+from .relationship_index import sync_relationship_index
+from .pair_matrix import record_pair_match
 from .time_manager import now
 
+# Every Nth entry of match_history_snapshots is a full snapshot (keyframe), the rest
+# only store what changed since the entry before. Resolving any entry replays at
+# most N - 1 deltas.
+SNAPSHOT_KEYFRAME_INTERVAL = 20
+
+# Snapshot fields stored whole when they change (all bounded by the number of players)
+_SNAPSHOT_VALUE_FIELDS = (
+    "waiting_players", "active_players", "match_queue",
+    "player_last_court", "court_players", "courts_mixed_history"
+)
+
 
 def create_session(config: SessionConfig, max_queue_size: int = 100) -> Session:
     """Create a new session"""
@@ -133,6 +146,32 @@ def create_session(config: SessionConfig, max_queue_size: int = 100) -> Session:
     return session
 
 
+def mark_session_changed(session: Session) -> None:
+    """
+    Record a state change by bumping the session version.
+    
+    Every mutation in this module calls this, so callers can tell an unchanged
+    session apart from a changed one by comparing versions (e.g. the GUI tick skips
+    re-evaluating matches when neither the version nor the empty courts moved).
+    Code that edits session fields directly should call it too.
+    
+    Ratings and ranks may have changed with it (stats, pre-seeded ratings or the
+    active players edited), so it also drops the cached ranking index.
+    """
+    session.version += 1
+    session.ranking_index = None  # invalidate_ranking_index, without importing competitive_variety
+
+
+def note_match_edited(session: Session, match: Match) -> None:
+    """
+    Note a change to a finished match for the next session journal record.
+    Waiting and in-progress matches are always re-checked when saving, so only
+    edits after a match ended (score edits) need this.
+    """
+    if session.journal_edits is not None:
+        session.journal_edits.add(match.id)
+
+
 def add_player_to_session(session: Session, player: Player) -> Session:
     """Add a player to an active session"""
     
@@ -141,6 +180,7 @@ def add_player_to_session(session: Session, player: Player) -> Session:
         # If player exists but is inactive, reactivate them
         if player.id not in session.active_players:
             session.active_players.add(player.id)
+            mark_session_changed(session)
             # Add to waiting list so they can get back into games
             if player.id not in session.waiting_players:
                 session.waiting_players.append(player.id)
@@ -180,11 +220,15 @@ def add_player_to_session(session: Session, player: Player) -> Session:
     # Give new player priority in the simple 2-court-wait system
     new_stats.courts_completed_since_last_play = max_courts_waited + 1
     session.player_stats[player.id] = new_stats
+    if session.pair_matrix is not None:
+        session.pair_matrix.slot(player.id)
     
     # Update config
     session.config.players = updated_players
     session.active_players = active_players
     
+    mark_session_changed(session)
+    
     # Regenerate queue for round-robin
     if session.config.mode == 'round-robin':
         active_player_objs = [p for p in updated_players if p.id in active_players]
@@ -233,6 +277,8 @@ def remove_player_from_session(session: Session, player_id: str) -> Session:
     session.active_players = active_players
     session.waiting_players = waiting_players
     
+    mark_session_changed(session)
+    
     # Update competitive variety settings if needed
     if session.config.mode == 'competitive-variety':
         from .competitive_variety import update_session_competitive_variety_settings
@@ -334,10 +380,135 @@ def _create_session_snapshot(session: Session, match_id: str) -> MatchSnapshot:
     )
 
 
+def _diff_snapshot_matches(old: List[Dict], new: List[Dict]) -> Optional[Dict]:
+    """Positions that changed plus appended matches, or None if nothing changed"""
+    if old == new:
+        return None
+    shared = min(len(old), len(new))
+    return {
+        "length": len(new),
+        "changed": [[pos, new[pos]] for pos in range(shared) if old[pos] != new[pos]],
+        "appended": new[shared:]
+    }
+
+
+def _patch_snapshot_matches(old: List[Dict], diff: Dict) -> List[Dict]:
+    matches = old[:diff["length"]]
+    for pos, match_data in diff["changed"]:
+        matches[pos] = match_data
+    matches.extend(diff["appended"])
+    return matches
+
+
+def _diff_snapshot_stats(old: Dict, new: Dict) -> Optional[Dict]:
+    """Changed stats fields per player (all fields for new players), or None if nothing changed"""
+    changed = {}
+    for player_id, stats_data in new.items():
+        old_data = old.get(player_id)
+        if old_data is None:
+            changed[player_id] = stats_data
+            continue
+        fields = {key: value for key, value in stats_data.items() if old_data.get(key) != value}
+        if fields:
+            changed[player_id] = fields
+    removed = [player_id for player_id in old if player_id not in new]
+    if not changed and not removed:
+        return None
+    return {"changed": changed, "removed": removed}
+
+
+def _patch_snapshot_stats(old: Dict, diff: Dict) -> Dict:
+    stats = dict(old)
+    for player_id in diff["removed"]:
+        stats.pop(player_id, None)
+    for player_id, fields in diff["changed"].items():
+        stats_data = dict(stats.get(player_id, {}))
+        stats_data.update(fields)
+        stats[player_id] = stats_data
+    return stats
+
+
+def _diff_snapshots(old: MatchSnapshot, new: MatchSnapshot) -> Dict:
+    """Changes that turn snapshot old into snapshot new"""
+    changes = {}
+    matches = _diff_snapshot_matches(old.matches, new.matches)
+    if matches is not None:
+        changes["matches"] = matches
+    stats = _diff_snapshot_stats(old.player_stats, new.player_stats)
+    if stats is not None:
+        changes["player_stats"] = stats
+    for name in _SNAPSHOT_VALUE_FIELDS:
+        value = getattr(new, name)
+        if getattr(old, name) != value:
+            changes[name] = value
+    return changes
+
+
+def _apply_snapshot_delta(base: MatchSnapshot, delta: MatchSnapshotDelta) -> MatchSnapshot:
+    changes = delta.changes
+    values = {name: changes.get(name, getattr(base, name)) for name in _SNAPSHOT_VALUE_FIELDS}
+    return MatchSnapshot(
+        match_id=delta.match_id,
+        timestamp=delta.timestamp,
+        matches=_patch_snapshot_matches(base.matches, changes["matches"]) if "matches" in changes else base.matches,
+        player_stats=_patch_snapshot_stats(base.player_stats, changes["player_stats"]) if "player_stats" in changes else base.player_stats,
+        **values
+    )
+
+
+def resolve_match_snapshot(session: Session, snapshot) -> MatchSnapshot:
+    """
+    Full session state for an entry of match_history_snapshots.
+    Replays the deltas since the closest keyframe before it.
+    """
+    if isinstance(snapshot, MatchSnapshot):
+        return snapshot
+    
+    head = session.snapshot_head
+    if head is not None and head[0] is snapshot:
+        return head[1]
+    
+    history = session.match_history_snapshots
+    idx = next((i for i, entry in enumerate(history) if entry is snapshot), None)
+    if idx is None:
+        raise ValueError(f"Snapshot for match {snapshot.match_id} is not in this session's history")
+    
+    start = idx
+    while not isinstance(history[start], MatchSnapshot):
+        start -= 1
+        if start < 0:
+            raise ValueError(f"No full snapshot before the one for match {snapshot.match_id}")
+    
+    full = history[start]
+    for entry in history[start + 1:idx + 1]:
+        full = _apply_snapshot_delta(full, entry)
+    return full
+
+
+def _record_match_snapshot(session: Session, match_id: str) -> None:
+    """Append the pre-completion state to match_history_snapshots, delta-encoded between keyframes"""
+    full = _create_session_snapshot(session, match_id)
+    history = session.match_history_snapshots
+    
+    entry = full
+    if history and len(history) % SNAPSHOT_KEYFRAME_INTERVAL != 0:
+        previous = resolve_match_snapshot(session, history[-1])
+        entry = MatchSnapshotDelta(
+            match_id=match_id,
+            timestamp=full.timestamp,
+            changes=_diff_snapshots(previous, full)
+        )
+    
+    history.append(entry)
+    session.snapshot_head = (entry, full)
+
+
 def load_session_from_snapshot(session: Session, snapshot: MatchSnapshot) -> bool:
     """Load session state from a snapshot (reverting to state before a match was completed)"""
     
     try:
+        snapshot = resolve_match_snapshot(session, snapshot)
+        
         # Restore matches
         session.matches = []
         for match_data in snapshot.matches:
@@ -405,6 +576,10 @@ def load_session_from_snapshot(session: Session, snapshot: MatchSnapshot) -> boo
         session.player_last_court = dict(snapshot.player_last_court)
         session.court_players = {k: list(v) for k, v in snapshot.court_players.items()}
         session.courts_mixed_history = set(snapshot.courts_mixed_history)
+        session.pair_matrix = None  # Rebuilt from the restored stats
+        session.journal_edits = None  # History rewritten; the next save diffs the whole session
+        
+        mark_session_changed(session)
         
         # Remove the snapshot that was just loaded (and all after it) from history
         # This preserves snapshots from before this point
@@ -446,8 +621,7 @@ def complete_match(session: Session, match_id: str, team1_score: int, team2_scor
         return False, []
     
     # Create snapshot BEFORE updating match status (so we capture pre-completion state)
-    snapshot = _create_session_snapshot(session, match_id)
-    session.match_history_snapshots.append(snapshot)
+    _record_match_snapshot(session, match_id)
     
     # Update match
     match.status = 'completed'
@@ -513,6 +687,11 @@ def complete_match(session: Session, match_id: str, team1_score: int, team2_scor
         if player_id in session.player_stats:
             session.player_stats[player_id].courts_completed_since_last_play = 0
     
+    record_pair_match(session, match.team1, match.team2)
+    
+    sync_relationship_index(session)
+    mark_session_changed(session)  # Ratings changed, so this also drops the cached ranks
+    
     # Update variety tracking for competitive-variety mode
     if session.config.mode == 'competitive-variety':
         from .competitive_variety import update_variety_tracking_after_match
@@ -598,6 +777,8 @@ def forfeit_match(session: Session, match_id: str) -> bool:
     
     match.status = 'forfeited'
     match.end_time = now()
+    sync_relationship_index(session)
+    mark_session_changed(session)
     
     # Log forfeit
     logger = get_session_logger()
@@ -623,6 +804,7 @@ def forfeit_match(session: Session, match_id: str) -> bool:
         for partner_id in match.team2:
             if partner_id != player_id:
                 stats.partners_played[partner_id] = stats.partners_played.get(partner_id, 0) + 1
+    record_pair_match(session, match.team1, match.team2)
     
     # Update variety tracking for competitive-variety mode to prevent immediate rescheduling
     if session.config.mode == 'competitive-variety':
@@ -680,6 +862,8 @@ def recalculate_stats_after_edit(session: Session, match: Match, old_score: Dict
         else:
             stats.losses += 1
 
+    mark_session_changed(session)
+
 
 def evaluate_and_create_matches(session: Session) -> Session:
     """
@@ -718,14 +902,18 @@ def evaluate_and_create_matches(session: Session) -> Session:
         from python.strict_continuous_rr import populate_courts_strict_continuous
         populate_courts_strict_continuous(session)
     
+    new_matches = [m for m in session.matches
+                   if m.id not in matches_before and m.status in ('waiting', 'in-progress')]
+    if new_matches:
+        mark_session_changed(session)
+    
     # Log any newly created matches
     logger = get_session_logger()
     if logger:
-        for m in session.matches:
-            if m.id not in matches_before and m.status in ('waiting', 'in-progress'):
-                t1_names = [get_player_name(session, pid) or pid for pid in m.team1]
-                t2_names = [get_player_name(session, pid) or pid for pid in m.team2]
-                logger.log_match_scheduled(m.id, m.court_number, t1_names, t2_names)
+        for m in new_matches:
+            t1_names = [get_player_name(session, pid) or pid for pid in m.team1]
+            t2_names = [get_player_name(session, pid) or pid for pid in m.team2]
+            logger.log_match_scheduled(m.id, m.court_number, t1_names, t2_names)
     
     return session
 
@@ -805,6 +993,7 @@ def create_manual_match(session: Session, court_number: int, team1_ids: List[str
     )
     
     session.matches.append(match)
+    mark_session_changed(session)
     
     # Log manual match creation
     from .session_logger import get_session_logger
@@ -864,6 +1053,7 @@ def update_match_teams(session: Session, match_id: str, team1_ids: List[str], te
         if player_id in session.player_stats:
             session.player_stats[player_id].courts_completed_since_last_play = 0
     
+    mark_session_changed(session)
     return True
 
 
@@ -0,0 +1,141 @@
+"""
+Session Archive - compact per-session files written when a session ends
+
+Each archive holds the full serialized session (see session_persistence.serialize_session)
+as zlib-compressed JSON behind a small uncompressed index (date, mode, players, match
+count). Listing past sessions reads only the index of each file, so a browser can show
+years of weekly sessions without decompressing any of them.
+
+File layout (integers big-endian):
+    4 bytes   magic b"PBSA"
+    2 bytes   format version
+    4 bytes   index length, then the index as UTF-8 JSON
+    4 bytes   payload length, then the zlib-compressed session JSON
+"""
+
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ARCHIVE_MAGIC = b"PBSA"
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_SUFFIX = ".pbsa"
+
+_PREAMBLE = struct.Struct(">4sHI")  # magic, format version, index length
+_LENGTH = struct.Struct(">I")
+
+
+@dataclass
+class ArchiveIndex:
+    """Header of a session archive, readable without decompressing the session"""
+    path: Path
+    session_id: str
+    date: Optional[str]  # ISO session start time
+    mode: str
+    session_type: str
+    courts: int
+    players: List[str] = field(default_factory=list)
+    match_count: int = 0  # Completed matches
+
+
+def get_archive_directory() -> Path:
+    """Directory archives are written to, inside the session files directory"""
+    from python.session_persistence import SESSIONS_DIR
+    return SESSIONS_DIR / "archive"
+
+
+def _build_index(data: Dict) -> Dict:
+    return {
+        "session_id": data["session_id"],
+        "date": data.get("session_start_time"),
+        "mode": data["config"]["mode"],
+        "session_type": data["config"]["session_type"],
+        "courts": data["config"]["courts"],
+        "players": [p["name"] for p in data["config"]["players"]],
+        "match_count": sum(1 for m in data["matches"] if m["status"] == "completed")
+    }
+
+
+def _archive_filename(index: Dict) -> str:
+    date = (index["date"] or "undated")[:19].replace("-", "").replace(":", "").replace("T", "_")
+    return f"session_{date}_{index['session_id']}{ARCHIVE_SUFFIX}"
+
+
+def write_session_archive(session, directory: Optional[Path] = None) -> Path:
+    """Write the session's archive, replacing an earlier archive of the same session"""
+    from python.session_persistence import serialize_session
+
+    directory = Path(directory) if directory is not None else get_archive_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    data = serialize_session(session)
+    index = _build_index(data)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    payload = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 9)
+
+    path = directory / _archive_filename(index)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(ARCHIVE_MAGIC, ARCHIVE_FORMAT_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(_LENGTH.pack(len(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_index(f, path: Path) -> Dict:
+    preamble = f.read(_PREAMBLE.size)
+    if len(preamble) < _PREAMBLE.size:
+        raise ValueError(f"{path.name}: not a session archive")
+    magic, version, index_length = _PREAMBLE.unpack(preamble)
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError(f"{path.name}: not a session archive")
+    if version > ARCHIVE_FORMAT_VERSION:
+        raise ValueError(f"{path.name}: archive format {version} is newer than this version reads")
+    return json.loads(f.read(index_length).decode("utf-8"))
+
+
+def read_archive_index(path: Path) -> ArchiveIndex:
+    """Read an archive's index without touching the compressed session"""
+    path = Path(path)
+    with open(path, 'rb') as f:
+        index = _read_index(f, path)
+    return ArchiveIndex(path=path, **index)
+
+
+def list_session_archives(directory: Optional[Path] = None) -> List[ArchiveIndex]:
+    """Indexes of all archives in the directory, newest session first; unreadable files are skipped"""
+    directory = Path(directory) if directory is not None else get_archive_directory()
+    if not directory.exists():
+        return []
+
+    archives = []
+    for path in directory.glob(f"*{ARCHIVE_SUFFIX}"):
+        try:
+            archives.append(read_archive_index(path))
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Skipping session archive: {e}")
+    archives.sort(key=lambda a: a.date or "", reverse=True)
+    return archives
+
+
+def load_session_archive(path: Path):
+    """Decompress an archive and rebuild its session"""
+    from python.session_persistence import deserialize_session
+
+    path = Path(path)
+    with open(path, 'rb') as f:
+        _read_index(f, path)
+        length = f.read(_LENGTH.size)
+        payload_length = _LENGTH.unpack(length)[0] if len(length) == _LENGTH.size else -1
+        payload = f.read(payload_length) if payload_length >= 0 else b""
+    if len(payload) != payload_length:
+        raise ValueError(f"{path.name}: archive is truncated")
+    return deserialize_session(json.loads(zlib.decompress(payload).decode("utf-8")))
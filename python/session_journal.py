@@ -0,0 +1,228 @@
+"""
+Append-only Session Journal
+
+Saving used to rewrite the whole session file on every score entry. The journal
+instead appends one line per save holding only what changed since the previous
+save (new or changed matches, changed player stats, new history snapshots,
+changed settings), so the amount written per event does not grow with the
+length of the session. Every COMPACT_AFTER_RECORDS records the full session is
+written as a checkpoint and the journal starts over.
+
+save() works the changes out by diffing the full serialized session against
+the last one. append() takes changes the caller already knows (see
+session_persistence.serialize_session_changes, which only serializes what was
+edited or added since the last record), so that neither serializing nor
+diffing grows with the length of the session either. Both keep last_data, the
+session data as of the last record, up to date for the next checkpoint.
+
+Recovery loads the checkpoint and replays the journal records written after it.
+The checkpoint is replaced atomically and a torn last journal line (crash while
+appending) is ignored, so a crash mid-write loses at most the event being written.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+COMPACT_AFTER_RECORDS = 100
+
+# Session data lists that mostly grow at the end, diffed by position
+_LIST_KEYS = ("matches", "match_history_snapshots")
+# Session data dicts diffed per entry
+_DICT_KEYS = ("player_stats",)
+
+
+def write_json_atomic(path: Path, data, indent: Optional[int] = 2) -> None:
+    """Write JSON to a temp file and rename it over path, so readers never see half a file"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _diff_list(old: List, new: List) -> Dict:
+    shared = min(len(old), len(new))
+    return {
+        "length": len(new),
+        "changed": [[pos, new[pos]] for pos in range(shared) if old[pos] != new[pos]],
+        "appended": new[shared:]
+    }
+
+
+def _patch_list(items: List, diff: Dict) -> List:
+    del items[diff["length"]:]
+    for pos, value in diff["changed"]:
+        items[pos] = value
+    items.extend(diff["appended"])
+    return items
+
+
+def _diff_dict(old: Dict, new: Dict) -> Dict:
+    return {
+        "changed": {key: value for key, value in new.items() if old.get(key) != value},
+        "removed": [key for key in old if key not in new]
+    }
+
+
+def _patch_dict(table: Dict, diff: Dict) -> Dict:
+    for key in diff["removed"]:
+        table.pop(key, None)
+    table.update(diff["changed"])
+    return table
+
+
+def diff_session_data(old: Dict, new: Dict) -> Dict:
+    """Changes that turn serialized session old into new (see session_persistence.serialize_session)"""
+    changes = {}
+    for key, value in new.items():
+        old_value = old.get(key)
+        if old_value == value:
+            continue
+        if key in _LIST_KEYS and isinstance(old_value, list):
+            changes[key] = {"list": _diff_list(old_value, value)}
+        elif key in _DICT_KEYS and isinstance(old_value, dict):
+            changes[key] = {"dict": _diff_dict(old_value, value)}
+        else:
+            changes[key] = {"value": value}
+    removed = [key for key in old if key not in new]
+    if removed:
+        changes["__removed__"] = removed
+    return changes
+
+
+def apply_session_diff(data: Dict, changes: Dict) -> Dict:
+    """Apply changes from diff_session_data to serialized session data, in place"""
+    for key in changes.get("__removed__", []):
+        data.pop(key, None)
+    for key, change in changes.items():
+        if key == "__removed__":
+            continue
+        if "list" in change:
+            data[key] = _patch_list(data.get(key, []), change["list"])
+        elif "dict" in change:
+            data[key] = _patch_dict(data.get(key, {}), change["dict"])
+        else:
+            data[key] = change["value"]
+    return data
+
+
+class SessionJournal:
+    """Checkpoint file plus an append-only journal of changes since the checkpoint"""
+
+    def __init__(self, checkpoint_path: Path, journal_path: Path,
+                 compact_after: int = COMPACT_AFTER_RECORDS):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.journal_path = Path(journal_path)
+        self.compact_after = compact_after
+        self._reset()
+
+    def _reset(self):
+        self.last_data: Optional[Dict] = None  # Session data as of the last save
+        self.seq = 0  # Sequence number of the last journal record
+        self.records_since_checkpoint = 0
+
+    def can_append(self, session_id: str) -> bool:
+        """Whether the next record of session_id can go in the journal (else write a checkpoint)"""
+        return (self.last_data is not None
+                and self.last_data.get("session_id") == session_id
+                and self.checkpoint_path.exists())
+
+    def save(self, data: Dict, event: str = "save") -> None:
+        """Record serialized session data, appending a journal record when possible"""
+        if not self.can_append(data.get("session_id")):
+            self.checkpoint(data)
+            return
+        self._write_record(diff_session_data(self.last_data, data), event)
+        self.last_data = data
+        self._compact_if_due()
+
+    def append(self, changes: Dict, event: str = "save") -> None:
+        """
+        Append a record of changes (in the form diff_session_data returns) and apply
+        them to last_data in place. The caller checks can_append first.
+        """
+        self._write_record(changes, event)
+        apply_session_diff(self.last_data, changes)
+        self._compact_if_due()
+
+    def _write_record(self, changes: Dict, event: str) -> None:
+        self.seq += 1
+        record = {
+            "seq": self.seq,
+            "session_id": self.last_data.get("session_id"),
+            "event": event,
+            "changes": changes
+        }
+        try:
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            self.last_data = None  # Unknown what reached the disk; the next save writes a checkpoint
+            raise
+        self.records_since_checkpoint += 1
+
+    def _compact_if_due(self) -> None:
+        if self.records_since_checkpoint >= self.compact_after:
+            self.checkpoint(self.last_data)
+
+    def checkpoint(self, data: Dict) -> None:
+        """Write the full session data and start a new journal"""
+        checkpoint = dict(data)
+        checkpoint["journal_seq"] = self.seq  # Records up to here are included
+        write_json_atomic(self.checkpoint_path, checkpoint)
+
+        # Records left behind by a crash before this point are skipped on load (seq <= journal_seq)
+        open(self.journal_path, 'w').close()
+        self.last_data = data
+        self.records_since_checkpoint = 0
+
+    def load(self) -> Optional[Dict]:
+        """Checkpoint with the journal replayed on top, or None if there is no checkpoint"""
+        if not self.checkpoint_path.exists():
+            return None
+
+        with open(self.checkpoint_path, 'r') as f:
+            data = json.load(f)
+        seq = data.pop("journal_seq", 0)
+        records = 0
+        intact = True
+
+        if self.journal_path.exists():
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line) if line.endswith("\n") else None
+                    except ValueError:
+                        record = None
+                    if record is None:
+                        intact = False  # Torn write at the end of the journal
+                        break
+                    if record.get("session_id") != data.get("session_id") or record["seq"] <= seq:
+                        continue
+                    if record["seq"] != seq + 1:
+                        intact = False
+                        break
+                    data = apply_session_diff(data, record["changes"])
+                    seq = record["seq"]
+                    records += 1
+
+        # Further saves continue this journal
+        self.last_data = data
+        self.seq = seq
+        self.records_since_checkpoint = records
+        if not intact:
+            self.checkpoint(data)  # Appending after a damaged tail would hide the new records
+        return data
+
+    def clear(self) -> None:
+        """Delete the checkpoint and journal"""
+        for path in (self.checkpoint_path, self.journal_path):
+            if path.exists():
+                path.unlink()
+        self._reset()
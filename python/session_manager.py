@@ -14,9 +14,13 @@ Key Principles:
 - Single responsibility for each service
 """
 
-from typing import Dict, List, Tuple, Optional, Callable
+from typing import Dict, List, Tuple, Optional, Callable, FrozenSet
 from python.pickleball_types import Session, Match, Player
-from python.session import evaluate_and_create_matches, complete_match, forfeit_match
+from python.session import (
+    evaluate_and_create_matches, complete_match, forfeit_match, mark_session_changed, note_match_edited,
+    recalculate_stats_after_edit
+)
+from python.session_undo import UndoStack
 from python.time_manager import now
 
 
@@ -39,8 +43,14 @@ class SessionEventHandler:
             'round_advanced': [],
             'player_added': [],
             'player_removed': [],
-            'waitlist_changed': []
+            'waitlist_changed': [],
+            'change_undone': [],
+            'change_redone': []
         }
+        # Recorded changes for undo/redo (see session_undo)
+        self.undo_stack = UndoStack()
+        # (version, empty courts) after the last evaluation; see evaluate_if_changed
+        self._last_evaluated_state: Optional[Tuple[int, FrozenSet[int]]] = None
     
     def add_event_listener(self, event_type: str, callback: Callable):
         """Add a callback for specific session events"""
@@ -64,17 +74,23 @@ class SessionEventHandler:
         Returns:
             Tuple of (success, court_slides)
         """
-        success, slides = complete_match(self.session, match_id, team1_score, team2_score)
+        match = self._find_match(match_id)
         
-        if success:
-            self._emit_event('match_completed', match_id, team1_score, team2_score)
+        def complete():
+            success, slides = complete_match(self.session, match_id, team1_score, team2_score)
             
-            # Trigger session evaluation and advancement
-            self._evaluate_and_advance_session()
+            if success:
+                self._emit_event('match_completed', match_id, team1_score, team2_score)
+                
+                # Trigger session evaluation and advancement
+                self._evaluate_and_advance_session()
+                
+                self._emit_event('session_updated')
             
-            self._emit_event('session_updated')
+            return success, slides
         
-        return success, slides
+        description = f"Score {team1_score}-{team2_score} on court {match.court_number}" if match else "Score entry"
+        return self.undo_stack.record(self.session, description, complete, matches=[match] if match else [])
     
     def handle_match_forfeit(self, match_id: str) -> bool:
         """
@@ -83,17 +99,73 @@ class SessionEventHandler:
         Returns:
             Success status
         """
-        success = forfeit_match(self.session, match_id)
+        match = self._find_match(match_id)
         
-        if success:
-            self._emit_event('match_forfeited', match_id)
+        def forfeit():
+            success = forfeit_match(self.session, match_id)
             
-            # Trigger session evaluation and advancement
-            self._evaluate_and_advance_session()
+            if success:
+                self._emit_event('match_forfeited', match_id)
+                
+                # Trigger session evaluation and advancement
+                self._evaluate_and_advance_session()
+                
+                self._emit_event('session_updated')
             
-            self._emit_event('session_updated')
+            return success
         
-        return success
+        description = f"Forfeit on court {match.court_number}" if match else "Forfeit"
+        return self.undo_stack.record(self.session, description, forfeit, matches=[match] if match else [])
+    
+    def handle_score_edit(self, match_id: str, team1_score: int, team2_score: int) -> bool:
+        """
+        Change the score of a completed match, adjusting the players' stats.
+        Only the match and its players are recorded for undo.
+        """
+        match = self._find_match(match_id)
+        if match is None:
+            return False
+        old_score = match.score.copy() if match.score else {'team1_score': 0, 'team2_score': 0}
+        new_score = {'team1_score': team1_score, 'team2_score': team2_score}
+        
+        def edit():
+            recalculate_stats_after_edit(self.session, match, old_score, new_score)
+            match.score = new_score
+            note_match_edited(self.session, match)
+        
+        self.undo_stack.record(self.session, f"Score edit to {team1_score}-{team2_score}", edit,
+                               matches=[match], whole_session=False)
+        self._emit_event('session_updated')
+        return True
+    
+    def record_change(self, description: str, action: Callable, players: List[str] = (),
+                      matches: List[Match] = ()):
+        """
+        Run a change made outside this class (manual court, team change, player changes)
+        so it can be undone. See UndoStack.record for players and matches.
+        """
+        return self.undo_stack.record(self.session, description, action, players=players, matches=matches)
+    
+    def handle_undo(self) -> Optional[str]:
+        """Undo the last recorded change; returns its description, or None if there was none"""
+        description = self.undo_stack.undo(self.session)
+        if description is not None:
+            self._after_undo_redo('change_undone', description)
+        return description
+    
+    def handle_redo(self) -> Optional[str]:
+        """Redo the last undone change; returns its description, or None if there was none"""
+        description = self.undo_stack.redo(self.session)
+        if description is not None:
+            self._after_undo_redo('change_redone', description)
+        return description
+    
+    def _after_undo_redo(self, event_type: str, description: str):
+        # The restored state is one matchmaking already settled, so the periodic refresh need not re-evaluate it
+        self._last_evaluated_state = self._evaluation_state()
+        self._emit_event(event_type, description)
+        self._emit_event('matches_changed')
+        self._emit_event('session_updated')
     
     def handle_player_addition(self, players: List[Player]):
         """
@@ -103,6 +175,7 @@ class SessionEventHandler:
             if player.id not in [p.id for p in self.session.config.players]:
                 self.session.config.players.append(player)
                 self.session.active_players.add(player.id)
+        mark_session_changed(self.session)
         
         self._emit_event('player_added', players)
         
@@ -123,6 +196,7 @@ class SessionEventHandler:
             # Remove from waitlist if present
             if player_id in self.session.waiting_players:
                 self.session.waiting_players.remove(player_id)
+        mark_session_changed(self.session)
         
         self._emit_event('player_removed', player_ids)
         
@@ -158,6 +232,7 @@ class SessionEventHandler:
             court_ordering = kwargs.get('ordering', [])
             if self.session.config.king_of_court_config:
                 self.session.config.king_of_court_config.court_ordering = court_ordering
+        mark_session_changed(self.session)
         
         # Re-evaluate session with new settings
         self._evaluate_and_advance_session()
@@ -183,6 +258,7 @@ class SessionEventHandler:
         for player_id in team1 + team2:
             if player_id in self.session.waiting_players:
                 self.session.waiting_players.remove(player_id)
+        mark_session_changed(self.session)
         
         self._emit_event('matches_changed')
         self._emit_event('session_updated')
@@ -190,11 +266,33 @@ class SessionEventHandler:
     def force_session_evaluation(self):
         """
         Force a session evaluation without any specific trigger.
-        Used for GUI refreshes, slider movements, etc.
+        Used after slider movements and other direct edits of session settings,
+        so the session is marked changed first.
         """
+        mark_session_changed(self.session)
         self._evaluate_and_advance_session()
         self._emit_event('session_updated')
     
+    def evaluate_if_changed(self) -> bool:
+        """
+        Evaluate the session only if it changed since the last evaluation.
+        Used by the GUI's periodic refresh; returns True if an evaluation ran.
+        
+        Matchmaking depends only on session state, so with the same version and the
+        same empty courts another evaluation would produce nothing new.
+        """
+        if self._evaluation_state() == self._last_evaluated_state:
+            return False
+        self._evaluate_and_advance_session()
+        self._emit_event('session_updated')
+        return True
+    
+    def _evaluation_state(self) -> Tuple[int, FrozenSet[int]]:
+        """Session version and the courts with no waiting or in-progress match"""
+        occupied = {m.court_number for m in self.session.matches if m.status in ('waiting', 'in-progress')}
+        empty_courts = frozenset(c for c in range(1, self.session.config.courts + 1) if c not in occupied)
+        return self.session.version, empty_courts
+    
     def _evaluate_and_advance_session(self):
         """
         Internal method to evaluate session and advance if needed.
@@ -206,6 +304,11 @@ class SessionEventHandler:
         except Exception as e:
             print(f"Session evaluation failed: {e}")
             # Could emit error event here
+        # Recorded after evaluating, so matches it just created don't force another pass
+        self._last_evaluated_state = self._evaluation_state()
+    
+    def _find_match(self, match_id: str) -> Optional[Match]:
+        return next((m for m in self.session.matches if m.id == match_id), None)
     
     def _generate_match_id(self) -> str:
         """Generate unique match ID"""
@@ -2,18 +2,46 @@
 Session persistence - save and load session state to/from files
 """
 
+import atexit
+import copy
 import json
 import os
+import sys
+import threading
+import time
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict, Tuple
 from pathlib import Path
 from .time_manager import now
-from .pickleball_types import Player
+from .pickleball_types import Player, MatchSnapshot, MatchSnapshotDelta
+from .session_journal import SessionJournal, diff_session_data, write_json_atomic
+from .player_history_store import PlayerHistoryStore, empty_player_history
+
+# Saves requested within this many seconds of each other are written together
+AUTOSAVE_DELAY_SECONDS = 1.0
+
+# Version of the saved session format. 1: full history snapshots (no version field);
+# 2: delta-encoded history snapshots; 3: history snapshot contents stored as JSON text
+SESSION_SCHEMA_VERSION = 3
+
+# Saved fields _adjust_times_for_resume needs once the time manager has started
+_RESUME_TIME_KEYS = ("session_start_time", "saved_at")
+
+# MatchSnapshot fields stored as the JSON text of a history keyframe
+_SNAPSHOT_STATE_FIELDS = (
+    "matches", "waiting_players", "player_stats", "active_players", "match_queue",
+    "player_last_court", "court_players", "courts_mixed_history"
+)
+
+# Match statuses that can still change without a note in Session.journal_edits
+_OPEN_MATCH_STATUSES = ('waiting', 'in-progress')
 
 # Session files locations
 SESSIONS_DIR = Path.home() / ".pickleball"
-LAST_SESSION_FILE = SESSIONS_DIR / "last_session.json"
-PLAYER_HISTORY_FILE = SESSIONS_DIR / "player_history.json"
+LAST_SESSION_FILE = SESSIONS_DIR / "last_session.json"  # Checkpoint of the session journal
+SESSION_JOURNAL_FILE = SESSIONS_DIR / "last_session.journal"
+PLAYER_HISTORY_FILE = SESSIONS_DIR / "player_history.json"  # Before the player history database; imported once
+PLAYER_HISTORY_DB = SESSIONS_DIR / "player_history.db"
 COURT_NAMES_FILE = SESSIONS_DIR / "court_names.json"
 COURT_ORDERING_FILE = SESSIONS_DIR / "court_ordering.json"
 
@@ -23,14 +51,48 @@ def ensure_session_dir():
     SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+_player_history_store: Optional[PlayerHistoryStore] = None
+
+
+def _read_legacy_player_history() -> Optional[Dict]:
+    """Contents of player_history.json, from before the player history database"""
+    if not PLAYER_HISTORY_FILE.exists():
+        return None
+    try:
+        with open(PLAYER_HISTORY_FILE, 'r') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Error reading old player history: {e}")
+        return None
+    history = empty_player_history()
+    for key in history:
+        if data.get(key) is not None:
+            history[key] = data[key]
+    return history
+
+
+def get_player_history_store() -> PlayerHistoryStore:
+    """The player history database (see player_history_store), importing player_history.json on first use"""
+    global _player_history_store
+    if _player_history_store is None or _player_history_store.path != PLAYER_HISTORY_DB:
+        _player_history_store = PlayerHistoryStore(PLAYER_HISTORY_DB)
+        if _player_history_store.is_empty():
+            legacy = _read_legacy_player_history()
+            if legacy is not None:
+                _player_history_store.save_setup(legacy)
+    return _player_history_store
+
+
 def save_player_history(player_names: List[str], first_bye_players: List[str] = None, 
                        players_with_ratings: List[Player] = None, pre_seeded: bool = False,
                        game_mode: str = None, session_type: str = None,
                        pool_assignments: Dict[str, List[str]] = None,
-                       pool_court_assignments: Dict[str, List[int]] = None):
-    """Save the list of player names, first bye players, pre-seeded ratings, and game configuration to history"""
-    ensure_session_dir()
-    
+                       pool_court_assignments: Dict[str, List[int]] = None,
+                       session=None):
+    """
+    Save the list of player names, first bye players, pre-seeded ratings, and game configuration to history.
+    With a session, the entry belongs to that session and its completed matches are recorded too.
+    """
     # Remove duplicates while preserving order
     seen = set()
     unique_players = []
@@ -43,120 +105,162 @@ def save_player_history(player_names: List[str], first_bye_players: List[str] =
     player_ratings = {}
     if pre_seeded and players_with_ratings:
         for player in players_with_ratings:
-            if player.skill_rating is not None:
+            if player.skill_rating is not None and player.name in seen:
                 player_ratings[player.name] = player.skill_rating
     
-    history_data = {
+    setup = {
         "players": unique_players,
         "first_bye_players": first_bye_players or [],
         "pre_seeded": pre_seeded,
         "player_ratings": player_ratings,
         "game_mode": game_mode,  # Store the game mode
         "session_type": session_type,  # Store session type (doubles/singles)
-        "last_updated": now().isoformat()
+        "pool_assignments": pool_assignments,  # Player names, not IDs
+        "pool_court_assignments": pool_court_assignments
     }
     
-    # Save pool assignments if provided (store as player names, not IDs)
-    if pool_assignments is not None:
-        history_data["pool_assignments"] = pool_assignments
-    if pool_court_assignments is not None:
-        history_data["pool_court_assignments"] = pool_court_assignments
+    session_id = started_at = matches = None
+    if session is not None:
+        session_id = session.id
+        started_at = session.session_start_time.isoformat() if session.session_start_time else None
+        names = {player.id: player.name for player in session.config.players}
+        matches = [
+            {
+                "id": match.id,
+                "court_number": match.court_number,
+                "team1": [names.get(pid, pid) for pid in match.team1],
+                "team2": [names.get(pid, pid) for pid in match.team2],
+                "team1_score": match.score.get('team1_score') if match.score else None,
+                "team2_score": match.score.get('team2_score') if match.score else None,
+                "end_time": match.end_time.isoformat() if match.end_time else None
+            }
+            for match in session.matches if match.status == 'completed'
+        ]
     
     try:
-        with open(PLAYER_HISTORY_FILE, 'w') as f:
-            json.dump(history_data, f, indent=2)
+        get_player_history_store().save_setup(setup, session_id, started_at, matches)
     except Exception as e:
         print(f"Error saving player history: {e}")
 
 
 def load_player_history() -> List[str]:
     """Load the list of player names from history"""
-    if not PLAYER_HISTORY_FILE.exists():
-        return []
-    
-    try:
-        with open(PLAYER_HISTORY_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get("players", [])
-    except Exception as e:
-        print(f"Error loading player history: {e}")
-        return []
+    return load_player_history_with_ratings()["players"]
 
 
 def load_player_history_with_ratings() -> Dict:
     """Load complete player history including pre-seeded ratings and game configuration"""
-    if not PLAYER_HISTORY_FILE.exists():
-        return {
-            "players": [], 
-            "first_bye_players": [], 
-            "pre_seeded": False, 
-            "player_ratings": {},
-            "game_mode": None,
-            "session_type": None,
-            "pool_assignments": None,
-            "pool_court_assignments": None
-        }
-    
     try:
-        with open(PLAYER_HISTORY_FILE, 'r') as f:
-            data = json.load(f)
-            return {
-                "players": data.get("players", []),
-                "first_bye_players": data.get("first_bye_players", []),
-                "pre_seeded": data.get("pre_seeded", False),
-                "player_ratings": data.get("player_ratings", {}),
-                "game_mode": data.get("game_mode", None),
-                "session_type": data.get("session_type", None),
-                "pool_assignments": data.get("pool_assignments", None),
-                "pool_court_assignments": data.get("pool_court_assignments", None)
-            }
+        return get_player_history_store().load_setup() or empty_player_history()
     except Exception as e:
         print(f"Error loading player history with ratings: {e}")
-        return {
-            "players": [], 
-            "first_bye_players": [], 
-            "pre_seeded": False, 
-            "player_ratings": {},
-            "game_mode": None,
-            "session_type": None,
-            "pool_assignments": None,
-            "pool_court_assignments": None
-        }
+        return empty_player_history()
 
 
 def load_first_bye_players() -> List[str]:
     """Load the list of first bye player names from history"""
-    if not PLAYER_HISTORY_FILE.exists():
-        return []
-    
+    return load_player_history_with_ratings()["first_bye_players"]
+
+
+def load_player_ratings(player_names: List[str]) -> Dict[str, float]:
+    """Most recent pre-seeded rating of each player from any earlier session (missing if never rated)"""
     try:
-        with open(PLAYER_HISTORY_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get("first_bye_players", [])
+        return get_player_history_store().latest_ratings(player_names)
     except Exception as e:
-        print(f"Error loading first bye players: {e}")
-        return []
+        print(f"Error loading player ratings: {e}")
+        return {}
 
 
 def serialize_session(session) -> Dict:
     """Convert session object to JSON-serializable dictionary"""
-    from python.pickleball_types import Session, Match
+    data = _serialize_session_state(session)
+    data["matches"] = [_serialize_match(match) for match in session.matches]
+    data["match_history_snapshots"] = [_serialize_snapshot(snapshot) for snapshot in session.match_history_snapshots]
+    return data
+
+
+def _serialize_match(match) -> Dict:
+    return {
+        "id": match.id,
+        "court_number": match.court_number,
+        "team1": list(match.team1),
+        "team2": list(match.team2),
+        "status": match.status,
+        "score": dict(match.score) if match.score else None,
+        "start_time": match.start_time.isoformat() if match.start_time else None,
+        "end_time": match.end_time.isoformat() if match.end_time else None
+    }
+
+
+def _serialize_snapshot(snapshot) -> Dict:
+    """History entry with its contents as JSON text (see StoredMatchSnapshot)"""
+    if isinstance(snapshot, (StoredMatchSnapshot, StoredMatchSnapshotDelta)):
+        state = snapshot.state  # Never decoded, or decoded from this same text
+    elif isinstance(snapshot, MatchSnapshotDelta):
+        state = json.dumps(snapshot.changes)
+    else:
+        state = json.dumps({name: getattr(snapshot, name) for name in _SNAPSHOT_STATE_FIELDS})
+    return {
+        "match_id": snapshot.match_id,
+        "timestamp": snapshot.timestamp.isoformat(),
+        "keyframe": isinstance(snapshot, MatchSnapshot),
+        "state": state
+    }
+
+
+def _decode_snapshot_state(state: str) -> Dict:
+    decoded = json.loads(state)
+    _intern_ids(decoded)
+    return decoded
+
+
+class StoredMatchSnapshot(MatchSnapshot):
+    """
+    History keyframe read from a saved session. Only the match id and time are
+    decoded on load; the rest stays JSON text until a field is first read
+    (undo to this point, or a later entry resolved against it).
+    """
     
-    # Serialize matches
-    matches_data = []
-    for match in session.matches:
-        match_data = {
-            "id": match.id,
-            "court_number": match.court_number,
-            "team1": list(match.team1),
-            "team2": list(match.team2),
-            "status": match.status,
-            "score": dict(match.score) if match.score else None,
-            "start_time": match.start_time.isoformat() if match.start_time else None,
-            "end_time": match.end_time.isoformat() if match.end_time else None
-        }
-        matches_data.append(match_data)
+    def __init__(self, match_id: str, timestamp: datetime, state: str):
+        self.match_id = match_id
+        self.timestamp = timestamp
+        self.state = state
+        self._decoded = None
+    
+    def _field(self, name: str):
+        if self._decoded is None:
+            self._decoded = _decode_snapshot_state(self.state)
+        return self._decoded[name]
+
+
+class StoredMatchSnapshotDelta(MatchSnapshotDelta):
+    """History delta read from a saved session; changes are decoded on first use"""
+    
+    def __init__(self, match_id: str, timestamp: datetime, state: str):
+        self.match_id = match_id
+        self.timestamp = timestamp
+        self.state = state
+        self._decoded = None
     
+    @property
+    def changes(self) -> Dict:
+        if self._decoded is None:
+            self._decoded = _decode_snapshot_state(self.state)
+        return self._decoded
+
+
+for _name in _SNAPSHOT_STATE_FIELDS:
+    setattr(StoredMatchSnapshot, _name, property(lambda self, name=_name: self._field(name)))
+
+
+def _serialize_session_state(session) -> Dict:
+    """
+    Everything serialize_session writes except the matches and history snapshots:
+    settings, player stats, waitlist and queue, whose size is set by the roster
+    rather than by the length of the session (apart from each player's court
+    history). Tables are copied, so the journal's last_data does not change along
+    with the session.
+    """
     # Serialize player stats
     stats_data = {}
     for player_id, stats in session.player_stats.items():
@@ -166,13 +270,13 @@ def serialize_session(session) -> Dict:
             "games_waited": stats.games_waited,
             "wins": stats.wins,
             "losses": stats.losses,
-            "partners_played": stats.partners_played,
-            "opponents_played": stats.opponents_played,
+            "partners_played": dict(stats.partners_played),
+            "opponents_played": dict(stats.opponents_played),
             "total_points_for": stats.total_points_for,
             "total_points_against": stats.total_points_against,
-            "partner_last_game": stats.partner_last_game,
-            "opponent_last_game": stats.opponent_last_game,
-            "court_history": stats.court_history,
+            "partner_last_game": dict(stats.partner_last_game),
+            "opponent_last_game": dict(stats.opponent_last_game),
+            "court_history": list(stats.court_history),
             "total_wait_time": stats.total_wait_time,
             "wait_start_time": stats.wait_start_time.isoformat() if stats.wait_start_time else None
         }
@@ -185,23 +289,6 @@ def serialize_session(session) -> Dict:
             "team2": list(queued_match.team2)
         })
     
-    # Serialize match history snapshots
-    snapshots_data = []
-    for snapshot in session.match_history_snapshots:
-        snapshot_data = {
-            "match_id": snapshot.match_id,
-            "timestamp": snapshot.timestamp.isoformat(),
-            "matches": snapshot.matches,
-            "waiting_players": snapshot.waiting_players,
-            "player_stats": snapshot.player_stats,
-            "active_players": snapshot.active_players,
-            "match_queue": snapshot.match_queue,
-            "player_last_court": snapshot.player_last_court,
-            "court_players": snapshot.court_players,
-            "courts_mixed_history": snapshot.courts_mixed_history
-        }
-        snapshots_data.append(snapshot_data)
-    
     # Serialize pooled continuous RR config if present
     pooled_rr_config_data = None
     if session.config.pooled_continuous_rr_config:
@@ -243,6 +330,7 @@ def serialize_session(session) -> Dict:
         }
     
     return {
+        "schema_version": SESSION_SCHEMA_VERSION,
         "session_id": session.id,
         "config": {
             "mode": session.config.mode,
@@ -255,113 +343,124 @@ def serialize_session(session) -> Dict:
             "randomize_player_order": session.config.randomize_player_order,
             "pooled_continuous_rr_config": pooled_rr_config_data
         },
-        "matches": matches_data,
-        "waiting_players": session.waiting_players,
+        "waiting_players": list(session.waiting_players),
         "player_stats": stats_data,
         "active_players": list(session.active_players),
         "match_queue": queue_data,
-        "match_history_snapshots": snapshots_data,
         "first_bye_used": session.first_bye_used,
         "competitive_variety_roaming_range_percent": session.competitive_variety_roaming_range_percent,
         "competitive_variety_partner_repetition_limit": session.competitive_variety_partner_repetition_limit,
         "competitive_variety_opponent_repetition_limit": session.competitive_variety_opponent_repetition_limit,
         "adaptive_balance_weight": session.adaptive_balance_weight,
         "adaptive_constraints_disabled": session.adaptive_constraints_disabled,
+        "competitive_variety_joint_court_solver": session.competitive_variety_joint_court_solver,
+        "competitive_variety_joint_solver_time_budget": session.competitive_variety_joint_solver_time_budget,
         "session_exported": session.session_exported,
         "session_start_time": session.session_start_time.isoformat() if session.session_start_time else None,
         "saved_at": now().isoformat()
     }
 
 
-def deserialize_session(data: Dict):
-    """Convert JSON-serialized dictionary back to session object"""
-    from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats, QueuedMatch
-    from python.utils import generate_id
+def serialize_session_changes(session, saved: Dict, open_positions: List[int]) -> Optional[Tuple[Dict, List[int]]]:
+    """
+    Changes from saved - the journal's copy of the last save of this session - to
+    the session, in the form diff_session_data returns, plus the positions of the
+    matches still waiting or in progress.
     
-    # Reconstruct config
-    players = [Player(id=p["id"], name=p["name"]) for p in data["config"]["players"]]
-    config = SessionConfig(
-        mode=data["config"]["mode"],
-        session_type=data["config"]["session_type"],
-        players=players,
-        courts=data["config"]["courts"],
-        banned_pairs=data["config"]["banned_pairs"],
-        locked_teams=data["config"]["locked_teams"],
-        first_bye_players=data["config"].get("first_bye_players", []),
-        randomize_player_order=data["config"]["randomize_player_order"]
-    )
+    Only what can have changed is serialized: the matches at open_positions (waiting
+    or in progress at the last save, so courts edits, slides, completions and forfeits
+    all land there), finished matches noted in session.journal_edits (score edits),
+    matches and history snapshots added since, and the roster-sized state. Returns
+    None when the history was rewritten (journal_edits is None after a snapshot
+    restore or undo); the caller then diffs the whole session.
+    """
+    edited = session.journal_edits
+    matches = session.matches
+    snapshots = session.match_history_snapshots
+    saved_matches = saved["matches"]
+    saved_snapshots = saved["match_history_snapshots"]
+    if edited is None or len(matches) < len(saved_matches) or len(snapshots) < len(saved_snapshots):
+        return None
     
-    # Reconstruct player stats
-    player_stats = {}
-    for player_id, stats_data in data["player_stats"].items():
-        # Reconstruct wait_start_time if it exists
-        wait_start_time = None
-        if stats_data.get("wait_start_time"):
-            from datetime import datetime as dt
-            wait_start_time = dt.fromisoformat(stats_data["wait_start_time"])
-        
-        # Handle backward compatibility for stats (Set -> Dict)
-        partners_data = stats_data["partners_played"]
-        if isinstance(partners_data, list):
-            partners_played = {pid: 1 for pid in partners_data}
-        else:
-            partners_played = partners_data
-
-        opponents_data = stats_data["opponents_played"]
-        if isinstance(opponents_data, list):
-            opponents_played = {pid: 1 for pid in opponents_data}
-        else:
-            opponents_played = opponents_data
-
-        player_stats[player_id] = PlayerStats(
-            player_id=stats_data["player_id"],
-            games_played=stats_data["games_played"],
-            games_waited=stats_data["games_waited"],
-            wins=stats_data["wins"],
-            losses=stats_data["losses"],
-            partners_played=partners_played,
-            opponents_played=opponents_played,
-            total_points_for=stats_data["total_points_for"],
-            total_points_against=stats_data["total_points_against"],
-            partner_last_game=stats_data.get("partner_last_game", {}),
-            opponent_last_game=stats_data.get("opponent_last_game", {}),
-            court_history=stats_data.get("court_history", []),
-            total_wait_time=stats_data.get("total_wait_time", 0),
-            wait_start_time=wait_start_time
-        )
+    state = _serialize_session_state(session)
+    changes = diff_session_data({key: saved.get(key) for key in state}, state)
     
-    # Reconstruct matches
-    matches = []
-    for match_data in data["matches"]:
-        start_time = None
-        if match_data.get("start_time"):
-            from datetime import datetime as dt
-            start_time = dt.fromisoformat(match_data["start_time"])
-        
-        end_time = None
-        if match_data.get("end_time"):
-            from datetime import datetime as dt
-            end_time = dt.fromisoformat(match_data["end_time"])
-        
-        match = Match(
-            id=match_data["id"],
-            court_number=match_data["court_number"],
-            team1=match_data["team1"],
-            team2=match_data["team2"],
-            status=match_data["status"],
-            score=match_data.get("score"),
-            start_time=start_time,
-            end_time=end_time
-        )
-        matches.append(match)
+    positions = set(open_positions)
+    if edited:
+        # Score edits of finished matches are rare enough to look up by scanning
+        positions.update(pos for pos in range(len(saved_matches)) if matches[pos].id in edited)
+    changed = []
+    for pos in sorted(positions):
+        match_data = _serialize_match(matches[pos])
+        if match_data != saved_matches[pos]:
+            changed.append([pos, match_data])
+    appended = [_serialize_match(match) for match in matches[len(saved_matches):]]
+    if changed or appended:
+        changes["matches"] = {"list": {"length": len(matches), "changed": changed, "appended": appended}}
+    if len(snapshots) > len(saved_snapshots):
+        changes["match_history_snapshots"] = {"list": {
+            "length": len(snapshots),
+            "changed": [],
+            "appended": [_serialize_snapshot(snapshot) for snapshot in snapshots[len(saved_snapshots):]]
+        }}
     
+    still_open = [pos for pos in sorted(positions) if matches[pos].status in _OPEN_MATCH_STATUSES]
+    still_open.extend(pos for pos in range(len(saved_matches), len(matches))
+                      if matches[pos].status in _OPEN_MATCH_STATUSES)
+    return changes, still_open
+
+
+def _open_match_positions(data: Dict) -> List[int]:
+    return [pos for pos, match in enumerate(data["matches"]) if match["status"] in _OPEN_MATCH_STATUSES]
+
+
+def _check_schema_version(data: Dict) -> int:
+    """Schema version of saved session data, rejecting files written by a newer version"""
+    version = data.get("schema_version", 1)
+    if not isinstance(version, int) or version < 1:
+        raise ValueError(f"Invalid session schema version: {version!r}")
+    if version > SESSION_SCHEMA_VERSION:
+        raise ValueError(f"Session was saved with schema version {version}, "
+                         f"this version reads up to {SESSION_SCHEMA_VERSION}")
+    return version
+
+
+def _intern_ids(value) -> None:
+    """
+    Intern the strings in the lists of parsed session data, in place.
+
+    Player IDs in team lists, waitlists and snapshots come out of json.loads as a separate
+    string per occurrence (dict keys are already shared, see _intern_keys). Interned, each
+    ID is one object wherever it appears, and `pid in match.team1` matches on identity.
+    """
+    if isinstance(value, dict):
+        for item in value.values():
+            if isinstance(item, (dict, list)):
+                _intern_ids(item)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, str):
+                value[i] = sys.intern(item)
+            elif isinstance(item, (dict, list)):
+                _intern_ids(item)
+
+
+def _intern_keys(table: Dict) -> Dict:
+    """Copy of a player-keyed table with interned keys, for tables kept on the live session"""
+    return {sys.intern(key): value for key, value in table.items()}
+
+
 def deserialize_session(data: Dict):
     """Convert JSON-serialized dictionary back to session object"""
-    from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats, QueuedMatch, MatchSnapshot
+    # Version 1 files differ only in holding full snapshots, which are read the same way as keyframes.
+    # Version 2 snapshots are parsed along with the file; version 3 ones are left as JSON text.
+    _check_schema_version(data)
+    _intern_ids(data)
+    from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats, QueuedMatch, MatchSnapshot, MatchSnapshotDelta
     from python.utils import generate_id
     
     # Reconstruct config
-    players = [Player(id=p["id"], name=p["name"]) for p in data["config"]["players"]]
+    players = [Player(id=sys.intern(p["id"]), name=p["name"]) for p in data["config"]["players"]]
     config = SessionConfig(
         mode=data["config"]["mode"],
         session_type=data["config"]["session_type"],
@@ -434,16 +533,16 @@ def deserialize_session(data: Dict):
         if isinstance(partners_data, list):
             partners_played = {pid: 1 for pid in partners_data}
         else:
-            partners_played = partners_data
+            partners_played = _intern_keys(partners_data)
 
         opponents_data = stats_data["opponents_played"]
         if isinstance(opponents_data, list):
             opponents_played = {pid: 1 for pid in opponents_data}
         else:
-            opponents_played = opponents_data
+            opponents_played = _intern_keys(opponents_data)
 
-        player_stats[player_id] = PlayerStats(
-            player_id=stats_data["player_id"],
+        player_stats[sys.intern(player_id)] = PlayerStats(
+            player_id=sys.intern(stats_data["player_id"]),
             games_played=stats_data["games_played"],
             games_waited=stats_data["games_waited"],
             wins=stats_data["wins"],
@@ -452,9 +551,9 @@ def deserialize_session(data: Dict):
             opponents_played=opponents_played,
             total_points_for=stats_data["total_points_for"],
             total_points_against=stats_data["total_points_against"],
-            partner_last_game=stats_data.get("partner_last_game", {}),
-            opponent_last_game=stats_data.get("opponent_last_game", {}),
-            court_history=stats_data.get("court_history", []),
+            partner_last_game=_intern_keys(stats_data.get("partner_last_game", {})),
+            opponent_last_game=_intern_keys(stats_data.get("opponent_last_game", {})),
+            court_history=list(stats_data.get("court_history", [])),
             total_wait_time=stats_data.get("total_wait_time", 0),
             wait_start_time=wait_start_time
         )
@@ -489,9 +588,24 @@ def deserialize_session(data: Dict):
     for queue_data in data["match_queue"]:
         match_queue.append(QueuedMatch(team1=list(queue_data["team1"]), team2=list(queue_data["team2"])))
     
-    # Reconstruct match history snapshots
+    # Reconstruct match history snapshots; version 3 entries are decoded on first use
     match_history_snapshots = []
     for snapshot_data in data.get("match_history_snapshots", []):
+        if "state" in snapshot_data:
+            stored = StoredMatchSnapshot if snapshot_data["keyframe"] else StoredMatchSnapshotDelta
+            match_history_snapshots.append(stored(
+                match_id=snapshot_data["match_id"],
+                timestamp=datetime.fromisoformat(snapshot_data["timestamp"]),
+                state=snapshot_data["state"]
+            ))
+            continue
+        if "changes" in snapshot_data:
+            match_history_snapshots.append(MatchSnapshotDelta(
+                match_id=snapshot_data["match_id"],
+                timestamp=datetime.fromisoformat(snapshot_data["timestamp"]),
+                changes=snapshot_data["changes"]
+            ))
+            continue
         snapshot = MatchSnapshot(
             match_id=snapshot_data["match_id"],
             timestamp=datetime.fromisoformat(snapshot_data["timestamp"]),
@@ -511,7 +625,7 @@ def deserialize_session(data: Dict):
         id=data["session_id"],
         config=config,
         matches=matches,
-        waiting_players=data["waiting_players"],
+        waiting_players=list(data["waiting_players"]),
         player_stats=player_stats,
         active_players=set(data["active_players"]),
         match_queue=match_queue,
@@ -533,6 +647,10 @@ def deserialize_session(data: Dict):
         session.adaptive_balance_weight = data["adaptive_balance_weight"]
     if "adaptive_constraints_disabled" in data:
         session.adaptive_constraints_disabled = data["adaptive_constraints_disabled"]
+    if "competitive_variety_joint_court_solver" in data:
+        session.competitive_variety_joint_court_solver = data["competitive_variety_joint_court_solver"]
+    if "competitive_variety_joint_solver_time_budget" in data:
+        session.competitive_variety_joint_solver_time_budget = data["competitive_variety_joint_solver_time_budget"]
     if "session_exported" in data:
         session.session_exported = data["session_exported"]
     
@@ -541,8 +659,8 @@ def deserialize_session(data: Dict):
         from datetime import datetime as dt
         session.session_start_time = dt.fromisoformat(data["session_start_time"])
     
-    # Store the original data for later wait time adjustment
-    session._original_serialized_data = data
+    # Keep only the timestamps for later wait time adjustment, not the whole parsed file
+    session._original_serialized_data = {key: data.get(key) for key in _RESUME_TIME_KEYS}
     
     return session
 
@@ -635,15 +753,36 @@ def _adjust_times_for_resume(session, original_data):
             match.start_time = new_match_start_time
 
 
-def save_session(session) -> bool:
-    """Save session state to file"""
+_session_journal: Optional[SessionJournal] = None
+# Serializes journal writes between the autosave thread and direct save_session calls
+_save_lock = threading.Lock()
+# session id -> what save_session last recorded in the player history (see _player_history_key)
+_player_history_saved: Dict[str, tuple] = {}
+# session id -> positions of the matches waiting or in progress in its last journal record
+_journal_open_matches: Dict[str, List[int]] = {}
+
+
+def get_session_journal() -> SessionJournal:
+    """The journal behind save_session/load_last_session"""
+    global _session_journal
+    if _session_journal is None:
+        _session_journal = SessionJournal(LAST_SESSION_FILE, SESSION_JOURNAL_FILE)
+    return _session_journal
+
+
+def save_session(session, event: str = "save", checkpoint: bool = False) -> bool:
+    """
+    Save session state.
+    
+    Appends what changed since the last save to the session journal; the full
+    session is only written on the first save, every few dozen events, or when
+    checkpoint is True (e.g. when the session window closes).
+    """
     ensure_session_dir()
     
     try:
-        session_data = serialize_session(session)
-        
-        with open(LAST_SESSION_FILE, 'w') as f:
-            json.dump(session_data, f, indent=2)
+        with _save_lock:
+            _write_session_journal(get_session_journal(), session, event, checkpoint)
         
         # Also update player history with first bye players (convert IDs to names)
         player_names = [p.name for p in session.config.players if p.id in session.active_players]
@@ -654,14 +793,21 @@ def save_session(session) -> bool:
                     bye_player_names.append(player.name)
                     break
         active_players_list = [p for p in session.config.players if p.id in session.active_players]
-        save_player_history(
-            player_names, 
-            bye_player_names,
-            players_with_ratings=active_players_list,
-            pre_seeded=session.config.pre_seeded_ratings,
-            game_mode=session.config.mode,
-            session_type=session.config.session_type
-        )
+        history_key = _player_history_key(session, player_names, bye_player_names, active_players_list)
+        with _save_lock:
+            unchanged = _player_history_saved.get(session.id) == history_key
+        if not unchanged:
+            save_player_history(
+                player_names, 
+                bye_player_names,
+                players_with_ratings=active_players_list,
+                pre_seeded=session.config.pre_seeded_ratings,
+                game_mode=session.config.mode,
+                session_type=session.config.session_type,
+                session=session
+            )
+            with _save_lock:
+                _player_history_saved[session.id] = history_key
         
         return True
     except Exception as e:
@@ -669,15 +815,235 @@ def save_session(session) -> bool:
         return False
 
 
+def _write_session_journal(journal: SessionJournal, session, event: str, checkpoint: bool) -> None:
+    """
+    Record the session in the journal (under _save_lock). Follow-up saves of the same
+    session serialize only what changed (serialize_session_changes); the first save,
+    checkpoints and saves after a rewritten history serialize the whole session.
+    """
+    update = None
+    open_positions = _journal_open_matches.get(session.id)
+    if not checkpoint and open_positions is not None and journal.can_append(session.id):
+        update = serialize_session_changes(session, journal.last_data, open_positions)
+    
+    if update is not None:
+        changes, open_positions = update
+        journal.append(changes, event)
+    else:
+        data = serialize_session(session)
+        if checkpoint:
+            journal.checkpoint(data)
+        else:
+            journal.save(data, event)
+        open_positions = _open_match_positions(data)
+    _journal_open_matches[session.id] = open_positions
+    session.journal_edits = set()  # Edits from here on go in the next record
+
+
+def _player_history_key(session, player_names: List[str], bye_player_names: List[str],
+                        active_players: List[Player]) -> tuple:
+    """Everything save_session records in the player history: roster, setup and completed matches"""
+    return (
+        tuple(player_names),
+        tuple(bye_player_names),
+        tuple((p.name, p.skill_rating) for p in active_players),
+        session.config.pre_seeded_ratings,
+        session.config.mode,
+        session.config.session_type,
+        tuple(
+            (match.id, match.court_number, tuple(match.team1), tuple(match.team2),
+             tuple(sorted(match.score.items())) if match.score else None, match.end_time)
+            for match in session.matches if match.status == 'completed'
+        )
+    )
+
+
+def _freeze_for_save(session):
+    """
+    Copy of everything serialize_session reads that the GUI thread may still change.
+    Taken once per save window, just before the write; the expensive serialization
+    then runs on the copy.
+    """
+    from python.trial_session import freeze_session
+    
+    frozen = freeze_session(session)
+    frozen.matches = [copy.copy(match) for match in frozen.matches]  # Score edits replace fields of finished matches
+    frozen.config = copy.deepcopy(session.config)  # Player changes edit the config in place
+    # The copy's save records the edits noted so far; later ones go in the next save
+    frozen.journal_edits = session.journal_edits
+    session.journal_edits = set()
+    return frozen
+
+
+def _merge_events(events: List[str], more: List[str]) -> List[str]:
+    return events + [event for event in more if event not in events]
+
+
+def _supersede(older, newer):
+    """Frozen save newer replacing older, which was never written: keep the events and edits of both"""
+    older_session, older_events = older
+    session, events = newer
+    if older_session.journal_edits is None or session.journal_edits is None:
+        session.journal_edits = None
+    else:
+        session.journal_edits |= older_session.journal_edits
+    return session, _merge_events(older_events, events)
+
+
+class AutosaveService:
+    """
+    Coalescing background session saves.
+    
+    request() only notes the session and returns at once. When the save window
+    (delay seconds from the first pending request) has passed, the session is frozen
+    and a worker thread writes the copy, so a burst of requests (score entry, court
+    slide, edits) costs one freeze and one write. The freeze runs through
+    call_on_owner when set - a function that runs a callable on the thread that edits
+    the session (the GUI thread) - and on the worker otherwise. flush() freezes and
+    writes anything pending on the calling thread.
+    """
+    
+    def __init__(self, delay: float = AUTOSAVE_DELAY_SECONDS,
+                 call_on_owner: Optional[Callable[[Callable[[], None]], None]] = None):
+        self.delay = delay
+        self.call_on_owner = call_on_owner
+        self._condition = threading.Condition()
+        self._pending = None  # (live session, [events]) waiting for the save window to close
+        self._frozen = None  # (frozen session, [events]) waiting for the worker
+        self._freeze_requested = False  # _freeze_pending handed to call_on_owner and not run yet
+        self._deadline = 0.0
+        self._writing = False
+        self._thread: Optional[threading.Thread] = None
+        self.freezes = 0
+        self.writes = 0
+    
+    def request(self, session, event: str = "save") -> None:
+        """Queue a save of the session; the state written is the one when the save window closes"""
+        with self._condition:
+            if self._pending is None:
+                self._deadline = time.monotonic() + self.delay
+                events = [event]
+            else:
+                events = self._pending[1]
+                if event not in events:
+                    events.append(event)
+            self._pending = (session, events)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+    
+    def _freeze(self, pending):
+        session, events = pending
+        frozen = _freeze_for_save(session)
+        with self._condition:
+            self.freezes += 1
+        return frozen, events
+    
+    def _freeze_pending(self) -> None:
+        """Freeze the pending session for the worker (passed to call_on_owner)"""
+        with self._condition:
+            pending = self._pending
+            self._pending = None
+            self._freeze_requested = False
+            self._condition.notify_all()
+        if pending is None:
+            return  # Flushed or discarded meanwhile
+        frozen = self._freeze(pending)
+        with self._condition:
+            if self._frozen is not None:  # Previous copy not picked up yet; this one supersedes it
+                frozen = _supersede(self._frozen, frozen)
+            self._frozen = frozen
+            self._condition.notify_all()
+    
+    def _take_pending(self):
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            taken = (self._frozen, self._pending)
+            self._frozen = self._pending = None
+            return taken
+    
+    def flush(self) -> bool:
+        """Wait for a write in progress and write any pending save now"""
+        frozen, pending = self._take_pending()
+        if pending is not None:
+            newer = self._freeze(pending)
+            frozen = newer if frozen is None else _supersede(frozen, newer)
+        if frozen is None:
+            return True
+        return self._write(frozen)
+    
+    def discard(self) -> None:
+        """Wait for a write in progress and drop any pending save"""
+        self._take_pending()
+    
+    def _write(self, frozen) -> bool:
+        session, events = frozen
+        self.writes += 1
+        return save_session(session, event="+".join(events))
+    
+    def _run(self):
+        while True:
+            frozen = pending = call_on_owner = None
+            with self._condition:
+                if self._frozen is not None:
+                    frozen = self._frozen
+                    self._frozen = None
+                    self._writing = True
+                elif self._pending is None or self._freeze_requested:
+                    self._condition.wait()
+                    continue
+                else:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+                    if self.call_on_owner is not None:
+                        call_on_owner = self.call_on_owner
+                        self._freeze_requested = True
+                    else:
+                        pending = self._pending
+                        self._pending = None
+                        self._writing = True
+            if call_on_owner is not None:
+                call_on_owner(self._freeze_pending)
+                continue
+            try:
+                if pending is not None:
+                    frozen = self._freeze(pending)
+                self._write(frozen)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+
+_autosave_service: Optional[AutosaveService] = None
+
+
+def get_autosave_service() -> AutosaveService:
+    """The shared autosave service; pending saves are flushed at exit"""
+    global _autosave_service
+    if _autosave_service is None:
+        _autosave_service = AutosaveService()
+        atexit.register(_autosave_service.flush)
+    return _autosave_service
+
+
+def request_session_save(session, event: str = "save") -> None:
+    """Save the session in the background, coalesced with other saves in the same window"""
+    get_autosave_service().request(session, event)
+
+
 def load_last_session() -> Optional:
     """Load the last saved session state"""
     if not LAST_SESSION_FILE.exists():
         return None
     
     try:
-        with open(LAST_SESSION_FILE, 'r') as f:
-            data = json.load(f)
-            return deserialize_session(data)
+        data = get_session_journal().load()
+        return deserialize_session(data)
     except Exception as e:
         print(f"Error loading last session: {e}")
         return None
@@ -691,8 +1057,9 @@ def has_saved_session() -> bool:
 def clear_saved_session() -> bool:
     """Clear the saved session file"""
     try:
-        if LAST_SESSION_FILE.exists():
-            LAST_SESSION_FILE.unlink()
+        if _autosave_service is not None:
+            _autosave_service.discard()
+        get_session_journal().clear()
         return True
     except Exception as e:
         print(f"Error clearing saved session: {e}")
@@ -0,0 +1,259 @@
+"""
+Session Undo - undo/redo of recorded session changes
+
+Each command (match completion, forfeit, score edit, manual court, team change,
+player changes) runs through UndoStack.record, which takes the values of the
+session state the command can touch just before and just after it runs:
+
+- the unfinished matches and any finished match the command names, field by
+  field, plus the matches and history snapshots it appends
+- every player's counters and the new end of their court history, and the
+  partner/opponent tables of the players the command involves
+- the waitlist, queue, court tracking and mode schedule state
+
+Undo writes the before values back into the same objects and redo the after
+values, so both cost time and memory in proportion to the courts and players
+involved, never to the number of matches played: completed matches and history
+snapshots are not copied.
+
+A command is only replayed onto the state it left behind. If the session changed
+some other way since (session.version moved), undo and redo are refused and the
+stack is cleared.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .pickleball_types import Session, Match
+
+UNDO_LIMIT = 50
+
+_MATCH_FIELDS = ("court_number", "team1", "team2", "status", "score", "start_time", "end_time")
+_PLAYER_COUNTERS = (
+    "games_played", "games_waited", "wins", "losses", "total_points_for", "total_points_against",
+    "wait_start_time", "total_wait_time", "courts_completed_since_last_play"
+)
+_PLAYER_TABLES = ("partners_played", "opponents_played", "partner_last_game", "opponent_last_game")
+_SESSION_FIELDS = (
+    "config", "waiting_players", "active_players", "match_queue", "player_last_court", "court_players",
+    "courts_mixed_history", "first_bye_used",
+    "competitive_variety_roaming_range_percent", "competitive_variety_partner_repetition_limit",
+    "competitive_variety_opponent_repetition_limit",
+    "king_of_court_round_number", "king_of_court_player_positions", "king_of_court_wait_counts",
+    "king_of_court_waitlist_history", "king_of_court_waitlist_rotation_index"
+)
+# Set on the session by matchmaking helpers only once they are first needed
+_OPTIONAL_SESSION_FIELDS = ("courts_mixed_last_round", "player_court_history")
+_MISSING = object()
+
+
+def _copy(value):
+    """Copy of a field value deep enough that later in-place edits don't reach it"""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, set):
+        return set(value)
+    if isinstance(value, dict):
+        return {key: list(item) if isinstance(item, list) else item for key, item in value.items()}
+    return value
+
+
+def _capture(obj, names: Iterable[str]) -> Tuple[Any, Dict[str, Any]]:
+    return obj, {name: _copy(getattr(obj, name, _MISSING)) for name in names}
+
+
+def _restore(captured: Tuple[Any, Dict[str, Any]]) -> None:
+    obj, values = captured
+    for name, value in values.items():
+        if value is _MISSING:
+            if hasattr(obj, name):
+                delattr(obj, name)
+        else:
+            setattr(obj, name, _copy(value))
+
+
+def _schedule_objects(session: Session) -> List[Tuple[Any, Tuple[str, ...]]]:
+    """Mode schedule objects whose fields matchmaking updates as matches are played"""
+    objects = []
+    crr = session.config.competitive_round_robin_config
+    if crr is not None:
+        objects.append((crr, ("scheduled_waiters", "current_round")))
+        objects.extend((scheduled, ("status",)) for scheduled in crr.scheduled_matches)
+    pooled = session.config.pooled_continuous_rr_config
+    if pooled is not None:
+        objects.append((pooled, ("scheduled_pool_matches", "crossover_matches", "pool_completed", "crossover_active")))
+        objects.extend((pooled_match, ("status",)) for pooled_match in pooled.scheduled_pool_matches + pooled.crossover_matches)
+    return objects
+
+
+class SessionState:
+    """Values of the session state a command can touch, taken just before or just after it"""
+
+    def __init__(self, session: Session, players: Iterable[str], matches: Iterable[Match],
+                 whole_session: bool, before: Optional['SessionState'] = None):
+        # Items appended by the command are kept from the length they had before it
+        self.matches_floor = before.matches_floor if before else len(session.matches)
+        self.appended_matches = session.matches[self.matches_floor:]
+        self.snapshots_floor = before.snapshots_floor if before else len(session.match_history_snapshots)
+        self.appended_snapshots = session.match_history_snapshots[self.snapshots_floor:]
+        self.snapshot_head = session.snapshot_head
+
+        touched = {id(match): match for match in matches}
+        if before:
+            touched.update((id(match), match) for match, _ in before.match_fields)  # Including ones just finished
+        else:
+            touched.update((id(match), match) for match in session.matches if match.status in ('waiting', 'in-progress'))
+        touched.update((id(match), match) for match in self.appended_matches)
+        self.match_fields = [_capture(match, _MATCH_FIELDS) for match in touched.values()]
+
+        players = [pid for pid in players if pid in session.player_stats]
+        self.whole_session = whole_session
+        if whole_session:
+            self.stats_entries = dict(session.player_stats)
+            counter_stats = list(session.player_stats.values())
+            self.session_fields = _capture(session, _SESSION_FIELDS + _OPTIONAL_SESSION_FIELDS)
+            self.config_players = list(session.config.players)
+            self.waitlist_predictions = session.advanced_config.waitlist_predictions
+            self.schedule = [_capture(obj, names) for obj, names in _schedule_objects(session)]
+        else:
+            self.stats_entries = None
+            counter_stats = [session.player_stats[pid] for pid in players]
+        self.counters = [_capture(stats, _PLAYER_COUNTERS) for stats in counter_stats]
+        self.tables = [_capture(session.player_stats[pid], _PLAYER_TABLES) for pid in players]
+
+        # Court history only grows at the end
+        self.history_floors = {
+            stats.player_id: before.history_floors.get(stats.player_id, 0) if before else len(stats.court_history)
+            for stats in counter_stats
+        }
+        self.history_tails = [
+            (stats, self.history_floors[stats.player_id], stats.court_history[self.history_floors[stats.player_id]:])
+            for stats in counter_stats
+        ]
+
+    def restore(self, session: Session) -> None:
+        """Put the session back into this state"""
+        from .session import mark_session_changed
+
+        if self.stats_entries is not None:
+            session.player_stats.clear()
+            session.player_stats.update(self.stats_entries)
+        del session.matches[self.matches_floor:]
+        session.matches.extend(self.appended_matches)
+        del session.match_history_snapshots[self.snapshots_floor:]
+        session.match_history_snapshots.extend(self.appended_snapshots)
+        session.snapshot_head = self.snapshot_head
+
+        for captured in self.match_fields + self.counters + self.tables:
+            _restore(captured)
+        for stats, floor, tail in self.history_tails:
+            del stats.court_history[floor:]
+            stats.court_history.extend(tail)
+
+        if self.whole_session:
+            _restore(self.session_fields)
+            session.config.players = list(self.config_players)
+            session.advanced_config.waitlist_predictions = self.waitlist_predictions
+            for captured in self.schedule:
+                _restore(captured)
+            session.relationship_index = None  # Rebuilt from the restored matches on next use
+
+        session.pair_matrix = None  # Stats tables were put back in place
+        session.journal_edits = None  # Any match may have changed; the next save diffs the whole session
+        mark_session_changed(session)  # Also drops the cached ranking
+
+
+@dataclass
+class SessionCommand:
+    """A recorded change: the touched state before and after it"""
+    description: str
+    before: SessionState
+    after: SessionState
+    version: int  # session.version while the command is next to undo or redo
+
+
+class UndoStack:
+    """Recorded commands of one session, newest last"""
+
+    def __init__(self, limit: int = UNDO_LIMIT):
+        self.limit = limit
+        self.undo_commands: List[SessionCommand] = []
+        self.redo_commands: List[SessionCommand] = []
+        self._recording = False
+
+    def record(self, session: Session, description: str, action: Callable[[], Any],
+               players: Iterable[str] = (), matches: Iterable[Match] = (), whole_session: bool = True):
+        """
+        Run action as an undoable command and return its result.
+
+        players are those whose partner/opponent tables the command may change; players of
+        the named matches are included. A command that only rescores a finished match can
+        pass whole_session=False, so only the named matches and their players are recorded.
+        Commands run inside another command's action are part of that command.
+        """
+        if self._recording:
+            return action()
+
+        matches = list(matches)
+        players = set(players)
+        for match in matches:
+            players.update(match.team1 + match.team2)
+
+        version = session.version
+        before = SessionState(session, players, matches, whole_session)
+        self._recording = True
+        try:
+            result = action()
+        finally:
+            self._recording = False
+        if session.version == version:
+            return result  # Nothing changed, nothing to undo
+
+        for match in matches:
+            players.update(match.team1 + match.team2)  # Team changes involve the new players too
+        after = SessionState(session, players, matches, whole_session, before)
+        self.undo_commands.append(SessionCommand(description, before, after, session.version))
+        del self.undo_commands[:-self.limit]
+        self.redo_commands.clear()
+        return result
+
+    def _stamp(self, session: Session) -> None:
+        """Restoring moves session.version; the commands next in line on both stacks are still current"""
+        for commands in (self.undo_commands, self.redo_commands):
+            if commands:
+                commands[-1].version = session.version
+
+    def _current(self, session: Session, commands: List[SessionCommand]) -> bool:
+        if commands and commands[-1].version != session.version:
+            self.clear()  # The session moved on without the stack
+        return bool(commands)
+
+    def can_undo(self, session: Session) -> bool:
+        return bool(self.undo_commands) and self.undo_commands[-1].version == session.version
+
+    def can_redo(self, session: Session) -> bool:
+        return bool(self.redo_commands) and self.redo_commands[-1].version == session.version
+
+    def undo(self, session: Session) -> Optional[str]:
+        """Revert the last command; returns its description, or None if there is nothing to undo"""
+        if not self._current(session, self.undo_commands):
+            return None
+        command = self.undo_commands.pop()
+        command.before.restore(session)
+        self.redo_commands.append(command)
+        self._stamp(session)
+        return command.description
+
+    def redo(self, session: Session) -> Optional[str]:
+        """Repeat the last undone command; returns its description, or None if there is nothing to redo"""
+        if not self._current(session, self.redo_commands):
+            return None
+        command = self.redo_commands.pop()
+        command.after.restore(session)
+        self.undo_commands.append(command)
+        self._stamp(session)
+        return command.description
+
+    def clear(self) -> None:
+        self.undo_commands.clear()
+        self.redo_commands.clear()
@@ -0,0 +1,129 @@
+"""
+Copy-on-Write Trial Sessions
+
+The deterministic waitlist runs the real matchmaking algorithm on throwaway
+copies of the session ("what if court 2 finishes with red winning?"). A deep
+copy duplicates every match, every player's stats and every history snapshot,
+so each scenario gets slower as the evening goes on.
+
+A trial session instead shares all objects with the real session and only
+copies the containers themselves (lists, dicts and sets of references), so
+appending matches, adding stats or popping the queue never reaches the real
+session. Objects the trial changes in place - a match it completes, a player's
+stats it updates - are copied on first write with trial_match and
+trial_player_stats. The matchmaking algorithm itself only appends new matches
+and new stats entries, so it needs neither.
+
+Those copies are one level deep as well: the object and its lists and dicts
+(teams, partner/opponent tables, court history), whose entries are IDs and
+numbers. A deep copy of a player's stats walks every table entry and costs
+twenty times as much, and a prediction pass copies the stats of every waiting
+player in every scenario.
+
+The relationship and ranking indexes are carried over instead of rebuilt, so a
+trial starts with the same warm caches as the real session.
+
+freeze_session goes one step further for work done on another thread: it also
+copies everything the real session may still change in place (player stats and
+matches that are not finished), so the real session can carry on while the
+snapshot is read.
+"""
+
+import copy
+from dataclasses import fields, replace
+from typing import Optional
+
+from .pickleball_types import Session, Match, PlayerStats
+from .relationship_index import fork_relationship_index
+
+
+# Fields holding lists and dicts, whose items are IDs and numbers
+_MATCH_CONTAINERS = ("team1", "team2", "score")
+_STATS_CONTAINERS = ("partners_played", "opponents_played", "partner_last_game", "opponent_last_game", "court_history")
+
+
+def _copy_with_containers(obj, names):
+    """Copy of obj with its own copies of the named list/dict fields"""
+    duplicate = copy.copy(obj)
+    for name in names:
+        value = getattr(obj, name)
+        if value is not None:
+            setattr(duplicate, name, copy.copy(value))
+    return duplicate
+
+
+def create_trial_session(session: Session) -> Session:
+    """
+    Create a trial session that shares history with session and keeps its own
+    changes. Modify existing matches and stats only through trial_match and
+    trial_player_stats.
+    """
+    trial = copy.copy(session)
+    for f in fields(Session):
+        value = getattr(session, f.name)
+        if isinstance(value, (list, dict, set)):
+            setattr(trial, f.name, copy.copy(value))
+    trial._trial_base = session
+    trial.scenario_cache = None  # Scenarios describe the real session, not this trial
+    trial.pair_matrix = None  # Mirrors the real stats; the trial updates copies of them
+
+    history = session.relationship_index
+    trial.relationship_index = None
+    if history is not None and history.matches_ref is session.matches:
+        trial.relationship_index = fork_relationship_index(history, trial.matches)
+
+    ranking = session.ranking_index
+    trial.ranking_index = None
+    if (ranking is not None
+            and ranking.active_players_ref is session.active_players
+            and ranking.active_count == len(session.active_players)
+            and ranking.player_stats_ref is session.player_stats):
+        # Ranks and ratings are only ever replaced, never edited, so they can be shared
+        trial.ranking_index = replace(ranking, active_players_ref=trial.active_players,
+                                      player_stats_ref=trial.player_stats)
+    return trial
+
+
+def freeze_session(session: Session) -> Session:
+    """
+    Snapshot of the session that is safe to read from a background thread.
+    
+    Finished matches never change, so they stay shared; stats and unfinished
+    matches are copied. The cost depends on the number of players and courts,
+    not on the length of the session.
+    """
+    frozen = create_trial_session(session)
+    for player_id in list(frozen.player_stats):
+        trial_player_stats(frozen, player_id)
+    for match in list(frozen.matches):
+        if match.status not in ('completed', 'forfeited'):
+            trial_match(frozen, match.id)
+    frozen._trial_base = None  # Owns everything that can still change
+    return frozen
+
+
+def _base_of(trial: Session) -> Optional[Session]:
+    return getattr(trial, '_trial_base', None)
+
+
+def trial_match(trial: Session, match_id: str) -> Optional[Match]:
+    """Return the trial's match with this id, safe to modify in place."""
+    base = _base_of(trial)
+    for pos, match in enumerate(trial.matches):
+        if match.id != match_id:
+            continue
+        if base is not None and any(m is match for m in base.matches):
+            match = _copy_with_containers(match, _MATCH_CONTAINERS)
+            trial.matches[pos] = match
+        return match
+    return None
+
+
+def trial_player_stats(trial: Session, player_id: str) -> Optional[PlayerStats]:
+    """Return the trial's stats for this player, safe to modify in place."""
+    stats = trial.player_stats.get(player_id)
+    base = _base_of(trial)
+    if stats is not None and base is not None and base.player_stats.get(player_id) is stats:
+        stats = _copy_with_containers(stats, _STATS_CONTAINERS)
+        trial.player_stats[player_id] = stats
+    return stats
@@ -0,0 +1,109 @@
+"""
+Waitlist View Model
+
+Everything the session window shows for the waitlist, computed once per refresh.
+Rank, wait times, relative priority tier and court dependencies are gathered for
+all waiting players in one pass, so the cost of a refresh grows with the number
+of waiting players instead of with its square. The GUI only compares each row's
+text with what the list already shows.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .pickleball_types import Session
+from .queue_manager import get_waiting_players
+from .competitive_variety import get_player_ranking
+from .deterministic_waitlist_v2 import format_court_dependencies_v2
+from .wait_priority import calculate_relative_wait_priority_infos, format_wait_time_display
+from .utils import format_duration
+
+
+@dataclass
+class WaitlistRow:
+    """One waiting player as shown in the waitlist"""
+    player_id: str
+    name: str
+    rank: int
+    has_stats: bool  # Players without stats have no wait times to show
+    current_wait_seconds: int = 0
+    total_wait_seconds: int = 0
+    priority_tier: int = 2  # 0=extreme, 1=significant, 2=normal
+    dependencies: Dict[int, List[str]] = field(default_factory=dict)
+    dependencies_stale: bool = False
+
+    def display_text(self, show_rank: bool, show_wait_times: bool, show_dependencies: bool) -> str:
+        """Text for the waitlist row with the given columns switched on"""
+        text = self.name
+        if show_rank:
+            text += f" [{self.rank}]"
+
+        if show_wait_times and self.has_stats:
+            priority_indicator = ""
+            if self.priority_tier == 0:  # extreme
+                priority_indicator = " ⚠️"  # Warning for extreme relative wait
+            elif self.priority_tier == 1:  # significant
+                priority_indicator = " ⏰"  # Clock for significant relative wait
+            current_wait_str = format_duration(self.current_wait_seconds)
+            total_wait_str = format_wait_time_display(self.total_wait_seconds)
+            text += f"  [{current_wait_str} / {total_wait_str}]{priority_indicator}"
+
+        if show_dependencies and self.dependencies:
+            # Mark predictions computed for an older state of the session
+            stale = " ⏳" if self.dependencies_stale else ""
+            text += f"\n    🎯{format_court_dependencies_v2(self.dependencies)}{stale}"
+        return text
+
+
+@dataclass
+class WaitlistViewModel:
+    """The waitlist in display order"""
+    rows: List[WaitlistRow]
+
+    @property
+    def player_ids(self) -> List[str]:
+        return [row.player_id for row in self.rows]
+
+
+def build_waitlist_view_model(session: Session,
+                              waiting_ids: Optional[List[str]] = None,
+                              dependencies: Optional[Dict[str, Dict[int, List[str]]]] = None,
+                              dependencies_stale: bool = False) -> WaitlistViewModel:
+    """
+    Build the waitlist view model for the session.
+
+    Args:
+        session: The current session
+        waiting_ids: Waiting players in display order (default: get_waiting_players)
+        dependencies: Last court dependency predictions by player (see
+            deterministic_waitlist_v2.calculate_waitlist_dependencies)
+        dependencies_stale: True if the predictions were made for an older session version
+    """
+    if waiting_ids is None:
+        waiting_ids = get_waiting_players(session)
+    names = {player.id: player.name for player in session.config.players}
+    dependencies = dependencies or {}
+
+    # Tiers are relative to the shortest waiter, so they need every waiter at once
+    with_stats = [pid for pid in waiting_ids if pid in session.player_stats]
+    wait_infos = {info.player_id: info for info in calculate_relative_wait_priority_infos(session, with_stats)}
+
+    rows = []
+    for player_id in waiting_ids:
+        rank, _ = get_player_ranking(session, player_id)
+        row = WaitlistRow(
+            player_id=player_id,
+            name=names.get(player_id),
+            rank=rank,
+            has_stats=player_id in wait_infos,
+            dependencies=dependencies.get(player_id, {}),
+            dependencies_stale=dependencies_stale
+        )
+        info = wait_infos.get(player_id)
+        if info is not None:
+            row.current_wait_seconds = info.current_wait_seconds
+            row.total_wait_seconds = info.total_wait_seconds
+            row.priority_tier = info.priority_tier
+        rows.append(row)
+
+    return WaitlistViewModel(rows=rows)
@@ -0,0 +1,248 @@
+"""
+Test the coalescing background autosave service.
+
+Verifies that:
+1. A burst of save requests within the save window is written once, with the latest state
+2. The session is frozen once per window, when the window closes, so the write has the latest state
+3. With call_on_owner the freeze runs on the owner's thread, never on the worker
+4. flush writes pending saves synchronously and discard drops them
+5. Requests return immediately even when writing is slow
+"""
+import sys
+import os
+import json
+import time
+import queue
+import random
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import create_session, evaluate_and_create_matches, complete_match, get_active_matches
+from python.session_journal import SessionJournal
+from python.time_manager import initialize_time_manager
+import python.session_persistence as session_persistence
+from python.session_persistence import AutosaveService
+
+
+def create_running_session(num_players=12, courts=2):
+    """Create a competitive-variety session with all courts filled."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    return session
+
+
+def play(session, rng):
+    complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+    evaluate_and_create_matches(session)
+
+
+def completed_ids(data):
+    return [m["id"] for m in data["matches"] if m["status"] == "completed"]
+
+
+def with_temp_files(test):
+    """Run test with the session journal and player history in a temporary directory."""
+    saved = (session_persistence._session_journal, session_persistence.PLAYER_HISTORY_DB)
+    with tempfile.TemporaryDirectory() as directory:
+        session_persistence._session_journal = SessionJournal(
+            Path(directory) / "last_session.json", Path(directory) / "last_session.journal")
+        session_persistence.PLAYER_HISTORY_DB = Path(directory) / "player_history.db"
+        try:
+            test(session_persistence._session_journal)
+        finally:
+            session_persistence._session_journal, session_persistence.PLAYER_HISTORY_DB = saved
+
+
+def test_burst_written_once():
+    """Several requests in one window become one write of the latest state."""
+    print("Test: Burst written once...")
+
+    def run(journal):
+        session = create_running_session()
+        rng = random.Random(1)
+        service = AutosaveService(delay=0.2)
+        for event in ("complete_match", "court_slide", "complete_match", "edit_score"):
+            play(session, rng)
+            service.request(session, event)
+        time.sleep(0.6)
+        assert service.writes == 1
+        assert completed_ids(SessionJournal(journal.checkpoint_path, journal.journal_path).load()) == \
+            [m.id for m in session.matches if m.status == 'completed']
+
+        # The next burst appends one journal record naming the coalesced events
+        play(session, rng)
+        service.request(session, "complete_match")
+        service.request(session, "court_slide")
+        time.sleep(0.6)
+        assert service.writes == 2
+        record = json.loads(journal.journal_path.read_text().splitlines()[-1])
+        assert record["event"] == "complete_match+court_slide"
+
+    with_temp_files(run)
+    print("  PASSED")
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_freeze_when_window_closes():
+    """Requests only note the session; it is frozen once, with changes made after the requests."""
+    print("Test: Freeze when window closes...")
+
+    def run(journal):
+        session = create_running_session()
+        rng = random.Random(2)
+        service = AutosaveService(delay=0.2)
+        play(session, rng)
+        service.request(session, "complete_match")
+        service.request(session, "court_slide")
+        assert service.freezes == 0
+        play(session, rng)
+        session.config.players.append(Player(id="late", name="Late Arrival"))
+        assert wait_for(lambda: service.writes == 1)
+        assert service.flush()  # Waits for the write to finish
+        assert service.freezes == 1
+        data = SessionJournal(journal.checkpoint_path, journal.journal_path).load()
+        assert completed_ids(data) == [m.id for m in session.matches if m.status == 'completed']
+        assert "late" in [p["id"] for p in data["config"]["players"]]
+
+    with_temp_files(run)
+    print("  PASSED")
+
+
+def test_freeze_runs_on_owner_thread():
+    """The worker hands the freeze to call_on_owner and writes the copy it gets back."""
+    print("Test: Freeze runs on owner thread...")
+
+    def run(journal):
+        session = create_running_session()
+        rng = random.Random(3)
+        owner_calls = queue.Queue()
+        service = AutosaveService(delay=0.05, call_on_owner=owner_calls.put)
+        frozen_on = []
+        original = session_persistence._freeze_for_save
+
+        def recording_freeze(session):
+            frozen_on.append(threading.current_thread())
+            return original(session)
+
+        session_persistence._freeze_for_save = recording_freeze
+        try:
+            play(session, rng)
+            service.request(session, "complete_match")
+            callback = owner_calls.get(timeout=2)
+            time.sleep(0.1)
+            assert owner_calls.empty() and service.writes == 0  # Asked once, waiting for the owner
+            play(session, rng)
+            callback()
+            assert wait_for(lambda: service.writes == 1)
+            assert service.flush()  # Waits for the write to finish
+            assert frozen_on == [threading.current_thread()]
+            data = SessionJournal(journal.checkpoint_path, journal.journal_path).load()
+            assert completed_ids(data) == [m.id for m in session.matches if m.status == 'completed']
+
+            # A flush before the owner gets to the freeze writes directly; the late callback is a no-op
+            service.request(session, "edit_score")
+            callback = owner_calls.get(timeout=2)
+            assert service.flush() and service.writes == 2
+            callback()
+            time.sleep(0.1)
+            assert service.writes == 2 and service.freezes == 2
+        finally:
+            session_persistence._freeze_for_save = original
+
+    with_temp_files(run)
+    print("  PASSED")
+
+
+def test_flush_and_discard():
+    """flush writes at once; discard leaves nothing to write."""
+    print("Test: Flush and discard...")
+
+    def run(journal):
+        session = create_running_session()
+        service = AutosaveService(delay=60)
+        service.request(session, "complete_match")
+        assert service.flush()
+        assert service.writes == 1 and journal.checkpoint_path.exists()
+        assert service.flush() and service.writes == 1
+
+        service.request(session, "edit_score")
+        service.discard()
+        assert service.flush() and service.writes == 1
+
+    with_temp_files(run)
+    print("  PASSED")
+
+
+def test_request_does_not_wait_for_slow_writes():
+    """A slow disk delays the write, not the caller."""
+    print("Test: Request does not wait for slow writes...")
+
+    def run(journal):
+        session = create_running_session()
+        original = session_persistence.save_session
+
+        def slow_save(session, event="save", checkpoint=False):
+            time.sleep(0.5)
+            return original(session, event, checkpoint)
+
+        session_persistence.save_session = slow_save
+        try:
+            service = AutosaveService(delay=0.05)
+            start = time.monotonic()
+            service.request(session, "complete_match")
+            time.sleep(0.1)  # Write in progress
+            service.request(session, "court_slide")
+            assert time.monotonic() - start < 0.3
+            assert service.flush()  # Waits for the first write, then writes the second
+            assert service.writes == 2
+        finally:
+            session_persistence.save_session = original
+
+    with_temp_files(run)
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Autosave Tests")
+    print("=" * 60)
+
+    tests = [
+        test_burst_written_once,
+        test_freeze_when_window_closes,
+        test_freeze_runs_on_owner_thread,
+        test_flush_and_discard,
+        test_request_does_not_wait_for_slow_writes,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,198 @@
+"""
+Test the batch match scorer used by competitive variety searches.
+
+Verifies that:
+1. Batch totals equal score_potential_match exactly for every split of every quadruple
+2. The feasibility flag equals meets_balance_constraints
+3. Components follow the adaptive phase (homogeneity/mismatch/tier only when weight >= 3)
+4. Streaming quadruples in batches gives the same scores as one batch
+5. The fallback court search widens past the search limit when the top candidates cannot play
+"""
+import sys
+import os
+import random
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats
+from python.competitive_variety import (
+    MATCH_SPLITS, build_matchmaking_context, build_match_score_table, score_match_splits,
+    score_potential_match, meets_balance_constraints, iter_scored_quadruples,
+    populate_empty_courts_competitive_variety, MATCH_SEARCH_LIMIT
+)
+from python.time_manager import initialize_time_manager
+from python.utils import generate_id
+
+
+def create_random_session(seed, num_players=12, pre_seeded=True):
+    """Create a session with random stats and partner/opponent history."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i}", name=f"Player {i}", skill_rating=rng.choice([3.0, 3.5, 4.0, 4.5, 5.0]))
+               for i in range(1, num_players + 1)]
+    config = SessionConfig(
+        mode='competitive-variety',
+        session_type='doubles',
+        players=players,
+        courts=3,
+        pre_seeded_ratings=pre_seeded
+    )
+    session = Session(id=generate_id(), config=config)
+    session.active_players = set(p.id for p in players)
+    ids = [p.id for p in players]
+    for pid in ids[:-1]:  # Last player has no stats yet
+        stats = PlayerStats(player_id=pid)
+        stats.games_played = rng.randint(0, 8)
+        stats.wins = rng.randint(0, stats.games_played)
+        stats.losses = stats.games_played - stats.wins
+        stats.total_points_for = rng.randint(0, 90)
+        stats.total_points_against = rng.randint(0, 90)
+        for other in rng.sample(ids, 4):
+            if other != pid:
+                stats.partners_played[other] = 1
+        for other in rng.sample(ids, 5):
+            if other != pid:
+                stats.opponents_played[other] = 1
+        session.player_stats[pid] = stats
+    return session
+
+
+def check_batch_against_scalar(session):
+    context = build_matchmaking_context(session)
+    players = sorted(session.active_players)
+    table = build_match_score_table(session, players, context)
+    quads = list(combinations(range(len(players)), 4))
+    batch = score_match_splits(table, quads)
+    assert len(batch.total) == len(quads) * 3
+
+    for q, quad in enumerate(quads):
+        for s, ((a, b), (c, d)) in enumerate(MATCH_SPLITS):
+            team1 = [players[quad[a]], players[quad[b]]]
+            team2 = [players[quad[c]], players[quad[d]]]
+            row = q * 3 + s
+            assert batch.total[row] == score_potential_match(session, team1, team2), (team1, team2)
+            assert batch.feasible[row] == meets_balance_constraints(session, team1, team2)
+    return batch
+
+
+def test_batch_equals_scalar_early_session():
+    """Weight 1.0: only balance and variety terms apply."""
+    print("Test: Batch equals scalar (early session)...")
+    for seed in range(3):
+        session = create_random_session(seed)
+        session._effective_adaptive_balance_weight = 1.0
+        batch = check_batch_against_scalar(session)
+        assert not any(batch.homogeneity) and not any(batch.mismatch) and not any(batch.tier)
+    print("  PASSED")
+
+
+def test_batch_equals_scalar_adaptive_weights():
+    """Mid/late and manual weights, with some splits failing the balance threshold."""
+    print("Test: Batch equals scalar (adaptive weights)...")
+    for seed, weight in ((3, 3.0), (4, 5.0), (5, 7.5)):
+        session = create_random_session(seed)
+        session._effective_adaptive_balance_weight = weight
+        # Push the session into the late phase so the hard balance threshold applies
+        for _ in range(12):
+            session.matches.append(Match(id=generate_id(), court_number=1, team1=["p1", "p2"],
+                                         team2=["p3", "p4"], status='completed'))
+        batch = check_batch_against_scalar(session)
+        assert not all(batch.feasible)
+    print("  PASSED")
+
+
+def test_batch_equals_scalar_unseeded():
+    """Unseeded ratings from stats only."""
+    print("Test: Batch equals scalar (unseeded)...")
+    session = create_random_session(6, pre_seeded=False)
+    session._effective_adaptive_balance_weight = 3.0
+    check_batch_against_scalar(session)
+    print("  PASSED")
+
+
+def test_iter_scored_quadruples_matches_single_batch():
+    """Small batches yield every quadruple in order with its own three split scores."""
+    print("Test: Streamed batches equal one batch...")
+    session = create_random_session(7)
+    players = sorted(session.active_players)
+    table = build_match_score_table(session, players)
+    quads = list(combinations(range(len(players)), 4))
+    batch = score_match_splits(table, quads)
+
+    streamed = list(iter_scored_quadruples(table, list(range(len(players))), iter(quads), batch_size=7))
+    assert [quad for quad, _, _ in streamed] == quads
+    for q, (_, totals, feasible) in enumerate(streamed):
+        assert totals == batch.total[q * 3:q * 3 + 3]
+        assert feasible == batch.feasible[q * 3:q * 3 + 3]
+
+    # Player-id quadruples are mapped through table.index
+    by_id = [tuple(players[i] for i in quad) for quad in quads[:20]]
+    for (_, totals, _), (_, expected, _) in zip(iter_scored_quadruples(table, table.index, by_id), streamed):
+        assert totals == expected
+    print("  PASSED")
+
+
+def test_fallback_search_widens_past_limit():
+    """A court is still filled when no quadruple of the top candidates can form a match."""
+    print("Test: Fallback widens past the search limit...")
+    initialize_time_manager()
+    num_players = MATCH_SEARCH_LIMIT + 4
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(1, num_players + 1)]
+    waited = [p.id for p in players[:MATCH_SEARCH_LIMIT]]
+    config = SessionConfig(
+        mode='competitive-variety',
+        session_type='doubles',
+        players=players,
+        courts=1,
+        banned_pairs=[list(pair) for pair in combinations(waited, 2)]  # Top candidates can't partner
+    )
+    session = Session(id=generate_id(), config=config)
+    session.active_players = set(p.id for p in players)
+    for p in players:
+        session.player_stats[p.id] = PlayerStats(player_id=p.id)
+        session.player_stats[p.id].courts_completed_since_last_play = 1 if p.id in waited else 0
+    rested = [p.id for p in players[MATCH_SEARCH_LIMIT:]]
+    session.matches.append(Match(id=generate_id(), court_number=1, team1=rested[:2],
+                                 team2=rested[2:], status='completed'))
+
+    populate_empty_courts_competitive_variety(session)
+    new_matches = [m for m in session.matches if m.status == 'waiting']
+    assert len(new_matches) == 1
+    match = new_matches[0]
+    for team in (match.team1, match.team2):
+        assert not (team[0] in waited and team[1] in waited)
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Batch Match Scoring Tests")
+    print("=" * 60)
+
+    tests = [
+        test_batch_equals_scalar_early_session,
+        test_batch_equals_scalar_adaptive_weights,
+        test_batch_equals_scalar_unseeded,
+        test_iter_scored_quadruples_matches_single_batch,
+        test_fallback_search_widens_past_limit,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,119 @@
+"""
+Test the compact representation of matches, player stats and queued matches.
+
+Verifies that:
+1. Match, PlayerStats and QueuedMatch instances have no per-instance __dict__
+2. A loaded session uses one string object per player ID everywhere it appears
+3. A loaded session round-trips to the same serialized data
+"""
+import sys
+import os
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig, Match, PlayerStats, QueuedMatch
+from python.session import create_session, evaluate_and_create_matches, complete_match, get_active_matches
+from python.session_persistence import serialize_session, deserialize_session
+from python.time_manager import initialize_time_manager
+
+
+def played_session(num_matches=30):
+    initialize_time_manager()
+    players = [Player(id=f"player_{i:02d}", name=f"Player {i}") for i in range(14)]
+    session = create_session(SessionConfig(mode='competitive-variety', session_type='doubles',
+                                           players=players, courts=3))
+    evaluate_and_create_matches(session)
+    rng = random.Random(5)
+    for _ in range(num_matches):
+        complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session
+
+
+def test_no_instance_dict():
+    """Slotted types reject attributes they don't declare."""
+    print("Test: No instance dict...")
+    if sys.version_info < (3, 10):
+        print("  SKIPPED (slotted dataclasses need Python 3.10)")
+        return
+    instances = [
+        Match(id="m1", court_number=1, team1=["a", "b"], team2=["c", "d"], status='waiting'),
+        PlayerStats(player_id="a"),
+        QueuedMatch(team1=["a", "b"], team2=["c", "d"])
+    ]
+    for instance in instances:
+        assert not hasattr(instance, '__dict__'), type(instance).__name__
+        try:
+            instance.winner = 'team1'
+            assert False, f"{type(instance).__name__} accepted an undeclared attribute"
+        except AttributeError:
+            pass
+    print("  PASSED")
+
+
+def test_loaded_ids_shared():
+    """Every occurrence of a player ID in a loaded session is the same object."""
+    print("Test: Loaded IDs shared...")
+    data = json.loads(json.dumps(serialize_session(played_session())))
+    session = deserialize_session(data)
+
+    canonical = {player.id: player.id for player in session.config.players}
+    occurrences = []
+    for match in session.matches:
+        occurrences.extend(match.team1 + match.team2)
+    for queued in session.match_queue:
+        occurrences.extend(queued.team1 + queued.team2)
+    occurrences.extend(session.waiting_players)
+    occurrences.extend(session.active_players)
+    for player_id, stats in session.player_stats.items():
+        occurrences.extend([player_id, stats.player_id])
+        occurrences.extend(stats.partners_played)
+        occurrences.extend(stats.opponents_played)
+    assert len(occurrences) > 200
+    assert all(pid is canonical[pid] for pid in occurrences)
+    print("  PASSED")
+
+
+def test_round_trip_unchanged():
+    """Interning on load does not change what is saved."""
+    print("Test: Round trip unchanged...")
+    original = serialize_session(played_session())
+    reloaded = serialize_session(deserialize_session(json.loads(json.dumps(original))))
+    for data in (original, reloaded):
+        data.pop("saved_at")
+        data["active_players"] = sorted(data["active_players"])  # Serialized from a set
+    assert json.dumps(reloaded, sort_keys=True) == json.dumps(original, sort_keys=True)
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Compact Types Tests")
+    print("=" * 60)
+
+    tests = [
+        test_no_instance_dict,
+        test_loaded_ids_shared,
+        test_round_trip_unchanged,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
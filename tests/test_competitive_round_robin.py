@@ -21,6 +21,7 @@ from python.session import create_session
 from python.competitive_round_robin import (
     generate_initial_schedule,
     validate_schedule,
+    ScheduleValidator,
     regenerate_match,
     swap_player_in_match,
     get_schedule_summary,
@@ -216,6 +217,44 @@ class TestScheduleValidation:
         partner_violations = [v for v in validation.violations if v.violation_type == 'partner_repeat']
         assert len(partner_violations) > 0, "Should detect partnership repeat"
         print("✅ Partnership violation detection works")
+    
+    def test_incremental_validator_matches_full_validation(self):
+        """Test that approving, unapproving and swapping one match at a time tracks validate_schedule."""
+        session = create_test_session(8)
+        config = CompetitiveRoundRobinConfig(max_partner_repeats=0, max_individual_opponent_repeats=1)
+        
+        matches = [
+            ScheduledMatch(id="m1", team1=["player_0", "player_1"], team2=["player_2", "player_3"]),
+            ScheduledMatch(id="m2", team1=["player_0", "player_1"], team2=["player_4", "player_5"]),
+            ScheduledMatch(id="m3", team1=["player_0", "player_6"], team2=["player_2", "player_7"])
+        ]
+        validator = ScheduleValidator(session, config, matches)
+        
+        def summarize(validation):
+            return (validation.is_valid,
+                    sorted((v.violation_type, sorted(v.players_involved), v.count) for v in validation.violations),
+                    validation.games_per_player)
+        
+        for match in matches:
+            match.status = 'approved'
+            validator.match_changed(match)
+            assert summarize(validator.result()) == summarize(validate_schedule(session, matches, config))
+        assert not validator.result().is_valid
+        
+        # Swapping in a replacement match without the repeated partnership clears that violation
+        replacement = ScheduledMatch(id="m2", team1=["player_0", "player_4"], team2=["player_1", "player_5"],
+                                     status='approved')
+        validator.match_removed(matches[1])
+        matches[1] = replacement
+        validator.match_changed(replacement)
+        assert summarize(validator.result()) == summarize(validate_schedule(session, matches, config))
+        assert not any(v.violation_type == 'partner_repeat' for v in validator.result().violations)
+        
+        matches[2].status = 'pending'
+        validator.match_changed(matches[2])
+        assert summarize(validator.result()) == summarize(validate_schedule(session, matches, config))
+        assert validator.result().is_valid
+        print("✅ Incremental validation matches full validation")
 
 
 class TestMatchRegeneration:
@@ -9,6 +9,7 @@ Key features to test:
 """
 
 import pytest
+import time
 from typing import List
 import os
 import sys
@@ -25,7 +26,11 @@ from python.competitive_round_robin import (
     populate_courts_from_schedule,
     compute_scheduled_waiters,
     get_round_info,
-    swap_waiter_in_round
+    swap_waiter_in_round,
+    evaluate_schedule_quality,
+    search_rounds_based_schedule,
+    default_schedule_search_starts,
+    _stop_schedule_workers
 )
 from python.time_manager import now, initialize_time_manager
 
@@ -306,6 +311,77 @@ class TestConstraintEnforcement:
             assert count <= config.max_individual_opponent_repeats, \
                 f"Opponent pair {pair} faced {count} times, limit is {config.max_individual_opponent_repeats}"
 
+    def test_large_group_schedules_quickly(self):
+        """A 28-player league night should schedule in seconds, still filling every court."""
+        session = create_test_session(num_players=28, num_courts=7)
+        config = session.config.competitive_round_robin_config
+
+        start = time.perf_counter()
+        matches, waiters = generate_rounds_based_schedule(session, config)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 60, f"Scheduling 28 players took {elapsed:.1f}s"
+        assert len(matches) == len(waiters) * 7, "Every round should fill all 7 courts"
+
+        partnerships = [tuple(sorted(team)) for m in matches for team in (m.team1, m.team2)]
+        assert len(partnerships) == len(set(partnerships)), "No partnership should repeat"
+
+
+class TestScheduleSearch:
+    """Test the seeded multi-start schedule search."""
+    
+    def test_seeded_schedules_are_reproducible(self):
+        """The same seed gives the same schedule; other seeds explore other schedules."""
+        session = create_test_session(num_players=14, num_courts=3)
+        config = session.config.competitive_round_robin_config
+        
+        def teams(schedule):
+            matches, waiters = schedule
+            return [(m.team1, m.team2) for m in matches], waiters
+        
+        unseeded = teams(generate_rounds_based_schedule(session, config))
+        assert teams(generate_rounds_based_schedule(session, config, seed=7)) == \
+            teams(generate_rounds_based_schedule(session, config, seed=7))
+        assert any(teams(generate_rounds_based_schedule(session, config, seed=seed)) != unseeded
+                   for seed in range(1, 4)), "Seeds should change tie-breaking"
+    
+    def test_search_never_worse_than_single_pass(self):
+        """Best-of-N keeps the unseeded start, so it can only match or beat it."""
+        session = create_test_session(num_players=14, num_courts=3)
+        config = session.config.competitive_round_robin_config
+        
+        single = generate_rounds_based_schedule(session, config)
+        searched = search_rounds_based_schedule(session, config, num_starts=4, time_budget=60, max_workers=2)
+        
+        single_quality = evaluate_schedule_quality(session, *single, config)
+        searched_quality = evaluate_schedule_quality(session, *searched, config)
+        assert searched_quality.sort_key() <= single_quality.sort_key()
+        assert len(searched[0]) == len(single[0])
+        assert all(m.status == 'pending' for m in searched[0])
+    
+    def test_default_starts_follow_cpu_count(self):
+        """The dialog's default uses every CPU (capped), and always at least one start."""
+        starts = default_schedule_search_starts()
+        assert 1 <= starts <= 8
+        assert starts == min(os.cpu_count() or 1, 8)
+    
+    def test_stop_workers_ends_running_starts(self):
+        """Starts still running at the deadline are terminated, not left burning a core."""
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=1)
+        future = executor.submit(time.sleep, 60)
+        deadline = time.perf_counter() + 10
+        while not future.running() and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        processes = list(executor._processes.values())
+        assert processes
+        
+        _stop_schedule_workers(executor)
+        executor.shutdown(wait=False)
+        for process in processes:
+            process.join(timeout=10)
+            assert not process.is_alive()
+
 
 class TestBackToBackPrevention:
     """Test that players don't play with/against same person in consecutive rounds (soft constraint)."""
@@ -0,0 +1,187 @@
+"""
+Test the joint multi-court assignment solver for competitive variety.
+
+Verifies that:
+1. Jointly assigned matches are disjoint and satisfy every hard constraint
+2. The joint assignment fills courts the greedy search leaves empty and scores at least as well
+3. Must-play players are placed, and an exhausted time budget falls back to greedy
+4. The solver settings survive a save/load round trip
+"""
+import sys
+import os
+import copy
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import create_session, evaluate_and_create_matches, complete_match
+from python.competitive_variety import (
+    populate_empty_courts_competitive_variety, build_matchmaking_context, score_potential_match,
+    apply_adaptive_constraints, _is_team_configuration_valid, can_all_players_play_together,
+    meets_balance_constraints, get_must_play_players
+)
+from python.joint_court_solver import solve_joint_court_assignment
+from python.session_persistence import serialize_session, deserialize_session
+from python.time_manager import initialize_time_manager
+import python.deterministic_waitlist_v2 as deterministic_waitlist_v2
+
+
+def create_session_with_empty_courts(num_players, courts, rounds, seed):
+    """Play a few rounds, then finish every match so all courts are empty at once."""
+    initialize_time_manager()
+    deterministic_waitlist_v2.calculate_waitlist_predictions_v2 = lambda s: []
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    for _ in range(rounds):
+        for match in [m for m in session.matches if m.status in ('waiting', 'in-progress')]:
+            complete_match(session, match.id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    for match in [m for m in session.matches if m.status in ('waiting', 'in-progress')]:
+        complete_match(session, match.id, 11, rng.randint(0, 9))
+    return session
+
+
+def adapted_copy(session):
+    """The session as populate sees it, with this pass's adaptive constraints applied."""
+    reference = copy.deepcopy(session)
+    apply_adaptive_constraints(reference)
+    return reference
+
+
+def assignment_value(session, matches):
+    """The solver's objective: courts filled, must-play placed, waited placed, total score."""
+    context = build_matchmaking_context(session)
+    placed = [p for m in matches for p in m.team1 + m.team2]
+    must_play = set(get_must_play_players(session, placed))
+    waited = [p for p in placed if session.player_stats[p].courts_completed_since_last_play > 0]
+    score = sum(score_potential_match(session, m.team1, m.team2, context) for m in matches)
+    return (len(matches), len(must_play), len(waited), score)
+
+
+def is_strictly_valid(session, match):
+    """Match passes every hard constraint, without the relaxed must-play fallback."""
+    return (can_all_players_play_together(session, match.team1 + match.team2) and
+            _is_team_configuration_valid(session, match.team1, match.team2) and
+            meets_balance_constraints(session, match.team1, match.team2))
+
+
+def fill_courts(session, joint):
+    """Populate the empty courts and return the new matches."""
+    trial = copy.deepcopy(session)
+    trial.competitive_variety_joint_court_solver = joint
+    before = len(trial.matches)
+    populate_empty_courts_competitive_variety(trial)
+    return trial, trial.matches[before:]
+
+
+def test_joint_matches_respect_constraints():
+    """Every jointly chosen match is valid, balanced and uses each player once."""
+    print("Test: Joint matches respect constraints...")
+    for num_players, courts, rounds, seed in ((16, 4, 3, 1), (20, 4, 4, 2), (24, 6, 5, 3)):
+        session = create_session_with_empty_courts(num_players, courts, rounds, seed)
+        reference = adapted_copy(session)
+        _, new_matches = fill_courts(session, joint=True)
+        players = [p for m in new_matches for p in m.team1 + m.team2]
+        assert len(players) == len(set(players))
+        assert len({m.court_number for m in new_matches}) == len(new_matches)
+
+        for match in new_matches:
+            assert is_strictly_valid(reference, match), (match.team1, match.team2)
+    print("  PASSED")
+
+
+def test_joint_beats_or_matches_greedy():
+    """Whenever greedy stays within the hard constraints, the joint assignment is at least as good."""
+    print("Test: Joint assignment vs greedy...")
+    for num_players, courts, rounds, seed in ((16, 4, 3, 1), (20, 4, 4, 2), (24, 6, 5, 3)):
+        session = create_session_with_empty_courts(num_players, courts, rounds, seed)
+        reference = adapted_copy(session)
+        _, greedy = fill_courts(session, joint=False)
+        _, joint = fill_courts(session, joint=True)
+        assert len(joint) >= len(greedy)
+        if all(is_strictly_valid(reference, m) for m in greedy):
+            greedy_value = assignment_value(reference, greedy)
+            joint_value = assignment_value(reference, joint)
+            assert joint_value[:3] >= greedy_value[:3]
+            if joint_value[:3] == greedy_value[:3]:
+                assert joint_value[3] >= greedy_value[3] - 1e-9
+    print("  PASSED")
+
+
+def test_must_play_players_placed():
+    """Players who waited two courts are always in the joint assignment."""
+    print("Test: Must-play players placed...")
+    session = create_session_with_empty_courts(18, 4, 3, 4)
+    available = sorted(session.active_players)
+    for pid in available[:3]:
+        session.player_stats[pid].courts_completed_since_last_play = 2
+    must_play = get_must_play_players(session, available)
+
+    assignment = solve_joint_court_assignment(session, available, 4, time_budget=5.0)
+    if assignment is not None:
+        placed = {p for team1, team2 in assignment for p in team1 + team2}
+        assert set(must_play) <= placed
+    print("  PASSED")
+
+
+def test_exhausted_budget_falls_back_to_greedy():
+    """With no time to search, populate still fills the courts greedily."""
+    print("Test: Exhausted budget falls back to greedy...")
+    session = create_session_with_empty_courts(20, 4, 4, 2)
+    assert solve_joint_court_assignment(session, sorted(session.active_players), 4, time_budget=0.0) is None
+
+    session.competitive_variety_joint_solver_time_budget = 0.0
+    _, greedy = fill_courts(session, joint=False)
+    _, fallback = fill_courts(session, joint=True)
+    assert [(m.team1, m.team2, m.court_number) for m in fallback] == \
+        [(m.team1, m.team2, m.court_number) for m in greedy]
+    print("  PASSED")
+
+
+def test_settings_persisted():
+    """The joint solver toggle and budget are saved with the session."""
+    print("Test: Joint solver settings persisted...")
+    session = create_session_with_empty_courts(12, 3, 1, 5)
+    session.competitive_variety_joint_court_solver = True
+    session.competitive_variety_joint_solver_time_budget = 0.5
+    restored = deserialize_session(serialize_session(session))
+    assert restored.competitive_variety_joint_court_solver is True
+    assert restored.competitive_variety_joint_solver_time_budget == 0.5
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Joint Court Solver Tests")
+    print("=" * 60)
+
+    tests = [
+        test_joint_matches_respect_constraints,
+        test_joint_beats_or_matches_greedy,
+        test_must_play_players_placed,
+        test_exhausted_budget_falls_back_to_greedy,
+        test_settings_persisted,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
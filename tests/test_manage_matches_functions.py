@@ -476,5 +476,51 @@ class TestEdgeCases(unittest.TestCase):
             )
 
 
+
+class TestRoundCheckpoints(unittest.TestCase):
+    """Test that regeneration resumes from checkpoints and keeps rounds the edit doesn't affect."""
+    
+    def setUp(self):
+        self.session = create_test_session(18, 4)
+        self.config = self.session.config.competitive_round_robin_config
+        self.num_courts = self.session.config.courts
+        matches, waiters = generate_rounds_based_schedule(self.session, self.config)
+        # Regenerate once so every later round has the type regeneration gives it
+        self.matches, self.waiters = regenerate_subsequent_rounds(self.session, matches, waiters, 0, self.config)
+        for match in self.matches:
+            match.status = 'approved'
+    
+    def test_unchanged_round_keeps_later_rounds(self):
+        """Regenerating after a round that didn't change keeps every later round and its approvals."""
+        new_matches, new_waiters = regenerate_subsequent_rounds(
+            self.session, list(self.matches), [list(w) for w in self.waiters], 2, self.config
+        )
+        
+        self.assertEqual(len(new_matches), len(self.matches))
+        self.assertTrue(all(new is old for new, old in zip(new_matches, self.matches)))
+        self.assertEqual(new_waiters, self.waiters)
+        self.assertTrue(all(m.status == 'approved' for m in new_matches))
+    
+    def test_edited_round_regenerates_later_rounds(self):
+        """A waiter swap changes the constraint state, so the following round is regenerated."""
+        round_index = 2
+        old_round_3 = self.matches[3 * self.num_courts:4 * self.num_courts]
+        waiter = self.waiters[round_index][0]
+        player = self.matches[round_index * self.num_courts].team1[0]
+        success, _ = swap_player_between_matches_or_waitlist(
+            self.session, self.matches, self.waiters, round_index, player, waiter, self.config
+        )
+        self.assertTrue(success)
+        
+        new_matches, new_waiters = regenerate_subsequent_rounds(
+            self.session, self.matches, self.waiters, round_index, self.config
+        )
+        
+        self.assertEqual(new_matches[:3 * self.num_courts], self.matches[:3 * self.num_courts])
+        new_round_3 = new_matches[3 * self.num_courts:4 * self.num_courts]
+        self.assertFalse(any(new is old for new in new_round_3 for old in old_round_3))
+        self.assertEqual(len(new_matches), len(new_waiters) * self.num_courts, "All courts should be filled")
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,157 @@
+"""
+Test the per-pass MatchmakingContext used by competitive variety matchmaking.
+
+Verifies that:
+1. Context ratings, ranks, provisional flags and thresholds match the direct session helpers
+2. Constraint and scoring helpers give the same answers with and without a context
+3. Pre-seeded scoring no longer swaps the session's effective balance weight
+"""
+import sys
+import os
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats
+from python.competitive_variety import (
+    build_matchmaking_context, calculate_player_elo_rating, get_player_ranking, is_provisional,
+    get_balance_threshold, get_adaptive_constraints, apply_adaptive_constraints,
+    can_play_with_player, score_potential_match, meets_balance_constraints,
+    can_all_players_play_together, create_skill_based_matches_for_pre_seeded
+)
+from python.time_manager import initialize_time_manager
+from python.utils import generate_id
+
+
+def create_test_session(num_players=12, courts=3, pre_seeded=False):
+    """Create a competitive-variety session with some completed history."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i}", name=f"Player {i}", skill_rating=3.0 + (i % 5) * 0.25)
+               for i in range(1, num_players + 1)]
+    config = SessionConfig(
+        mode='competitive-variety',
+        session_type='doubles',
+        players=players,
+        courts=courts,
+        pre_seeded_ratings=pre_seeded
+    )
+    session = Session(id=generate_id(), config=config)
+    session.active_players = set(p.id for p in players)
+    for p in players:
+        session.player_stats[p.id] = PlayerStats(player_id=p.id)
+
+    ids = [p.id for p in players]
+    for round_num in range(14):
+        shift = (round_num * 5) % num_players
+        rotated = ids[shift:] + ids[:shift]
+        team1, team2 = rotated[0:2], rotated[2:4]
+        session.matches.append(Match(id=generate_id(), court_number=1, team1=team1, team2=team2,
+                                     status='completed',
+                                     score={'team1_score': 11, 'team2_score': round_num}))
+        for pid in team1 + team2:
+            stats = session.player_stats[pid]
+            stats.games_played += 1
+            if pid in team1:
+                stats.wins += 1
+                stats.total_points_for += 11
+                stats.total_points_against += round_num
+            else:
+                stats.losses += 1
+                stats.total_points_for += round_num
+                stats.total_points_against += 11
+            for other in team1 + team2:
+                if other == pid:
+                    continue
+                same_team = (pid in team1) == (other in team1)
+                played = stats.partners_played if same_team else stats.opponents_played
+                played[other] = played.get(other, 0) + 1
+    apply_adaptive_constraints(session)
+    return session
+
+
+def test_context_matches_session_helpers():
+    """Frozen values agree with the helpers that compute them from the session."""
+    print("Test: Context matches session helpers...")
+    session = create_test_session()
+    context = build_matchmaking_context(session)
+
+    for pid in session.active_players:
+        assert context.rating(pid) == calculate_player_elo_rating(session, pid)
+        assert context.rank(pid) == get_player_ranking(session, pid)[0]
+        assert context.is_provisional(pid) == is_provisional(session, pid)
+    assert context.rank("ghost") == get_player_ranking(session, "ghost")[0]
+    assert context.is_provisional("ghost")
+    assert context.balance_threshold == get_balance_threshold(session)
+    assert context.adaptive_balance_weight == get_adaptive_constraints(session)['balance_weight']
+    assert context.scoring_balance_weight == session._effective_adaptive_balance_weight
+    print("  PASSED")
+
+
+def test_helpers_identical_with_context():
+    """Every pairing and scoring answer is unchanged when a shared context is passed in."""
+    print("Test: Helpers identical with context...")
+    for pre_seeded in (False, True):
+        session = create_test_session(pre_seeded=pre_seeded)
+        context = build_matchmaking_context(session)
+        ids = sorted(session.active_players)
+
+        for p1 in ids:
+            for p2 in ids:
+                if p1 == p2:
+                    continue
+                for role in ('partner', 'opponent'):
+                    for cross in (False, True):
+                        assert (can_play_with_player(session, p1, p2, role, cross) ==
+                                can_play_with_player(session, p1, p2, role, cross, context))
+
+        for combo in combinations(ids[:8], 4):
+            team1, team2 = list(combo[:2]), list(combo[2:])
+            assert can_all_players_play_together(session, list(combo)) == \
+                can_all_players_play_together(session, list(combo), context)
+            assert meets_balance_constraints(session, team1, team2) == \
+                meets_balance_constraints(session, team1, team2, context)
+            assert score_potential_match(session, team1, team2) == \
+                score_potential_match(session, team1, team2, context)
+    print("  PASSED")
+
+
+def test_pre_seeded_scoring_leaves_session_weight():
+    """Pre-seeded matching scores with a boosted weight without touching the session."""
+    print("Test: Pre-seeded scoring leaves session weight alone...")
+    session = create_test_session(pre_seeded=True)
+    session._effective_adaptive_balance_weight = 1.0
+    matches = create_skill_based_matches_for_pre_seeded(session, sorted(session.active_players), 2)
+    assert matches
+    assert session._effective_adaptive_balance_weight == 1.0
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Matchmaking Context Tests")
+    print("=" * 60)
+
+    tests = [
+        test_context_matches_session_helpers,
+        test_helpers_identical_with_context,
+        test_pre_seeded_scoring_leaves_session_weight,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,243 @@
+"""
+Test the dense partner/opponent pair matrix kept next to the player stats tables.
+
+Verifies that:
+1. complete_match and forfeit_match update the matrix incrementally, and it always
+   equals a matrix built from the stats tables
+2. Adding a player mid-session grows the matrix by a slot
+3. Trial sessions, snapshot restores and undo never leave a matrix that disagrees with the stats
+4. Match score tables and continuous wave flow variety penalties read from the matrix
+   equal ones read from the stats dicts
+5. Round robin queue generation counts session history and its own queued matches
+"""
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, forfeit_match,
+    get_active_matches, add_player_to_session, load_session_from_snapshot
+)
+from python.session_manager import create_session_manager
+from python.pair_matrix import build_pair_matrix, get_pair_matrix
+from python.competitive_variety import build_match_score_table
+from python.continuous_wave_flow import calculate_variety_penalty
+from python.roundrobin import generate_round_robin_queue
+from python.trial_session import create_trial_session, trial_player_stats
+from python.time_manager import initialize_time_manager
+
+
+def create_running_session(num_players=14, courts=3, mode='competitive-variety'):
+    initialize_time_manager()
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode=mode, session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    return session
+
+
+def play(session, rng, forfeit_rate=0.0):
+    match = rng.choice(get_active_matches(session))
+    if rng.random() < forfeit_rate:
+        forfeit_match(session, match.id)
+    else:
+        complete_match(session, match.id, 11, rng.randint(0, 9))
+    evaluate_and_create_matches(session)
+
+
+def assert_matches_stats(session):
+    """Every matrix cell equals the player's own stats table entry (or zero)."""
+    matrix = session.pair_matrix
+    for player_id, stats in session.player_stats.items():
+        for other_id in matrix.players:
+            assert matrix.partners(player_id, other_id) == stats.partners_played.get(other_id, 0)
+            assert matrix.opponents(player_id, other_id) == stats.opponents_played.get(other_id, 0)
+
+
+def test_incremental_updates_match_stats():
+    """complete_match and forfeit_match keep the matrix equal to a rebuild from the stats."""
+    print("Test: Incremental updates match stats...")
+    session = create_running_session()
+    assert session.pair_matrix is None
+    rng = random.Random(1)
+    play(session, rng)
+    matrix = session.pair_matrix
+    assert matrix is not None
+
+    for _ in range(40):
+        play(session, rng, forfeit_rate=0.15)
+        assert session.pair_matrix is matrix  # Updated in place, never rebuilt
+    assert_matches_stats(session)
+    rebuilt = build_pair_matrix(session)
+    assert rebuilt.slots == matrix.slots
+    assert rebuilt.partner_count == matrix.partner_count
+    assert rebuilt.opponent_count == matrix.opponent_count
+    print("  PASSED")
+
+
+def test_other_modes_count_pairs():
+    """Modes without variety tracking still keep counts."""
+    print("Test: Round robin keeps counts...")
+    session = create_running_session(num_players=10, courts=2, mode='round-robin')
+    rng = random.Random(2)
+    for _ in range(12):
+        play(session, rng)
+    assert_matches_stats(session)
+    print("  PASSED")
+
+
+def test_added_player_grows_matrix():
+    """A player added mid-session gets a slot with empty rows, then counts like everyone else."""
+    print("Test: Added player grows matrix...")
+    session = create_running_session()
+    rng = random.Random(3)
+    for _ in range(6):
+        play(session, rng)
+    matrix = session.pair_matrix
+    size = len(matrix.players)
+
+    add_player_to_session(session, Player(id="late", name="Late Arrival"))
+    assert len(matrix.players) == size + 1
+    assert all(len(row) == size + 1 for row in matrix.partner_count + matrix.opponent_count)
+    slot = matrix.slots["late"]
+    assert not any(matrix.partner_count[slot]) and not any(matrix.opponent_count[slot])
+
+    for _ in range(30):
+        play(session, rng)
+    assert sum(matrix.partner_count[slot]) == session.player_stats["late"].games_played
+    assert_matches_stats(session)
+    print("  PASSED")
+
+
+def test_trials_restores_and_undo():
+    """Copies and restores never reuse a matrix that disagrees with their stats."""
+    print("Test: Trials, restores and undo...")
+    session = create_running_session()
+    rng = random.Random(4)
+    for _ in range(8):
+        play(session, rng)
+
+    trial = create_trial_session(session)
+    assert trial.pair_matrix is None
+    match = get_active_matches(trial)[0]
+    trial_player_stats(trial, match.team1[0]).partners_played[match.team1[1]] = 99
+    assert session.pair_matrix.partners(match.team1[0], match.team1[1]) != 99
+    assert get_pair_matrix(trial).partners(match.team1[0], match.team1[1]) == 99
+
+    load_session_from_snapshot(session, session.match_history_snapshots[3])
+    assert session.pair_matrix is None
+    play(session, rng)
+    assert_matches_stats(session)
+
+    manager = create_session_manager(session)
+    manager.handle_match_completion(get_active_matches(session)[0].id, 11, 4)
+    assert manager.handle_undo()
+    assert session.pair_matrix is None
+    play(session, rng)
+    assert_matches_stats(session)
+    print("  PASSED")
+
+
+def test_score_table_from_matrix():
+    """build_match_score_table reads the matrix when there is one, with the same result."""
+    print("Test: Score table from matrix...")
+    session = create_running_session(num_players=16, courts=3)
+    rng = random.Random(5)
+    for _ in range(25):
+        play(session, rng, forfeit_rate=0.1)
+    players = sorted(session.active_players) + ["unknown"]
+
+    from_matrix = build_match_score_table(session, players)
+    matrix = session.pair_matrix
+    session.pair_matrix = None
+    from_stats = build_match_score_table(session, players)
+    session.pair_matrix = matrix
+    assert from_matrix.partnered == from_stats.partnered
+    assert from_matrix.opposed == from_stats.opposed
+    assert any(any(row) for row in from_matrix.partnered)
+    print("  PASSED")
+
+
+def test_wave_flow_penalty_from_matrix():
+    """calculate_variety_penalty reads the matrix when there is one, with the same result."""
+    print("Test: Wave flow penalty from matrix...")
+    session = create_running_session(num_players=12, courts=2)
+    rng = random.Random(6)
+    for _ in range(30):
+        play(session, rng)
+    players = sorted(session.active_players)
+
+    matrix = session.pair_matrix
+    penalties = []
+    for _ in range(50):
+        four = rng.sample(players, 4)
+        team1, team2 = four[:2], four[2:]
+        session.pair_matrix = matrix
+        from_matrix = calculate_variety_penalty(session, team1, team2)
+        session.pair_matrix = None
+        penalties.append(from_matrix)
+        assert from_matrix == calculate_variety_penalty(session, team1, team2)
+    session.pair_matrix = matrix
+    assert any(penalties)
+    print("  PASSED")
+
+
+def test_round_robin_queue_counts_history():
+    """A queue built on session history avoids the partnerships the session already played."""
+    print("Test: Round robin queue counts history...")
+    session = create_running_session(num_players=8, courts=2, mode='round-robin')
+    rng = random.Random(7)
+    for _ in range(4):
+        play(session, rng)
+    played = {(p, q) for p, stats in session.player_stats.items() for q in stats.partners_played}
+    before = {p: dict(stats.partners_played) for p, stats in session.player_stats.items()}
+
+    def repeats(queue):
+        return sum(1 for match in queue for team in (match.team1, match.team2) if tuple(team) in played)
+
+    fresh = generate_round_robin_queue(session.config.players, 'doubles', [], max_matches=2)
+    queued = generate_round_robin_queue(session.config.players, 'doubles', [], max_matches=2,
+                                        player_stats=session.player_stats)
+    assert repeats(queued) == 0 < len(queued)
+    assert repeats(queued) <= repeats(fresh)
+    # Queued matches are counted in the queue's own matrix, never in the session stats
+    assert {p: dict(stats.partners_played) for p, stats in session.player_stats.items()} == before
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Pair Matrix Tests")
+    print("=" * 60)
+
+    tests = [
+        test_incremental_updates_match_stats,
+        test_other_modes_count_pairs,
+        test_added_player_grows_matrix,
+        test_trials_restores_and_undo,
+        test_score_table_from_matrix,
+        test_wave_flow_penalty_from_matrix,
+        test_round_robin_queue_counts_history,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,333 @@
+"""
+Test the SQLite player history store behind save_player_history/load_player_history_with_ratings.
+
+Verifies that:
+1. The last saved setup loads back in the same shape player_history.json had
+2. Saving an unchanged setup does not write to the database
+3. A session's setup is updated in place and its completed matches are recorded once
+4. save_session records into its session's row and skips the database when nothing changed,
+   and matches undone or rolled back are removed from the store again
+5. An existing player_history.json is imported on first use
+6. Loading stays fast with thousands of players and tens of thousands of matches
+7. Pre-seeding finds each player's most recent rating from any session
+"""
+import sys
+import os
+import json
+import time
+import random
+import sqlite3
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, get_active_matches, load_session_from_snapshot
+)
+from python.session_manager import create_session_manager
+from python.player_history_store import PlayerHistoryStore, empty_player_history
+from python.time_manager import initialize_time_manager
+import python.session_persistence as session_persistence
+from python.session_persistence import save_player_history, load_player_history_with_ratings, load_player_ratings
+
+
+def with_temp_history(test):
+    """Run test with the player history files in a temporary directory."""
+    saved = (session_persistence.PLAYER_HISTORY_DB, session_persistence.PLAYER_HISTORY_FILE)
+    with tempfile.TemporaryDirectory() as directory:
+        session_persistence.PLAYER_HISTORY_DB = Path(directory) / "player_history.db"
+        session_persistence.PLAYER_HISTORY_FILE = Path(directory) / "player_history.json"
+        try:
+            test(Path(directory))
+        finally:
+            session_persistence.PLAYER_HISTORY_DB, session_persistence.PLAYER_HISTORY_FILE = saved
+
+
+def count(db_path, table):
+    with sqlite3.connect(str(db_path)) as db:
+        return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_setup_round_trip():
+    """Players, byes, ratings, mode and pools come back as saved."""
+    print("Test: Setup round trip...")
+
+    def run(directory):
+        assert load_player_history_with_ratings() == empty_player_history()
+        players = [Player(id=f"p{i}", name=name, skill_rating=3.0 + i / 4)
+                   for i, name in enumerate(['Cara', 'Ann', 'Bob', 'Dee'])]
+        save_player_history(['Cara', 'Ann', 'Bob', 'Ann', 'Dee'], ['Bob'], players_with_ratings=players,
+                            pre_seeded=True, game_mode='pooled-continuous-rr', session_type='doubles',
+                            pool_assignments={'Pool 1': ['Cara', 'Ann'], 'Pool 2': ['Bob', 'Dee']},
+                            pool_court_assignments={'Pool 1': [1], 'Pool 2': [2]})
+        assert load_player_history_with_ratings() == {
+            "players": ['Cara', 'Ann', 'Bob', 'Dee'],
+            "first_bye_players": ['Bob'],
+            "pre_seeded": True,
+            "player_ratings": {'Cara': 3.0, 'Ann': 3.25, 'Bob': 3.5, 'Dee': 3.75},
+            "game_mode": 'pooled-continuous-rr',
+            "session_type": 'doubles',
+            "pool_assignments": {'Pool 1': ['Cara', 'Ann'], 'Pool 2': ['Bob', 'Dee']},
+            "pool_court_assignments": {'Pool 1': [1], 'Pool 2': [2]}
+        }
+
+        # A later setup becomes the one offered next time; known players are not added again
+        save_player_history(['Dee', 'Eve'], game_mode='competitive-variety')
+        history = load_player_history_with_ratings()
+        assert (history["players"], history["pre_seeded"], history["pool_assignments"]) == (['Dee', 'Eve'], False, None)
+        assert count(directory / "player_history.db", "players") == 5
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_unchanged_setup_not_written():
+    """Repeating the latest setup leaves the database file untouched."""
+    print("Test: Unchanged setup not written...")
+
+    def run(directory):
+        save_player_history(['Ann', 'Bob', 'Cara', 'Dee'], ['Ann'], game_mode='competitive-variety')
+        db_path = directory / "player_history.db"
+        before = (db_path.stat().st_mtime_ns, db_path.read_bytes())
+        time.sleep(0.01)
+        save_player_history(['Ann', 'Bob', 'Cara', 'Dee'], ['Ann'], game_mode='competitive-variety')
+        assert (db_path.stat().st_mtime_ns, db_path.read_bytes()) == before
+        assert count(db_path, "sessions") == 1
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_session_matches_recorded():
+    """Setup and close of one session share a row; matches are added and score edits update them."""
+    print("Test: Session matches recorded...")
+
+    def run(directory):
+        initialize_time_manager()
+        players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(12)]
+        session = create_session(SessionConfig(mode='competitive-variety', session_type='doubles',
+                                               players=players, courts=2))
+        evaluate_and_create_matches(session)
+        names = [p.name for p in players]
+        pools = {'Pool 1': names[:6], 'Pool 2': names[6:]}
+        save_player_history(names, game_mode='competitive-variety', session_type='doubles',
+                            pool_assignments=pools, session=session)
+
+        rng = random.Random(1)
+        for _ in range(8):
+            complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+            evaluate_and_create_matches(session)
+        # Closing saves without pools; the ones from setup are kept
+        save_player_history(names, game_mode='competitive-variety', session_type='doubles', session=session)
+        db_path = directory / "player_history.db"
+        assert count(db_path, "sessions") == 1 and count(db_path, "matches") == 8
+        assert load_player_history_with_ratings()["pool_assignments"] == pools
+
+        edited = next(m for m in session.matches if m.status == 'completed')
+        edited.score = {'team1_score': 11, 'team2_score': 13}
+        save_player_history(names, game_mode='competitive-variety', session_type='doubles', session=session)
+        with sqlite3.connect(str(db_path)) as db:
+            stored = db.execute("SELECT team1, team1_score, team2_score FROM matches WHERE match_id = ?",
+                                (edited.id,)).fetchone()
+        assert stored == (json.dumps([players[int(pid[1:])].name for pid in edited.team1]), 11, 13)
+        assert count(db_path, "matches") == 8
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_save_session_records_its_session():
+    """Autosaves update the session's own row and leave the database alone when nothing changed."""
+    print("Test: save_session records its session...")
+
+    def run(directory):
+        saved = (session_persistence.LAST_SESSION_FILE, session_persistence.SESSION_JOURNAL_FILE,
+                 session_persistence._session_journal)
+        session_persistence.LAST_SESSION_FILE = directory / "last_session.json"
+        session_persistence.SESSION_JOURNAL_FILE = directory / "last_session.journal"
+        session_persistence._session_journal = None
+        try:
+            initialize_time_manager()
+            players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(12)]
+            session = create_session(SessionConfig(mode='competitive-variety', session_type='doubles',
+                                                   players=players, courts=2))
+            evaluate_and_create_matches(session)
+            assert session_persistence.save_session(session)
+
+            db_path = directory / "player_history.db"
+            with sqlite3.connect(str(db_path)) as db:
+                assert db.execute("SELECT session_id FROM sessions").fetchall() == [(session.id,)]
+            before = (db_path.stat().st_mtime_ns, db_path.read_bytes())
+            time.sleep(0.01)
+            assert session_persistence.save_session(session)
+            assert (db_path.stat().st_mtime_ns, db_path.read_bytes()) == before
+
+            rng = random.Random(2)
+            for _ in range(3):
+                complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+                evaluate_and_create_matches(session)
+                assert session_persistence.save_session(session, event="complete_match")
+            assert count(db_path, "sessions") == 1 and count(db_path, "matches") == 3
+            assert load_player_history_with_ratings()["players"] == [p.name for p in players]
+        finally:
+            (session_persistence.LAST_SESSION_FILE, session_persistence.SESSION_JOURNAL_FILE,
+             session_persistence._session_journal) = saved
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_undone_matches_removed():
+    """A completion that is undone or rolled back leaves the matches table on the next save."""
+    print("Test: Undone matches removed...")
+
+    def run(directory):
+        saved = (session_persistence.LAST_SESSION_FILE, session_persistence.SESSION_JOURNAL_FILE,
+                 session_persistence._session_journal)
+        session_persistence.LAST_SESSION_FILE = directory / "last_session.json"
+        session_persistence.SESSION_JOURNAL_FILE = directory / "last_session.journal"
+        session_persistence._session_journal = None
+        try:
+            initialize_time_manager()
+            players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(12)]
+            session = create_session(SessionConfig(mode='competitive-variety', session_type='doubles',
+                                                   players=players, courts=2))
+            evaluate_and_create_matches(session)
+            manager = create_session_manager(session)
+            db_path = directory / "player_history.db"
+
+            def stored_ids():
+                with sqlite3.connect(str(db_path)) as db:
+                    return {row[0] for row in db.execute("SELECT match_id FROM matches")}
+
+            for _ in range(3):
+                manager.handle_match_completion(get_active_matches(session)[0].id, 11, 4)
+            assert session_persistence.save_session(session)
+            undone = [m for m in session.matches if m.status == 'completed'][-1]
+            assert undone.id in stored_ids()
+
+            assert manager.handle_undo()
+            assert session_persistence.save_session(session)
+            completed = {m.id for m in session.matches if m.status == 'completed'}
+            assert undone.id not in stored_ids() and stored_ids() == completed
+
+            # Rolling back to before the first completion empties the table
+            load_session_from_snapshot(session, session.match_history_snapshots[0])
+            assert session_persistence.save_session(session)
+            assert stored_ids() == set()
+        finally:
+            (session_persistence.LAST_SESSION_FILE, session_persistence.SESSION_JOURNAL_FILE,
+             session_persistence._session_journal) = saved
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_latest_ratings():
+    """Each player's rating comes from the last session that rated them."""
+    print("Test: Latest ratings...")
+
+    def run(directory):
+        def rated(ratings):
+            return [Player(id=f"p{i}", name=name, skill_rating=rating)
+                    for i, (name, rating) in enumerate(ratings.items())]
+
+        save_player_history(['Ann', 'Bob'], players_with_ratings=rated({'Ann': 3.0, 'Bob': 3.5}), pre_seeded=True)
+        save_player_history(['Ann', 'Cara'], players_with_ratings=rated({'Ann': 4.0, 'Cara': 3.25}), pre_seeded=True)
+        save_player_history(['Ann', 'Bob', 'Dee'], game_mode='competitive-variety')  # Not pre-seeded
+        assert load_player_ratings(['Ann', 'Bob', 'Cara', 'Dee', 'Eve']) == {'Ann': 4.0, 'Bob': 3.5, 'Cara': 3.25}
+        assert load_player_ratings([]) == {}
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_legacy_json_imported():
+    """player_history.json from before the database is imported on first use."""
+    print("Test: Legacy JSON imported...")
+
+    def run(directory):
+        (directory / "player_history.json").write_text(json.dumps({
+            "players": ['Ann', 'Bob', 'Cara', 'Dee'],
+            "first_bye_players": ['Dee'],
+            "pre_seeded": True,
+            "player_ratings": {'Ann': 4.0},
+            "game_mode": 'king-of-court',
+            "session_type": 'doubles',
+            "last_updated": "2024-01-01T19:00:00"
+        }))
+        history = load_player_history_with_ratings()
+        assert history["players"] == ['Ann', 'Bob', 'Cara', 'Dee']
+        assert history["first_bye_players"] == ['Dee']
+        assert history["player_ratings"] == {'Ann': 4.0}
+        assert history["game_mode"] == 'king-of-court'
+        assert history["pool_assignments"] is None
+
+    with_temp_history(run)
+    print("  PASSED")
+
+
+def test_large_history_is_fast():
+    """Years of weekly sessions: loading the setup dialog's history stays quick."""
+    print("Test: Large history is fast...")
+    with tempfile.TemporaryDirectory() as directory:
+        store = PlayerHistoryStore(Path(directory) / "player_history.db")
+        rng = random.Random(2)
+        club = [f"Member {i}" for i in range(3000)]
+        start = time.perf_counter()
+        for week in range(250):
+            names = rng.sample(club, 32)
+            setup = dict(empty_player_history(), players=names, game_mode='competitive-variety')
+            matches = [{"id": f"m{week}_{n}", "court_number": n % 6 + 1, "team1": names[0:2],
+                        "team2": names[2:4], "team1_score": 11, "team2_score": n % 10, "end_time": None}
+                       for n in range(100)]
+            store.save_setup(setup, session_id=f"s{week}", started_at=f"2020-01-01T19:00:{week:03d}",
+                             matches=matches)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        history = store.load_setup()
+        elapsed = time.perf_counter() - start
+        assert history["players"] == names
+        assert count(store.path, "matches") == 25000
+        assert elapsed < 0.05
+        print(f"  {build:.2f}s to record 250 sessions, {elapsed * 1000:.1f}ms to load the latest setup")
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Player History Store Tests")
+    print("=" * 60)
+
+    tests = [
+        test_setup_round_trip,
+        test_unchanged_setup_not_written,
+        test_session_matches_recorded,
+        test_save_session_records_its_session,
+        test_undone_matches_removed,
+        test_latest_ratings,
+        test_legacy_json_imported,
+        test_large_history_is_fast,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -317,14 +317,14 @@ class TestPoolPersistence(unittest.TestCase):
         """Pool assignments should be saved and loaded from player history"""
         from python.session_persistence import save_player_history, load_player_history_with_ratings
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.db', delete=False) as f:
             temp_path = f.name
         
         try:
             import python.session_persistence as sp
-            original_file = sp.PLAYER_HISTORY_FILE
+            original_file = sp.PLAYER_HISTORY_DB
             from pathlib import Path
-            sp.PLAYER_HISTORY_FILE = Path(temp_path)
+            sp.PLAYER_HISTORY_DB = Path(temp_path)
             
             # Save with pool assignments
             pool_assignments = {
@@ -351,21 +351,21 @@ class TestPoolPersistence(unittest.TestCase):
             self.assertEqual(data['pool_court_assignments'], pool_court_assignments)
             self.assertEqual(data['game_mode'], 'pooled-continuous-rr')
         finally:
-            sp.PLAYER_HISTORY_FILE = original_file
+            sp.PLAYER_HISTORY_DB = original_file
             os.unlink(temp_path)
     
     def test_load_without_pool_assignments(self):
         """Loading history without pool assignments should return None"""
         from python.session_persistence import save_player_history, load_player_history_with_ratings
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.db', delete=False) as f:
             temp_path = f.name
         
         try:
             import python.session_persistence as sp
-            original_file = sp.PLAYER_HISTORY_FILE
+            original_file = sp.PLAYER_HISTORY_DB
             from pathlib import Path
-            sp.PLAYER_HISTORY_FILE = Path(temp_path)
+            sp.PLAYER_HISTORY_DB = Path(temp_path)
             
             save_player_history(['Alice', 'Bob'], game_mode='competitive-variety')
             
@@ -373,7 +373,7 @@ class TestPoolPersistence(unittest.TestCase):
             self.assertIsNone(data['pool_assignments'])
             self.assertIsNone(data['pool_court_assignments'])
         finally:
-            sp.PLAYER_HISTORY_FILE = original_file
+            sp.PLAYER_HISTORY_DB = original_file
             os.unlink(temp_path)
 
 
@@ -0,0 +1,211 @@
+"""
+Test the session-scoped ranking index used by competitive variety.
+
+Verifies that:
+1. Cached ranks/ratings match a from-scratch re-rate and sort of all active players
+2. The index is reused between lookups while nothing changes
+3. complete_match, score edits, and player add/remove rebuild the index
+4. Replacing the active player set or stats dict is detected without explicit invalidation
+5. Matchmaking passes reuse the index; stats edited directly are picked up after
+   mark_session_changed
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats
+from python.competitive_variety import (
+    calculate_player_elo_rating, get_player_ranking, get_ranking_index,
+    invalidate_ranking_index, BASE_RATING
+)
+from python.competitive_variety import populate_empty_courts_competitive_variety
+from python.session import (
+    complete_match, recalculate_stats_after_edit, add_player_to_session, remove_player_from_session,
+    mark_session_changed
+)
+from python.time_manager import initialize_time_manager
+from python.utils import generate_id
+
+
+def create_test_session(num_players=12, courts=2):
+    """Create a test session in competitive-variety mode."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i}", name=f"Player {i}") for i in range(1, num_players + 1)]
+    config = SessionConfig(
+        mode='competitive-variety',
+        session_type='doubles',
+        players=players,
+        courts=courts
+    )
+    session = Session(id=generate_id(), config=config)
+    session.active_players = set(p.id for p in players)
+    for p in players:
+        session.player_stats[p.id] = PlayerStats(player_id=p.id)
+    return session
+
+
+def reference_ranking(session, player_id):
+    """Re-rate and sort every active player the way rankings were computed before the index."""
+    ratings = [(pid, calculate_player_elo_rating(session, pid)) for pid in sorted(session.active_players)]
+    ratings.sort(key=lambda x: x[1], reverse=True)
+    for rank, (pid, rating) in enumerate(ratings, 1):
+        if pid == player_id:
+            return rank, rating
+    return len(ratings) + 1, BASE_RATING
+
+
+def add_in_progress_match(session, team1, team2, court=1):
+    match = Match(id=generate_id(), court_number=court, team1=team1, team2=team2, status='in-progress')
+    session.matches.append(match)
+    return match
+
+
+def test_index_matches_reference_ranking():
+    """Cached lookups agree with a full re-rate for every player, including ties."""
+    print("Test: Index matches reference ranking...")
+    session = create_test_session()
+    for i, pid in enumerate(sorted(session.active_players)):
+        stats = session.player_stats[pid]
+        stats.games_played = 4
+        stats.wins = i % 5
+        stats.losses = 4 - (i % 5)
+        stats.total_points_for = 30 + i
+        stats.total_points_against = 35
+    invalidate_ranking_index(session)
+
+    for pid in session.active_players:
+        assert get_player_ranking(session, pid) == reference_ranking(session, pid)
+
+    # Unknown players rank after everyone with the base rating
+    assert get_player_ranking(session, "ghost") == (len(session.active_players) + 1, BASE_RATING)
+    print("  PASSED")
+
+
+def test_index_reused_until_stats_change():
+    """Repeated lookups reuse one index; complete_match rebuilds it."""
+    print("Test: Index reused until stats change...")
+    session = create_test_session()
+    index = get_ranking_index(session)
+    get_player_ranking(session, "p1")
+    get_player_ranking(session, "p2")
+    assert session.ranking_index is index
+
+    match = add_in_progress_match(session, ["p1", "p2"], ["p3", "p4"])
+    success, _ = complete_match(session, match.id, 11, 3)
+    assert success
+    assert session.ranking_index is None
+
+    # Winners move to the top of the ranking
+    assert get_player_ranking(session, "p1")[0] <= 2
+    assert get_player_ranking(session, "p2")[0] <= 2
+    assert get_player_ranking(session, "p3") == reference_ranking(session, "p3")
+    print("  PASSED")
+
+
+def test_score_edit_rebuilds_index():
+    """Editing a completed score flips the ranking of the affected players."""
+    print("Test: Score edit rebuilds index...")
+    session = create_test_session()
+    match = add_in_progress_match(session, ["p1", "p2"], ["p3", "p4"])
+    complete_match(session, match.id, 11, 3)
+    assert get_player_ranking(session, "p1")[0] <= 2
+
+    old_score = dict(match.score)
+    match.score = {'team1_score': 3, 'team2_score': 11}
+    recalculate_stats_after_edit(session, match, old_score, match.score)
+
+    assert get_player_ranking(session, "p3")[0] <= 2
+    for pid in session.active_players:
+        assert get_player_ranking(session, pid) == reference_ranking(session, pid)
+    print("  PASSED")
+
+
+def test_player_add_remove_rebuilds_index():
+    """Adding or removing players changes the ranked population."""
+    print("Test: Player add/remove rebuilds index...")
+    session = create_test_session()
+    get_ranking_index(session)
+
+    add_player_to_session(session, Player(id="p13", name="Player 13"))
+    assert get_ranking_index(session).active_count == 13
+    assert get_player_ranking(session, "p13")[0] <= 13
+
+    remove_player_from_session(session, "p13")
+    assert get_ranking_index(session).active_count == 12
+    assert get_player_ranking(session, "p13") == (13, BASE_RATING)
+
+    # Reactivating a known player mutates the active set in place
+    add_player_to_session(session, Player(id="p13", name="Player 13"))
+    assert get_ranking_index(session).active_count == 13
+    print("  PASSED")
+
+
+def test_replaced_state_detected():
+    """Swapping in a new active set or stats dict invalidates the index without a hook."""
+    print("Test: Replaced session state detected...")
+    session = create_test_session()
+    index = get_ranking_index(session)
+
+    session.active_players = set(session.active_players) - {"p12"}
+    assert get_ranking_index(session) is not index
+    assert get_player_ranking(session, "p12") == (12, BASE_RATING)
+
+    index = get_ranking_index(session)
+    session.player_stats = dict(session.player_stats)
+    assert get_ranking_index(session) is not index
+    print("  PASSED")
+
+
+def test_passes_reuse_index_until_marked_changed():
+    """A matchmaking pass ranks from the cached index; direct stats edits need mark_session_changed."""
+    print("Test: Passes reuse index until marked changed...")
+    session = create_test_session(num_players=12, courts=1)
+    populate_empty_courts_competitive_variety(session)
+    index = session.ranking_index
+    assert index is not None
+    populate_empty_courts_competitive_variety(session)
+    assert session.ranking_index is index
+
+    stats = session.player_stats["p12"]
+    stats.games_played, stats.wins = 5, 5
+    stats.total_points_for, stats.total_points_against = 55, 10
+    mark_session_changed(session)
+    assert session.ranking_index is None
+    assert get_player_ranking(session, "p12") == reference_ranking(session, "p12")
+    assert get_player_ranking(session, "p12")[0] == 1
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Ranking Index Tests")
+    print("=" * 60)
+
+    tests = [
+        test_index_matches_reference_ranking,
+        test_index_reused_until_stats_change,
+        test_score_edit_rebuilds_index,
+        test_player_add_remove_rebuilds_index,
+        test_replaced_state_detected,
+        test_passes_reuse_index_until_marked_changed,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
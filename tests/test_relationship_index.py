@@ -0,0 +1,244 @@
+"""
+Test the relationship history index used by the competitive variety repetition rules.
+
+Verifies that:
+1. Index lookups agree with brute-force scans of the completed match history
+2. complete_match and forfeit_match keep the index in sync incrementally
+3. Directly appended matches and status flips are folded in on the next lookup
+4. Out-of-order completions fold in incrementally; replaced match lists trigger a full rebuild
+"""
+import sys
+import os
+import copy
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Session, SessionConfig, Player, Match, PlayerStats
+from python.relationship_index import get_relationship_index, build_relationship_index
+from python.session import complete_match, forfeit_match
+from python.time_manager import initialize_time_manager
+from python.utils import generate_id
+
+
+def create_test_session(num_players=8, courts=2):
+    """Create a test session in competitive-variety mode."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i}", name=f"Player {i}") for i in range(1, num_players + 1)]
+    config = SessionConfig(
+        mode='competitive-variety',
+        session_type='doubles',
+        players=players,
+        courts=courts
+    )
+    session = Session(id=generate_id(), config=config)
+    session.active_players = set(p.id for p in players)
+    for p in players:
+        session.player_stats[p.id] = PlayerStats(player_id=p.id)
+    return session
+
+
+def add_match(session, team1, team2, status='in-progress', court=1):
+    match = Match(id=generate_id(), court_number=court, team1=team1, team2=team2, status=status)
+    session.matches.append(match)
+    return match
+
+
+def brute_force_last_together(session, p1, p2):
+    """Scan completed matches the way the repetition checks did before the index."""
+    completed = [m for m in session.matches if m.status == 'completed']
+    for i in range(len(completed) - 1, -1, -1):
+        m = completed[i]
+        if p1 in m.team1 + m.team2 and p2 in m.team1 + m.team2:
+            same_team = (p1 in m.team1 and p2 in m.team1) or (p1 in m.team2 and p2 in m.team2)
+            return i, not same_team
+    return -1, False
+
+
+def brute_force_personal(session, p1, p2, role):
+    """Personal game count of p1, and p1's personal index of the last game with p2 in role."""
+    player_matches = [m for m in session.matches
+                      if m.status == 'completed' and p1 in m.team1 + m.team2]
+    last = None
+    for i, m in enumerate(player_matches):
+        same_team = (p1 in m.team1 and p2 in m.team1) or (p1 in m.team2 and p2 in m.team2)
+        other_team = (p1 in m.team1 and p2 in m.team2) or (p1 in m.team2 and p2 in m.team1)
+        if (role == 'partner' and same_team) or (role == 'opponent' and other_team):
+            last = i
+    return len(player_matches), last
+
+
+def assert_index_consistent(session):
+    index = get_relationship_index(session)
+    completed = [m for m in session.matches if m.status == 'completed']
+    assert index.completed == completed
+    for p1 in session.active_players:
+        for p2 in session.active_players:
+            if p1 == p2:
+                continue
+            assert index.last_together_index(p1, p2) == brute_force_last_together(session, p1, p2), (p1, p2)
+            count, last_partner = brute_force_personal(session, p1, p2, 'partner')
+            _, last_opponent = brute_force_personal(session, p1, p2, 'opponent')
+            assert index.personal_game_count(p1) == count
+            assert index.last_role_index(p1, p2, 'partner')[1] == (-1 if last_partner is None else last_partner)
+            assert index.last_role_index(p1, p2, 'opponent')[1] == (-1 if last_opponent is None else last_opponent)
+
+
+def test_complete_and_forfeit_sync():
+    """Completing and forfeiting matches keeps the index in step with the history."""
+    print("Test: complete_match / forfeit_match sync...")
+    session = create_test_session()
+    m1 = add_match(session, ["p1", "p2"], ["p3", "p4"], court=1)
+    m2 = add_match(session, ["p5", "p6"], ["p7", "p8"], court=2)
+    index = get_relationship_index(session)
+    assert index.completed_count == 0
+
+    complete_match(session, m1.id, 11, 5)
+    forfeit_match(session, m2.id)
+    m3 = add_match(session, ["p1", "p3"], ["p2", "p4"], court=1)
+    complete_match(session, m3.id, 11, 9)
+
+    assert get_relationship_index(session) is index
+    assert index.completed_count == 2
+    assert index.last_together_index("p1", "p2") == (1, True)
+    assert index.first_partner_index("p1", "p2") == 0
+    assert_index_consistent(session)
+    print("  PASSED")
+
+
+def test_direct_appends_and_status_flips():
+    """Matches appended or completed outside session.py are picked up on lookup."""
+    print("Test: Direct appends and status flips...")
+    session = create_test_session()
+    add_match(session, ["p1", "p2"], ["p3", "p4"], status='completed')
+    index = get_relationship_index(session)
+
+    pending = add_match(session, ["p5", "p6"], ["p7", "p8"], status='waiting')
+    add_match(session, ["p1", "p5"], ["p2", "p6"], status='completed')
+    assert_index_consistent(session)
+
+    pending.status = 'completed'
+    assert_index_consistent(session)
+    assert session.relationship_index is index  # Completed ahead of an indexed match, folded in
+    print("  PASSED")
+
+
+def test_out_of_order_completion_incremental():
+    """A court finishing after a later-created match shifts indices without a rebuild."""
+    print("Test: Out-of-order completion...")
+    session = create_test_session()
+    slow = add_match(session, ["p1", "p2"], ["p3", "p4"], court=1)
+    fast = add_match(session, ["p5", "p6"], ["p7", "p8"], court=2)
+    complete_match(session, fast.id, 11, 4)
+    index = get_relationship_index(session)
+    assert index.last_game_index("p5") == 0
+
+    complete_match(session, slow.id, 11, 7)
+    assert get_relationship_index(session) is index
+    assert index.last_game_index("p1") == 0
+    assert index.last_game_index("p5") == 1
+    assert_index_consistent(session)
+    print("  PASSED")
+
+
+def test_replaced_history_rebuilds():
+    """Restoring or copying the session swaps the matches list and is detected."""
+    print("Test: Replaced match history...")
+    session = create_test_session()
+    for i in range(4):
+        add_match(session, ["p1", f"p{i + 2}"], ["p6", "p7"], status='completed')
+    get_relationship_index(session)
+
+    session.matches = session.matches[:2]
+    assert get_relationship_index(session).completed_count == 2
+    assert_index_consistent(session)
+
+    trial = copy.deepcopy(session)
+    add_match(trial, ["p1", "p8"], ["p2", "p3"], status='completed')
+    assert get_relationship_index(trial).completed_count == 3
+    assert get_relationship_index(session).completed_count == 2
+    assert_index_consistent(trial)
+    print("  PASSED")
+
+
+def test_rebuild_matches_incremental():
+    """An incrementally synced index equals one built from scratch."""
+    print("Test: Incremental index equals full rebuild...")
+    session = create_test_session(num_players=12, courts=3)
+    ids = [f"p{i}" for i in range(1, 13)]
+    get_relationship_index(session)
+    for round_num in range(6):
+        for court in range(3):
+            rotated = ids[(round_num * 5 + court * 4):] + ids[:(round_num * 5 + court * 4)]
+            match = add_match(session, rotated[0:2], rotated[2:4], court=court + 1)
+            complete_match(session, match.id, 11, round_num + court)
+
+    incremental = get_relationship_index(session)
+    rebuilt = build_relationship_index(session)
+    assert incremental.completed == rebuilt.completed
+    assert incremental.player_games == rebuilt.player_games
+    assert incremental.last_partner_pos == rebuilt.last_partner_pos
+    assert incremental.last_opponent_pos == rebuilt.last_opponent_pos
+    assert incremental.first_partner_pos == rebuilt.first_partner_pos
+    assert_index_consistent(session)
+    print("  PASSED")
+
+
+def test_shuffled_completions_match_rebuild():
+    """Completing a round's courts in any order gives the same index as a rebuild."""
+    print("Test: Shuffled completion order...")
+    rng = random.Random(7)
+    session = create_test_session(num_players=16, courts=4)
+    ids = [f"p{i}" for i in range(1, 17)]
+    index = get_relationship_index(session)
+    for round_num in range(5):
+        rng.shuffle(ids)
+        matches = [add_match(session, ids[i:i + 2], ids[i + 2:i + 4], court=i // 4 + 1)
+                   for i in range(0, 16, 4)]
+        rng.shuffle(matches)
+        for match in matches:
+            complete_match(session, match.id, 11, round_num)
+            assert_index_consistent(session)
+
+    assert get_relationship_index(session) is index
+    rebuilt = build_relationship_index(session)
+    assert index.completed_positions == rebuilt.completed_positions
+    assert index.player_games == rebuilt.player_games
+    assert index.last_partner_pos == rebuilt.last_partner_pos
+    assert index.last_opponent_pos == rebuilt.last_opponent_pos
+    assert index.first_partner_pos == rebuilt.first_partner_pos
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Relationship Index Tests")
+    print("=" * 60)
+
+    tests = [
+        test_complete_and_forfeit_sync,
+        test_direct_appends_and_status_flips,
+        test_out_of_order_completion_incremental,
+        test_replaced_history_rebuilds,
+        test_rebuild_matches_incremental,
+        test_shuffled_completions_match_rebuild,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,135 @@
+"""
+Test roaming-window quadruple generation for competitive variety.
+
+Verifies that:
+1. The generator yields exactly the combinations can_all_players_play_together accepts, in order
+2. Provisional players and players missing from the ranking follow the same rules
+3. Large sessions never enumerate the rank-distant part of the C(n, 4) space
+"""
+import sys
+import os
+import random
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Session, SessionConfig, Player, PlayerStats
+from python.competitive_variety import (
+    build_matchmaking_context, can_all_players_play_together, generate_roaming_quadruples,
+    roaming_compatibility_masks
+)
+from python.time_manager import initialize_time_manager
+from python.utils import generate_id
+
+
+def create_ranked_session(num_players, seed, provisional_every=0, roaming_percent=0.25, mode='competitive-variety'):
+    """Create a session with random records; every Nth player has too few games to be ranked."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode=mode, session_type='doubles', players=players, courts=num_players // 4)
+    session = Session(id=generate_id(), config=config)
+    session.active_players = set(p.id for p in players)
+    session.competitive_variety_roaming_range_percent = roaming_percent
+    for i, p in enumerate(players):
+        stats = PlayerStats(player_id=p.id)
+        if not (provisional_every and i % provisional_every == 0):
+            stats.games_played = rng.randint(2, 10)
+            stats.wins = rng.randint(0, stats.games_played)
+            stats.losses = stats.games_played - stats.wins
+            stats.total_points_for = rng.randint(10, 110)
+            stats.total_points_against = rng.randint(10, 110)
+        session.player_stats[p.id] = stats
+    return session
+
+
+def brute_force(session, player_ids, context):
+    return [quad for quad in combinations(range(len(player_ids)), 4)
+            if can_all_players_play_together(session, [player_ids[i] for i in quad], context)]
+
+
+def test_matches_brute_force_order():
+    """Same quadruples, same order, as filtering every combination."""
+    print("Test: Generator equals filtered combinations...")
+    for seed, num_players, roaming in ((1, 12, 0.25), (2, 16, 0.5), (3, 20, 0.1), (4, 14, 0.0)):
+        session = create_ranked_session(num_players, seed, roaming_percent=roaming)
+        context = build_matchmaking_context(session)
+        player_ids = sorted(session.active_players)
+        random.Random(seed).shuffle(player_ids)  # Callers pass wait-priority order, not rank order
+        assert list(generate_roaming_quadruples(session, player_ids, context)) == \
+            brute_force(session, player_ids, context)
+    print("  PASSED")
+
+
+def test_provisional_and_unranked_players():
+    """Provisional players roam freely but still have to sit inside others' windows."""
+    print("Test: Provisional and unranked players...")
+    session = create_ranked_session(16, 5, provisional_every=4)
+    context = build_matchmaking_context(session)
+    player_ids = sorted(session.active_players) + ["guest"]
+    assert list(generate_roaming_quadruples(session, player_ids, context)) == \
+        brute_force(session, player_ids, context)
+
+    masks = roaming_compatibility_masks(session, player_ids, context)
+    for i in range(len(player_ids)):
+        assert not masks[i] >> i & 1
+        for j in range(len(player_ids)):
+            assert (masks[i] >> j & 1) == (masks[j] >> i & 1)
+    print("  PASSED")
+
+
+def test_other_modes_unrestricted():
+    """Outside competitive variety every combination is allowed."""
+    print("Test: Other modes unrestricted...")
+    session = create_ranked_session(10, 6, mode='round-robin')
+    player_ids = sorted(session.active_players)
+    assert list(generate_roaming_quadruples(session, player_ids)) == list(combinations(range(10), 4))
+    print("  PASSED")
+
+
+def test_large_session_prunes():
+    """A 60-player open play with a 10% window yields a small slice of C(60, 4)."""
+    print("Test: Large session prunes rank-distant combinations...")
+    session = create_ranked_session(60, 7, roaming_percent=0.1)
+    context = build_matchmaking_context(session)
+    player_ids = sorted(session.active_players)
+    quads = list(generate_roaming_quadruples(session, player_ids, context))
+    total = len(list(combinations(range(60), 4)))
+    assert quads and len(quads) < total // 20
+    for quad in quads[::97]:
+        ranks = [context.rank(player_ids[i]) for i in quad]
+        assert max(ranks) - min(ranks) <= context.roaming_limit
+    print(f"  {len(quads)} of {total} combinations generated")
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Roaming Quadruple Generation Tests")
+    print("=" * 60)
+
+    tests = [
+        test_matches_brute_force_order,
+        test_provisional_and_unranked_players,
+        test_other_modes_unrestricted,
+        test_large_session_prunes,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,149 @@
+"""
+Test the compressed per-session archive files.
+
+Verifies that:
+1. An archive loads back to the same session it was written from
+2. The index (date, mode, players, match count) is read without decompressing the session
+3. Archives are much smaller than the JSON session file
+4. Listing returns newest sessions first and skips files that are not archives
+"""
+import sys
+import os
+import json
+import random
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import create_session, evaluate_and_create_matches, complete_match, get_active_matches
+from python.session_persistence import serialize_session
+from python.time_manager import initialize_time_manager
+import python.session_archive as session_archive
+from python.session_archive import (
+    write_session_archive, read_archive_index, list_session_archives, load_session_archive
+)
+
+
+def play_session(completions=30, seed=1, start=None):
+    """Create a competitive-variety session and play some matches."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(16)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=3)
+    session = create_session(config)
+    session.session_start_time = start or datetime(2024, 3, 5, 18, 30)
+    evaluate_and_create_matches(session)
+    for _ in range(completions):
+        complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session
+
+
+def comparable(data):
+    data = json.loads(json.dumps(data))
+    data.pop("saved_at")
+    data["active_players"] = sorted(data["active_players"])
+    return data
+
+
+def test_archive_round_trip():
+    """Loading an archive gives back the session's data."""
+    print("Test: Archive round trip...")
+    session = play_session()
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_session_archive(session, directory)
+        restored = load_session_archive(path)
+        assert comparable(serialize_session(restored)) == comparable(serialize_session(session))
+
+        # Archiving the same session again replaces its file
+        assert write_session_archive(session, directory) == path
+        assert len(list(Path(directory).iterdir())) == 1
+    print("  PASSED")
+
+
+def test_index_without_decompressing():
+    """The index carries the listing fields and reading it never calls zlib."""
+    print("Test: Index without decompressing...")
+    session = play_session(completions=12, seed=2)
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_session_archive(session, directory)
+        original = session_archive.zlib.decompress
+
+        def fail(*args):
+            raise AssertionError("index read decompressed the session")
+
+        session_archive.zlib.decompress = fail
+        try:
+            index = read_archive_index(path)
+        finally:
+            session_archive.zlib.decompress = original
+
+        assert index.session_id == session.id
+        assert index.date == "2024-03-05T18:30:00"
+        assert (index.mode, index.session_type, index.courts) == ('competitive-variety', 'doubles', 3)
+        assert index.players == [p.name for p in session.config.players]
+        assert index.match_count == 12
+    print("  PASSED")
+
+
+def test_archive_is_compact():
+    """The archive is a fraction of the size of the indented session JSON."""
+    print("Test: Archive is compact...")
+    session = play_session(completions=60, seed=3)
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_session_archive(session, directory)
+        archived = path.stat().st_size
+        plain = len(json.dumps(serialize_session(session), indent=2))
+        assert archived * 10 < plain
+        print(f"  {archived} bytes archived vs {plain} bytes of session JSON")
+    print("  PASSED")
+
+
+def test_listing():
+    """Newest first; stray files are skipped."""
+    print("Test: Listing...")
+    with tempfile.TemporaryDirectory() as directory:
+        for week in range(4):
+            session = play_session(completions=2, seed=week, start=datetime(2024, 1, 2 + 7 * week, 19))
+            write_session_archive(session, directory)
+        (Path(directory) / "notes.pbsa").write_text("not an archive")
+
+        archives = list_session_archives(directory)
+        assert [a.date[:10] for a in archives] == ["2024-01-23", "2024-01-16", "2024-01-09", "2024-01-02"]
+        assert list_session_archives(Path(directory) / "missing") == []
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Session Archive Tests")
+    print("=" * 60)
+
+    tests = [
+        test_archive_round_trip,
+        test_index_without_decompressing,
+        test_archive_is_compact,
+        test_listing,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
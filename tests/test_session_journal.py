@@ -0,0 +1,337 @@
+"""
+Test the append-only session journal behind save_session/load_last_session.
+
+Verifies that:
+1. Saves after the first append one small record instead of rewriting the checkpoint
+2. Loading replays the journal onto the checkpoint and gives back the last saved session
+3. The journal is compacted into the checkpoint after a fixed number of records
+4. A torn last record or records left over from before a checkpoint are skipped safely
+5. Follow-up save_session calls serialize only open, edited and new matches and snapshots
+6. Court edits, score edits, player changes, undo and snapshot restores all reach the journal
+"""
+import sys
+import os
+import json
+import random
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, forfeit_match, get_active_matches,
+    create_manual_match, update_match_teams, add_player_to_session, remove_player_from_session,
+    load_session_from_snapshot
+)
+from python.session_manager import create_session_manager
+from python.session_journal import SessionJournal
+from python.time_manager import initialize_time_manager
+import python.session_persistence as session_persistence
+
+
+def create_running_session(num_players=16, courts=3):
+    """Create a competitive-variety session with all courts filled."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    return session
+
+
+def play(session, rng):
+    """Complete one match and refill the court."""
+    complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+    evaluate_and_create_matches(session)
+
+
+def plain(data):
+    """Serialized session as it reads back from JSON."""
+    return json.loads(json.dumps(data))
+
+
+def new_journal(directory, compact_after=1000):
+    return SessionJournal(Path(directory) / "last_session.json", Path(directory) / "last_session.journal",
+                          compact_after=compact_after)
+
+
+def test_saves_append_records():
+    """The checkpoint is written once; each later save adds one record of bounded size."""
+    print("Test: Saves append records...")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory)
+        session = create_running_session()
+        rng = random.Random(1)
+        journal.save(session_persistence.serialize_session(session))
+        checkpoint = journal.checkpoint_path.read_text()
+
+        record_sizes = []
+        for _ in range(60):
+            play(session, rng)
+            journal.save(session_persistence.serialize_session(session), "complete_match")
+            record_sizes.append(len(journal.journal_path.read_text().splitlines()[-1]))
+
+        assert journal.checkpoint_path.read_text() == checkpoint
+        lines = journal.journal_path.read_text().splitlines()
+        assert len(lines) == 60
+        assert [json.loads(line)["seq"] for line in lines] == list(range(1, 61))
+        assert json.loads(lines[0])["event"] == "complete_match"
+        # Late records are no bigger than early ones, apart from snapshot keyframes
+        assert sorted(record_sizes[-20:])[10] < 2 * sorted(record_sizes[:20])[10]
+        assert max(record_sizes) < len(json.dumps(session_persistence.serialize_session(session))) // 3
+    print("  PASSED")
+
+
+def test_load_replays_journal():
+    """Checkpoint plus journal gives back the data of the last save, also after a restart."""
+    print("Test: Load replays journal...")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory)
+        session = create_running_session()
+        rng = random.Random(2)
+        for _ in range(25):
+            play(session, rng)
+            data = session_persistence.serialize_session(session)
+            journal.save(data)
+
+        restarted = new_journal(directory)
+        assert restarted.load() == plain(data)
+
+        # Saving after a restart continues the same journal
+        play(session, rng)
+        data = session_persistence.serialize_session(session)
+        restarted.save(data)
+        assert json.loads(restarted.journal_path.read_text().splitlines()[-1])["seq"] == 25
+        assert new_journal(directory).load() == plain(data)
+    print("  PASSED")
+
+
+def test_compaction():
+    """After compact_after records the checkpoint is rewritten and the journal emptied."""
+    print("Test: Compaction...")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory, compact_after=10)
+        session = create_running_session()
+        rng = random.Random(3)
+        journal.save(session_persistence.serialize_session(session))
+        for _ in range(23):
+            play(session, rng)
+            data = session_persistence.serialize_session(session)
+            journal.save(data)
+
+        assert len(journal.journal_path.read_text().splitlines()) == 3
+        assert json.loads(journal.checkpoint_path.read_text())["journal_seq"] == 20
+        assert new_journal(directory).load() == plain(data)
+    print("  PASSED")
+
+
+def test_damaged_journal():
+    """Torn tails and records older than the checkpoint do not break recovery."""
+    print("Test: Damaged journal...")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory)
+        session = create_running_session()
+        rng = random.Random(4)
+        for _ in range(5):
+            play(session, rng)
+            good = session_persistence.serialize_session(session)
+            journal.save(good)
+        old_records = journal.journal_path.read_text()
+
+        # Crash while appending the next record
+        with open(journal.journal_path, 'a') as f:
+            f.write(old_records.splitlines()[-1][:40])
+        recovered = new_journal(directory)
+        assert recovered.load() == plain(good)
+
+        # The damaged tail is gone, so new records are readable
+        play(session, rng)
+        data = session_persistence.serialize_session(session)
+        recovered.save(data)
+        assert new_journal(directory).load() == plain(data)
+
+        # Crash after a checkpoint but before the journal was emptied
+        recovered.checkpoint(data)
+        with open(recovered.journal_path, 'w') as f:
+            f.write(old_records)
+        assert new_journal(directory).load() == plain(data)
+    print("  PASSED")
+
+
+def test_save_session_uses_journal():
+    """save_session and load_last_session go through the journal."""
+    print("Test: save_session uses journal...")
+    saved = (session_persistence.LAST_SESSION_FILE, session_persistence._session_journal)
+    with tempfile.TemporaryDirectory() as directory:
+        session_persistence.LAST_SESSION_FILE = Path(directory) / "last_session.json"
+        session_persistence._session_journal = new_journal(directory)
+        try:
+            session = create_running_session()
+            rng = random.Random(5)
+            assert session_persistence.save_session(session)
+            play(session, rng)
+            assert session_persistence.save_session(session, event="complete_match")
+            assert len(session_persistence._session_journal.journal_path.read_text().splitlines()) == 1
+
+            loaded = session_persistence.load_last_session()
+            assert loaded.id == session.id
+            assert [(m.id, m.status, m.score) for m in loaded.matches] == \
+                [(m.id, m.status, m.score) for m in session.matches]
+            assert [(s.games_played, s.wins, s.partners_played) for s in loaded.player_stats.values()] == \
+                [(s.games_played, s.wins, s.partners_played) for s in session.player_stats.values()]
+
+            assert session_persistence.save_session(session, event="close", checkpoint=True)
+            assert session_persistence._session_journal.journal_path.read_text() == ""
+            assert session_persistence.clear_saved_session()
+            assert not session_persistence.has_saved_session()
+        finally:
+            session_persistence.LAST_SESSION_FILE, session_persistence._session_journal = saved
+    print("  PASSED")
+
+
+def use_temp_journal(directory):
+    """Point save_session/load_last_session at a journal in directory; returns a restore function."""
+    saved = (session_persistence.LAST_SESSION_FILE, session_persistence._session_journal)
+    session_persistence.LAST_SESSION_FILE = Path(directory) / "last_session.json"
+    session_persistence._session_journal = new_journal(directory)
+
+    def restore():
+        session_persistence.LAST_SESSION_FILE, session_persistence._session_journal = saved
+    return restore
+
+
+def assert_journal_holds(session):
+    """Replaying the journal from disk gives the session as serialize_session writes it."""
+    loaded = new_journal(session_persistence._session_journal.checkpoint_path.parent).load()
+    expected = plain(session_persistence.serialize_session(session))
+    loaded.pop("saved_at")
+    expected.pop("saved_at")
+    assert loaded == expected
+
+
+def test_follow_up_saves_serialize_changes():
+    """After the first save, save_session serializes only the matches that can have changed."""
+    print("Test: Follow-up saves serialize changes...")
+    original = session_persistence._serialize_match
+    serialized = []
+
+    def counting_serialize_match(match):
+        serialized.append(match.id)
+        return original(match)
+
+    with tempfile.TemporaryDirectory() as directory:
+        restore = use_temp_journal(directory)
+        session_persistence._serialize_match = counting_serialize_match
+        try:
+            session = create_running_session()
+            rng = random.Random(6)
+            assert session_persistence.save_session(session)
+            for _ in range(60):
+                play(session, rng)
+                del serialized[:]
+                assert session_persistence.save_session(session, event="complete_match")
+                # The finished match plus the courts refilled, whatever the session length
+                assert len(serialized) <= 2 * session.config.courts
+            assert len(session.matches) > 60
+            assert_journal_holds(session)
+        finally:
+            session_persistence._serialize_match = original
+            restore()
+    print("  PASSED")
+
+
+def test_edits_reach_journal():
+    """Every kind of edit between saves is in the journal when it is replayed."""
+    print("Test: Edits reach journal...")
+    with tempfile.TemporaryDirectory() as directory:
+        restore = use_temp_journal(directory)
+        try:
+            session = create_running_session(num_players=16, courts=4)
+            manager = create_session_manager(session)
+            rng = random.Random(7)
+            assert session_persistence.save_session(session)
+
+            def complete():
+                play(session, rng)
+
+            def forfeit():
+                forfeit_match(session, rng.choice(get_active_matches(session)).id)
+                evaluate_and_create_matches(session)
+
+            def edit_score():
+                finished = [m for m in session.matches if m.status == 'completed']
+                if finished:
+                    match = rng.choice(finished[:-1] or finished)
+                    manager.handle_score_edit(match.id, 11, rng.randint(0, 9))
+
+            def edit_teams():
+                match = rng.choice(get_active_matches(session))
+                update_match_teams(session, match.id, list(match.team2), list(match.team1))
+
+            def manual_court():
+                match = rng.choice(get_active_matches(session))
+                players = match.team1 + match.team2
+                create_manual_match(session, match.court_number, players[::2], players[1::2])
+
+            def change_players():
+                player = Player(id=f"late{len(session.config.players)}", name="Late Arrival")
+                add_player_to_session(session, player)
+                if session.waiting_players:
+                    remove_player_from_session(session, session.waiting_players[0])
+
+            def undo():
+                manager.handle_match_completion(rng.choice(get_active_matches(session)).id, 11, 5)
+                assert manager.handle_undo()
+
+            def restore_snapshot():
+                if len(session.match_history_snapshots) > 3:
+                    load_session_from_snapshot(session, session.match_history_snapshots[-2])
+                    evaluate_and_create_matches(session)
+
+            edits = [complete, complete, complete, forfeit, edit_score, edit_teams, manual_court,
+                     change_players, undo, restore_snapshot]
+            for step in range(60):
+                rng.choice(edits)()
+                if step % 3 == 0:
+                    rng.choice(edits)()  # Several edits in one save
+                assert session_persistence.save_session(session)
+                assert_journal_holds(session)
+        finally:
+            restore()
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Session Journal Tests")
+    print("=" * 60)
+
+    tests = [
+        test_saves_append_records,
+        test_load_replays_journal,
+        test_compaction,
+        test_damaged_journal,
+        test_save_session_uses_journal,
+        test_follow_up_saves_serialize_changes,
+        test_edits_reach_journal,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,208 @@
+"""
+Test the schema-versioned session loader.
+
+Verifies that:
+1. Saved sessions carry the current schema version and load back unchanged
+2. Version 1 files (no version field, full history snapshots) still load and resume
+3. Files from a newer schema version are rejected instead of half-loaded
+4. A loaded session keeps only the resume timestamps, not the whole parsed file
+5. History snapshots are decoded on first use, and only back to the nearest keyframe
+"""
+import sys
+import os
+import json
+import random
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, get_active_matches,
+    load_session_from_snapshot, resolve_match_snapshot, SNAPSHOT_KEYFRAME_INTERVAL
+)
+from python.session_journal import SessionJournal
+from python.time_manager import initialize_time_manager
+import python.session_persistence as session_persistence
+from python.session_persistence import (
+    serialize_session, deserialize_session, adjust_wait_times_after_time_manager_start,
+    SESSION_SCHEMA_VERSION, StoredMatchSnapshot, StoredMatchSnapshotDelta
+)
+from python.pickleball_types import MatchSnapshot, MatchSnapshotDelta
+
+
+def play_session(completions=25, seed=1):
+    """Create a competitive-variety session and play some matches."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(16)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=3)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    for _ in range(completions):
+        complete_match(session, rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session
+
+
+def to_json(data):
+    return json.loads(json.dumps(data))
+
+
+def test_schema_version_round_trip():
+    """Serialized data is stamped with the current version and reloads to the same data."""
+    print("Test: Schema version round trip...")
+    session = play_session()
+    data = to_json(serialize_session(session))
+    assert data["schema_version"] == SESSION_SCHEMA_VERSION
+
+    restored = deserialize_session(data)
+    again = to_json(serialize_session(restored))
+    for key in ("matches", "player_stats", "waiting_players", "match_queue", "match_history_snapshots"):
+        assert again[key] == data[key], key
+    print("  PASSED")
+
+
+def test_version_1_file_loads():
+    """Unversioned files with full snapshots in every history entry still load and undo."""
+    print("Test: Version 1 file loads...")
+    session = play_session(seed=2)
+    data = to_json(serialize_session(session))
+
+    # Write the history the way version 1 did: a full snapshot per entry, no version field
+    legacy = dict(data)
+    del legacy["schema_version"]
+    legacy["match_history_snapshots"] = []
+    for entry in session.match_history_snapshots:
+        full = resolve_match_snapshot(session, entry)
+        legacy["match_history_snapshots"].append(to_json({
+            "match_id": full.match_id,
+            "timestamp": full.timestamp.isoformat(),
+            "matches": full.matches,
+            "waiting_players": full.waiting_players,
+            "player_stats": full.player_stats,
+            "active_players": list(full.active_players),
+            "match_queue": full.match_queue,
+            "player_last_court": full.player_last_court,
+            "court_players": full.court_players,
+            "courts_mixed_history": full.courts_mixed_history
+        }))
+
+    restored = deserialize_session(legacy)
+    assert [m.id for m in restored.matches] == [m.id for m in session.matches]
+    target = restored.match_history_snapshots[10]
+    assert load_session_from_snapshot(restored, target)
+    assert len([m for m in restored.matches if m.status == 'completed']) == 10
+    print("  PASSED")
+
+
+def test_newer_version_rejected():
+    """A file from a newer schema version is refused, and load_last_session reports no session."""
+    print("Test: Newer version rejected...")
+    session = play_session(completions=3, seed=3)
+    data = to_json(serialize_session(session))
+    data["schema_version"] = SESSION_SCHEMA_VERSION + 1
+    try:
+        deserialize_session(data)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+    saved = (session_persistence.LAST_SESSION_FILE, session_persistence._session_journal)
+    with tempfile.TemporaryDirectory() as directory:
+        session_persistence.LAST_SESSION_FILE = Path(directory) / "last_session.json"
+        session_persistence._session_journal = SessionJournal(
+            session_persistence.LAST_SESSION_FILE, Path(directory) / "last_session.journal")
+        try:
+            session_persistence._session_journal.checkpoint(data)
+            assert session_persistence.load_last_session() is None
+        finally:
+            session_persistence.LAST_SESSION_FILE, session_persistence._session_journal = saved
+    print("  PASSED")
+
+
+def test_loaded_session_keeps_only_timestamps():
+    """The parsed file is not kept alive by the session after loading."""
+    print("Test: Loaded session keeps only timestamps...")
+    session = play_session(seed=4)
+    data = to_json(serialize_session(session))
+    restored = deserialize_session(data)
+    assert restored._original_serialized_data == {
+        "session_start_time": data["session_start_time"],
+        "saved_at": data["saved_at"]
+    }
+
+    adjust_wait_times_after_time_manager_start(restored)
+    assert not hasattr(restored, '_original_serialized_data')
+    print("  PASSED")
+
+
+def test_history_decoded_on_first_use():
+    """Loading leaves snapshot contents as text; resolving one decodes back to its keyframe only."""
+    print("Test: History decoded on first use...")
+    session = play_session(completions=50, seed=5)
+    data = to_json(serialize_session(session))
+    restored = deserialize_session(data)
+    history = restored.match_history_snapshots
+    assert len(history) == 50
+    for idx, entry in enumerate(history):
+        keyframe = idx % SNAPSHOT_KEYFRAME_INTERVAL == 0
+        assert isinstance(entry, StoredMatchSnapshot if keyframe else StoredMatchSnapshotDelta)
+        assert isinstance(entry, MatchSnapshot if keyframe else MatchSnapshotDelta)
+        assert entry._decoded is None
+        assert entry.match_id == session.match_history_snapshots[idx].match_id
+
+    # Saving again passes the undecoded text through unchanged
+    assert to_json(serialize_session(restored))["match_history_snapshots"] == data["match_history_snapshots"]
+
+    target = SNAPSHOT_KEYFRAME_INTERVAL + 5
+    original = resolve_match_snapshot(session, session.match_history_snapshots[target])
+    resolved = resolve_match_snapshot(restored, history[target])
+    assert resolved.timestamp == original.timestamp
+    for name in ("matches", "player_stats", "waiting_players", "match_queue", "court_players"):
+        assert to_json(getattr(resolved, name)) == to_json(getattr(original, name)), name
+    decoded = [idx for idx, entry in enumerate(history) if entry._decoded is not None]
+    assert decoded == list(range(SNAPSHOT_KEYFRAME_INTERVAL, target + 1))
+
+    # The next completion encodes its delta against the last entry, decoding only that span
+    complete_match(restored, get_active_matches(restored)[0].id, 11, 3)
+    decoded = [idx for idx, entry in enumerate(history[:50]) if entry._decoded is not None]
+    assert decoded == list(range(SNAPSHOT_KEYFRAME_INTERVAL, target + 1)) + list(range(40, 50))
+
+    assert load_session_from_snapshot(restored, history[target])
+    assert len([m for m in restored.matches if m.status == 'completed']) == target
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Session Schema Tests")
+    print("=" * 60)
+
+    tests = [
+        test_schema_version_round_trip,
+        test_version_1_file_loads,
+        test_newer_version_rejected,
+        test_loaded_session_keeps_only_timestamps,
+        test_history_decoded_on_first_use,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
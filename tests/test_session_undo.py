@@ -0,0 +1,223 @@
+"""
+Test undo/redo of recorded session changes.
+
+Verifies that:
+1. Undoing any mix of completions, forfeits, score edits, manual courts, team changes and
+   player changes restores exactly the earlier state, and redo restores the later one
+2. Play continues normally after undo, and new changes discard the redo history
+3. Undo is refused (and the stack cleared) once the session changed without being recorded
+4. Recording copies only the state near the courts, never the completed match history
+"""
+import sys
+import os
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, get_active_matches, add_player_to_session, remove_player_from_session,
+    create_manual_match, update_match_teams, mark_session_changed, _create_session_snapshot
+)
+from python.session_manager import create_session_manager
+from python.session_persistence import serialize_session
+from python.queue_manager import get_waiting_players
+from python.time_manager import initialize_time_manager
+
+
+def session_state(session):
+    """Everything a change can touch, as plain JSON data."""
+    data = serialize_session(session)
+    data.pop("saved_at")
+    data["active_players"] = sorted(data["active_players"])  # Serialized from a set
+    snapshot = _create_session_snapshot(session, "state")
+    return json.loads(json.dumps({
+        "serialized": data,
+        "player_stats": snapshot.player_stats,
+        "player_last_court": snapshot.player_last_court,
+        "court_players": snapshot.court_players,
+        "courts_mixed_history": sorted(snapshot.courts_mixed_history),
+        "history_length": len(session.match_history_snapshots)
+    }, default=str))
+
+
+def create_manager(num_players=18, courts=3, mode='competitive-variety'):
+    initialize_time_manager()
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode=mode, session_type='doubles', players=players, courts=courts)
+    manager = create_session_manager(create_session(config))
+    manager.force_session_evaluation()
+    return manager
+
+
+def random_change(manager, rng, step):
+    """Apply one recorded change of a random kind."""
+    session = manager.session
+    active = get_active_matches(session)
+    completed = [m for m in session.matches if m.status == 'completed']
+    kind = rng.choice(['complete'] * 5 + ['forfeit', 'edit', 'swap', 'players', 'manual'])
+
+    if kind == 'edit' and completed:
+        match = rng.choice(completed)
+        manager.handle_score_edit(match.id, rng.randint(0, 9), 11)
+    elif kind == 'forfeit' and active:
+        manager.handle_match_forfeit(rng.choice(active).id)
+    elif kind == 'swap' and active:
+        match = rng.choice(active)
+        waiting = get_waiting_players(session)
+        team1 = list(match.team1)
+        if waiting:
+            team1[0] = waiting[0]
+        manager.record_change("Change teams", lambda: update_match_teams(session, match.id, match.team2, team1),
+                              players=team1 + match.team2, matches=[match])
+    elif kind == 'players':
+        def change_players():
+            leaving = rng.choice(sorted(get_waiting_players(session)) or sorted(session.active_players))
+            for match in get_active_matches(session):
+                if leaving in match.team1 + match.team2:
+                    manager.handle_match_forfeit(match.id)
+            remove_player_from_session(session, leaving)
+            add_player_to_session(session, Player(id=f"new{step}", name=f"New {step}"))
+            manager.force_session_evaluation()
+        manager.record_change("Update players", change_players,
+                              players=[pid for m in active for pid in m.team1 + m.team2])
+    elif kind == 'manual' and active:
+        match = rng.choice(active)
+        court = match.court_number
+
+        def make_court():
+            manager.handle_match_forfeit(match.id)
+            waiting = get_waiting_players(session)
+            if len(waiting) >= 4 and not any(m.court_number == court for m in get_active_matches(session)):
+                create_manual_match(session, court, waiting[:2], waiting[2:4])
+        manager.record_change("Make court", make_court, players=match.team1 + match.team2 + get_waiting_players(session)[:4])
+    elif active:
+        match = rng.choice(active)
+        manager.handle_match_completion(match.id, 11, rng.randint(0, 9))
+
+
+def test_undo_redo_restores_exact_state():
+    """Random sequences of changes undo to each earlier state and redo to each later one."""
+    print("Test: Undo/redo restores exact state...")
+    for seed in range(4):
+        rng = random.Random(seed)
+        manager = create_manager()
+        session = manager.session
+        states = [session_state(session)]
+        for step in range(30):
+            recorded = len(manager.undo_stack.undo_commands)
+            random_change(manager, rng, step)
+            if len(manager.undo_stack.undo_commands) > recorded:
+                states.append(session_state(session))
+            else:
+                assert session_state(session) == states[-1]
+        assert len(states) > 20
+
+        for expected in reversed(states[:-1]):
+            assert manager.handle_undo() is not None
+            assert session_state(session) == expected
+        assert manager.handle_undo() is None
+
+        for expected in states[1:]:
+            assert manager.handle_redo() is not None
+            assert session_state(session) == expected
+        assert manager.handle_redo() is None
+    print("  PASSED")
+
+
+def test_play_continues_after_undo():
+    """After an undo, the undone match can be scored again and redo history is dropped."""
+    print("Test: Play continues after undo...")
+    rng = random.Random(7)
+    manager = create_manager()
+    session = manager.session
+    for step in range(10):
+        random_change(manager, rng, step)
+
+    match = get_active_matches(session)[0]
+    manager.handle_match_completion(match.id, 11, 3)
+    after_wrong_score = session_state(session)
+    assert manager.handle_undo().startswith("Score 11-3")
+    assert match.status in ('waiting', 'in-progress') and match.score is None
+
+    success, _ = manager.handle_match_completion(match.id, 3, 11)
+    assert success and match.score == {'team1_score': 3, 'team2_score': 11}
+    assert manager.handle_redo() is None
+    assert session_state(session) != after_wrong_score
+    print("  PASSED")
+
+
+def test_unrecorded_change_clears_stack():
+    """Undo refuses to replay over changes it did not record."""
+    print("Test: Unrecorded change clears stack...")
+    manager = create_manager()
+    session = manager.session
+    manager.handle_match_completion(get_active_matches(session)[0].id, 11, 5)
+    assert manager.undo_stack.can_undo(session)
+
+    session.competitive_variety_roaming_range_percent = 0.8
+    mark_session_changed(session)
+    assert not manager.undo_stack.can_undo(session)
+    before = session_state(session)
+    assert manager.handle_undo() is None
+    assert session_state(session) == before
+    assert manager.undo_stack.undo_commands == []
+    print("  PASSED")
+
+
+def test_recording_skips_history():
+    """A completion late in a long session records the courts' matches, not the history."""
+    print("Test: Recording skips history...")
+    rng = random.Random(3)
+    manager = create_manager(num_players=24, courts=4)
+    session = manager.session
+    for _ in range(60):
+        manager.handle_match_completion(rng.choice(get_active_matches(session)).id, 11, rng.randint(0, 9))
+    command = manager.undo_stack.undo_commands[-1]
+    assert len([m for m in session.matches if m.status == 'completed']) == 60
+    assert len(command.before.match_fields) <= session.config.courts
+    assert len(command.after.match_fields) <= session.config.courts + 1
+    assert command.after.appended_snapshots == session.match_history_snapshots[-1:]
+
+    # A score edit records only that match and its players
+    edited = session.matches[0]
+    manager.handle_score_edit(edited.id, 2, 11)
+    command = manager.undo_stack.undo_commands[-1]
+    assert [match for match, _ in command.before.match_fields if match.status == 'completed'] == [edited]
+    assert len(command.before.counters) == 4 and command.before.stats_entries is None
+    manager.handle_undo()
+    assert edited.score != {'team1_score': 2, 'team2_score': 11}
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Session Undo Tests")
+    print("=" * 60)
+
+    tests = [
+        test_undo_redo_restores_exact_state,
+        test_play_continues_after_undo,
+        test_unrecorded_change_clears_stack,
+        test_recording_skips_history,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
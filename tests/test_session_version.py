@@ -0,0 +1,164 @@
+"""
+Test session version tracking and the skip-if-unchanged evaluation used by the GUI tick.
+
+Verifies that:
+1. Every session mutation bumps the version; reads and no-op evaluations do not
+2. evaluate_if_changed skips when neither the version nor the empty courts changed
+3. Completions, settings changes and direct court changes are re-evaluated
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, forfeit_match,
+    add_player_to_session, remove_player_from_session, create_manual_match,
+    update_match_teams, recalculate_stats_after_edit, get_active_matches
+)
+from python.session_manager import create_session_manager
+from python.time_manager import initialize_time_manager
+import python.session_manager as session_manager_module
+
+
+def create_test_session(num_players=10, courts=2, mode='competitive-variety'):
+    """Create a session with all courts filled."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i}", name=f"Player {i}") for i in range(1, num_players + 1)]
+    config = SessionConfig(mode=mode, session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    return session
+
+
+def count_evaluations():
+    """Wrap the evaluator the manager calls and return the call counter."""
+    calls = []
+    original = session_manager_module.evaluate_and_create_matches
+
+    def counting(session):
+        calls.append(session.version)
+        return original(session)
+
+    session_manager_module.evaluate_and_create_matches = counting
+    return calls, lambda: setattr(session_manager_module, 'evaluate_and_create_matches', original)
+
+
+def test_mutations_bump_version():
+    """Session functions that change state bump the version."""
+    print("Test: Mutations bump version...")
+    session = create_test_session()
+    match = get_active_matches(session)[0]
+
+    steps = [
+        lambda: complete_match(session, match.id, 11, 7),
+        lambda: recalculate_stats_after_edit(session, match, {'team1_score': 11, 'team2_score': 7},
+                                             {'team1_score': 11, 'team2_score': 9}),
+        lambda: add_player_to_session(session, Player(id="p11", name="Player 11")),
+        lambda: remove_player_from_session(session, "p11"),
+        lambda: evaluate_and_create_matches(session),  # Refills the freed court
+        lambda: forfeit_match(session, get_active_matches(session)[0].id),
+    ]
+    for step in steps:
+        before = session.version
+        step()
+        assert session.version > before
+
+    active = get_active_matches(session)[0]
+    players = active.team1 + active.team2
+    before = session.version
+    assert update_match_teams(session, active.id, [players[1], players[0]], players[2:])
+    assert session.version > before
+    before = session.version
+    assert create_manual_match(session, active.court_number, players[:2], players[2:])['success']
+    assert session.version > before
+    print("  PASSED")
+
+
+def test_noop_evaluation_keeps_version():
+    """Evaluating a full session creates nothing and leaves the version alone."""
+    print("Test: No-op evaluation keeps version...")
+    session = create_test_session()
+    before = session.version
+    evaluate_and_create_matches(session)
+    assert session.version == before
+    print("  PASSED")
+
+
+def test_tick_skips_unchanged_session():
+    """Repeated ticks on an idle session evaluate once."""
+    print("Test: Tick skips unchanged session...")
+    session = create_test_session(num_players=6, courts=2)  # Court 2 stays empty
+    manager = create_session_manager(session)
+    calls, restore = count_evaluations()
+    try:
+        assert manager.evaluate_if_changed()
+        for _ in range(5):
+            assert not manager.evaluate_if_changed()
+        assert len(calls) == 1
+    finally:
+        restore()
+    print("  PASSED")
+
+
+def test_tick_reevaluates_after_changes():
+    """Completions, settings changes and courts emptied behind the manager's back all trigger a pass."""
+    print("Test: Tick re-evaluates after changes...")
+    session = create_test_session()
+    manager = create_session_manager(session)
+    calls, restore = count_evaluations()
+    try:
+        manager.evaluate_if_changed()
+        start = len(calls)
+
+        match = get_active_matches(session)[0]
+        complete_match(session, match.id, 11, 3)
+        assert manager.evaluate_if_changed()
+        assert not manager.evaluate_if_changed()
+
+        manager.handle_settings_change('variety', value=0.4)  # Evaluates itself
+        assert not manager.evaluate_if_changed()
+
+        session.competitive_variety_roaming_range_percent = 0.6
+        manager.force_session_evaluation()  # Direct edits are followed by a forced pass
+        assert not manager.evaluate_if_changed()
+
+        get_active_matches(session)[0].status = 'forfeited'  # Empties a court without a version bump
+        assert manager.evaluate_if_changed()
+        assert len(calls) == start + 4
+    finally:
+        restore()
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Session Version Tests")
+    print("=" * 60)
+
+    tests = [
+        test_mutations_bump_version,
+        test_noop_evaluation_keeps_version,
+        test_tick_skips_unchanged_session,
+        test_tick_reevaluates_after_changes,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,162 @@
+"""
+Test delta-encoded match history snapshots.
+
+Verifies that:
+1. Every history entry resolves to the same state a full snapshot would have captured
+2. Keyframes are stored at a fixed interval and resolving never replays more than the interval
+3. Deltas survive a save/load round trip, and loading a delta entry restores the session correctly
+4. The stored history is a fraction of the size of full snapshots
+"""
+import sys
+import os
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig, MatchSnapshot, MatchSnapshotDelta
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, get_active_matches,
+    load_session_from_snapshot, resolve_match_snapshot, _create_session_snapshot,
+    SNAPSHOT_KEYFRAME_INTERVAL
+)
+from python.session_persistence import serialize_session, deserialize_session
+from python.time_manager import initialize_time_manager
+import python.session as session_module
+
+
+def snapshot_state(snapshot):
+    """Snapshot contents as plain JSON data (tuples become lists, court keys become strings, sets are sorted)."""
+    return json.loads(json.dumps({
+        "match_id": snapshot.match_id,
+        "matches": snapshot.matches,
+        "waiting_players": snapshot.waiting_players,
+        "player_stats": snapshot.player_stats,
+        "active_players": sorted(snapshot.active_players),
+        "match_queue": snapshot.match_queue,
+        "player_last_court": snapshot.player_last_court,
+        "court_players": snapshot.court_players,
+        "courts_mixed_history": snapshot.courts_mixed_history
+    }))
+
+
+def play_session(num_players=16, courts=3, completions=35, seed=1):
+    """Play a session and return it with the full snapshots taken before each completion."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    expected = []
+    for _ in range(completions):
+        match = rng.choice(get_active_matches(session))
+        expected.append(snapshot_state(_create_session_snapshot(session, match.id)))
+        complete_match(session, match.id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session, expected
+
+
+def test_entries_resolve_to_full_state():
+    """Keyframes at the interval, deltas in between, every entry resolves exactly."""
+    print("Test: Entries resolve to full state...")
+    session, expected = play_session()
+    history = session.match_history_snapshots
+    assert len(history) == len(expected)
+
+    for idx, entry in enumerate(history):
+        is_keyframe = idx % SNAPSHOT_KEYFRAME_INTERVAL == 0
+        assert isinstance(entry, MatchSnapshot if is_keyframe else MatchSnapshotDelta)
+        assert snapshot_state(resolve_match_snapshot(session, entry)) == expected[idx]
+    print("  PASSED")
+
+
+def test_resolve_replay_is_bounded():
+    """Resolving an entry applies at most interval - 1 deltas."""
+    print("Test: Resolve replay is bounded...")
+    session, _ = play_session(completions=45, seed=2)
+    calls = []
+    original = session_module._apply_snapshot_delta
+
+    def counting(base, delta):
+        calls.append(delta.match_id)
+        return original(base, delta)
+
+    session_module._apply_snapshot_delta = counting
+    try:
+        session.snapshot_head = None
+        for entry in session.match_history_snapshots:
+            calls.clear()
+            resolve_match_snapshot(session, entry)
+            assert len(calls) < SNAPSHOT_KEYFRAME_INTERVAL
+    finally:
+        session_module._apply_snapshot_delta = original
+    print("  PASSED")
+
+
+def test_round_trip_and_load():
+    """Deltas reload from JSON, load the right state, and recording continues after a reload."""
+    print("Test: Round trip and load...")
+    session, expected = play_session(seed=3)
+    restored = deserialize_session(json.loads(json.dumps(serialize_session(session))))
+    for idx, entry in enumerate(restored.match_history_snapshots):
+        assert snapshot_state(resolve_match_snapshot(restored, entry)) == expected[idx]
+
+    # Go back to the state before the 17th completion (a delta entry)
+    target = 16
+    assert isinstance(restored.match_history_snapshots[target], MatchSnapshotDelta)
+    assert load_session_from_snapshot(restored, restored.match_history_snapshots[target])
+    assert len(restored.match_history_snapshots) == target
+    state = snapshot_state(_create_session_snapshot(restored, expected[target]["match_id"]))
+    assert state == expected[target]
+
+    # New completions delta-encode against the reloaded history
+    match = get_active_matches(restored)[0]
+    before = snapshot_state(_create_session_snapshot(restored, match.id))
+    complete_match(restored, match.id, 11, 5)
+    restored.snapshot_head = None
+    assert snapshot_state(resolve_match_snapshot(restored, restored.match_history_snapshots[-1])) == before
+    print("  PASSED")
+
+
+def test_history_is_compact():
+    """A long evening's history is much smaller than full snapshots per completion."""
+    print("Test: History is compact...")
+    session, expected = play_session(num_players=24, courts=4, completions=80, seed=4)
+    stored = len(json.dumps(serialize_session(session)["match_history_snapshots"]))
+    full = len(json.dumps(expected))
+    assert stored * 3 < full
+    print(f"  {stored} bytes stored vs {full} bytes of full snapshots")
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Snapshot Delta Tests")
+    print("=" * 60)
+
+    tests = [
+        test_entries_resolve_to_full_state,
+        test_resolve_replay_is_bounded,
+        test_round_trip_and_load,
+        test_history_is_compact,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,188 @@
+"""
+Test copy-on-write trial sessions used by the deterministic waitlist.
+
+Verifies that:
+1. Trials share matches, stats and snapshots with the real session instead of copying them
+2. Nothing a trial does (new matches, completed matches, stat updates) reaches the real session
+3. Waitlist scenario analysis gives the same results as with deep-copied sessions
+"""
+import sys
+import os
+import copy
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import create_session, evaluate_and_create_matches, complete_match, get_active_matches
+from python.session_persistence import serialize_session
+from python.relationship_index import get_relationship_index, build_relationship_index
+from python.competitive_variety import get_ranking_index, populate_empty_courts_competitive_variety
+from python.trial_session import create_trial_session, trial_match, trial_player_stats
+from python.time_manager import initialize_time_manager
+import python.deterministic_waitlist as deterministic_waitlist
+import python.deterministic_waitlist_v2 as deterministic_waitlist_v2
+
+
+def create_played_session(num_players=14, courts=3, rounds=6, seed=1):
+    """Create a competitive-variety session with some history and full courts."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    for _ in range(rounds):
+        match = get_active_matches(session)[0]
+        complete_match(session, match.id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session
+
+
+def session_state(session):
+    """Serialized session without the save timestamp or set ordering."""
+    state = serialize_session(session)
+    state.pop('saved_at', None)
+    state['active_players'] = sorted(state['active_players'])
+    return state
+
+
+def deepcopy_trials(test):
+    """Run test with trials made by copy.deepcopy, as before copy-on-write trials."""
+    saved = (deterministic_waitlist.create_trial_session, deterministic_waitlist_v2.create_trial_session)
+    deterministic_waitlist.create_trial_session = copy.deepcopy
+    deterministic_waitlist_v2.create_trial_session = copy.deepcopy
+    try:
+        return test()
+    finally:
+        deterministic_waitlist.create_trial_session, deterministic_waitlist_v2.create_trial_session = saved
+
+
+def test_trial_shares_history():
+    """Creating a trial copies containers, not the objects in them."""
+    print("Test: Trial shares history...")
+    session = create_played_session()
+    get_ranking_index(session)
+    get_relationship_index(session)
+    trial = create_trial_session(session)
+
+    assert trial.matches is not session.matches
+    assert all(a is b for a, b in zip(trial.matches, session.matches))
+    assert trial.player_stats is not session.player_stats
+    assert all(trial.player_stats[pid] is stats for pid, stats in session.player_stats.items())
+    assert all(a is b for a, b in zip(trial.match_history_snapshots, session.match_history_snapshots))
+
+    # Warm indexes carry over instead of being rebuilt
+    assert get_ranking_index(trial).ranks == session.ranking_index.ranks
+    assert trial.relationship_index is not session.relationship_index
+    assert get_relationship_index(trial).completed == session.relationship_index.completed
+    print("  PASSED")
+
+
+def test_trial_changes_stay_in_trial():
+    """Completing a match, editing stats and populating courts leave the real session untouched."""
+    print("Test: Trial changes stay in trial...")
+    session = create_played_session()
+    before = session_state(session)
+    history_before = list(get_relationship_index(session).completed)
+
+    trial = create_trial_session(session)
+    active = get_active_matches(session)[0]
+    match = trial_match(trial, active.id)
+    assert match is not active and trial_match(trial, active.id) is match
+    match.status = 'completed'
+    match.score = {'team1_score': 11, 'team2_score': 4}
+    for pid in match.team1 + match.team2:
+        stats = trial_player_stats(trial, pid)
+        assert stats is not session.player_stats[pid]
+        assert trial_player_stats(trial, pid) is stats
+        stats.games_played += 1
+        stats.partners_played["nobody"] = 1
+        stats.opponent_last_game["nobody"] = 1
+        stats.court_history.append(match.court_number)
+    populate_empty_courts_competitive_variety(trial)
+    edited = trial_match(trial, get_active_matches(session)[-1].id)
+    edited.team1.reverse()
+
+    # The trial's history index picked up its own completion
+    trial_history = get_relationship_index(trial)
+    assert trial_history.completed == build_relationship_index(trial).completed
+    assert trial_history.completed_count == len(history_before) + 1
+
+    # Nested trials copy from the trial, not the real session
+    nested = create_trial_session(trial)
+    assert trial_player_stats(nested, match.team1[0]) is not trial.player_stats[match.team1[0]]
+
+    assert session_state(session) == before
+    assert get_relationship_index(session).completed == history_before
+    print("  PASSED")
+
+
+def test_waitlist_v2_matches_deepcopy():
+    """Court finish scenarios and trial matching agree with deep-copied trials."""
+    print("Test: Waitlist v2 scenarios match deep copies...")
+    for seed in (1, 2, 3):
+        session = create_played_session(seed=seed)
+        courts = sorted(m.court_number for m in get_active_matches(session))
+
+        def run():
+            return ([deterministic_waitlist_v2.analyze_court_finish_scenarios(session, c) for c in courts],
+                    deterministic_waitlist_v2.run_matching_in_trial_mode(session))
+
+        before = session_state(session)
+        assert run() == deepcopy_trials(run)
+        assert session_state(session) == before
+    print("  PASSED")
+
+
+def test_waitlist_v1_matches_deepcopy():
+    """Simulated outcomes and per-court checks agree with deep-copied trials."""
+    print("Test: Waitlist v1 simulation matches deep copies...")
+    session = create_played_session(seed=4)
+    before = session_state(session)
+
+    def run():
+        results = []
+        for match in get_active_matches(session):
+            for team1_wins in (True, False):
+                sim = deterministic_waitlist.simulate_match_outcome(session, match, team1_wins)
+                results.append(session_state(sim))
+                for pid in sorted(session.active_players):
+                    results.append(deterministic_waitlist.check_player_gets_match(sim, pid, match.court_number))
+        return results
+
+    assert run() == deepcopy_trials(run)
+    assert session_state(session) == before
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Trial Session Tests")
+    print("=" * 60)
+
+    tests = [
+        test_trial_shares_history,
+        test_trial_changes_stay_in_trial,
+        test_waitlist_v2_matches_deepcopy,
+        test_waitlist_v1_matches_deepcopy,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
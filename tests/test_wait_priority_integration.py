@@ -75,7 +75,7 @@ def simulate_real_session_with_wait_priority():
         # Add scoring manually after creation
         match.end_time = datetime.now() - timedelta(minutes=25-i*5)
         match.score = {'team1_score': 11, 'team2_score': 8}
-        match.winner = 'team1'
+        winner = 'team1'
         session.matches.append(match)
         match_id += 1
         
@@ -88,12 +88,12 @@ def simulate_real_session_with_wait_priority():
             stats.games_played += 1
             
             if player_id in match.team1:
-                if match.winner == 'team1':
+                if winner == 'team1':
                     stats.wins += 1
                 else:
                     stats.losses += 1
             else:
-                if match.winner == 'team2':
+                if winner == 'team2':
                     stats.wins += 1
                 else:
                     stats.losses += 1
@@ -0,0 +1,125 @@
+"""
+Test the frozen session snapshots and batch predictions behind the GUI's background waitlist worker.
+
+Verifies that:
+1. A frozen session owns its stats and unfinished matches and shares finished ones
+2. Batch waitlist dependencies equal the per-player predictions
+3. Predictions on a frozen snapshot are unaffected by the real session changing meanwhile
+"""
+import sys
+import os
+import random
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import create_session, evaluate_and_create_matches, complete_match, get_active_matches
+from python.queue_manager import get_waiting_players
+from python.trial_session import freeze_session
+from python.time_manager import initialize_time_manager
+from python.deterministic_waitlist_v2 import (
+    calculate_waitlist_dependencies, get_court_outcome_dependencies_v2, format_court_dependencies_v2
+)
+
+
+def create_waiting_session(num_players=18, courts=3, rounds=5, seed=1):
+    """Create a competitive-variety session with full courts and a waitlist."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    for _ in range(rounds):
+        complete_match(session, get_active_matches(session)[0].id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session
+
+
+def test_frozen_session_ownership():
+    """Everything the real session may still change is copied; finished matches are shared."""
+    print("Test: Frozen session ownership...")
+    session = create_waiting_session()
+    frozen = freeze_session(session)
+
+    for pid, stats in session.player_stats.items():
+        assert frozen.player_stats[pid] is not stats
+        assert frozen.player_stats[pid] == stats
+    for real, copy in zip(session.matches, frozen.matches):
+        if real.status in ('completed', 'forfeited'):
+            assert copy is real
+        else:
+            assert copy is not real and copy == real
+    assert frozen.scenario_cache is None
+    print("  PASSED")
+
+
+def test_batch_equals_per_player():
+    """calculate_waitlist_dependencies agrees with asking for each player."""
+    print("Test: Batch dependencies equal per-player...")
+    for seed in (1, 2, 3):
+        session = create_waiting_session(seed=seed)
+        expected = {}
+        for pid in get_waiting_players(session):
+            dependencies = get_court_outcome_dependencies_v2(session, pid)
+            if dependencies:
+                expected[pid] = dependencies
+        assert expected
+        assert calculate_waitlist_dependencies(session) == expected
+        assert calculate_waitlist_dependencies(freeze_session(session)) == expected
+
+    assert format_court_dependencies_v2({3: ['red_wins'], 1: ['red_wins', 'blue_wins']}) == "C1RB, C3R"
+    print("  PASSED")
+
+
+def test_snapshot_isolated_from_live_session():
+    """A worker thread reading a snapshot sees the session as it was when frozen."""
+    print("Test: Snapshot isolated from live session...")
+    session = create_waiting_session(seed=4)
+    expected = calculate_waitlist_dependencies(freeze_session(session))
+    frozen = freeze_session(session)
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(calculate_waitlist_dependencies(frozen)))
+    worker.start()
+    rng = random.Random(4)
+    for _ in range(3):
+        complete_match(session, get_active_matches(session)[0].id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    worker.join()
+
+    assert results == [expected]
+    assert calculate_waitlist_dependencies(frozen) == expected
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Waitlist Prediction Worker Tests")
+    print("=" * 60)
+
+    tests = [
+        test_frozen_session_ownership,
+        test_batch_equals_per_player,
+        test_snapshot_isolated_from_live_session,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,142 @@
+"""
+Test the per-version court finish scenario cache of the deterministic waitlist.
+
+Verifies that:
+1. A full prediction pass runs each court/outcome trial once
+2. Predictions are identical with and without the cache
+3. A version bump, a court slide or a direct change to the matches list starts a fresh cache
+"""
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import (
+    create_session, evaluate_and_create_matches, complete_match, get_active_matches, mark_session_changed
+)
+from python.time_manager import initialize_time_manager
+from python.utils import generate_id
+import python.deterministic_waitlist_v2 as deterministic_waitlist_v2
+from python.deterministic_waitlist_v2 import (
+    analyze_court_finish_scenarios, calculate_waitlist_predictions_v2, get_scenario_cache
+)
+
+
+def create_waiting_session(num_players=20, courts=3, rounds=5, seed=1):
+    """Create a competitive-variety session with full courts and a long waitlist."""
+    initialize_time_manager()
+    rng = random.Random(seed)
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    for _ in range(rounds):
+        complete_match(session, get_active_matches(session)[0].id, 11, rng.randint(0, 9))
+        evaluate_and_create_matches(session)
+    return session
+
+
+def count_trials():
+    """Count the trial sessions created by the v2 waitlist."""
+    calls = []
+    original = deterministic_waitlist_v2.create_trial_session
+
+    def counting(session):
+        calls.append(session.version)
+        return original(session)
+
+    deterministic_waitlist_v2.create_trial_session = counting
+    return calls, lambda: setattr(deterministic_waitlist_v2, 'create_trial_session', original)
+
+
+def test_one_trial_per_court_outcome():
+    """The prediction pass costs courts x 2 trials, however many players are waiting."""
+    print("Test: One trial per court outcome...")
+    session = create_waiting_session()
+    courts = len(get_active_matches(session))
+    calls, restore = count_trials()
+    try:
+        predictions = calculate_waitlist_predictions_v2(session)
+        assert len(predictions) > 4
+        assert len(calls) == courts * 2
+        calculate_waitlist_predictions_v2(session)
+        assert len(calls) == courts * 2
+    finally:
+        restore()
+    print("  PASSED")
+
+
+def test_predictions_unchanged_by_cache():
+    """Cached and freshly computed predictions are the same."""
+    print("Test: Predictions unchanged by cache...")
+    for seed in (1, 2, 3):
+        session = create_waiting_session(seed=seed)
+        cached = calculate_waitlist_predictions_v2(session)
+        cached_again = calculate_waitlist_predictions_v2(session)
+        session.scenario_cache = None
+        fresh = calculate_waitlist_predictions_v2(session)
+        assert cached == cached_again == fresh
+    print("  PASSED")
+
+
+def test_cache_evicted_on_change():
+    """Version bumps, replaced match lists and court slides miss the cache."""
+    print("Test: Cache evicted on change...")
+    session = create_waiting_session()
+    court = get_active_matches(session)[0].court_number
+    first = analyze_court_finish_scenarios(session, court)
+    cache = get_scenario_cache(session)
+    assert analyze_court_finish_scenarios(session, court) == first
+
+    mark_session_changed(session)
+    assert get_scenario_cache(session) is not cache
+
+    cache = get_scenario_cache(session)
+    session.matches = list(session.matches)
+    assert get_scenario_cache(session) is not cache
+
+    # A different match on the same court (e.g. after a slide) is a different scenario
+    analyze_court_finish_scenarios(session, court)
+    calls, restore = count_trials()
+    try:
+        for match in get_active_matches(session):
+            if match.court_number == court:
+                match.id = generate_id()
+        analyze_court_finish_scenarios(session, court)
+        assert len(calls) == 2
+    finally:
+        restore()
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Waitlist Scenario Cache Tests")
+    print("=" * 60)
+
+    tests = [
+        test_one_trial_per_court_outcome,
+        test_predictions_unchanged_by_cache,
+        test_cache_evicted_on_change,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,130 @@
+"""
+Test the waitlist view model built once per GUI refresh.
+
+Verifies that:
+1. Rows follow the waitlist order and carry rank, wait times and relative tiers for every waiter
+2. Row text matches the session window's waitlist format, including dependencies and the stale marker
+3. Building the model evaluates each waiter's wait priority once, however long the waitlist
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.pickleball_types import Player, SessionConfig
+from python.session import create_session, evaluate_and_create_matches
+from python.queue_manager import get_waiting_players
+from python.competitive_variety import get_player_ranking
+from python.wait_priority import calculate_relative_wait_priority_infos
+from python.time_manager import initialize_time_manager
+from python.utils import start_player_wait_timer
+import python.wait_priority as wait_priority
+from python.waitlist_view import WaitlistRow, build_waitlist_view_model
+
+
+def create_waiting_session(num_players=30, courts=2):
+    """Create a session with a long waitlist and spread-out wait times."""
+    initialize_time_manager()
+    players = [Player(id=f"p{i:02d}", name=f"Player {i}") for i in range(num_players)]
+    config = SessionConfig(mode='competitive-variety', session_type='doubles', players=players, courts=courts)
+    session = create_session(config)
+    evaluate_and_create_matches(session)
+    for i, pid in enumerate(get_waiting_players(session)):
+        stats = session.player_stats[pid]
+        stats.total_wait_time = i * 90
+        start_player_wait_timer(stats)
+    return session
+
+
+def test_rows_cover_waitlist():
+    """One row per waiter in waitlist order, with the same values as the per-player helpers."""
+    print("Test: Rows cover waitlist...")
+    session = create_waiting_session()
+    waiting_ids = get_waiting_players(session)
+    view = build_waitlist_view_model(session)
+
+    assert view.player_ids == waiting_ids
+    infos = {info.player_id: info for info in calculate_relative_wait_priority_infos(session, waiting_ids)}
+    assert {info.priority_tier for info in infos.values()} == {0, 1, 2}
+    for row in view.rows:
+        info = infos[row.player_id]
+        assert row.has_stats
+        assert (row.current_wait_seconds, row.total_wait_seconds, row.priority_tier) == \
+            (info.current_wait_seconds, info.total_wait_seconds, info.priority_tier)
+        assert row.rank == get_player_ranking(session, row.player_id)[0]
+        assert row.name == f"Player {int(row.player_id[1:])}"
+    print("  PASSED")
+
+
+def test_row_text():
+    """Columns are added in the order the waitlist shows them."""
+    print("Test: Row text...")
+    row = WaitlistRow(player_id="p1", name="Ann", rank=3, has_stats=True, current_wait_seconds=65,
+                      total_wait_seconds=1500, priority_tier=0,
+                      dependencies={2: ['blue_wins'], 1: ['red_wins', 'blue_wins']})
+
+    assert row.display_text(False, False, False) == "Ann"
+    assert row.display_text(True, False, False) == "Ann [3]"
+    assert row.display_text(False, True, False) == "Ann  [01:05 / 25m] ⚠️"
+    assert row.display_text(True, True, True) == "Ann [3]  [01:05 / 25m] ⚠️\n    🎯C1RB, C2B"
+    row.priority_tier = 1
+    row.dependencies_stale = True
+    assert row.display_text(False, True, True) == "Ann  [01:05 / 25m] ⏰\n    🎯C1RB, C2B ⏳"
+
+    # Players without stats have nothing to show in the wait column
+    guest = WaitlistRow(player_id="g", name="Guest", rank=9, has_stats=False)
+    assert guest.display_text(True, True, True) == "Guest [9]"
+    print("  PASSED")
+
+
+def test_priority_computed_once_per_waiter():
+    """Wait priority is evaluated once per waiter per refresh, not once per pair."""
+    print("Test: Priority computed once per waiter...")
+    session = create_waiting_session(num_players=40)
+    waiting_ids = get_waiting_players(session)
+    calls = []
+    original = wait_priority.calculate_wait_priority_info
+
+    def counting(session, player_id):
+        calls.append(player_id)
+        return original(session, player_id)
+
+    wait_priority.calculate_wait_priority_info = counting
+    try:
+        view = build_waitlist_view_model(session, waiting_ids)
+    finally:
+        wait_priority.calculate_wait_priority_info = original
+    assert len(view.rows) == len(waiting_ids) > 20
+    assert sorted(calls) == sorted(waiting_ids)
+    print("  PASSED")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Waitlist View Model Tests")
+    print("=" * 60)
+
+    tests = [
+        test_rows_cover_waitlist,
+        test_row_text,
+        test_priority_computed_once_per_waiter,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  FAILED: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print()
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)